@@ -7,6 +7,7 @@ from shg.shg.utils.notification_service import (
     schedule_notification,
     NotificationService
 )
+from shg.shg.doctype.shg_notification_log.shg_notification_log import mark_notifications_read
 import json
 
 @frappe.whitelist(allow_guest=False)
@@ -75,17 +76,21 @@ def send_member_notification():
 @frappe.whitelist(allow_guest=False)
 def get_member_notifications():
     """
-    Get notifications for a specific member
+    Get notifications for a specific member, newest first
     
     Required params:
     - member_id: ID of the member
     - limit: Number of notifications to return (default 20)
-    - offset: Offset for pagination (default 0)
+    
+    Optional params:
+    - cursor: next_cursor from the previous page (preferred, constant cost per page)
+    - offset: Offset for pagination (default 0, ignored when cursor is given)
     """
     try:
         member_id = frappe.form_dict.get('member_id')
         limit = int(frappe.form_dict.get('limit', 20))
         offset = int(frappe.form_dict.get('offset', 0))
+        cursor = frappe.form_dict.get('cursor')
         
         if not member_id:
             return {
@@ -93,24 +98,36 @@ def get_member_notifications():
                 "message": "Member ID is required"
             }
         
-        # Get notifications for the member
-        notifications = frappe.get_all(
-            "SHG Notification Log",
-            filters={"member": member_id},
-            fields=[
-                "name", "member", "member_name", "notification_type", 
-                "channel", "status", "sent_date", "message", 
-                "reference_document", "reference_name", "delivery_status"
-            ],
-            order_by="creation DESC",
-            limit_page_length=limit,
-            limit_start=offset
-        )
+        values = {"member": member_id, "limit": limit, "offset": 0 if cursor else offset}
+        cursor_condition = ""
+        if cursor:
+            # Keyset pagination on the (member, creation) index; name breaks ties
+            values["cursor_creation"], values["cursor_name"] = cursor.split("|", 1)
+            cursor_condition = """
+                AND (creation < %(cursor_creation)s
+                    OR (creation = %(cursor_creation)s AND name < %(cursor_name)s))
+            """
+        
+        notifications = frappe.db.sql(f"""
+            SELECT name, member, member_name, notification_type, channel, status,
+                sent_date, message, reference_document, reference_name,
+                delivery_status, is_read, read_on, creation
+            FROM `tabSHG Notification Log`
+            WHERE member = %(member)s {cursor_condition}
+            ORDER BY creation DESC, name DESC
+            LIMIT %(limit)s OFFSET %(offset)s
+        """, values, as_dict=True)
+        
+        next_cursor = None
+        if len(notifications) == limit:
+            last = notifications[-1]
+            next_cursor = f"{last.creation}|{last.name}"
         
         return {
             "status": "success",
             "data": notifications,
-            "count": len(notifications)
+            "count": len(notifications),
+            "next_cursor": next_cursor
         }
         
     except Exception as e:
@@ -121,6 +138,46 @@ def get_member_notifications():
         }
 
 
+@frappe.whitelist(allow_guest=False)
+def mark_member_notifications_read():
+    """
+    Mark notifications as read for a member
+    
+    Required params:
+    - member_id: ID of the member
+    
+    Optional params:
+    - notifications: JSON list of notification log names (default: all unread)
+    """
+    try:
+        member_id = frappe.form_dict.get('member_id')
+        notifications = frappe.form_dict.get('notifications')
+        
+        if not member_id:
+            return {
+                "status": "error",
+                "message": "Member ID is required"
+            }
+        
+        if isinstance(notifications, str):
+            notifications = json.loads(notifications)
+        
+        marked = mark_notifications_read(member_id, notifications)
+        
+        return {
+            "status": "success",
+            "marked_read": marked,
+            "unread_count": frappe.db.get_value("SHG Member", member_id, "unread_notification_count") or 0
+        }
+        
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "SHG API - Mark Notifications Read Error")
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+
+
 @frappe.whitelist(allow_guest=False)
 def schedule_member_notification():
     """
@@ -337,9 +394,8 @@ def get_unread_notifications_count():
                 "message": "Member ID is required"
             }
         
-        # Count notifications (for now, just count all since we don't have a read status field)
-        # In a real implementation, you'd have a separate read receipts mechanism
-        count = frappe.db.count("SHG Notification Log", {"member": member_id})
+        # Counter maintained on insert/read/archive, a primary key lookup
+        count = frappe.db.get_value("SHG Member", member_id, "unread_notification_count") or 0
         
         return {
             "status": "success",
@@ -19,31 +19,76 @@ doc_events = {
     },
     "SHG Contribution": {
         "validate": "shg.shg.doctype.shg_contribution.shg_contribution.validate_contribution",
-        "on_submit": "shg.shg.doctype.shg_contribution.shg_contribution.post_to_general_ledger",
+        "on_submit": [
+            "shg.shg.doctype.shg_contribution.shg_contribution.post_to_general_ledger",
+            "shg.shg.utils.kpi_snapshots.on_submit",
+            "shg.shg.utils.cash_flow_cube.on_submit",
+            "shg.shg.utils.member_ledger.on_submit"
+        ],
+        "on_cancel": [
+            "shg.shg.utils.kpi_snapshots.on_cancel",
+            "shg.shg.utils.cash_flow_cube.on_cancel",
+            "shg.shg.utils.member_ledger.on_cancel"
+        ],
         "before_validate": "shg.shg.utils.company_utils.ensure_company_field"
     },
     "SHG Contribution Invoice": {
         "validate": "shg.shg.doctype.shg_contribution_invoice.shg_contribution_invoice.validate_contribution_invoice",
-        "on_submit": "shg.shg.doctype.shg_contribution_invoice.shg_contribution_invoice.create_contribution_from_invoice",
+        "on_submit": [
+            "shg.shg.doctype.shg_contribution_invoice.shg_contribution_invoice.create_contribution_from_invoice",
+            "shg.shg.utils.member_ledger.on_submit"
+        ],
+        "on_cancel": "shg.shg.utils.member_ledger.on_cancel",
         "before_validate": "shg.shg.utils.company_utils.ensure_company_field"
     },
     "SHG Loan": {
         "validate": "shg.shg.doctype.shg_loan.shg_loan.validate_loan",
         "before_save": "shg.shg.doctype.shg_loan.shg_loan.before_save",
-        "on_submit": "shg.shg.doctype.shg_loan.shg_loan.on_submit",
+        "on_submit": [
+            "shg.shg.doctype.shg_loan.shg_loan.on_submit",
+            "shg.shg.utils.kpi_snapshots.on_submit",
+            "shg.shg.utils.cash_flow_cube.on_submit",
+            "shg.shg.utils.member_ledger.on_submit"
+        ],
+        "on_cancel": [
+            "shg.shg.utils.kpi_snapshots.on_cancel",
+            "shg.shg.utils.cash_flow_cube.on_cancel",
+            "shg.shg.utils.member_ledger.on_cancel"
+        ],
         "after_insert": "shg.shg.doctype.shg_loan.shg_loan.after_insert_or_update",
         "on_update_after_submit": "shg.shg.doctype.shg_loan.shg_loan.after_insert_or_update",
         "before_validate": "shg.shg.utils.company_utils.ensure_company_field"
     },
     "SHG Loan Repayment": {
         "validate": "shg.shg.doctype.shg_loan_repayment.shg_loan_repayment.validate_repayment",
-        "on_submit": "shg.shg.doctype.shg_loan_repayment.shg_loan_repayment.post_to_general_ledger"
+        "on_submit": [
+            "shg.shg.doctype.shg_loan_repayment.shg_loan_repayment.post_to_general_ledger",
+            "shg.shg.utils.kpi_snapshots.on_submit",
+            "shg.shg.utils.cash_flow_cube.on_submit",
+            "shg.shg.utils.member_ledger.on_submit"
+        ],
+        "on_cancel": [
+            "shg.shg.utils.kpi_snapshots.on_cancel",
+            "shg.shg.utils.cash_flow_cube.on_cancel",
+            "shg.shg.utils.member_ledger.on_cancel"
+        ]
     },
     "SHG Meeting Fine": {
         "validate": "shg.shg.doctype.shg_meeting_fine.shg_meeting_fine.validate_fine",
-        "on_submit": "shg.shg.doctype.shg_meeting_fine.shg_meeting_fine.post_to_general_ledger",
+        "on_submit": [
+            "shg.shg.doctype.shg_meeting_fine.shg_meeting_fine.post_to_general_ledger",
+            "shg.shg.utils.kpi_snapshots.on_submit",
+            "shg.shg.utils.member_ledger.on_submit"
+        ],
+        "on_cancel": [
+            "shg.shg.utils.kpi_snapshots.on_cancel",
+            "shg.shg.utils.member_ledger.on_cancel"
+        ],
         "before_validate": "shg.shg.utils.company_utils.ensure_company_field"
     },
+    "Journal Entry": {
+        "before_cancel": "shg.shg.hooks.journal_entry.before_cancel"
+    },
     "Payment Entry": {
         "validate": [
             "shg.shg.hooks.payment_entry.validate",
@@ -53,25 +98,48 @@ doc_events = {
         "before_validate": "shg.shg.utils.company_utils.ensure_company_field"
     },
     "SHG Payment Entry": {
-        "before_validate": "shg.shg.utils.company_utils.ensure_company_field"
+        "before_validate": "shg.shg.utils.company_utils.ensure_company_field",
+        "on_submit": [
+            "shg.shg.utils.kpi_snapshots.on_submit",
+            "shg.shg.utils.cash_flow_cube.on_submit",
+            "shg.shg.utils.member_ledger.on_submit"
+        ],
+        "on_cancel": [
+            "shg.shg.utils.kpi_snapshots.on_cancel",
+            "shg.shg.utils.cash_flow_cube.on_cancel",
+            "shg.shg.utils.member_ledger.on_cancel"
+        ]
     },
     "SHG Multi Member Payment": {
-        "before_validate": "shg.shg.utils.company_utils.ensure_company_field"
+        "before_validate": "shg.shg.utils.company_utils.ensure_company_field",
+        "on_submit": "shg.shg.utils.kpi_snapshots.on_submit",
+        "on_cancel": "shg.shg.utils.kpi_snapshots.on_cancel"
+    },
+    "*": {
+        "on_submit": "shg.shg.utils.report_cache.on_doc_change",
+        "on_cancel": "shg.shg.utils.report_cache.on_doc_change",
+        "on_update_after_submit": "shg.shg.utils.report_cache.on_doc_change"
     }
 }
 
 # Scheduled Tasks
 scheduler_events = {
+    "hourly": [
+        "shg.shg.utils.kpi_snapshots.reconcile_kpi_snapshots"
+    ],
     "daily": [
         "shg.tasks.send_daily_reminders",
         "shg.tasks.calculate_loan_penalties",
         "shg.tasks.generate_billable_contribution_invoices",
         "shg.shg.doctype.shg_contribution.shg_contribution.update_overdue_contributions",
         "shg.shg.utils.loan_utils.flag_overdue_loans",
-        "shg.shg.utils.notification_service.process_scheduled_notifications"
+        "shg.shg.utils.notification_service.process_scheduled_notifications",
+        "shg.shg.utils.credit_scoring.run_nightly_credit_scoring"
     ],
     "weekly": [
-        "shg.tasks.send_weekly_contribution_reminders"
+        "shg.tasks.send_weekly_contribution_reminders",
+        "shg.shg.utils.notification_service.archive_notification_logs",
+        "shg.shg.utils.pdf_batch.purge_pdf_cache"
     ],
     "monthly": [
         "shg.tasks.generate_monthly_reports",
@@ -81,6 +149,12 @@ scheduler_events = {
     ]
 }
 
+# Performance instrumentation (no-op unless enabled in SHG Settings)
+before_request = ["shg.shg.utils.instrumentation.before_request"]
+after_request = ["shg.shg.utils.instrumentation.after_request"]
+before_job = ["shg.shg.utils.instrumentation.before_job"]
+after_job = ["shg.shg.utils.instrumentation.after_job"]
+
 # Installation
 after_install = "shg.install.after_install"
 
@@ -148,11 +222,31 @@ whitelisted_methods = [
     "shg.shg.api.notifications.get_scheduled_notifications",
     "shg.shg.api.notifications.send_batch_notifications_api",
     "shg.shg.api.notifications.get_unread_notifications_count",
+    "shg.api.notifications.mark_member_notifications_read",
     "shg.shg.api.notifications.test_notification_connection",
     "shg.loan_repayment_api.get_active_loans",
     "shg.loan_repayment_api.get_outstanding_amount",
     "shg.shg.utils.member_statement_utils.send_member_statements",  # Add the new method
-    "shg.shg.utils.member_statement_utils.calculate_member_statement"
+    "shg.shg.utils.member_statement_utils.calculate_member_statement",
+    "shg.shg.utils.member_purge.bulk_purge_members",
+    "shg.shg.utils.kpi_snapshots.rebuild_kpi_snapshots",
+    "shg.shg.utils.invoice_submission.get_submission_report",
+    "shg.shg.utils.invoice_submission.retry_failed_invoices",
+    "shg.shg.utils.cash_flow_cube.rebuild_cash_flow_cube",
+    "shg.shg.utils.member_ledger.get_member_ledger",
+    "shg.shg.utils.member_ledger.rebuild_member_ledger",
+    "shg.shg.utils.report_pager.get_report_page",
+    "shg.shg.utils.report_pager.start_report_export",
+    "shg.shg.utils.report_cache.get_report_cache_stats",
+    "shg.shg.utils.instrumentation.clear_instrumentation",
+    "shg.shg.loan_services.writeoff.preview_bulk_writeoff",
+    "shg.shg.loan_services.writeoff.bulk_writeoff_loans",
+    "shg.shg.loan_services.reschedule.get_reschedule_scenarios",
+    "shg.shg.utils.credit_scoring.get_credit_score_history",
+    "shg.shg.utils.contribution_import.preview_contribution_import",
+    "shg.shg.utils.contribution_import.import_contributions",
+    "shg.shg.utils.mpesa_reconciliation.reconcile_mpesa_statement",
+    "shg.shg.utils.mpesa_reconciliation.resolve_statement_line"
 ]
 
 # Patches
@@ -1,5 +1,6 @@
 import frappe
 from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+from shg.shg.utils.instrumentation import instrumented
 
 def after_install():
     """Setup after installing SHG app"""
@@ -297,10 +298,12 @@ def create_accounts_for_company(company):
     create_shg_accounts(company)
 
 # Hook functions
+@instrumented()
 def validate_member(doc, method):
     """Hook function called from hooks.py"""
     doc.validate()
 
+@instrumented()
 def create_member_ledger(doc, method):
     """Hook function called from hooks.py"""
     doc.create_member_ledger_account()
\ No newline at end of file
@@ -137,6 +137,12 @@ function generate_individual_loans(frm) {
                     indicator: "green"
                 });
                 frm.reload_doc();
+            } else if (r.message && r.message.status === "queued") {
+                frappe.msgprint({
+                    title: __("Queued"),
+                    message: r.message.message,
+                    indicator: "blue"
+                });
             } else {
                 frappe.msgprint({
                     title: __("Error"),
@@ -182,18 +188,25 @@ function pull_unpaid_installments(frm) {
         return;
     }
     
+    // Reuse the snapshot held by the form while the loan is unchanged
+    var cached = frm.__inline_snapshot;
     frappe.call({
-        method: "shg.shg.doctype.shg_loan.shg_loan.pull_unpaid_installments",
+        method: "shg.shg.api.loan_inline.get_inline_snapshot",
         args: {
-            loan_name: frm.doc.name
+            loan: frm.doc.name,
+            etag: cached && cached.loan === frm.doc.name ? cached.etag : null
         },
         callback: function(r) {
             if (r.message) {
+                var snapshot = r.message.not_modified ? cached : r.message;
+                snapshot.loan = frm.doc.name;
+                frm.__inline_snapshot = snapshot;
+
                 // Clear existing schedule
                 frm.clear_table('repayment_schedule');
                 
                 // Add unpaid installments to the schedule
-                r.message.forEach(function(installment) {
+                snapshot.rows.forEach(function(installment) {
                     var row = frm.add_child('repayment_schedule');
                     row.name = installment.name;
                     row.installment_no = installment.installment_no;
@@ -205,8 +218,8 @@ function pull_unpaid_installments(frm) {
                     row.unpaid_balance = installment.unpaid_balance;
                     row.status = installment.status;
                     row.remaining_amount = installment.remaining_amount;
-                    row.pay_now = installment.pay_now;
-                    row.amount_to_pay = installment.amount_to_pay;
+                    row.pay_now = 0;
+                    row.amount_to_pay = null;
                 });
                 
                 frm.refresh_field('repayment_schedule');
@@ -39,6 +39,24 @@ frappe.ui.form.on('SHG Meeting', {
             } else {
                 frm.dashboard.add_indicator(__('Quorum Not Met'), 'red');
             }
+
+            // Post-meeting fines and invoices run in the background
+            if (frm.doc.post_meeting_status) {
+                frm.dashboard.add_indicator(__('Post-Meeting Processing: {0}', [__(frm.doc.post_meeting_status)]),
+                    frm.doc.post_meeting_status === 'Completed' ? 'green' :
+                    frm.doc.post_meeting_status === 'Failed' ? 'red' : 'orange');
+            }
+            if (frm.doc.post_meeting_status === 'Failed') {
+                frm.add_custom_button(__('Retry Post-Meeting Processing'), function() {
+                    frappe.call({
+                        method: 'rerun_post_meeting_processing',
+                        doc: frm.doc,
+                        callback: function() {
+                            frm.reload_doc();
+                        }
+                    });
+                });
+            }
         }
     },
     
@@ -46,6 +46,10 @@ frappe.ui.form.on('SHG Member', {
                     }
                 });
             });
+
+            frm.add_custom_button(__('Credit Score History'), function() {
+                frappe.set_route('List', 'SHG Credit Score Snapshot', { member: frm.doc.name });
+            });
         }
 
         // Add dashboard indicators
@@ -1,6 +1,11 @@
+import hashlib
 import frappe
 from frappe import _
 from frappe.utils import getdate
+from shg.shg.loan_utils import get_row_remaining, is_unpaid_row
+
+SNAPSHOT_CACHE_KEY = "shg_inline_snapshot"
+SNAPSHOT_CACHE_TTL = 600
 
 def _schedule_fieldname():
     """Find the schedule child table field on SHG Loan (defaults to 'repayment_schedule')."""
@@ -15,47 +20,107 @@ def _row_remaining(row):
     paid  = (row.amount_paid or 0)
     return max(total - paid, 0)
 
-@frappe.whitelist()
-def pull_unpaid_installments(loan):
-    """Fill the loan's schedule grid with only unpaid (or partly-paid) rows on the form, and compute 'remaining_amount'."""
-    doc = frappe.get_doc("SHG Loan", loan)
-    grid = _schedule_fieldname()
-    updated = []
-    for row in doc.get(grid) or []:
-        rem = _row_remaining(row)
-        row.remaining_amount = rem
-        # clear any previous selection for a fresh pull
+def get_snapshot_etag(loan):
+    """
+    ETag of the loan's inline repayment state.
+
+    Changes whenever the loan or any of its schedule rows is modified, read
+    from the loan's primary key and the schedule's parent index.
+    """
+    loan_modified = frappe.db.get_value("SHG Loan", loan, "modified")
+    if not loan_modified:
+        frappe.throw(_("SHG Loan {0} not found").format(loan), frappe.DoesNotExistError)
+    rows_modified, row_count = frappe.db.sql("""
+        SELECT MAX(modified), COUNT(*)
+        FROM `tabSHG Loan Repayment Schedule`
+        WHERE parent = %s AND parenttype = 'SHG Loan'
+    """, (loan,))[0]
+    return hashlib.sha1(f"{loan}|{loan_modified}|{rows_modified}|{row_count}".encode()).hexdigest()[:16]
+
+def _read_unpaid_rows(loan):
+    """
+    Unpaid or partly-paid schedule rows, in due date order.
+
+    Rows are kept by the same predicate as ``api.loan.get_unpaid_installments``.
+    """
+    rows = frappe.db.sql("""
+        SELECT name, idx, installment_no, due_date, principal_component, interest_component,
+            total_payment, amount_paid, unpaid_balance, status
+        FROM `tabSHG Loan Repayment Schedule`
+        WHERE parent = %s AND parenttype = 'SHG Loan'
+        AND IFNULL(status, '') != 'Paid'
+        ORDER BY due_date, idx
+    """, (loan,), as_dict=True)
+    rows = [row for row in rows if is_unpaid_row(row)]
+    for row in rows:
+        row.remaining_amount = get_row_remaining(row)
         row.pay_now = 0
         row.amount_to_pay = None
-        if rem > 0:
-            updated.append(dict(name=row.name, remaining_amount=rem))
-    doc.save(ignore_permissions=True)
-    return {"count": len(updated)}
+    return rows
+
+def get_inline_snapshot_data(loan, etag=None):
+    """Build (or reuse from cache) the snapshot for ``loan``; no permission check."""
+    current = get_snapshot_etag(loan)
+    if etag and etag == current:
+        return {"etag": current, "not_modified": True}
+
+    today = getdate()
+    cache_key = f"{SNAPSHOT_CACHE_KEY}:{loan}:{current}:{today}"
+    snapshot = frappe.cache().get_value(cache_key)
+    if snapshot is None:
+        rows = _read_unpaid_rows(loan)
+        snapshot = {
+            "etag": current,
+            "rows": rows,
+            "outstanding": sum(row.remaining_amount for row in rows),
+            "overdue": sum(row.remaining_amount for row in rows if row.due_date and getdate(row.due_date) < today),
+            "as_of": str(today),
+        }
+        frappe.cache().set_value(cache_key, snapshot, expires_in_sec=SNAPSHOT_CACHE_TTL)
+    return snapshot
 
 @frappe.whitelist()
-def compute_inline_totals(loan):
-    """Return live totals for Selected To Pay, Overdue, and Outstanding (P+I)."""
-    doc = frappe.get_doc("SHG Loan", loan)
-    grid = _schedule_fieldname()
+def get_inline_snapshot(loan, etag=None):
+    """
+    Read-only snapshot of the loan's unpaid installments and totals.
 
-    selected_to_pay = 0
-    overdue = 0
-    outstanding = 0
+    Pass the ``etag`` of a snapshot already held by the client; while the
+    loan is unchanged only ``{"etag", "not_modified": True}`` is returned.
+    """
+    frappe.has_permission("SHG Loan", "read", loan, throw=True)
+    return get_inline_snapshot_data(loan, etag)
 
-    today = getdate()
+@frappe.whitelist()
+def pull_unpaid_installments(loan):
+    """Return only the unpaid (or partly-paid) rows with their 'remaining_amount'; the loan is not written."""
+    snapshot = get_inline_snapshot(loan)
+    return {"count": len(snapshot["rows"]), "rows": snapshot["rows"], "etag": snapshot["etag"]}
 
-    for row in doc.get(grid) or []:
-        rem = _row_remaining(row)
-        outstanding += rem
-        if row.due_date and getdate(row.due_date) < today and rem > 0:
-            overdue += rem
-        if int(row.pay_now or 0) == 1 and (row.amount_to_pay or 0) > 0:
-            selected_to_pay += min(float(row.amount_to_pay), float(rem))
+@frappe.whitelist()
+def compute_inline_totals(loan, selections=None):
+    """
+    Return live totals for Selected To Pay, Overdue, and Outstanding (P+I).
+
+    ``selections`` is the client's ``[{rowname, amount_to_pay}]``; amounts
+    are capped at each row's remaining balance. Totals are computed from
+    the cached snapshot, so repeated calls while the user ticks rows do
+    not read the loan again.
+    """
+    frappe.has_permission("SHG Loan", "read", loan, throw=True)
+    snapshot = get_inline_snapshot_data(loan)
+    remaining = {row["name"]: row["remaining_amount"] for row in snapshot["rows"]}
+
+    selected_to_pay = 0
+    for selection in frappe.parse_json(selections) or []:
+        amount = float(selection.get("amount_to_pay") or 0)
+        if amount > 0 and selection.get("rowname") in remaining:
+            selected_to_pay += min(amount, remaining[selection["rowname"]])
 
     return {
         "selected": selected_to_pay,
-        "overdue": overdue,
-        "outstanding": outstanding
+        "overdue": snapshot["overdue"],
+        "outstanding": snapshot["outstanding"],
+        "etag": snapshot["etag"],
     }
 
 @frappe.whitelist()
@@ -89,6 +154,7 @@ def post_inline_repayments(loan):
         new_remaining = _row_remaining(row)
         row.status = "Paid" if new_remaining <= 1e-9 else "Partly Paid"
         row.remaining_amount = new_remaining
+        row.unpaid_balance = new_remaining
 
         # reset inline inputs after posting
         row.pay_now = 0
@@ -0,0 +1,285 @@
+"""
+Benchmark suite for the SHG hot paths.
+
+Each case is timed over several runs and its database round trips are
+counted. Results are written as JSON and compared with the per-scale
+baseline in ``baseline.json``; :func:`compare_results` lists the cases that
+got slower or issue more queries than the baseline allows.
+
+Usage::
+
+    bench --site <site> execute shg.shg.benchmarks.data_generator.generate_dataset --kwargs "{'scale': '1k'}"
+    bench --site <site> execute shg.shg.benchmarks.suite.run --kwargs "{'scale': '1k', 'output': '/tmp/bench.json'}"
+
+Cases that write (daily accruals) run behind a savepoint that is rolled
+back, so the dataset is unchanged between runs. Run the suite on a
+disposable site: controller hooks reached from a case may still commit.
+"""
+import json
+import os
+import statistics
+import time
+from contextlib import contextmanager
+import frappe
+from frappe.utils import flt, getdate, now, today
+from typing import Any, Callable, Dict, List, Optional
+
+from shg.shg.benchmarks.data_generator import NAME_PREFIX, SCHEDULE_BUILDERS
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+DEFAULT_REPEAT = 3
+SAMPLE_SIZE = 200
+
+# A case regresses when its median time grows by more than this share
+TIME_TOLERANCE = 0.25
+# ... or when it issues more queries than the baseline plus this share
+QUERY_TOLERANCE = 0.10
+
+
+# ---------------------------------------------------
+# Measurement
+# ---------------------------------------------------
+@contextmanager
+def count_queries():
+    """Count ``frappe.db.sql`` round trips made inside the block"""
+    counter = {"queries": 0}
+    db = frappe.db
+    patched_before = "sql" in vars(db)
+    original = db.sql
+
+    def counting_sql(*args, **kwargs):
+        counter["queries"] += 1
+        return original(*args, **kwargs)
+
+    db.sql = counting_sql
+    try:
+        yield counter
+    finally:
+        if patched_before:
+            db.sql = original
+        else:
+            del db.sql
+
+
+@contextmanager
+def rolled_back():
+    """Run a block behind a savepoint and undo its writes"""
+    savepoint = f"shg_bench_{frappe.generate_hash(length=6)}"
+    frappe.db.savepoint(savepoint)
+    try:
+        yield
+    finally:
+        frappe.db.rollback(save_point=savepoint)
+
+
+def measure(case: Callable[[], Any], repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """
+    Time ``case`` ``repeat`` times
+
+    Returns:
+        Median, minimum and maximum seconds and the query count of the last run
+    """
+    timings, queries = [], 0
+    for _ in range(max(int(repeat), 1)):
+        with count_queries() as counter:
+            started = time.perf_counter()
+            case()
+            timings.append(time.perf_counter() - started)
+        queries = counter["queries"]
+
+    return {
+        "median_seconds": round(statistics.median(timings), 4),
+        "min_seconds": round(min(timings), 4),
+        "max_seconds": round(max(timings), 4),
+        "queries": queries,
+    }
+
+
+# ---------------------------------------------------
+# Cases
+# ---------------------------------------------------
+def _sample(doctype: str, fields: List[str], limit: int = SAMPLE_SIZE) -> List[Dict[str, Any]]:
+    return frappe.get_all(
+        doctype,
+        filters={"name": ["like", f"{NAME_PREFIX}%"], "docstatus": 1},
+        fields=fields,
+        order_by="name",
+        limit_page_length=limit,
+    )
+
+
+def _report(module_path: str, filters: Dict[str, Any]) -> Callable[[], Any]:
+    """Call a report's ``execute`` past the result cache"""
+    execute = frappe.get_attr(f"{module_path}.execute")
+    execute = getattr(execute, "__wrapped__", execute)
+    return lambda: execute(frappe._dict(filters))
+
+
+def build_cases(as_of) -> Dict[str, Callable[[], Any]]:
+    """Benchmark cases keyed by a stable name"""
+    from shg.shg.loan_services.accrual import run_daily_accruals
+    from shg.shg.loan_services.allocation import allocate_payment_to_schedule
+    from shg.shg.utils.overdue_sweep import get_overdue_contributions
+    from shg.shg.utils.payment_utils import _get_unpaid_records
+    from shg.tasks import get_overdue_loans
+
+    loans = _sample("SHG Loan", ["name", "loan_amount", "interest_rate", "loan_period_months", "interest_type"])
+    schedules = {}
+    for row in frappe.get_all(
+        "SHG Loan Repayment Schedule",
+        filters={"parent": ["in", [loan.name for loan in loans] or [""]]},
+        fields=["parent", "due_date", "total_due", "amount_paid", "unpaid_balance"],
+        order_by="parent, idx",
+    ):
+        schedules.setdefault(row.parent, []).append({
+            "due_date": row.due_date,
+            "balance": flt(row.unpaid_balance),
+            "amount_paid": flt(row.amount_paid),
+        })
+
+    def daily_accruals():
+        with rolled_back():
+            run_daily_accruals(str(as_of))
+
+    def schedule_generation():
+        for loan in loans:
+            build = SCHEDULE_BUILDERS.get(loan.interest_type, SCHEDULE_BUILDERS["Flat Rate"])
+            build(loan.loan_amount, loan.interest_rate, loan.loan_period_months)
+
+    def repayment_allocation():
+        for loan in loans:
+            rows = schedules.get(loan.name) or []
+            allocate_payment_to_schedule(rows, sum(row["balance"] for row in rows[:3]))
+
+    def unpaid_records():
+        for doctype in ("SHG Contribution Invoice", "SHG Contribution", "SHG Meeting Fine"):
+            _get_unpaid_records(doctype)
+
+    def reminder_planning():
+        get_overdue_contributions(as_of)
+        get_overdue_loans()
+
+    year = {"from_date": str(getdate(as_of).replace(month=1, day=1)), "to_date": str(as_of)}
+    return {
+        "run_daily_accruals": daily_accruals,
+        "schedule_generation": schedule_generation,
+        "repayment_allocation": repayment_allocation,
+        "get_unpaid_records": unpaid_records,
+        "reminder_planning": reminder_planning,
+        "report.contribution_summary": _report("shg.shg.report.contribution_summary.contribution_summary", year),
+        "report.loan_portfolio": _report("shg.shg.report.loan_portfolio.loan_portfolio", {}),
+        "report.shg_repayments_register": _report("shg.shg.report.shg_repayments_register.shg_repayments_register", year),
+        "report.member_summary": _report("shg.shg.report.member_summary.member_summary", {}),
+        "report.member_statement": _report("shg.shg.report.member_statement.member_statement", year),
+        "report.financial_summary": _report("shg.shg.report.financial_summary.financial_summary", year),
+        "report.shg_loan_aging": _report("shg.shg.report.shg_loan_aging.shg_loan_aging", {}),
+        "report.meeting_fines": _report("shg.shg.report.meeting_fines.meeting_fines", year),
+    }
+
+
+# ---------------------------------------------------
+# Runner and baseline
+# ---------------------------------------------------
+def run_suite(scale: str = "1k", repeat: int = DEFAULT_REPEAT, cases: Optional[List[str]] = None,
+              as_of=None) -> Dict[str, Any]:
+    """
+    Run the benchmark cases against the generated dataset
+
+    Args:
+        scale: Label of the dataset scale, recorded in the results
+        repeat: Runs per case
+        cases: Case names to run; all by default
+        as_of: Reference date the dataset was generated for
+
+    Returns:
+        Results keyed by case name, with run metadata
+    """
+    as_of = getdate(as_of or today())
+    available = build_cases(as_of)
+    results = {}
+    for name in cases or available:
+        if name not in available:
+            frappe.throw(f"Unknown benchmark case {name}")
+        try:
+            results[name] = measure(available[name], repeat)
+        except Exception as e:
+            frappe.log_error(frappe.get_traceback(), f"Benchmark case {name} failed")
+            results[name] = {"error": str(e)}
+
+    return {
+        "scale": scale,
+        "repeat": repeat,
+        "as_of": str(as_of),
+        "recorded_on": now(),
+        "dataset": {
+            doctype: frappe.db.count(doctype, {"name": ["like", f"{NAME_PREFIX}%"]})
+            for doctype in ("SHG Member", "SHG Loan", "SHG Contribution", "SHG Loan Repayment")
+        },
+        "cases": results,
+    }
+
+
+def compare_results(results: Dict[str, Any], baseline: Dict[str, Any],
+                    time_tolerance: float = TIME_TOLERANCE,
+                    query_tolerance: float = QUERY_TOLERANCE) -> List[Dict[str, Any]]:
+    """
+    Cases of ``results`` that regressed against ``baseline``
+
+    Returns:
+        One entry per regressed case with the baseline and current figures
+    """
+    regressions = []
+    for name, current in results.get("cases", {}).items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous or "error" in previous:
+            continue
+        if "error" in current:
+            regressions.append({"case": name, "error": current["error"]})
+            continue
+
+        slower = current["median_seconds"] > previous["median_seconds"] * (1 + time_tolerance)
+        chattier = current["queries"] > previous["queries"] * (1 + query_tolerance)
+        if slower or chattier:
+            regressions.append({
+                "case": name,
+                "baseline_seconds": previous["median_seconds"],
+                "median_seconds": current["median_seconds"],
+                "baseline_queries": previous["queries"],
+                "queries": current["queries"],
+            })
+    return regressions
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Any]:
+    """Read a baseline file, keyed by scale; empty when none was recorded yet"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def run(scale: str = "1k", repeat: int = DEFAULT_REPEAT, output: Optional[str] = None,
+        update_baseline: bool = False) -> Dict[str, Any]:
+    """
+    ``bench execute`` entry point
+
+    Runs the suite, compares it with the baseline recorded for ``scale``,
+    optionally writes the results to ``output`` and, with
+    ``update_baseline``, stores them as the new baseline for that scale.
+    """
+    results = run_suite(scale=scale, repeat=repeat)
+    baseline = load_baseline()
+    results["regressions"] = compare_results(results, baseline.get(scale, {}))
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+
+    if update_baseline:
+        baseline[scale] = {key: results[key] for key in ("scale", "repeat", "as_of", "recorded_on", "dataset", "cases")}
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+            f.write("\n")
+
+    return results
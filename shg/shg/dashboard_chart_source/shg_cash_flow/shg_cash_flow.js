@@ -0,0 +1,26 @@
+frappe.provide("frappe.dashboards.chart_sources");
+
+frappe.dashboards.chart_sources["SHG Cash Flow"] = {
+	method: "shg.shg.dashboard_chart_source.shg_cash_flow.shg_cash_flow.get",
+	filters: [
+		{
+			fieldname: "flow_type",
+			label: __("Flow Type"),
+			fieldtype: "Select",
+			options: [
+				"contribution",
+				"loan_disbursement",
+				"loan_repayment",
+				"loan_interest",
+				"payment",
+			],
+			default: "payment",
+		},
+		{
+			fieldname: "company",
+			label: __("Company"),
+			fieldtype: "Link",
+			options: "Company",
+		},
+	],
+};
@@ -0,0 +1,24 @@
+import frappe
+from shg.shg.utils.cash_flow_cube import get_flow_series
+from shg.shg.utils.kpi_snapshots import get_default_range
+
+
+@frappe.whitelist()
+def get(chart_name=None, chart=None, no_cache=None, filters=None, from_date=None,
+        to_date=None, timespan=None, time_interval=None, heatmap_year=None):
+    """Monthly dashboard chart data read from the SHG Cash Flow Month cube"""
+    if chart_name:
+        chart = frappe.get_doc("Dashboard Chart", chart_name)
+    else:
+        chart = frappe._dict(frappe.parse_json(chart or "{}"))
+
+    filters = frappe.parse_json(filters) or frappe.parse_json(chart.get("filters_json") or "{}") or {}
+    flow_type = filters.get("flow_type") or "payment"
+
+    default_from, default_to = get_default_range("Monthly")
+    series = get_flow_series(flow_type, from_date or default_from, to_date or default_to, filters.get("company"))
+
+    return {
+        "labels": series["labels"],
+        "datasets": [{"name": chart.get("chart_name") or flow_type, "values": series["values"]}],
+    }
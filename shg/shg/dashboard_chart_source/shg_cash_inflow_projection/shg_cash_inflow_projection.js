@@ -0,0 +1,32 @@
+frappe.provide("frappe.dashboards.chart_sources");
+
+frappe.dashboards.chart_sources["SHG Cash Inflow Projection"] = {
+	method: "shg.shg.dashboard_chart_source.shg_cash_inflow_projection.shg_cash_inflow_projection.get",
+	filters: [
+		{
+			fieldname: "period",
+			label: __("Period"),
+			fieldtype: "Select",
+			options: ["Monthly", "Weekly"],
+			default: "Monthly",
+		},
+		{
+			fieldname: "horizon_months",
+			label: __("Horizon (Months)"),
+			fieldtype: "Int",
+			default: 12,
+		},
+		{
+			fieldname: "apply_haircuts",
+			label: __("Apply Historical Collection Rates"),
+			fieldtype: "Check",
+			default: 1,
+		},
+		{
+			fieldname: "company",
+			label: __("Company"),
+			fieldtype: "Link",
+			options: "Company",
+		},
+	],
+};
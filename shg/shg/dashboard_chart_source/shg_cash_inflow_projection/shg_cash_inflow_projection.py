@@ -0,0 +1,24 @@
+import frappe
+from frappe.utils import cint
+from shg.shg.utils.cash_projection import get_projection_chart, project_cash_inflows
+
+
+@frappe.whitelist()
+def get(chart_name=None, chart=None, no_cache=None, filters=None, from_date=None,
+        to_date=None, timespan=None, time_interval=None, heatmap_year=None):
+    """Projected repayment inflows per period, scheduled against expected"""
+    if chart_name:
+        chart = frappe.get_doc("Dashboard Chart", chart_name)
+    else:
+        chart = frappe._dict(frappe.parse_json(chart or "{}"))
+
+    filters = frappe.parse_json(filters) or frappe.parse_json(chart.get("filters_json") or "{}") or {}
+    period = filters.get("period") or "Monthly"
+
+    projection = project_cash_inflows(
+        period=period,
+        horizon_months=cint(filters.get("horizon_months")) or 12,
+        company=filters.get("company"),
+        apply_haircuts=cint(filters.get("apply_haircuts")),
+    )
+    return get_projection_chart(projection, period)
@@ -0,0 +1,28 @@
+frappe.provide("frappe.dashboards.chart_sources");
+
+frappe.dashboards.chart_sources["SHG KPI Series"] = {
+	method: "shg.shg.dashboard_chart_source.shg_kpi_series.shg_kpi_series.get",
+	filters: [
+		{
+			fieldname: "kpi",
+			label: __("KPI"),
+			fieldtype: "Select",
+			options: [
+				"contributions",
+				"loan_disbursements",
+				"loan_repayments",
+				"meeting_fines",
+				"payments",
+				"multi_member_payments",
+			],
+			default: "payments",
+		},
+		{
+			fieldname: "measure",
+			label: __("Measure"),
+			fieldtype: "Select",
+			options: ["value", "count"],
+			default: "value",
+		},
+	],
+};
@@ -0,0 +1,28 @@
+import frappe
+from frappe import _
+from shg.shg.utils.kpi_snapshots import SERIES_SOURCES, get_default_range, get_series
+
+
+@frappe.whitelist()
+def get(chart_name=None, chart=None, no_cache=None, filters=None, from_date=None,
+        to_date=None, timespan=None, time_interval=None, heatmap_year=None):
+    """Dashboard chart data read from SHG KPI Daily Point instead of the raw tables"""
+    if chart_name:
+        chart = frappe.get_doc("Dashboard Chart", chart_name)
+    else:
+        chart = frappe._dict(frappe.parse_json(chart or "{}"))
+
+    filters = frappe.parse_json(filters) or frappe.parse_json(chart.get("filters_json") or "{}") or {}
+    kpi = filters.get("kpi") or "payments"
+    if kpi not in SERIES_SOURCES:
+        frappe.throw(_("Unknown KPI series {0}").format(kpi))
+
+    time_interval = time_interval or chart.get("time_interval") or "Monthly"
+    default_from, default_to = get_default_range(time_interval)
+    series = get_series(kpi, from_date or default_from, to_date or default_to,
+                        time_interval, filters.get("measure") or "value")
+
+    return {
+        "labels": series["labels"],
+        "datasets": [{"name": chart.get("chart_name") or kpi, "values": series["values"]}],
+    }
@@ -0,0 +1,17 @@
+# Copyright (c) 2026, SHG Solutions
+# License: MIT
+
+import frappe
+from frappe.model.document import Document
+
+class SHGCashFlowMonth(Document):
+    """One company-month-flow cell of the cash-flow cube read by financial reports"""
+
+    def autoname(self):
+        # Deterministic name so submit/cancel events can upsert by primary key
+        self.name = f"{self.company}|{self.period}|{self.flow_type}"
+
+
+def on_doctype_update():
+    """Index backing the company and month range reads of the reports"""
+    frappe.db.add_index("SHG Cash Flow Month", ["company", "period"])
@@ -1,8 +1,10 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import nowdate, getdate, formatdate, add_days, today
+from frappe.utils import nowdate, formatdate, add_days, today
 from frappe.utils import flt
+from shg.shg.utils.instrumentation import instrumented
+from shg.shg.utils.report_cache import bump_data_version_after_commit
 
 class SHGContribution(Document):
     def validate(self):
@@ -184,6 +186,8 @@ class SHGContribution(Document):
             member = frappe.get_doc("SHG Member", self.member)
             member.update_financial_summary()
             
+            bump_data_version_after_commit("SHG Contribution", "SHG Contribution Invoice", "SHG Member")
+            
         except Exception as e:
             frappe.log_error(frappe.get_traceback(), f"Update Payment Status Failed for Member {self.member} with Amount {paid_amount}")
             frappe.throw(_("Failed to update payment status: {0}").format(str(e)))
@@ -391,34 +395,6 @@ class SHGContribution(Document):
             frappe.log_error(frappe.get_traceback(), "SHG Contribution - Mpesa STK Push Failed")
             return {"success": False, "error": str(e)}
 
-# Move the function outside the class
-def update_overdue_contributions():
-    """Update overdue contributions based on due date"""
-    today_date = getdate(today())
-    
-    # Get all unpaid contributions where due date has passed
-    overdue_contributions = frappe.get_all(
-        "SHG Contribution",
-        filters={
-            "status": "Unpaid",
-            "due_date": ["<", today_date]
-        },
-        fields=["name", "due_date", "status"]
-    )
-    
-    updated = 0
-    for contrib in overdue_contributions:
-        try:
-            contrib_doc = frappe.get_doc("SHG Contribution", contrib.name)
-            contrib_doc.db_set("status", "Overdue", update_modified=False)
-            updated += 1
-        except Exception as e:
-            frappe.log_error(frappe.get_traceback(), f"Failed to update overdue contribution {contrib.name}")
-    
-    frappe.msgprint(f"Updated {updated} contributions to Overdue status")
-    return updated
-
-
 @frappe.whitelist()
 def generate_contribution_invoices(invoice_date=None, amount=0, contribution_type=None, remarks=None, send_email=0, supplier_invoice_date=None):
     from frappe.utils import getdate, today
@@ -483,87 +459,76 @@ def generate_contribution_invoices(invoice_date=None, amount=0, contribution_typ
 
 @frappe.whitelist()
 def send_contribution_invoice_emails(invoice_date):
-    """Send emails for all contribution invoices created on the given date"""
-    # Get all contribution invoices created on the given date
-    invoices = frappe.get_all("SHG Contribution Invoice", 
-                             filters={
-                                 "invoice_date": invoice_date,
-                                 "status": "Unpaid",
-                                 "docstatus": 1
-                             },
-                             fields=["name"])
-    
-    sent = 0
-    for invoice in invoices:
-        try:
-            inv_doc = frappe.get_doc("SHG Contribution Invoice", invoice.name)
-            inv_doc.send_invoice_email()
-            sent += 1
-        except Exception as e:
-            frappe.log_error(frappe.get_traceback(), f"Failed to send email for invoice {invoice.name}")
-    
-    frappe.msgprint(_("{0} invoice emails sent successfully.").format(sent))
-    return sent
+    """Queue emails for all contribution invoices created on the given date"""
+    from shg.shg.utils.invoice_mailer import get_invoice_mail_rows
+
+    count = len(get_invoice_mail_rows(invoice_date))
+    frappe.enqueue(
+        "shg.shg.utils.invoice_mailer.send_invoice_mails",
+        queue="long",
+        timeout=3600,
+        job_name=f"contribution-invoice-mails-{invoice_date}",
+        invoice_date=invoice_date,
+    )
+
+    frappe.msgprint(_("{0} invoice emails queued for sending.").format(count))
+    return count
 
 # --- Hook functions ---
 # These are hook functions called from hooks.py and should NOT have @frappe.whitelist()
+@instrumented()
 def validate_contribution(doc, method):
     """Hook function called from hooks.py"""
     doc.validate()
 
+@instrumented()
 def post_to_general_ledger(doc, method):
     """Hook function called from hooks.py"""
     if doc.docstatus == 1 and not doc.get("posted_to_gl"):
         doc.post_to_ledger()
 
 def update_overdue_contributions():
-    """Scheduled job to update overdue contributions"""
-    # Get all unpaid contributions where due date has passed
-    overdue_contributions = frappe.db.sql("""
-        SELECT name
-        FROM `tabSHG Contribution`
-        WHERE docstatus = 1 
-        AND status = 'Unpaid'
-        AND contribution_date < %s
-    """, getdate(), as_dict=True)
-    
-    updated_count = 0
-    for contrib in overdue_contributions:
-        try:
-            contribution = frappe.get_doc("SHG Contribution", contrib.name)
-            # Send reminder email
-            send_contribution_reminder(contribution)
-            updated_count += 1
-        except Exception as e:
-            frappe.log_error(f"Failed to process overdue contribution {contrib.name}: {str(e)}")
-    
-    frappe.msgprint(f"Processed {updated_count} overdue contributions")
+    """Scheduled job: mark overdue invoices and remind members with unpaid contributions"""
+    from shg.shg.utils.overdue_sweep import run_overdue_sweep
+
+    result = run_overdue_sweep()
+    frappe.msgprint(f"Processed {result['contributions']} overdue contributions")
+    return result
 
 def send_contribution_reminder(contribution):
     """Send email reminder for unpaid contribution"""
-    try:
-        member = frappe.get_doc("SHG Member", contribution.member)
-        if member.email:
-            # Create email content
-            subject = "Unpaid Contribution Reminder"
+    member = frappe.db.get_value("SHG Member", contribution.member, ["member_name", "email"], as_dict=True) or {}
+    send_contribution_reminders([frappe._dict({
+        "name": contribution.name,
+        "unpaid_amount": contribution.unpaid_amount,
+        "contribution_date": contribution.contribution_date,
+        "member_name": member.get("member_name"),
+        "email": member.get("email"),
+    })])
+
+def send_contribution_reminders(rows):
+    """Send reminder emails for unpaid contribution rows that already carry member_name and email"""
+    sent = 0
+    for row in rows:
+        if not row.email:
+            continue
+        try:
             message = f"""
-            <p>Dear {member.member_name},</p>
-            <p>This is a reminder that you have an unpaid contribution of KES {contribution.unpaid_amount:,.2f} 
-            due on {formatdate(contribution.contribution_date)}.</p>
+            <p>Dear {row.member_name},</p>
+            <p>This is a reminder that you have an unpaid contribution of KES {flt(row.unpaid_amount):,.2f} 
+            due on {formatdate(row.contribution_date)}.</p>
             <p>Please make the payment at your earliest convenience.</p>
             <p>Thank you for your continued support.</p>
             """
-            
-            # Send email
             frappe.sendmail(
-                recipients=[member.email],
-                subject=subject,
+                recipients=[row.email],
+                subject="Unpaid Contribution Reminder",
                 message=message
             )
-            
-            frappe.msgprint(f"Reminder email sent to {member.member_name}")
-    except Exception as e:
-        frappe.log_error(f"Failed to send reminder for contribution {contribution.name}: {str(e)}")
+            sent += 1
+        except Exception as e:
+            frappe.log_error(f"Failed to send reminder for contribution {row.name}: {str(e)}")
+    return sent
 
 @frappe.whitelist()
 def create_contribution_from_invoice(doc, method=None):
@@ -781,3 +746,9 @@ def get_or_create_member_account(self, member_id, company):
         frappe.msgprint(f"✅ Created member account '{member_account_name}' under '{parent_account_name}'.")
 
     return member_account
+
+
+def on_doctype_update():
+    """Indexes backing member statements, Contribution Summary pages and the unpaid contribution sweep"""
+    from shg.shg.utils.db_indexes import add_composite_indexes
+    add_composite_indexes(["SHG Contribution"])
@@ -5,6 +5,8 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 from frappe.utils import getdate, formatdate, today, nowdate, add_days, flt
+from shg.shg.utils.instrumentation import instrumented
+from shg.shg.utils.pdf_batch import get_pdf_attachment
 
 class SHGContributionInvoice(Document):
     def validate(self):
@@ -265,7 +267,7 @@ SHG Management"""
                 recipients=[member.email],
                 subject=subject,
                 message=message,
-                attachments=[frappe.attach_print("Sales Invoice", self.sales_invoice, file_name=self.sales_invoice)]
+                attachments=[get_pdf_attachment("Sales Invoice", self.sales_invoice)]
             )
             
             frappe.msgprint(_("Invoice email sent to {0}").format(member.email))
@@ -326,6 +328,7 @@ SHG Management"""
             frappe.log_error(frappe.get_traceback(), f"Failed to reopen SHG Contribution for invoice {self.name}")
             
 @frappe.whitelist()
+@instrumented()
 def create_contribution_from_invoice(doc, method=None):
     """
     Automatically create SHG Contribution when a Contribution Invoice is submitted
@@ -593,6 +596,7 @@ def update_status_based_on_sales_invoice(self):
             contribution.db_set("status", self.status)
 
 @frappe.whitelist()
+@instrumented()
 def validate_contribution_invoice(doc, method=None):
     """
     Validate SHG Contribution Invoice before submission.
@@ -633,40 +637,25 @@ def validate_contribution_invoice(doc, method=None):
         frappe.throw(str(e))
 
 @frappe.whitelist()
-def auto_submit_contribution_invoices():
+def auto_submit_contribution_invoices(chunk_size=None):
     """
-    Auto-submit all draft SHG Contribution Invoices
+    Auto-submit all draft SHG Contribution Invoices.
+
+    Drafts are validated up front and submitted in chunks by background
+    workers; use ``shg.shg.utils.invoice_submission.get_submission_report``
+    with the returned run id to follow progress and fetch the retry list.
     """
+    from shg.shg.utils.invoice_submission import SUBMIT_CHUNK_SIZE, start_submission_run
+
     try:
-        # Find all draft invoices
-        draft_invoices = frappe.get_all("SHG Contribution Invoice", 
-                                      filters={"docstatus": 0, "status": "Draft"},
-                                      fields=["name"])
-        
-        submitted_count = 0
-        error_count = 0
-        
-        for invoice_data in draft_invoices:
-            try:
-                # Validate the invoice first
-                validate_contribution_invoice(invoice_data.name)
-                # If validation passes, submit the invoice
-                invoice = frappe.get_doc("SHG Contribution Invoice", invoice_data.name)
-                invoice.submit()
-                submitted_count += 1
-                
-            except Exception as e:
-                frappe.log_error(frappe.get_traceback(), 
-                               f"Auto-submit failed for invoice {invoice_data.name}")
-                error_count += 1
-        
-        frappe.db.commit()
-        
+        run = start_submission_run(chunk_size=int(chunk_size or SUBMIT_CHUNK_SIZE))
+
         return {
-            "status": "success",
-            "submitted": submitted_count,
-            "errors": error_count,
-            "message": f"Processed {len(draft_invoices)} draft invoices. Submitted: {submitted_count}, Errors: {error_count}"
+            "status": "queued",
+            "run_id": run["run_id"],
+            "chunks": run["chunks"],
+            "errors": run["prevalidation_failed"],
+            "message": f"Queued {run['queued']} draft invoices in {run['chunks']} chunks. Failed validation: {run['prevalidation_failed']}"
         }
         
     except Exception as e:
@@ -678,35 +667,16 @@ def mark_overdue_invoices():
     """
     Scheduled function to mark overdue invoices and calculate late fees
     """
+    from shg.shg.utils.overdue_sweep import sweep_overdue_invoices
+
     try:
-        # Get all unpaid invoices where due date has passed
-        overdue_invoices = frappe.get_all("SHG Contribution Invoice",
-                                        filters={
-                                            "status": "Unpaid",
-                                            "due_date": ["<", today()],
-                                            "docstatus": 1
-                                        },
-                                        fields=["name"])
-        
-        updated_count = 0
-        for invoice_data in overdue_invoices:
-            try:
-                invoice = frappe.get_doc("SHG Contribution Invoice", invoice_data.name)
-                # Update status to Overdue
-                invoice.db_set("status", "Overdue")
-                
-                # Calculate and store late fee
-                late_fee = invoice.calculate_late_fee()
-                if late_fee > 0:
-                    invoice.db_set("late_fee_amount", late_fee)
-                
-                updated_count += 1
-            except Exception as e:
-                frappe.log_error(frappe.get_traceback(), f"Failed to process overdue invoice {invoice_data.name}")
-        
+        result = sweep_overdue_invoices()
+        frappe.db.commit()
+
+        updated_count = len(result["invoices"])
         frappe.msgprint(f"Marked {updated_count} invoices as overdue")
         return updated_count
-        
+
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Mark Overdue Invoices Failed")
         frappe.throw(str(e))
@@ -865,3 +835,7 @@ def post_to_contribution(docname):
     return {"contribution": contribution.name}
 
 
+def on_doctype_update():
+    """Indexes backing member invoice lists, the overdue invoice sweep and the daily invoice mail run"""
+    from shg.shg.utils.db_indexes import add_composite_indexes
+    add_composite_indexes(["SHG Contribution Invoice"])
@@ -0,0 +1,17 @@
+# Copyright (c) 2026, SHG Solutions
+# License: MIT
+
+import frappe
+from frappe.model.document import Document
+
+class SHGCreditScoreSnapshot(Document):
+    """Dated credit score of one member, written by the nightly scoring job"""
+
+    def autoname(self):
+        # Deterministic name so a re-run of the same day replaces its snapshot
+        self.name = f"{self.member}|{self.snapshot_date}"
+
+
+def on_doctype_update():
+    """Index backing the per-member score history reads"""
+    frappe.db.add_index("SHG Credit Score Snapshot", ["member", "snapshot_date"])
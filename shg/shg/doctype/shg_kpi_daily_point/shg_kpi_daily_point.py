@@ -0,0 +1,17 @@
+# Copyright (c) 2026, SHG Solutions
+# License: MIT
+
+import frappe
+from frappe.model.document import Document
+
+class SHGKPIDailyPoint(Document):
+    """One day of a KPI time series used by the SHG dashboard charts"""
+
+    def autoname(self):
+        # Deterministic name so incremental updates can upsert by primary key
+        self.name = f"{self.kpi}|{self.point_date}"
+
+
+def on_doctype_update():
+    """Index backing the per-KPI date range reads of the dashboard charts"""
+    frappe.db.add_index("SHG KPI Daily Point", ["kpi", "point_date"])
@@ -0,0 +1,8 @@
+# Copyright (c) 2026, SHG Solutions
+# License: MIT
+
+from frappe.model.document import Document
+
+class SHGKPISnapshot(Document):
+    """Current value of a dashboard KPI, kept up to date by kpi_snapshots"""
+    pass
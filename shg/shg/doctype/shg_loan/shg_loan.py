@@ -5,6 +5,7 @@ from frappe.utils import today, add_months, flt, now_datetime, getdate, nowdate
 from shg.shg.utils.account_helpers import get_or_create_member_receivable
 from shg.shg.utils.schedule_math import generate_reducing_balance_schedule, generate_flat_rate_schedule
 from shg.shg.api.loan import get_unpaid_installments as get_unpaid_rows, post_repayment_allocation as allocate_payment, refresh_repayment_summary
+from shg.shg.utils.instrumentation import instrumented
 
 @frappe.whitelist()
 def get_loan_balance(loan_name):
@@ -577,59 +578,23 @@ class SHGLoan(Document):
 
     def generate_individual_member_loans(self):
         """Split a group loan into individual member loans."""
+        from shg.shg.loan_services.group_split import split_or_enqueue
+
         if not self.get("loan_members"):
             frappe.throw(_("No Loan Members found."))
 
-        created = []
-        for row in self.get("loan_members", []):
-            if not row.member:
-                continue
-            if frappe.db.exists("SHG Loan", {"parent_loan": self.name, "member": row.member}):
-                continue
-
-            loan = frappe.new_doc("SHG Loan")
-            loan.update({
-                "loan_type": self.loan_type,
-                "loan_amount": row.allocated_amount,
-                "interest_rate": self.interest_rate,
-                "interest_type": self.interest_type,
-                "loan_period_months": self.loan_period_months,
-                "repayment_frequency": self.repayment_frequency,
-                "member": row.member,
-                "member_name": row.member_name,
-                "company": self.company,
-                "repayment_start_date": self.repayment_start_date or today(),
-                "status": "Approved",
-                "parent_loan": self.name,
-                "is_group_loan": 0
-            })
-            loan.insert(ignore_permissions=True)
-            loan.create_repayment_schedule_if_needed()
-            created.append(loan.name)
-
-        frappe.db.commit()
-        return created
+        return split_or_enqueue(self)
 
     # ---------------------------------------------------
     # ELIGIBILITY
     # ---------------------------------------------------
     def run_eligibility_checks(self):
-        settings = frappe.get_single("SHG Settings")
-        min_savings = flt(getattr(settings, "min_savings_for_loan", 0))
-
-        def _check(member_id):
-            m = frappe.get_doc("SHG Member", member_id)
-            if getattr(m, "membership_status", "Active") != "Active":
-                frappe.throw(_("{0} is not Active.").format(m.member_name))
-            if min_savings and flt(m.total_contributions or 0) < min_savings:
-                frappe.throw(_("{0} has not met minimum savings.").format(m.member_name))
+        from shg.shg.loan_services.group_split import check_members_eligibility
 
         if self.get("loan_members"):
-            for r in self.loan_members:
-                if r.member:
-                    _check(r.member)
+            check_members_eligibility([r.member for r in self.loan_members if r.member])
         elif self.member:
-            _check(self.member)
+            check_members_eligibility([self.member])
 
     def validate_posting_date(self):
         """Validate that the posting date is not in a locked period"""
@@ -783,15 +748,7 @@ class SHGLoan(Document):
         if self.get("repayment_schedule"):
             return
 
-        principal = flt(self.loan_amount)
-        months = int(self.loan_period_months)
-        start = self.repayment_start_date or add_months(self.disbursement_date or today(), 1)
-        interest_type = getattr(self, "interest_type", "Reducing Balance")
-
-        if interest_type == "Flat Rate":
-            schedule = generate_flat_rate_schedule(principal, self.interest_rate, months, start)
-        else:
-            schedule = generate_reducing_balance_schedule(principal, self.interest_rate, months, start)
+        schedule = self.build_repayment_schedule_rows()
 
         # Add schedule rows to loan
         for row_data in schedule:
@@ -803,6 +760,17 @@ class SHGLoan(Document):
         from shg.shg.loan_utils import update_loan_summary
         update_loan_summary(self.name)
 
+    def build_repayment_schedule_rows(self):
+        """Return the repayment schedule rows for this loan without saving."""
+        principal = flt(self.loan_amount)
+        months = int(self.loan_period_months)
+        start = self.repayment_start_date or add_months(self.disbursement_date or today(), 1)
+        interest_type = getattr(self, "interest_type", "Reducing Balance")
+
+        if interest_type == "Flat Rate":
+            return generate_flat_rate_schedule(principal, self.interest_rate, months, start)
+        return generate_reducing_balance_schedule(principal, self.interest_rate, months, start)
+
     @frappe.whitelist()
     def mark_all_due_as_paid(self):
         """Mark all due installments as paid"""
@@ -960,13 +928,20 @@ def generate_individual_loans(parent_loan):
     # Get the parent loan document
     loan_doc = frappe.get_doc("SHG Loan", parent_loan)
     
-    # Generate individual member loans
-    created_loans = loan_doc.generate_individual_member_loans()
-    
+    # Generate individual member loans; large groups are split in the background
+    result = loan_doc.generate_individual_member_loans()
+
+    if result["queued"]:
+        return {
+            "status": "queued",
+            "created": [],
+            "message": _("Splitting {0} member loans in the background").format(len(loan_doc.loan_members))
+        }
+
     return {
         "status": "success",
-        "created": created_loans,
-        "message": _("Generated {0} individual loans").format(len(created_loans))
+        "created": result["created"],
+        "message": _("Generated {0} individual loans").format(len(result["created"]))
     }
 
 
@@ -980,6 +955,7 @@ def get_member_loan_statement(loan_id=None, member=None):
     return api_get_statement(loan_name=loan_id, member=member)
 
 
+@instrumented()
 def before_save(doc, method=None):
     """Hook to safely round and validate before saving."""
     for field in ["loan_amount", "monthly_installment", "total_payable", "balance_amount"]:
@@ -997,6 +973,7 @@ def check_member_eligibility(doc):
     if member_status != "Active":
         frappe.throw(f"Member {doc.member} is not active.")
 
+@instrumented()
 def validate_loan(doc, method=None):
     doc.validate()
 
@@ -1004,6 +981,7 @@ def post_to_general_ledger(doc, method=None):
     if doc.docstatus == 1 and not doc.get("posted_to_gl"):
         doc.post_to_ledger_if_needed()
 
+@instrumented()
 def after_insert_or_update(doc, method=None):
     """Auto actions after saving loan."""
     if doc.get("loan_members"):
@@ -1011,6 +989,7 @@ def after_insert_or_update(doc, method=None):
     else:
         doc.create_repayment_schedule_if_needed()
 
+@instrumented()
 def on_submit(doc, method=None):
     """Post to ledger and create schedule on submit."""
     doc.post_to_ledger_if_needed()
@@ -1022,4 +1001,10 @@ def on_submit(doc, method=None):
     from shg.shg.loan_utils import update_loan_summary
     update_loan_summary(doc.name)
     
-    frappe.msgprint(_(f"Loan {doc.name} successfully disbursed and schedule created."))
\ No newline at end of file
+    frappe.msgprint(_(f"Loan {doc.name} successfully disbursed and schedule created."))
+
+
+def on_doctype_update():
+    """Indexes backing member loan lists and Loan Portfolio pages by status and disbursement date"""
+    from shg.shg.utils.db_indexes import add_composite_indexes
+    add_composite_indexes(["SHG Loan"])
@@ -5,6 +5,7 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import flt, getdate, today, nowdate
 from shg.shg.utils.account_helpers import get_or_create_member_receivable
+from shg.shg.utils.instrumentation import instrumented
 
 
 class SHGLoanRepayment(Document):
@@ -512,11 +513,13 @@ class SHGLoanRepayment(Document):
 
 # --- Hook functions ---
 # These are hook functions called from hooks.py and should NOT have @frappe.whitelist()
+@instrumented()
 def validate_repayment(doc, method):
     """Hook function called from hooks.py"""
     doc.validate()
 
 
+@instrumented()
 def post_to_general_ledger(doc, method):
     """Hook function called from hooks.py"""
     if doc.docstatus == 1:
@@ -550,3 +553,9 @@ def get_unpaid_schedule_rows(loan):
         })
 
     return result
+
+
+def on_doctype_update():
+    """Indexes backing member repayment history, per-loan repayment lists and Repayments Register pages"""
+    from shg.shg.utils.db_indexes import add_composite_indexes
+    add_composite_indexes(["SHG Loan Repayment"])
@@ -90,4 +90,10 @@ def reverse_installment_payment(loan_name, installment_no):
         )
         return {"installment_no": installment_no, "status": "Pending", "balance": getattr(schedule, 'unpaid_balance', 0)}
     except Exception as e:
-        frappe.throw(f"Failed to reverse payment: {str(e)}")
\ No newline at end of file
+        frappe.throw(f"Failed to reverse payment: {str(e)}")
+
+
+def on_doctype_update():
+    """Indexes backing open-installment lookups per loan and the overdue installment sweep"""
+    from shg.shg.utils.db_indexes import add_composite_indexes
+    add_composite_indexes(["SHG Loan Repayment Schedule"])
@@ -0,0 +1,13 @@
+# Copyright (c) 2026, SHG Solutions
+# License: MIT
+
+from frappe.model.document import Document
+
+class SHGLoanTransaction(Document):
+    pass
+
+
+def on_doctype_update():
+    """Indexes backing Loan Transaction Ledger pages, overall and per loan"""
+    from shg.shg.utils.db_indexes import add_composite_indexes
+    add_composite_indexes(["SHG Loan Transaction"])
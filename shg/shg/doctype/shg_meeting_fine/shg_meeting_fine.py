@@ -2,6 +2,7 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 from frappe.utils import today, getdate
+from shg.shg.utils.instrumentation import instrumented
 
 class SHGMeetingFine(Document):
     def validate(self):
@@ -77,6 +78,51 @@ class SHGMeetingFine(Document):
         elif self.status == "Pending":
             frappe.msgprint(_("Fine is pending payment. Use 'Mark as Paid' to post to ledger."))
             
+    def on_cancel(self):
+        """Reverse this fine's line when its Journal Entry also posts other fines"""
+        if self.journal_entry and len(get_journal_entry_fines(self.journal_entry)) > 1:
+            # The shared entry stays submitted and keeps linking to this fine
+            self.ignore_linked_doctypes = ("Journal Entry",)
+            self.reverse_shared_posting()
+
+    def reverse_shared_posting(self):
+        """
+        Post a Journal Entry reversing only this fine's line of a shared entry.
+        The shared entry stays submitted for the other fines it posts.
+        """
+        line = frappe.db.get_value("Journal Entry Account",
+            {"parent": self.journal_entry, "custom_shg_meeting_fine": self.name},
+            ["account", "party_type", "party", "debit_in_account_currency"], as_dict=True)
+        if not line:
+            return
+
+        from shg.shg.utils.account_utils import get_account
+        company = frappe.db.get_value("Journal Entry", self.journal_entry, "company")
+
+        je = frappe.new_doc("Journal Entry")
+        je.voucher_type = "Journal Entry"
+        je.company = company
+        je.posting_date = today()
+        je.remark = f"Reversal of meeting fine {self.name} posted in {self.journal_entry}"
+        je.custom_shg_meeting_fine = self.name
+        je.append("accounts", {
+            "account": line.account,
+            "party_type": line.party_type,
+            "party": line.party,
+            "debit_in_account_currency": 0,
+            "credit_in_account_currency": line.debit_in_account_currency,
+            "custom_shg_meeting_fine": self.name,
+            "company": company
+        })
+        je.append("accounts", {
+            "account": get_account(company, "fines"),
+            "debit_in_account_currency": line.debit_in_account_currency,
+            "credit_in_account_currency": 0,
+            "company": company
+        })
+        je.insert(ignore_permissions=True)
+        je.submit()
+
     def on_update(self):
         """Update status when paid date is set"""
         if self.paid_date and self.status != "Paid":
@@ -139,6 +185,7 @@ class SHGMeetingFine(Document):
                 "party": customer,
                 "debit_in_account_currency": self.fine_amount,
                 "credit_in_account_currency": 0,
+                "custom_shg_meeting_fine": self.name,
                 "company": self.company
             })
 
@@ -229,13 +276,24 @@ class SHGMeetingFine(Document):
             frappe.throw(_(f"Failed to send fine notification: {str(e)}"))
 
 
+def get_journal_entry_fines(journal_entry):
+    """Names of the meeting fines posted by the lines of a Journal Entry"""
+    return frappe.db.sql_list("""
+        SELECT DISTINCT custom_shg_meeting_fine
+        FROM `tabJournal Entry Account`
+        WHERE parent = %s AND IFNULL(custom_shg_meeting_fine, '') != ''
+    """, journal_entry)
+
+
 # --- Hook functions ---
 # These are hook functions called from hooks.py and should NOT have @frappe.whitelist()
+@instrumented()
 def validate_fine(doc, method):
     """Hook function called from hooks.py"""
     doc.validate()
 
 
+@instrumented()
 def post_to_general_ledger(doc, method):
     """Hook function called from hooks.py - only post when status is 'Paid'"""
     try:
@@ -243,4 +301,10 @@ def post_to_general_ledger(doc, method):
             doc.post_to_ledger()
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), f"SHG Meeting Fine - Failed to post to general ledger for {doc.name}")
-        frappe.throw(_(f"Failed to post meeting fine to general ledger: {str(e)}"))
\ No newline at end of file
+        frappe.throw(_(f"Failed to post meeting fine to general ledger: {str(e)}"))
+
+
+def on_doctype_update():
+    """Index backing member fine ranges in statements"""
+    from shg.shg.utils.db_indexes import add_composite_indexes
+    add_composite_indexes(["SHG Meeting Fine"])
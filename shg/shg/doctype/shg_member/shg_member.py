@@ -5,10 +5,26 @@ import re
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import today, getdate, now, flt
+from frappe.utils import today, getdate, flt
 import json
 
+from shg.utils.security import SHGSecurity, decrypt_member_rows, encrypted_member_fields
+from shg.shg.utils.instrumentation import instrumented
+
 class SHGMember(Document):
+    def load_from_db(self):
+        """Load the member with its sensitive fields decrypted."""
+        super().load_from_db()
+        decrypt_member_rows([self])
+
+    def db_insert(self, *args, **kwargs):
+        with encrypted_member_fields(self):
+            return super().db_insert(*args, **kwargs)
+
+    def db_update(self, *args, **kwargs):
+        with encrypted_member_fields(self):
+            return super().db_update(*args, **kwargs)
+
     def validate(self):
         """Run all member validations before save."""
         self.validate_required_fields()
@@ -40,10 +56,11 @@ class SHGMember(Document):
         if not re.match(r"^\d{6,8}$", str(self.id_number)):
             frappe.throw("Invalid ID Number format. Must be 6–8 digits.")
 
-        # Ensure unique across all SHG Members
+        # Ensure unique across all SHG Members; compared by hash as the
+        # stored value may be encrypted
         existing = frappe.db.exists(
             "SHG Member",
-            {"id_number": self.id_number, "name": ["!=", self.name]}
+            {"id_number_hash": SHGSecurity().blind_index(self.id_number), "name": ["!=", self.name]}
         )
         if existing:
             frappe.throw(f"ID Number {self.id_number} is already used by another member.")
@@ -70,11 +87,12 @@ class SHGMember(Document):
             frappe.throw("Invalid email address.")
 
     def validate_duplicates(self):
-        """Ensure no duplicate phone numbers or ID numbers."""
+        """Ensure no duplicate phone numbers or ID numbers (compared by hash)."""
+        security = SHGSecurity()
         if self.phone_number:
             existing_phone = frappe.db.exists(
                 "SHG Member",
-                {"phone_number": self.phone_number, "name": ["!=", self.name]}
+                {"phone_number_hash": security.blind_index(self.phone_number), "name": ["!=", self.name]}
             )
             if existing_phone:
                 frappe.throw(f"Phone number {self.phone_number} already exists for another member.")
@@ -82,7 +100,7 @@ class SHGMember(Document):
         if self.id_number:
             existing_id = frappe.db.exists(
                 "SHG Member",
-                {"id_number": self.id_number, "name": ["!=", self.name]}
+                {"id_number_hash": security.blind_index(self.id_number), "name": ["!=", self.name]}
             )
             if existing_id:
                 frappe.throw(f"ID Number {self.id_number} already exists for another member.")
@@ -216,6 +234,27 @@ class SHGMember(Document):
             FROM `tabSHG Loan` 
             WHERE member = %s AND status = 'Disbursed'
         """, self.name)[0][0]
+        
+        # Update total payments received
+        total_payments = frappe.db.sql("""
+            SELECT SUM(amount) 
+            FROM `tabSHG Payment Entry` 
+            WHERE member = %s AND docstatus = 1
+        """, self.name)[0][0] or 0
+        
+        # Credit score is recomputed nightly by shg.shg.utils.credit_scoring
+        
+        # Update document using db_set to avoid recursion
+        self.db_set({
+            "total_contributions": total_contributions,
+            "total_unpaid_contributions": total_unpaid_contributions,
+            "total_loans_taken": total_loans,
+            "current_loan_balance": loan_balance,
+            "total_unpaid_loans": total_unpaid_loans,
+            "last_contribution_date": last_contribution,
+            "last_loan_date": last_loan,
+            "total_payments_received": total_payments
+        }, update_modified=False)
 
     @frappe.whitelist()
     def get_member_contribution_statement(self):
@@ -278,56 +317,6 @@ class SHGMember(Document):
         
         return statement
         
-        # Update total payments received
-        total_payments = frappe.db.sql("""
-            SELECT SUM(total_amount) 
-            FROM `tabSHG Payment Entry` 
-            WHERE member = %s AND docstatus = 1
-        """, self.name)[0][0] or 0
-        
-        # Calculate credit score (simplified) only if it hasn't been manually set
-        if not hasattr(self, '_credit_score_manually_updated') or not self._credit_score_manually_updated:
-            credit_score = 50  # Base score
-            
-            # Add points for contributions
-            if total_contributions > 0:
-                credit_score += min(20, total_contributions / 1000)  # Up to 20 points
-                
-            # Add points for timely repayments (if any loans)
-            if total_loans > 0:
-                # Get repayment history
-                timely_repayments = frappe.db.sql("""
-                    SELECT COUNT(*) 
-                    FROM `tabSHG Loan Repayment` 
-                    WHERE member = %s AND docstatus = 1 AND repayment_date <= due_date
-                """, self.name)[0][0] or 0
-                
-                total_repayments = frappe.db.sql("""
-                    SELECT COUNT(*) 
-                    FROM `tabSHG Loan Repayment` 
-                    WHERE member = %s AND docstatus = 1
-                """, self.name)[0][0] or 0
-                
-                if total_repayments > 0:
-                    repayment_rate = timely_repayments / total_repayments
-                    credit_score += min(30, repayment_rate * 30)  # Up to 30 points
-            
-            self.credit_score = int(credit_score)
-        # If credit score was manually updated, keep the manually set value
-        
-        # Update document using db_set to avoid recursion
-        self.db_set({
-            "total_contributions": total_contributions,
-            "total_unpaid_contributions": total_unpaid_contributions,
-            "total_loans_taken": total_loans,
-            "current_loan_balance": loan_balance,
-            "total_unpaid_loans": total_unpaid_loans,
-            "last_contribution_date": last_contribution,
-            "last_loan_date": last_loan,
-            "credit_score": self.credit_score,
-            "total_payments_received": total_payments
-        }, update_modified=False)
-        
     @frappe.whitelist()
     def update_member_statement(self):
         """Update member statement"""
@@ -433,46 +422,20 @@ def purge_member_data(member_id: str):
     member = frappe.get_doc("SHG Member", member_id)
     frappe.msgprint(f"🔍 Starting full data purge for {member.member_name} ({member_id})")
 
-    # 1️⃣ Create a deletion log entry
-    frappe.get_doc({
-        "doctype": "Deletion Log",
-        "entity_type": "SHG Member",
-        "entity_name": member_id,
-        "reason": "Manual purge requested by System Manager",
-        "deleted_by": frappe.session.user,
-        "timestamp": now()
-    }).insert(ignore_permissions=True)
-
-    # 2️⃣ Delete related child and transactional records in correct order
-    def safe_delete(doctype, filters):
-        names = frappe.get_all(doctype, filters=filters, pluck="name")
-        for name in names:
-            try:
-                frappe.delete_doc(doctype, name, force=True, ignore_permissions=True, ignore_missing=True)
-            except Exception as e:
-                frappe.log_error(frappe.get_traceback(), f"Failed deleting {doctype} {name}")
-
     frappe.msgprint("🧾 Removing linked records...")
 
-    # Order matters: start from lowest dependencies upward
-    safe_delete("SHG Loan Repayment", {"member": member_id})
-    safe_delete("SHG Loan", {"member": member_id})
-    safe_delete("SHG Contribution", {"member": member_id})
-    safe_delete("SHG Contribution Invoice", {"member": member_id})
-    safe_delete("Payment Entry", {"party": member_id})
-    safe_delete("Journal Entry", {"reference_member": member_id})
-    safe_delete("GL Entry", {"party": member_id})
-
-    # 3️⃣ Finally, delete the member record itself
-    frappe.delete_doc("SHG Member", member_id, force=True, ignore_permissions=True)
+    # Same dependency-ordered, set-based plan as the bulk purge job; it also
+    # writes the Deletion Log entry with a per-doctype summary.
+    from shg.shg.utils.member_purge import execute_purge
+    execute_purge([member_id], reason="Manual purge requested by System Manager")
 
-    frappe.db.commit()
     frappe.msgprint(f"✅ Successfully purged all data for {member.member_name}")
     return True
 
 # --- Hook functions ---
 # These are hook functions called from hooks.py and should NOT have @frappe.whitelist()
 
+@instrumented()
 def handle_member_update_after_submit(doc, method=None):
     """
     Triggered when a submitted SHG Member document is edited.
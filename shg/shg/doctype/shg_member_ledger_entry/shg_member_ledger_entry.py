@@ -0,0 +1,24 @@
+# Copyright (c) 2026, SHG Solutions
+# License: MIT
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+class SHGMemberLedgerEntry(Document):
+    """Append-only record of one financial event on a member's account"""
+
+    def validate(self):
+        if not self.is_new():
+            frappe.throw(_("Member ledger entries cannot be edited; cancel the source document instead."))
+
+    def on_trash(self):
+        if not self.flags.ignore_ledger_guard:
+            frappe.throw(_("Member ledger entries cannot be deleted."))
+
+
+def on_doctype_update():
+    """Indexes backing statement range scans, keyset pages and reversals"""
+    frappe.db.add_unique("SHG Member Ledger Entry", ["member", "entry_no"], constraint_name="member_entry_no")
+    frappe.db.add_index("SHG Member Ledger Entry", ["member", "posting_date", "entry_no"])
+    frappe.db.add_index("SHG Member Ledger Entry", ["voucher_type", "voucher_no"])
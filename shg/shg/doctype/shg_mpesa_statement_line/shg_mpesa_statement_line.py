@@ -0,0 +1,14 @@
+# Copyright (c) 2026, SHG Solutions
+# License: MIT
+
+import frappe
+from frappe.model.document import Document
+
+class SHGMpesaStatementLine(Document):
+    """One M-Pesa statement receipt and the open item it was matched to"""
+
+
+def on_doctype_update():
+    """Indexes backing the review queue and per-batch reads"""
+    frappe.db.add_index("SHG Mpesa Statement Line", ["status", "transaction_date"])
+    frappe.db.add_index("SHG Mpesa Statement Line", ["import_batch"])
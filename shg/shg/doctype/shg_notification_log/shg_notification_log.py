@@ -10,6 +10,16 @@ class SHGNotificationLog(Document):
             if member_name:
                 self.member_name = member_name
 
+    def after_insert(self):
+        """Count the new notification against the member's unread counter"""
+        if self.member and not self.is_read:
+            adjust_unread_count(self.member, 1)
+
+    def on_trash(self):
+        """Release the unread counter slot held by this notification"""
+        if self.member and not self.is_read:
+            adjust_unread_count(self.member, -1)
+
     @frappe.whitelist()
     def mark_as_sent(self):
         """Mark notification as sent"""
@@ -23,4 +33,62 @@ class SHGNotificationLog(Document):
         """Mark notification as failed"""
         self.status = "Failed"
         self.error_message = error_message
-        self.db_update()
\ No newline at end of file
+        self.db_update()
+
+    @frappe.whitelist()
+    def mark_as_read(self):
+        """Mark notification as read by the member"""
+        mark_notifications_read(self.member, [self.name])
+
+
+def on_doctype_update():
+    """Index backing the per-member, newest-first listing and cursor pagination"""
+    frappe.db.add_index("SHG Notification Log", ["member", "creation"])
+
+
+def adjust_unread_count(member, delta):
+    """
+    Atomically move a member's unread counter by ``delta``, never below zero.
+    """
+    frappe.db.sql("""
+        UPDATE `tabSHG Member`
+        SET unread_notification_count = GREATEST(IFNULL(unread_notification_count, 0) + %(delta)s, 0)
+        WHERE name = %(member)s
+    """, {"member": member, "delta": delta})
+
+
+def mark_notifications_read(member, names=None):
+    """
+    Mark a member's notifications as read with one UPDATE.
+
+    Args:
+        member: SHG Member name
+        names: Notification log names; all unread notifications when omitted
+
+    Returns:
+        Number of notifications that changed from unread to read
+    """
+    conditions = "member = %(member)s AND is_read = 0"
+    values = {"member": member, "read_on": now()}
+    if names:
+        conditions += " AND name IN %(names)s"
+        values["names"] = tuple(names)
+
+    unread = frappe.db.sql_list(f"""
+        SELECT name FROM `tabSHG Notification Log` WHERE {conditions} FOR UPDATE
+    """, values)
+    if not unread:
+        return 0
+
+    frappe.db.sql("""
+        UPDATE `tabSHG Notification Log`
+        SET is_read = 1, read_on = %(read_on)s
+        WHERE name IN %(names)s
+    """, {"read_on": values["read_on"], "names": tuple(unread)})
+
+    if names:
+        adjust_unread_count(member, -len(unread))
+    else:
+        frappe.db.set_value("SHG Member", member, "unread_notification_count", 0, update_modified=False)
+
+    return len(unread)
@@ -0,0 +1,11 @@
+import frappe
+from frappe.model.document import Document
+
+class SHGNotificationLogArchive(Document):
+    """Cold storage for notification logs moved out by the archival job"""
+    pass
+
+
+def on_doctype_update():
+    """Index for looking up a member's archived history"""
+    frappe.db.add_index("SHG Notification Log Archive", ["member", "creation"])
@@ -1,8 +1,10 @@
 import frappe
 from frappe import _
-from frappe.utils import flt, nowdate
+from frappe.utils import flt, now, nowdate
 from shg.shg.utils.company_utils import get_default_company
 from shg.shg.utils.account_utils import get_or_create_member_account
+from shg.shg.utils.bulk_utils import table_has_column
+from shg.shg.utils.report_cache import bump_data_version_after_commit
 
 
 @frappe.whitelist()
@@ -135,6 +137,9 @@ def shg_receive_single_payment(document_type, document_name, amount, mode_of_pay
     except Exception:
         frappe.log_error(frappe.get_traceback(), "SHG Payment - Update Member Financial Summary Failed")
     
+    # Status updates above go through db_set, which fires no document events
+    bump_data_version_after_commit(document_type, "SHG Member")
+    
     return {
         "payment_entry": payment_entry.name,
         "status": "success",
@@ -142,11 +147,202 @@ def shg_receive_single_payment(document_type, document_name, amount, mode_of_pay
     }
 
 
+BULK_PAYMENT_DOCTYPES = ("SHG Contribution Invoice", "SHG Contribution", "SHG Meeting Fine")
+
+
+def get_bulk_payment_documents(documents):
+    """
+    Fetch every document referenced by a bulk payment with one query per doctype
+
+    Contribution invoices carry the outstanding amount of their Sales Invoice.
+
+    Returns:
+        dict: Document rows keyed by (doctype, name)
+    """
+    names = {}
+    for row in documents:
+        names.setdefault(row.get("doctype"), set()).add(row.get("name"))
+
+    queries = {
+        "SHG Contribution Invoice": """
+            SELECT i.name, i.member, i.status, i.amount, i.sales_invoice,
+                si.outstanding_amount AS sales_invoice_outstanding
+            FROM `tabSHG Contribution Invoice` i
+            LEFT JOIN `tabSales Invoice` si ON si.name = i.sales_invoice
+            WHERE i.name IN %(names)s
+        """,
+        "SHG Contribution": """
+            SELECT name, member, status, amount, expected_amount, amount_paid, invoice_reference
+            FROM `tabSHG Contribution`
+            WHERE name IN %(names)s
+        """,
+        "SHG Meeting Fine": """
+            SELECT name, member, status, fine_amount, fine_reason, posted_to_gl
+            FROM `tabSHG Meeting Fine`
+            WHERE name IN %(names)s
+        """,
+    }
+
+    found = {}
+    for doctype, doc_names in names.items():
+        if doctype not in queries:
+            continue
+        for row in frappe.db.sql(queries[doctype], {"names": tuple(doc_names)}, as_dict=True):
+            found[(doctype, row.name)] = row
+    return found
+
+
+def apply_invoice_payments(invoices):
+    """
+    Set the status of paid contribution invoices and close the fully paid ones
+
+    Args:
+        invoices (list): (invoice row, allocated amount) pairs
+
+    Returns:
+        dict: New status keyed by invoice name
+    """
+    statuses = {}
+    for invoice, alloc_amount in invoices:
+        due = invoice.sales_invoice_outstanding if invoice.sales_invoice else invoice.amount
+        statuses[invoice.name] = "Paid" if flt(alloc_amount) >= flt(due) else "Partially Paid"
+
+    paid = [name for name, status in statuses.items() if status == "Paid"]
+    partially_paid = [name for name, status in statuses.items() if status != "Paid"]
+    if paid:
+        closed = {"is_closed": 1} if table_has_column("SHG Contribution Invoice", "is_closed") else {}
+        frappe.db.bulk_update("SHG Contribution Invoice", {name: {"status": "Paid", **closed} for name in paid})
+    if partially_paid:
+        frappe.db.bulk_update("SHG Contribution Invoice", {name: {"status": "Partially Paid"} for name in partially_paid})
+
+    # Mark the contributions of the closed invoices as paid
+    if paid:
+        posted_on = ", posted_on = %(now)s" if table_has_column("SHG Contribution", "posted_on") else ""
+        frappe.db.sql(f"""
+            UPDATE `tabSHG Contribution`
+            SET status = 'Paid'{posted_on}
+            WHERE invoice_reference IN %(invoices)s AND status != 'Paid'
+        """, {"invoices": tuple(paid), "now": now()})
+    return statuses
+
+
+def apply_contribution_payments(contributions):
+    """
+    Add allocated amounts to contributions and sync their invoices' status
+
+    Args:
+        contributions (list): (contribution row, allocated amount) pairs
+
+    Returns:
+        dict: New status keyed by contribution name
+    """
+    updates, invoice_updates = {}, {}
+    for contribution, alloc_amount in contributions:
+        amount_paid = flt(flt(contribution.amount_paid) + flt(alloc_amount))
+        unpaid = flt(max(0, flt(contribution.expected_amount or contribution.amount) - amount_paid))
+        if unpaid <= 0:
+            status = "Paid"
+        elif amount_paid > 0:
+            status = "Partially Paid"
+        else:
+            status = "Unpaid"
+
+        updates[contribution.name] = {"amount_paid": amount_paid, "unpaid_amount": unpaid, "status": status}
+        if contribution.invoice_reference:
+            invoice_updates[contribution.invoice_reference] = {"status": status}
+
+    if updates:
+        frappe.db.bulk_update("SHG Contribution", updates)
+    if invoice_updates:
+        frappe.db.bulk_update("SHG Contribution Invoice", invoice_updates)
+    return {name: values["status"] for name, values in updates.items()}
+
+
+def post_fine_payments(fines, posting_date):
+    """
+    Mark fines as paid and post the unposted ones with one Journal Entry
+
+    The entry debits the members' fines accounts, one line per fine, and
+    credits the fines income account with the total. Each debit line names
+    its fine in ``custom_shg_meeting_fine``; the header field is only set
+    when the entry posts a single fine. A fine on a shared entry is reversed
+    by its own cancellation (see ``SHGMeetingFine.on_cancel``) and the shared
+    entry itself cannot be cancelled. Fines already posted to the ledger are
+    only marked as paid.
+
+    Args:
+        fines (list): Meeting fine rows
+        posting_date: Posting date of the Journal Entry
+    """
+    from shg.shg.utils.account_utils import get_account
+
+    company = get_default_company()
+    unposted = [fine for fine in fines if not fine.posted_to_gl]
+
+    customers = dict(frappe.db.sql(
+        "SELECT name, customer FROM `tabSHG Member` WHERE name IN %(members)s",
+        {"members": tuple({fine.member for fine in fines})},
+    ))
+
+    updates = {fine.name: {"status": "Paid"} for fine in fines}
+    if unposted:
+        try:
+            je = frappe.new_doc("Journal Entry")
+            je.voucher_type = "Journal Entry"
+            je.company = company
+            je.posting_date = posting_date
+            if len(unposted) == 1:
+                je.remark = f"Meeting fine from {unposted[0].member} for {unposted[0].fine_reason}"
+                je.custom_shg_meeting_fine = unposted[0].name
+            else:
+                je.remark = f"Meeting fines {', '.join(fine.name for fine in unposted)}"
+
+            member_accounts = {}
+            for fine in unposted:
+                if fine.member not in member_accounts:
+                    member_accounts[fine.member] = get_account(company, "fines", fine.member)
+                je.append("accounts", {
+                    "account": member_accounts[fine.member],
+                    "party_type": "Customer",
+                    "party": customers.get(fine.member) or fine.member,
+                    "debit_in_account_currency": fine.fine_amount,
+                    "credit_in_account_currency": 0,
+                    "custom_shg_meeting_fine": fine.name,
+                    "company": company
+                })
+            je.append("accounts", {
+                "account": get_account(company, "fines"),
+                "debit_in_account_currency": 0,
+                "credit_in_account_currency": flt(sum(flt(fine.fine_amount) for fine in unposted), 2),
+                "company": company
+            })
+            je.insert(ignore_permissions=True)
+            je.submit()
+
+            posted_on = now()
+            for fine in unposted:
+                updates[fine.name].update({"journal_entry": je.name, "posted_to_gl": 1, "posted_on": posted_on})
+        except Exception:
+            frappe.log_error(frappe.get_traceback(), "SHG Bulk Payment - Post Fines to Ledger Failed")
+
+    # Rows of fines posted and not posted carry different columns
+    for keys in {tuple(values) for values in updates.values()}:
+        frappe.db.bulk_update("SHG Meeting Fine", {
+            name: values for name, values in updates.items() if tuple(values) == keys
+        })
+
+
 @frappe.whitelist()
 def shg_receive_bulk_payment(member, documents, amount, mode_of_payment, posting_date=None, reference_no=None):
     """
     Receive payment for multiple documents in a single Payment Entry
+
+    All referenced documents are fetched up front and their status changes
+    are written with grouped updates, so the number of queries does not grow
+    with the number of documents.
     """
+    documents = frappe.parse_json(documents) if isinstance(documents, str) else documents
+
     # 1. Validate total requested allocation = received amount
     total_allocated = sum(flt(row.get("amount", 0)) for row in documents)
     if abs(flt(total_allocated) - flt(amount)) > 0.01:
@@ -158,15 +354,15 @@ def shg_receive_bulk_payment(member, documents, amount, mode_of_payment, posting
         frappe.throw(_("Default company not found in SHG Settings"))
     
     # 3. Validate all documents exist and are not fully paid
+    found = get_bulk_payment_documents(documents)
     for row in documents:
         doctype = row.get("doctype")
         docname = row.get("name")
+        doc = found.get((doctype, docname))
         
-        if not frappe.db.exists(doctype, docname):
+        if not doc:
             frappe.throw(_("Document {0} {1} not found").format(doctype, docname))
         
-        doc = frappe.get_doc(doctype, docname)
-        
         if doctype == "SHG Contribution Invoice" and doc.status == "Paid":
             frappe.throw(_("Invoice {0} is already fully paid").format(docname))
         elif doctype == "SHG Meeting Fine" and doc.status == "Paid":
@@ -202,8 +398,8 @@ def shg_receive_bulk_payment(member, documents, amount, mode_of_payment, posting
     # Set member account as paid from
     payment_entry.paid_from = account
     
-    # Add multiple references
-    updated_documents = []
+    # Add multiple references; allocations are summed per document for the updates below
+    allocations = {doctype: {} for doctype in BULK_PAYMENT_DOCTYPES}
     for row in documents:
         doctype = row.get("doctype")
         docname = row.get("name")
@@ -217,78 +413,34 @@ def shg_receive_bulk_payment(member, documents, amount, mode_of_payment, posting
             "reference_name": docname,
             "allocated_amount": alloc_amount
         })
+        allocation = allocations[doctype].setdefault(docname, [found[(doctype, docname)], 0])
+        allocation[1] += alloc_amount
+    allocations = {doctype: [tuple(allocation) for allocation in rows.values()] for doctype, rows in allocations.items()}
     
     # 6. Submit Payment Entry
     payment_entry.insert(ignore_permissions=True)
     payment_entry.submit()
     
-    # 7. Loop through all documents and update them
-    for row in documents:
-        doctype = row.get("doctype")
-        docname = row.get("name")
-        alloc_amount = flt(row.get("amount", 0))
-        
-        if alloc_amount <= 0:
-            continue
-            
-        doc = frappe.get_doc(doctype, docname)
-        
-        if doctype == "SHG Contribution Invoice":
-            # Update invoice status
-            if doc.sales_invoice:
-                # If linked to Sales Invoice, check outstanding amount
-                sales_invoice = frappe.get_doc("Sales Invoice", doc.sales_invoice)
-                if flt(alloc_amount) >= flt(sales_invoice.outstanding_amount):
-                    doc.db_set("status", "Paid")
-                    doc.db_set("is_closed", 1)
-                else:
-                    doc.db_set("status", "Partially Paid")
-            else:
-                # For standalone invoices
-                if flt(alloc_amount) >= flt(doc.amount):
-                    doc.db_set("status", "Paid")
-                    doc.db_set("is_closed", 1)
-                else:
-                    doc.db_set("status", "Partially Paid")
-            
-            # Update linked contribution
-            try:
-                doc.mark_linked_contribution_as_paid()
-            except Exception:
-                frappe.log_error(frappe.get_traceback(), "SHG Bulk Payment - Update Linked Contribution Failed")
-                
-            updated_documents.append({
-                "doctype": doctype,
-                "name": docname,
-                "new_status": doc.status
-            })
-        
-        elif doctype == "SHG Contribution":
-            # Update contribution payment status
-            try:
-                doc.update_payment_status(flt(alloc_amount))
-                updated_documents.append({
-                    "doctype": doctype,
-                    "name": docname,
-                    "new_status": doc.status
-                })
-            except Exception:
-                frappe.log_error(frappe.get_traceback(), "SHG Bulk Payment - Update Contribution Status Failed")
-        
-        elif doctype == "SHG Meeting Fine":
-            # Update fine status
-            doc.db_set("status", "Paid")
-            # Post to ledger
-            try:
-                doc.post_to_ledger()
-            except Exception:
-                frappe.log_error(frappe.get_traceback(), "SHG Bulk Payment - Post Fine to Ledger Failed")
-                
-            updated_documents.append({
-                "doctype": doctype,
-                "name": docname,
-                "new_status": "Paid"
-            })
+    # 7. Update all documents with grouped updates
+    new_status = {}
+    new_status["SHG Contribution Invoice"] = apply_invoice_payments(allocations["SHG Contribution Invoice"])
+    try:
+        new_status["SHG Contribution"] = apply_contribution_payments(allocations["SHG Contribution"])
+    except Exception:
+        new_status["SHG Contribution"] = {}
+        frappe.log_error(frappe.get_traceback(), "SHG Bulk Payment - Update Contribution Status Failed")
+    
+    fines = [fine for fine, _alloc_amount in allocations["SHG Meeting Fine"]]
+    if fines:
+        post_fine_payments(fines, payment_entry.posting_date)
+    new_status["SHG Meeting Fine"] = {fine.name: "Paid" for fine in fines}
+    
+    updated_documents = [
+        {"doctype": doctype, "name": doc.name, "new_status": new_status[doctype].get(doc.name)}
+        for doctype in BULK_PAYMENT_DOCTYPES
+        for doc, _alloc_amount in allocations[doctype]
+        if doc.name in new_status[doctype]
+    ]
     
     # Update member financial summary
     try:
@@ -297,6 +449,9 @@ def shg_receive_bulk_payment(member, documents, amount, mode_of_payment, posting
     except Exception:
         frappe.log_error(frappe.get_traceback(), "SHG Bulk Payment - Update Member Financial Summary Failed")
     
+    # The grouped updates above bypass document events
+    bump_data_version_after_commit(*BULK_PAYMENT_DOCTYPES, "SHG Member")
+    
     return {
         "payment_entry": payment_entry.name,
         "updated_documents": updated_documents,
@@ -352,6 +507,8 @@ def on_payment_submit(doc, method):
                 member_doc.update_financial_summary()
             except Exception:
                 frappe.log_error(frappe.get_traceback(), "Payment Entry Submit - Update Member Financial Summary Failed")
+        
+        bump_data_version_after_commit(*{ref.reference_doctype for ref in doc.references}, "SHG Member")
                 
     except Exception:
         frappe.log_error(frappe.get_traceback(), "Payment Entry Submit Hook Failed")
\ No newline at end of file
@@ -103,4 +103,10 @@ class SHGPaymentEntry(Document):
                                          filters={"voucher_type": "Payment Entry", "voucher_no": payment_entry_name},
                                          pluck="name")
             if gl_entries:
-                self.db_set("linked_gl_entries", ", ".join(gl_entries))
\ No newline at end of file
+                self.db_set("linked_gl_entries", ", ".join(gl_entries))
+
+
+def on_doctype_update():
+    """Index backing member payment ranges in statements"""
+    from shg.shg.utils.db_indexes import add_composite_indexes
+    add_composite_indexes(["SHG Payment Entry"])
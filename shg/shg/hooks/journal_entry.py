@@ -0,0 +1,14 @@
+import frappe
+from frappe import _
+
+
+def before_cancel(doc, method):
+    """
+    Hook function called before a Journal Entry is cancelled.
+    An entry posting several meeting fines (a bulk payment) is kept; each
+    fine reverses its own line when it is cancelled.
+    """
+    fines = sorted({row.get("custom_shg_meeting_fine") for row in doc.accounts if row.get("custom_shg_meeting_fine")})
+    if len(fines) > 1:
+        frappe.throw(_("Journal Entry {0} posts meeting fines {1}. Cancel the fines instead; each one reverses its own line.").format(
+            doc.name, ", ".join(fines)))
@@ -2,6 +2,8 @@ import frappe
 from frappe import _
 from frappe.utils.data import flt
 from shg.shg.utils.member_account_mapping import set_member_credit_account as map_member_account
+from shg.shg.utils.instrumentation import instrumented
+from shg.shg.utils.report_cache import bump_data_version_after_commit
 
 def set_reference_fields(pe, source_doc):
     """
@@ -32,6 +34,7 @@ def set_reference_fields(pe, source_doc):
                 pe.reference_date = source_doc.posting_date or pe.posting_date
 
 
+@instrumented()
 def validate(doc, method):
     """
     Hook function called during Payment Entry validation.
@@ -74,6 +77,7 @@ def validate(doc, method):
         # Don't raise the exception to avoid blocking submission, just log it
 
 
+@instrumented()
 def on_submit(doc, method):
     """
     Hook function called when Payment Entry is submitted.
@@ -113,6 +117,12 @@ def on_submit(doc, method):
         # Update related invoice statuses
         _update_related_invoice_statuses(doc)
         
+        # The updates above use db_set, so cached reports are invalidated here
+        bump_data_version_after_commit(
+            *{ref.reference_doctype for ref in doc.references},
+            "SHG Contribution", "SHG Contribution Invoice", "SHG Member",
+        )
+        
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), f"SHG Payment Entry On Submit Error - {doc.name}")
         # Don't raise the exception to avoid blocking submission, just log it
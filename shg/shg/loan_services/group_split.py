@@ -0,0 +1,181 @@
+"""
+Group loan split services for SHG Loan module.
+Resolves member eligibility in one query and creates all child loans with
+their repayment schedules through a single bulk write.
+"""
+import frappe
+from frappe import _
+from frappe.utils import flt, today
+from typing import Any, Dict, Iterable, List, Optional
+
+from shg.shg.utils.bulk_utils import bulk_insert_docs
+
+# Groups with more members than this are split in a background job
+GROUP_SPLIT_JOB_THRESHOLD = 50
+
+
+def check_members_eligibility(member_ids: Iterable[str], min_savings: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Validate that every member is Active and meets the minimum savings.
+
+    Args:
+        member_ids: SHG Member names
+        min_savings: Minimum total contributions; read from SHG Settings when None
+
+    Returns:
+        Dictionary of member name to member row
+    """
+    member_ids = [m for m in dict.fromkeys(member_ids) if m]
+    if not member_ids:
+        return {}
+
+    if min_savings is None:
+        min_savings = flt(frappe.db.get_single_value("SHG Settings", "min_savings_for_loan") or 0)
+
+    members = {
+        m.name: m
+        for m in frappe.get_all(
+            "SHG Member",
+            filters={"name": ["in", member_ids]},
+            fields=["name", "member_name", "membership_status", "total_contributions"],
+        )
+    }
+
+    missing = [m for m in member_ids if m not in members]
+    if missing:
+        frappe.throw(_("Member(s) not found: {0}").format(", ".join(missing)))
+
+    inactive = [members[m].member_name or m for m in member_ids if (members[m].membership_status or "Active") != "Active"]
+    if inactive:
+        frappe.throw(_("{0} is not Active.").format(", ".join(inactive)))
+
+    if min_savings:
+        short = [members[m].member_name or m for m in member_ids if flt(members[m].total_contributions) < min_savings]
+        if short:
+            frappe.throw(_("{0} has not met minimum savings.").format(", ".join(short)))
+
+    return members
+
+
+def get_split_members(parent_loan: str) -> set:
+    """Return members that already have a child loan of ``parent_loan``."""
+    return set(frappe.get_all("SHG Loan", filters={"parent_loan": parent_loan}, pluck="member"))
+
+
+def build_child_loan(parent: Any, row: Any) -> Any:
+    """
+    Build (without saving) the individual loan for one group member row.
+
+    The loan is named and carries its repayment schedule and balance
+    fields, so it can go straight into :func:`bulk_insert_docs`.
+    """
+    loan = frappe.new_doc("SHG Loan")
+    loan.update({
+        "loan_type": parent.loan_type,
+        "loan_amount": flt(row.allocated_amount, 2),
+        "interest_rate": parent.interest_rate,
+        "interest_type": parent.interest_type,
+        "loan_period_months": parent.loan_period_months,
+        "repayment_frequency": parent.repayment_frequency,
+        "member": row.member,
+        "member_name": row.member_name,
+        "company": parent.company,
+        "repayment_start_date": parent.repayment_start_date or today(),
+        "status": "Approved",
+        "parent_loan": parent.name,
+        "is_group_loan": 0
+    })
+    loan.calculate_repayment_details()
+
+    for row_data in loan.build_repayment_schedule_rows():
+        loan.append("repayment_schedule", row_data)
+
+    outstanding = flt(sum(flt(r.unpaid_balance) for r in loan.repayment_schedule), 2)
+    loan.balance_amount = outstanding
+    loan.loan_balance = outstanding
+
+    for field in ("loan_amount", "monthly_installment", "total_payable"):
+        if loan.get(field):
+            loan.set(field, flt(loan.get(field), 2))
+
+    loan.set_new_name()
+    loan.set_parent_in_children()
+    return loan
+
+
+def split_group_loan(parent: Any, publish_progress: bool = False) -> List[str]:
+    """
+    Create the individual member loans of a group loan in one transaction.
+
+    Members that already have a child loan are skipped, so the split can be
+    re-run safely. Either every missing child loan is written or, on error,
+    none is.
+
+    Args:
+        parent: SHG Loan document or name of the group loan
+        publish_progress: Publish realtime progress while building loans
+
+    Returns:
+        List of created loan names
+    """
+    if isinstance(parent, str):
+        parent = frappe.get_doc("SHG Loan", parent)
+
+    rows = [r for r in parent.get("loan_members", []) if r.member]
+    if not rows:
+        frappe.throw(_("No Loan Members found."))
+
+    check_members_eligibility([r.member for r in rows])
+    already_split = get_split_members(parent.name)
+    pending = [r for r in rows if r.member not in already_split]
+
+    loans = []
+    try:
+        for i, row in enumerate(pending, start=1):
+            loans.append(build_child_loan(parent, row))
+            if publish_progress:
+                frappe.publish_progress(
+                    i * 100 / len(pending),
+                    title=_("Splitting Group Loan"),
+                    doctype="SHG Loan",
+                    docname=parent.name,
+                    description=_("Prepared {0} of {1} member loans").format(i, len(pending)),
+                )
+
+        bulk_insert_docs(loans)
+        frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), f"Group loan split failed for {parent.name}")
+        raise
+
+    return [loan.name for loan in loans]
+
+
+def run_group_split_job(parent_loan: str):
+    """Background job entry point for :func:`split_or_enqueue`."""
+    return split_group_loan(parent_loan, publish_progress=True)
+
+
+def split_or_enqueue(parent: Any) -> Dict[str, Any]:
+    """
+    Split small groups inline and queue large ones as a background job.
+
+    Returns:
+        Dictionary with ``queued`` and the created loan names (empty when queued)
+    """
+    members = [r.member for r in parent.get("loan_members", []) if r.member]
+    if len(members) <= GROUP_SPLIT_JOB_THRESHOLD:
+        return {"queued": False, "created": split_group_loan(parent)}
+
+    # Fail fast on eligibility while the user is still waiting on the save
+    check_members_eligibility(members)
+    frappe.enqueue(
+        "shg.shg.loan_services.group_split.run_group_split_job",
+        queue="long",
+        timeout=3600,
+        job_name=f"group-loan-split-{parent.name}",
+        enqueue_after_commit=True,
+        parent_loan=parent.name,
+    )
+    return {"queued": True, "created": []}
@@ -2,6 +2,7 @@
 Loan rescheduling services for SHG Loan module.
 Handles loan rescheduling and amendment flows.
 """
+import hashlib
 import frappe
 from frappe.utils import flt, getdate
 from typing import List, Dict, Any, Tuple
@@ -240,4 +241,207 @@ def reschedule_loan(
         "message": f"Loan rescheduled successfully. New loan: {new_loan_name}",
         "new_loan": new_loan_name,
         "impact": impact
-    }
\ No newline at end of file
+    }
+
+# ---------------------------------------------------
+# Scenario grid
+# ---------------------------------------------------
+SCENARIO_CACHE_KEY = "shg_reschedule_scenarios"
+SCENARIO_CACHE_TTL = 3600
+MAX_SCENARIO_CELLS = 10000
+
+FLAT_INTEREST_TYPES = ("Flat Rate", "Flat")
+DECLINING_INTEREST_TYPES = ("Reducing (Declining Balance)",)
+
+
+def _parse_grid_values(values, cast) -> List[Any]:
+    """Grid axis from a list or a JSON / comma separated string, de-duplicated in order"""
+    if isinstance(values, str):
+        values = frappe.parse_json(values) if values.strip().startswith("[") else values.split(",")
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+    return list(dict.fromkeys(cast(value) for value in values if str(value).strip() != ""))
+
+
+def get_scenario_factors(
+    interest_type: str,
+    rates: List[float],
+    tenors: List[int],
+    grace: List[int]
+) -> Dict[str, List]:
+    """
+    Per-unit-of-principal EMI and total repayment for every grid cell.
+
+    Every formula is linear in the principal, so the factors are computed once
+    per grid and scaled per loan instead of building a schedule per cell. Rates
+    are annual percentages applied per installment as ``rate / 12`` and tenors
+    count installments, the same convention as the schedule builders. Grace
+    installments are interest-only and come before the ``tenor`` amortizing
+    installments.
+
+    Args:
+        interest_type: Flat rate, reducing (EMI) or declining balance
+        rates: Candidate annual interest rates (percentage)
+        tenors: Candidate numbers of amortizing installments
+        grace: Candidate numbers of interest-only grace installments
+
+    Returns:
+        ``emi`` (first amortizing installment) and ``total`` factors, both
+        nested as ``[grace][rate][tenor]``
+    """
+    emi_factors, total_factors = [], []
+    for grace_installments in grace:
+        emi_by_rate, total_by_rate = [], []
+        for rate in rates:
+            r = flt(rate) / 100 / 12
+            grace_interest = grace_installments * r
+            emi_row, total_row = [], []
+            for n in tenors:
+                if interest_type in FLAT_INTEREST_TYPES:
+                    total = 1 + r * n
+                    emi = total / n
+                elif interest_type in DECLINING_INTEREST_TYPES:
+                    emi = 1 / n + r
+                    total = 1 + r * (n + 1) / 2
+                elif r > 0:
+                    growth = (1 + r) ** n
+                    emi = r * growth / (growth - 1)
+                    total = emi * n
+                else:
+                    emi = 1 / n
+                    total = 1
+                emi_row.append(emi)
+                total_row.append(total + grace_interest)
+            emi_by_rate.append(emi_row)
+            total_by_rate.append(total_row)
+        emi_factors.append(emi_by_rate)
+        total_factors.append(total_by_rate)
+    return {"emi": emi_factors, "total": total_factors}
+
+
+def _get_scenario_loans(loan_names: List[str]) -> List[Dict[str, Any]]:
+    """
+    Outstanding principal and current terms of the loans, in one query
+
+    The principal is what the unpaid schedule rows still owe of their
+    ``principal_component``. Payments settle a row's interest first, so a
+    row's unpaid principal is the smaller of its principal and its unpaid
+    balance; future interest in ``loan_balance`` is left out.
+    """
+    return frappe.db.sql("""
+        SELECT
+            l.name, l.member, l.interest_type, l.interest_rate, l.loan_period_months, l.modified,
+            ROUND(IFNULL(s.principal, 0), 2) AS outstanding
+        FROM `tabSHG Loan` l
+        LEFT JOIN (
+            SELECT parent, SUM(LEAST(
+                IFNULL(principal_component, 0),
+                GREATEST(IFNULL(unpaid_balance, IFNULL(total_payment, 0) - IFNULL(amount_paid, 0)), 0)
+            )) AS principal
+            FROM `tabSHG Loan Repayment Schedule`
+            WHERE parenttype = 'SHG Loan' AND parent IN %(names)s
+                AND IFNULL(status, '') != 'Paid'
+            GROUP BY parent
+        ) s ON s.parent = l.name
+        WHERE l.name IN %(names)s AND l.docstatus = 1
+    """, {"names": tuple(loan_names)}, as_dict=True)
+
+
+def _scale(factors: List, amount: float) -> List:
+    return [[[flt(value * amount, 2) for value in row] for row in by_rate] for by_rate in factors]
+
+
+def evaluate_reschedule_scenarios(
+    loan_names: List[str],
+    rates: List[float],
+    tenors: List[int],
+    grace: List[int] = None,
+    interest_type: str = None
+) -> Dict[str, Any]:
+    """
+    Score a grid of candidate terms for one or many loans.
+
+    Results are cached per loan state (name, ``modified`` and outstanding
+    principal) and grid, so re-opening the same comparison costs one query.
+
+    Args:
+        loan_names: Loans to evaluate
+        rates: Candidate annual interest rates (percentage)
+        tenors: Candidate numbers of amortizing installments
+        grace: Candidate numbers of interest-only grace installments
+        interest_type: Interest method of the new terms; defaults to each loan's own
+
+    Returns:
+        The grid axes and, per loan, ``emi``, ``total_repayment`` and
+        ``difference`` (total repayment minus outstanding principal) nested as
+        ``[grace][rate][tenor]``
+    """
+    rates = _parse_grid_values(rates, flt)
+    tenors = [n for n in _parse_grid_values(tenors, int) if n > 0]
+    grace = [g for g in _parse_grid_values(grace or [0], int) if g >= 0] or [0]
+    if not rates or not tenors:
+        frappe.throw("At least one rate and one tenor are required.")
+    if len(rates) * len(tenors) * len(grace) > MAX_SCENARIO_CELLS:
+        frappe.throw(f"A scenario grid may have at most {MAX_SCENARIO_CELLS} cells.")
+
+    grid_key = hashlib.sha1(f"{rates}|{tenors}|{grace}|{interest_type or ''}".encode()).hexdigest()[:16]
+    factors_by_type = {}
+    results = {}
+
+    loan_names = _parse_grid_values(loan_names, lambda name: str(name).strip())
+    if not loan_names:
+        frappe.throw("Select at least one loan.")
+
+    for loan in _get_scenario_loans(loan_names):
+        cache_key = f"{SCENARIO_CACHE_KEY}:{loan.name}:{loan.modified}:{loan.outstanding}:{grid_key}"
+        cached = frappe.cache().get_value(cache_key)
+        if cached:
+            results[loan.name] = cached
+            continue
+
+        method = interest_type or loan.interest_type
+        if method not in factors_by_type:
+            factors_by_type[method] = get_scenario_factors(method, rates, tenors, grace)
+        factors = factors_by_type[method]
+
+        outstanding = flt(loan.outstanding)
+        total_repayment = _scale(factors["total"], outstanding)
+        result = {
+            "member": loan.member,
+            "outstanding": outstanding,
+            "current_terms": {
+                "interest_type": loan.interest_type,
+                "interest_rate": flt(loan.interest_rate),
+                "loan_period_months": loan.loan_period_months,
+            },
+            "interest_type": method,
+            "emi": _scale(factors["emi"], outstanding),
+            "total_repayment": total_repayment,
+            "difference": [[[flt(total - outstanding, 2) for total in row] for row in by_rate]
+                           for by_rate in total_repayment],
+        }
+        frappe.cache().set_value(cache_key, result, expires_in_sec=SCENARIO_CACHE_TTL)
+        results[loan.name] = result
+
+    return {"rates": rates, "tenors": tenors, "grace": grace, "loans": results}
+
+
+@frappe.whitelist()
+def get_reschedule_scenarios(loans, rates, tenors, grace=None, interest_type=None) -> Dict[str, Any]:
+    """
+    Whitelisted method to compare candidate reschedule terms.
+
+    Args:
+        loans: Loan name, or JSON / comma separated list of loan names
+        rates: JSON / comma separated annual interest rates
+        tenors: JSON / comma separated numbers of installments
+        grace: JSON / comma separated numbers of grace installments
+        interest_type: Optional interest method of the new terms
+
+    Returns:
+        See :func:`evaluate_reschedule_scenarios`
+    """
+    if not frappe.has_permission("SHG Loan", "read"):
+        frappe.throw("Insufficient permissions to view loan reschedule scenarios.")
+
+    return evaluate_reschedule_scenarios(loans, rates, tenors, grace, interest_type)
@@ -5,6 +5,7 @@ Supports Flat, Reducing (EMI), and Reducing (Declining Balance) interest methods
 import frappe
 from frappe.utils import flt, getdate, add_months
 from typing import List, Dict, Any
+from shg.shg.utils.instrumentation import instrumented
 
 
 def build_flat_rate_schedule(
@@ -279,6 +280,7 @@ def validate_schedule_totals(schedule: List[Dict], principal: float, tolerance:
 
 
 @frappe.whitelist()
+@instrumented()
 def generate_schedule_for_loan(loan_name: str) -> List[Dict[str, Any]]:
     """
     Generate repayment schedule for a loan document.
@@ -4,7 +4,7 @@ Handles loan write-off processes and accounting.
 """
 import frappe
 from frappe.utils import flt, getdate, add_days
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 
 def calculate_writeoff_amount(loan_doc: Any) -> Dict[str, float]:
@@ -183,6 +183,9 @@ def reverse_loan_writeoff(
     }
 
 
+WRITEOFF_ELIGIBLE_STATUSES = ("Disbursed", "Active", "Overdue", "Defaulted")
+
+
 def get_writeoff_eligible_loans() -> List[Dict[str, Any]]:
     """
     Get list of loans eligible for write-off.
@@ -196,7 +199,7 @@ def get_writeoff_eligible_loans() -> List[Dict[str, Any]]:
     loans = frappe.get_all(
         "SHG Loan",
         filters={
-            "status": ["in", ["Disbursed", "Active", "Overdue"]],
+            "status": ["in", WRITEOFF_ELIGIBLE_STATUSES],
             "docstatus": 1,
             "next_due_date": ["<", cutoff_date]
         },
@@ -284,4 +287,274 @@ def reverse_writeoff(
     # Reverse write-off
     result = reverse_loan_writeoff(loan_name, posting_date)
     
-    return result
\ No newline at end of file
+    return result
+
+# ---------------------------------------------------
+# Bulk write-off run
+# ---------------------------------------------------
+BULK_WRITEOFF_MIN_OVERDUE_DAYS = 90
+
+
+def get_bulk_writeoff_query(filters: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Candidate loans of a bulk write-off run with the run totals
+
+    Eligibility mirrors :func:`get_writeoff_eligible_loans`: submitted loans
+    in ``WRITEOFF_ELIGIBLE_STATUSES`` whose next installment is at least
+    ``min_overdue_days`` overdue and that still carry a balance. The
+    ``COUNT``/``SUM ... OVER ()`` window columns give the run totals in the
+    same query.
+
+    Args:
+        filters: ``min_overdue_days``, ``as_of``, ``company``, ``member``, ``loans``
+    """
+    filters = frappe._dict(filters or {})
+    as_of = getdate(filters.as_of or frappe.utils.today())
+    min_overdue_days = int(filters.min_overdue_days or BULK_WRITEOFF_MIN_OVERDUE_DAYS)
+
+    conditions = [
+        "l.docstatus = 1",
+        "l.status IN %(statuses)s",
+        "l.next_due_date < %(cutoff)s",
+        "IFNULL(NULLIF(l.loan_balance, 0), l.balance_amount) > 0",
+    ]
+    values = {
+        "statuses": WRITEOFF_ELIGIBLE_STATUSES,
+        "cutoff": add_days(as_of, -min_overdue_days),
+        "as_of": as_of,
+    }
+    if filters.company:
+        conditions.append("l.company = %(company)s")
+        values["company"] = filters.company
+    if filters.member:
+        conditions.append("l.member = %(member)s")
+        values["member"] = filters.member
+    if filters.loans:
+        conditions.append("l.name IN %(loans)s")
+        values["loans"] = tuple(frappe.parse_json(filters.loans) if isinstance(filters.loans, str) else filters.loans)
+
+    query = f"""
+        SELECT
+            l.name AS loan, l.member, l.member_name, l.company, l.next_due_date,
+            DATEDIFF(%(as_of)s, l.next_due_date) AS overdue_days,
+            ROUND(IFNULL(NULLIF(l.loan_balance, 0), l.balance_amount), 2) AS outstanding_amount,
+            COUNT(*) OVER () AS total_loans,
+            ROUND(SUM(IFNULL(NULLIF(l.loan_balance, 0), l.balance_amount)) OVER (), 2) AS total_outstanding
+        FROM `tabSHG Loan` l
+        WHERE {" AND ".join(conditions)}
+        ORDER BY l.company, l.name
+    """
+    return query, values
+
+
+@frappe.whitelist()
+def preview_bulk_writeoff(filters=None) -> Dict[str, Any]:
+    """
+    Dry run of a bulk write-off: the loans that would be written off and the totals
+
+    Nothing is written.
+    """
+    frappe.only_for(["System Manager", "SHG Admin"])
+    query, values = get_bulk_writeoff_query(frappe.parse_json(filters) or {})
+    rows = frappe.db.sql(query, values, as_dict=True)
+    totals = {
+        "loans": rows[0].total_loans if rows else 0,
+        "outstanding": flt(rows[0].total_outstanding) if rows else 0.0,
+    }
+    for row in rows:
+        row.pop("total_loans")
+        row.pop("total_outstanding")
+    return {"loans": rows, "totals": totals}
+
+
+def _get_receivable_accounts(rows: List[Dict[str, Any]], company: str) -> Dict[str, str]:
+    """Member receivable subaccounts of ``rows`` resolved with one query; missing ones are created"""
+    from shg.shg.utils.account_helpers import get_or_create_member_receivable
+
+    abbr = frappe.db.get_value("Company", company, "abbr")
+    account_names = {
+        row["member"]: f"{(row.get('member_name') or row['member']).strip().upper()} - {abbr}"
+        for row in rows
+    }
+    existing = dict(frappe.db.sql("""
+        SELECT account_name, name FROM `tabAccount`
+        WHERE company = %(company)s AND account_name IN %(names)s
+    """, {"company": company, "names": tuple(set(account_names.values()))}))
+
+    return {
+        member: existing.get(account_name) or get_or_create_member_receivable(member, company)
+        for member, account_name in account_names.items()
+    }
+
+
+def _get_outstanding_split(rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """
+    Principal, interest and penalty shares of each loan's written-off amount
+
+    Principal and interest are what the unpaid schedule rows still owe,
+    interest being settled first within a row; any balance beyond the
+    schedule (penalties charged to the loan) is penalty. Loans without
+    unpaid schedule rows are written off as principal.
+    """
+    schedule = {
+        row.parent: row for row in frappe.db.sql("""
+            SELECT
+                parent,
+                SUM(LEAST(IFNULL(principal_component, 0), GREATEST(unpaid, 0))) AS principal,
+                SUM(GREATEST(unpaid - IFNULL(principal_component, 0), 0)) AS interest
+            FROM (
+                SELECT parent, principal_component,
+                    IFNULL(unpaid_balance, IFNULL(total_payment, 0) - IFNULL(amount_paid, 0)) AS unpaid
+                FROM `tabSHG Loan Repayment Schedule`
+                WHERE parenttype = 'SHG Loan' AND parent IN %(loans)s
+                    AND IFNULL(status, '') != 'Paid'
+            ) s
+            GROUP BY parent
+        """, {"loans": tuple(row["loan"] for row in rows)}, as_dict=True)
+    }
+
+    split = {}
+    for row in rows:
+        amount = flt(row["outstanding_amount"], 2)
+        unpaid = schedule.get(row["loan"])
+        if not unpaid:
+            split[row["loan"]] = {"principal": amount, "interest": 0.0, "penalty": 0.0}
+            continue
+        principal = flt(min(flt(unpaid.get("principal")), amount), 2)
+        interest = flt(min(flt(unpaid.get("interest")), amount - principal), 2)
+        split[row["loan"]] = {
+            "principal": principal,
+            "interest": interest,
+            "penalty": flt(amount - principal - interest, 2),
+        }
+    return split
+
+
+def _post_writeoff_voucher(rows: List[Dict[str, Any]], company: str, write_off_account: str,
+                           posting_date, remarks: str) -> str:
+    """One Journal Entry for a company: a debit to the write-off account and a credit per loan"""
+    receivables = _get_receivable_accounts(rows, company)
+    customers = dict(frappe.get_all(
+        "SHG Member",
+        filters={"name": ["in", list({row["member"] for row in rows})]},
+        fields=["name", "customer"],
+        as_list=True,
+    ))
+
+    je = frappe.new_doc("Journal Entry")
+    je.voucher_type = "Write Off Entry"
+    je.company = company
+    je.posting_date = posting_date
+    je.user_remark = remarks
+    je.append("accounts", {
+        "account": write_off_account,
+        "debit_in_account_currency": flt(sum(flt(row["outstanding_amount"]) for row in rows), 2),
+    })
+    for row in rows:
+        je.append("accounts", {
+            "account": receivables[row["member"]],
+            "party_type": "Customer",
+            "party": customers.get(row["member"]) or row["member"],
+            "credit_in_account_currency": flt(row["outstanding_amount"], 2),
+            "user_remark": f"Loan write-off for {row['loan']}",
+        })
+    je.insert(ignore_permissions=True)
+    je.submit()
+    return je.name
+
+
+def run_bulk_writeoff(filters: Optional[Dict[str, Any]] = None, posting_date: Optional[str] = None,
+                      remarks: Optional[str] = None, expected_total: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Write off every candidate loan of ``filters`` in one transaction
+
+    Posts one consolidated Journal Entry per company, bulk-updates the loans
+    to *Written Off* and bulk-inserts their ``SHG Loan Transaction`` logs,
+    split into principal, interest and penalty.
+    Any failure rolls the whole run back.
+
+    Args:
+        filters: Eligibility filters, as for :func:`get_bulk_writeoff_query`
+        posting_date: Date of the write-off (default: today)
+        remarks: Remarks on the vouchers and logs
+        expected_total: Total confirmed from the preview; the run aborts when
+            the candidates no longer add up to it
+
+    Returns:
+        Number of loans, total written off and the Journal Entries created
+    """
+    from shg.shg.utils.bulk_utils import bulk_insert_rows
+
+    posting_date = getdate(posting_date or frappe.utils.today())
+    write_off_account = frappe.db.get_single_value("SHG Settings", "default_write_off_account")
+    if not write_off_account:
+        frappe.throw("Please set Loan Write-off Account in SHG Settings.")
+
+    filters = dict(filters or {}, as_of=posting_date)
+    query, values = get_bulk_writeoff_query(filters)
+    rows = frappe.db.sql(query + " FOR UPDATE", values, as_dict=True)
+    if not rows:
+        return {"loans": 0, "total": 0.0, "journal_entries": []}
+
+    total = flt(rows[0].total_outstanding, 2)
+    if expected_total is not None and abs(total - flt(expected_total)) > 0.005:
+        frappe.throw(f"Write-off candidates changed since the preview (total {total}, expected {flt(expected_total, 2)}).")
+
+    remarks = remarks or f"Bulk loan write-off on {posting_date}"
+    by_company = {}
+    for row in rows:
+        by_company.setdefault(row.company or frappe.db.get_single_value("SHG Settings", "company"), []).append(row)
+
+    try:
+        split = _get_outstanding_split(rows)
+        loan_updates, logs, journal_entries = {}, [], []
+        for company, company_rows in by_company.items():
+            je_name = _post_writeoff_voucher(company_rows, company, write_off_account, posting_date, remarks)
+            journal_entries.append(je_name)
+            for row in company_rows:
+                loan_updates[row.loan] = {
+                    "status": "Written Off",
+                    "write_off_date": posting_date,
+                    "write_off_amount": row.outstanding_amount,
+                    "write_off_journal_entry": je_name,
+                    "loan_balance": 0,
+                    "balance_amount": 0,
+                    "overdue_amount": 0,
+                }
+                logs.append({
+                    "name": frappe.generate_hash(length=10),
+                    "loan": row.loan,
+                    "member": row.member,
+                    "transaction_type": "Write-off",
+                    "posting_date": posting_date,
+                    "amount": row.outstanding_amount,
+                    **split[row.loan],
+                    "journal_entry": je_name,
+                    "remarks": remarks,
+                })
+
+        frappe.db.bulk_update("SHG Loan", loan_updates)
+        bulk_insert_rows("SHG Loan Transaction", logs)
+        frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "Bulk loan write-off failed")
+        raise
+
+    from shg.shg.utils.report_cache import bump_data_version
+    bump_data_version("SHG Loan")
+
+    return {"loans": len(rows), "total": total, "journal_entries": journal_entries}
+
+
+@frappe.whitelist()
+def bulk_writeoff_loans(filters=None, posting_date: Optional[str] = None, remarks: Optional[str] = None,
+                        expected_total=None) -> Dict[str, Any]:
+    """Whitelisted entry point of :func:`run_bulk_writeoff`; pass the previewed total as ``expected_total``"""
+    frappe.only_for(["System Manager", "SHG Admin"])
+    return run_bulk_writeoff(
+        frappe.parse_json(filters) or {},
+        posting_date,
+        remarks,
+        flt(expected_total) if expected_total not in (None, "") else None,
+    )
@@ -13,6 +13,15 @@ def get_schedule(loan_name):
         order_by="due_date asc, idx asc"
     )
 
+def get_row_remaining(row):
+    """Remaining amount of a schedule row: remaining_amount, else unpaid_balance, else total less paid."""
+    return flt(row.get("remaining_amount") or row.get("unpaid_balance")
+               or (flt(row.get("total_payment")) - flt(row.get("amount_paid") or 0)))
+
+def is_unpaid_row(row):
+    """Whether a schedule row is still open for payment."""
+    return row.get("status") != "Paid" and get_row_remaining(row) > 0
+
 def compute_totals(schedule_rows):
     total_principal = sum(flt(r.principal_component) for r in schedule_rows)
     total_interest  = sum(flt(r.interest_component)  for r in schedule_rows)
@@ -20,27 +20,15 @@ def get_context(context):
 @frappe.whitelist()
 def get_dashboard_data():
     """Get data for the dashboard charts"""
-    # Get total active members
-    active_members = frappe.db.count("SHG Member", filters={"membership_status": "Active"})
-    
-    # Get total contributions
-    total_contributions = frappe.db.sql("""
-        SELECT COALESCE(SUM(amount), 0) 
-        FROM `tabSHG Contribution` 
-        WHERE docstatus = 1
-    """)[0][0]
-    
-    # Get active loans and outstanding balance
-    active_loans = frappe.db.count("SHG Loan", filters={"status": "Disbursed"})
-    outstanding_balance = frappe.db.sql("""
-        SELECT COALESCE(SUM(balance_amount), 0) 
-        FROM `tabSHG Loan` 
-        WHERE status = 'Disbursed'
-    """)[0][0]
+    # Read from the KPI snapshot store; it reconciles itself if older than
+    # the staleness bound in SHG Settings
+    from shg.shg.utils.kpi_snapshots import get_snapshot
+    snapshot = get_snapshot()
     
     return {
-        "active_members": active_members,
-        "total_contributions": float(total_contributions),
-        "active_loans": active_loans,
-        "outstanding_balance": float(outstanding_balance)
+        "active_members": int(snapshot.get("active_members", 0)),
+        "total_contributions": float(snapshot.get("total_contributions", 0)),
+        "active_loans": int(snapshot.get("active_loans", 0)),
+        "outstanding_balance": float(snapshot.get("outstanding_balance", 0)),
+        "as_of": snapshot.get("as_of")
     }
\ No newline at end of file
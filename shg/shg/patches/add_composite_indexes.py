@@ -0,0 +1,7 @@
+import frappe
+
+def execute():
+    """Add the composite index pack to the SHG transaction tables."""
+    from shg.shg.utils.db_indexes import add_composite_indexes
+    add_composite_indexes()
+    frappe.db.commit()
@@ -0,0 +1,30 @@
+import frappe
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+def execute():
+    """Link Journal Entry lines to the meeting fine they post, for entries shared by several fines."""
+    custom_fields = {
+        "Journal Entry Account": [
+            {
+                "fieldname": "custom_shg_meeting_fine",
+                "fieldtype": "Link",
+                "options": "SHG Meeting Fine",
+                "label": "SHG Meeting Fine",
+                "insert_after": "party",
+                "read_only": 1,
+                "allow_on_submit": 1
+            }
+        ]
+    }
+    create_custom_fields(custom_fields, update=True)
+
+    # Single-fine entries already carry the fine on their header; copy it to the debit line
+    frappe.db.sql("""
+        UPDATE `tabJournal Entry Account` jea
+        JOIN `tabJournal Entry` je ON je.name = jea.parent
+        SET jea.custom_shg_meeting_fine = je.custom_shg_meeting_fine
+        WHERE IFNULL(je.custom_shg_meeting_fine, '') != ''
+            AND jea.debit_in_account_currency > 0
+            AND IFNULL(jea.custom_shg_meeting_fine, '') = ''
+    """)
+    frappe.db.commit()
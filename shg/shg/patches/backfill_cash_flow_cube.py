@@ -0,0 +1,9 @@
+import frappe
+
+def execute():
+    """Build the monthly cash-flow cube from existing submitted transactions."""
+    frappe.reload_doc("shg", "doctype", "shg_cash_flow_month")
+
+    from shg.shg.utils.cash_flow_cube import rebuild_cube
+    rebuild_cube()
+    frappe.db.commit()
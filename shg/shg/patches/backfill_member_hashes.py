@@ -0,0 +1,9 @@
+import frappe
+
+def execute():
+    """Fill the ID and phone number hash columns of existing members."""
+    frappe.reload_doc("shg", "doctype", "shg_member")
+
+    from shg.utils.security import backfill_member_hashes
+    backfill_member_hashes()
+    frappe.db.commit()
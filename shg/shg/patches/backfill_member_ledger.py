@@ -0,0 +1,9 @@
+import frappe
+
+def execute():
+    """Build the member ledger from existing submitted transactions."""
+    frappe.reload_doc("shg", "doctype", "shg_member_ledger_entry")
+
+    from shg.shg.utils.member_ledger import rebuild_ledger
+    rebuild_ledger()
+    frappe.db.commit()
@@ -0,0 +1,20 @@
+import frappe
+
+def execute():
+    """Initialize the per-member unread notification counter from existing logs."""
+    frappe.reload_doc("shg", "doctype", "shg_notification_log")
+    frappe.reload_doc("shg", "doctype", "shg_notification_log_archive")
+    frappe.reload_doc("shg", "doctype", "shg_member")
+
+    # Logs written before read receipts existed are all unread
+    frappe.db.sql("""
+        UPDATE `tabSHG Member` m
+        LEFT JOIN (
+            SELECT member, COUNT(*) AS unread
+            FROM `tabSHG Notification Log`
+            WHERE is_read = 0
+            GROUP BY member
+        ) n ON n.member = m.name
+        SET m.unread_notification_count = IFNULL(n.unread, 0)
+    """)
+    frappe.db.commit()
@@ -1,8 +1,10 @@
 import frappe
 from frappe import _
 from frappe.utils import flt, getdate
+from shg.shg.utils.report_cache import cached_report
 
 
+@cached_report("Aging By Member", ["SHG Loan", "SHG Loan Repayment"])
 def execute(filters=None):
     columns = get_columns()
     data = get_data(filters)
@@ -2,13 +2,13 @@ import frappe
 from frappe import _
 from frappe.utils import getdate
 
+from shg.shg.utils.report_pager import execute_paged, iter_rows
+from shg.shg.utils.report_cache import cached_report
+
+@cached_report("Contribution Summary", ["SHG Contribution", "SHG Payment Entry"])
 def execute(filters=None):
-    if not filters:
-        filters = {}
-        
-    columns = get_columns()
-    data = get_data(filters)
-    return columns, data
+    filters = frappe._dict(filters or {})
+    return execute_paged(get_columns(), get_query(filters))
 
 def get_columns():
     return [
@@ -76,7 +76,8 @@ def get_columns():
         }
     ]
 
-def get_data(filters):
+def get_query(filters):
+    """Report query for :mod:`shg.shg.utils.report_pager`, newest first"""
     conditions = ""
     params = {}
     
@@ -90,40 +91,24 @@ def get_data(filters):
         conditions += " AND c.contribution_type_link = %(contribution_type)s"
         params["contribution_type"] = filters.get("contribution_type")
         
-    if conditions:
-        conditions = conditions.lstrip(" AND")
-        query = f"""
-            SELECT 
-                c.contribution_date as date,
-                c.member,
-                c.member_name,
-                c.contribution_type_link as contribution_type,
-                c.expected_amount,
-                c.amount_paid,
-                c.unpaid_amount,
-                c.status,
-                c.payment_method,
-                c.reference_number
-            FROM `tabSHG Contribution` c
-            WHERE c.docstatus = 1 AND {conditions}
-            ORDER BY c.contribution_date DESC
-        """
-    else:
-        query = """
-            SELECT 
-                c.contribution_date as date,
-                c.member,
-                c.member_name,
-                c.contribution_type_link as contribution_type,
-                c.expected_amount,
-                c.amount_paid,
-                c.unpaid_amount,
-                c.status,
-                c.payment_method,
-                c.reference_number
-            FROM `tabSHG Contribution` c
-            WHERE c.docstatus = 1
-            ORDER BY c.contribution_date DESC
-        """
+    query = f"""
+        SELECT 
+            c.contribution_date as date,
+            c.member,
+            c.member_name,
+            c.contribution_type_link as contribution_type,
+            c.expected_amount,
+            c.amount_paid,
+            c.unpaid_amount,
+            c.status,
+            c.payment_method,
+            c.reference_number,
+            c.name
+        FROM `tabSHG Contribution` c
+        WHERE c.docstatus = 1 {conditions}
+    """
     
-    return frappe.db.sql(query, params, as_dict=1)
\ No newline at end of file
+    return {"query": query, "values": params, "keys": ["date", "name"], "nullable_keys": ["date"]}
+
+def get_data(filters):
+    return list(iter_rows(get_query(frappe._dict(filters or {}))))
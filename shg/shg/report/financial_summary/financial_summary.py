@@ -1,7 +1,9 @@
-import frappe
 from frappe import _
-from frappe.utils import getdate, flt
+from frappe.utils import flt
+from shg.shg.utils.cash_flow_cube import get_monthly_flows
+from shg.shg.utils.report_cache import cached_report
 
+@cached_report("Financial Summary", ["SHG Contribution", "SHG Loan", "SHG Loan Repayment", "SHG Payment Entry"])
 def execute(filters=None):
     columns = get_columns()
     data = get_data(filters)
@@ -54,81 +56,29 @@ def get_columns():
     ]
 
 def get_data(filters):
-    # Get contributions summary
-    contributions = frappe.db.sql("""
-        SELECT 
-            MONTH(contribution_date) as month,
-            YEAR(contribution_date) as year,
-            SUM(amount) as total_contributions
-        FROM `tabSHG Contribution`
-        WHERE docstatus = 1
-        GROUP BY YEAR(contribution_date), MONTH(contribution_date)
-        ORDER BY year, month
-    """, as_dict=1)
-    
-    # Get loan disbursements summary
-    disbursements = frappe.db.sql("""
-        SELECT 
-            MONTH(disbursement_date) as month,
-            YEAR(disbursement_date) as year,
-            SUM(loan_amount) as total_loan_disbursements
-        FROM `tabSHG Loan`
-        WHERE docstatus = 1 AND status = 'Disbursed'
-        GROUP BY YEAR(disbursement_date), MONTH(disbursement_date)
-        ORDER BY year, month
-    """, as_dict=1)
-    
-    # Get loan repayments summary
-    repayments = frappe.db.sql("""
-        SELECT 
-            MONTH(repayment_date) as month,
-            YEAR(repayment_date) as year,
-            SUM(total_paid) as total_loan_repayments,
-            SUM(interest_amount) as total_interest_collected
-        FROM `tabSHG Loan Repayment`
-        WHERE docstatus = 1
-        GROUP BY YEAR(repayment_date), MONTH(repayment_date)
-        ORDER BY year, month
-    """, as_dict=1)
-    
-    # Combine data
-    result = []
-    months_data = {}
-    
-    # Process contributions
-    for item in contributions:
-        key = (item.year, item.month)
-        if key not in months_data:
-            months_data[key] = {}
-        months_data[key]['total_contributions'] = item.total_contributions
-    
-    # Process disbursements
-    for item in disbursements:
-        key = (item.year, item.month)
-        if key not in months_data:
-            months_data[key] = {}
-        months_data[key]['total_loan_disbursements'] = item.total_loan_disbursements
-    
-    # Process repayments
-    for item in repayments:
-        key = (item.year, item.month)
-        if key not in months_data:
-            months_data[key] = {}
-        months_data[key]['total_loan_repayments'] = item.total_loan_repayments
-        months_data[key]['total_interest_collected'] = item.total_interest_collected
-    
+    filters = filters or {}
+
+    # Read the monthly cash-flow cube instead of scanning the transaction tables
+    months_data = get_monthly_flows(
+        ["contribution", "loan_disbursement", "loan_repayment", "loan_interest"],
+        filters.get("from_date"),
+        filters.get("to_date"),
+        filters.get("company")
+    )
+
     # Create result data
-    for (year, month), values in months_data.items():
-        total_contributions = flt(values.get('total_contributions', 0))
-        total_disbursements = flt(values.get('total_loan_disbursements', 0))
-        total_repayments = flt(values.get('total_loan_repayments', 0))
-        total_interest = flt(values.get('total_interest_collected', 0))
+    result = []
+    for period, values in months_data.items():
+        total_contributions = flt(values.get('contribution', 0))
+        total_disbursements = flt(values.get('loan_disbursement', 0))
+        total_repayments = flt(values.get('loan_repayment', 0))
+        total_interest = flt(values.get('loan_interest', 0))
         
         net_cash_flow = total_contributions + total_repayments - total_disbursements
         
         result.append({
-            'month': get_month_name(month),
-            'year': year,
+            'month': get_month_name(period.month),
+            'year': period.year,
             'total_contributions': total_contributions,
             'total_loan_disbursements': total_disbursements,
             'total_loan_repayments': total_repayments,
@@ -136,7 +86,7 @@ def get_data(filters):
             'net_cash_flow': net_cash_flow
         })
     
-    return sorted(result, key=lambda x: (x['year'], get_month_number(x['month'])))
+    return result
 
 def get_month_name(month_num):
     months = ["", "January", "February", "March", "April", "May", "June",
@@ -1,7 +1,10 @@
 import frappe
 from frappe import _
-from frappe.utils import getdate
+from frappe.utils import getdate, flt
+from shg.shg.utils.cash_flow_cube import get_monthly_flows
+from shg.shg.utils.report_cache import cached_report
 
+@cached_report("Loan Disbursement vs Repayment", ["SHG Loan", "SHG Loan Repayment"])
 def execute(filters=None):
     columns = get_columns()
     data = get_data(filters)
@@ -42,6 +45,39 @@ def get_columns():
     ]
 
 def get_data(filters):
+    filters = filters or {}
+
+    # The cube has no member dimension; member statements keep the row-level queries
+    if filters.get("member"):
+        return get_member_data(filters)
+
+    months_data = get_monthly_flows(
+        ["loan_disbursement", "loan_repayment"],
+        filters.get("from_date"),
+        filters.get("to_date"),
+        filters.get("company")
+    )
+
+    result = []
+    cumulative_balance = 0
+
+    for period, values in months_data.items():
+        disbursed_amount = flt(values.get("loan_disbursement", 0))
+        repaid_amount = flt(values.get("loan_repayment", 0))
+        net_change = disbursed_amount - repaid_amount
+        cumulative_balance += net_change
+
+        result.append({
+            "month": period.strftime("%Y-%m"),
+            "disbursed_amount": disbursed_amount,
+            "repaid_amount": repaid_amount,
+            "net_change": net_change,
+            "cumulative_balance": cumulative_balance
+        })
+
+    return result
+
+def get_member_data(filters):
     conditions_loan = ""
     conditions_repayment = ""
     params = {}
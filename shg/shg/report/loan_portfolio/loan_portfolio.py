@@ -2,10 +2,13 @@ import frappe
 from frappe import _
 from frappe.utils import getdate, today
 
+from shg.shg.utils.report_pager import execute_paged, iter_rows
+from shg.shg.utils.report_cache import cached_report
+
+@cached_report("Loan Portfolio", ["SHG Loan", "SHG Loan Repayment"])
 def execute(filters=None):
-    columns = get_columns()
-    data = get_data(filters)
-    return columns, data
+    filters = frappe._dict(filters or {})
+    return execute_paged(get_columns(), get_query(filters))
 
 def get_columns():
     return [
@@ -103,7 +106,8 @@ def get_columns():
         }
     ]
 
-def get_data(filters):
+def get_query(filters):
+    """Report query for :mod:`shg.shg.utils.report_pager`, newest first"""
     conditions = ""
     params = {"today": getdate(today())}
     
@@ -148,7 +152,9 @@ def get_data(filters):
             l.next_due_date
         FROM `tabSHG Loan` l
         WHERE l.docstatus = 1 {conditions}
-        ORDER BY l.disbursement_date DESC
     """
     
-    return frappe.db.sql(query, params, as_dict=1)
\ No newline at end of file
+    return {"query": query, "values": params, "keys": ["disbursement_date", "loan_id"], "nullable_keys": ["disbursement_date"]}
+
+def get_data(filters):
+    return list(iter_rows(get_query(frappe._dict(filters or {}))))
\ No newline at end of file
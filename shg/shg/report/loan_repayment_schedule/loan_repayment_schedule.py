@@ -1,6 +1,8 @@
 import frappe
 from frappe import _
+from shg.shg.utils.report_cache import cached_report
 
+@cached_report("Loan Repayment Schedule", ["SHG Loan", "SHG Loan Repayment"])
 def execute(filters=None):
     columns = get_columns()
     data = get_data(filters)
@@ -1,6 +1,10 @@
 import frappe
 from frappe import _
+from frappe.utils import flt
+from shg.shg.utils.member_ledger import get_ledger_entries, get_opening_balance
+from shg.shg.utils.report_cache import cached_report
 
+@cached_report("Loan Statement", ["SHG Loan", "SHG Loan Repayment"])
 def execute(filters=None):
     if not filters:
         filters = {}
@@ -61,69 +65,33 @@ def get_data(filters):
         return []
     
     result = []
-    running_balance = 0
+    voucher_types = ["SHG Loan", "SHG Loan Repayment"]
     
-    # Get loan disbursements
-    loans = frappe.db.sql("""
-        SELECT 
-            COALESCE(disbursement_date, posting_date) as date,
-            name as loan_id,
-            loan_amount,
-            'Loan Disbursement' as description
-        FROM `tabSHG Loan`
-        WHERE member = %(member)s AND docstatus = 1 AND status = 'Disbursed'
-        ORDER BY date
-    """, filters, as_dict=1)
+    # Loan movements from the member ledger. The balance is amount owed:
+    # disbursements add the loan amount and repayments deduct the total paid
+    # (principal, interest and penalty), as this statement always has.
+    running_balance = -get_opening_balance(filters.get("member"), filters.get("from_date"), voucher_types=voucher_types)
+    entries = get_ledger_entries(
+        filters.get("member"),
+        filters.get("from_date"),
+        filters.get("to_date"),
+        voucher_types=voucher_types
+    )
     
-    # Get loan repayments
-    repayments = frappe.db.sql("""
-        SELECT 
-            repayment_date as date,
-            loan as loan_id,
-            principal_amount,
-            interest_amount,
-            penalty_amount,
-            total_paid,
-            'Loan Repayment' as description
-        FROM `tabSHG Loan Repayment`
-        WHERE member = %(member)s AND docstatus = 1
-        ORDER BY repayment_date
-    """, filters, as_dict=1)
+    for entry in entries:
+        is_disbursement = entry.voucher_type == "SHG Loan"
+        running_balance += flt(entry.debit) - flt(entry.credit)
+        result.append({
+            'date': entry.posting_date,
+            'description': entry.description,
+            'loan_amount': flt(entry.debit - entry.credit) if is_disbursement else 0,
+            'principal_paid': 0 if is_disbursement else entry.principal_amount,
+            'interest_paid': 0 if is_disbursement else entry.interest_amount,
+            'penalty_paid': 0 if is_disbursement else entry.penalty_amount,
+            'balance': flt(running_balance, 2)
+        })
     
-    # Combine and sort all transactions
-    all_transactions = []
-    all_transactions.extend(loans)
-    all_transactions.extend(repayments)
-    all_transactions.sort(key=lambda x: x['date'] or '')
-    
-    # Process transactions
-    for transaction in all_transactions:
-        if transaction.get('loan_amount'):
-            # Loan disbursement
-            running_balance += transaction.loan_amount
-            result.append({
-                'date': transaction.date,
-                'description': transaction.description + f" ({transaction.loan_id})",
-                'loan_amount': transaction.loan_amount,
-                'principal_paid': 0,
-                'interest_paid': 0,
-                'penalty_paid': 0,
-                'balance': running_balance
-            })
-        else:
-            # Loan repayment
-            running_balance -= transaction.total_paid
-            result.append({
-                'date': transaction.date,
-                'description': transaction.description + f" ({transaction.loan_id})",
-                'loan_amount': 0,
-                'principal_paid': transaction.principal_amount,
-                'interest_paid': transaction.interest_amount,
-                'penalty_paid': transaction.penalty_amount,
-                'balance': running_balance
-            })
-    
-    if not all_transactions:
+    if not entries:
         result.append({"description": _("No loan transactions found for this member.")})
     
-    return result
\ No newline at end of file
+    return result
@@ -2,11 +2,12 @@ import frappe
 from frappe import _
 from frappe.utils import flt, getdate
 
+from shg.shg.utils.report_pager import execute_paged, iter_rows
+
 
 def execute(filters=None):
-    columns = get_columns()
-    data = get_data(filters)
-    return columns, data
+    filters = frappe._dict(filters or {})
+    return execute_paged(get_columns(), get_query(filters))
 
 
 def get_columns():
@@ -70,7 +71,8 @@ def get_columns():
     ]
 
 
-def get_data(filters):
+def get_query(filters):
+    """Report query for :mod:`shg.shg.utils.report_pager`, newest first"""
     conditions = ""
     params = {}
     
@@ -104,12 +106,14 @@ def get_data(filters):
             COALESCE(t.interest, 0) as interest,
             COALESCE(t.penalty, 0) as penalty,
             COALESCE(t.amount, 0) as total_amount,
-            t.remarks
+            t.remarks,
+            t.name
         FROM `tabSHG Loan Transaction` t
         WHERE t.docstatus = 1 {conditions}
-        ORDER BY t.posting_date DESC, t.creation DESC
     """
     
-    data = frappe.db.sql(query, params, as_dict=1)
-    
-    return data
\ No newline at end of file
+    return {"query": query, "values": params, "keys": ["posting_date", "name"], "nullable_keys": ["posting_date"]}
+
+
+def get_data(filters):
+    return list(iter_rows(get_query(frappe._dict(filters or {}))))
\ No newline at end of file
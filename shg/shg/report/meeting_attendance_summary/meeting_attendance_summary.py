@@ -1,6 +1,8 @@
 import frappe
 from frappe import _
+from shg.shg.utils.report_cache import cached_report
 
+@cached_report("Meeting Attendance Summary", ["SHG Member Attendance"])
 def execute(filters=None):
     if not filters:
         filters = {}
@@ -1,7 +1,9 @@
 import frappe
 from frappe import _
 from frappe.utils import flt
+from shg.shg.utils.report_cache import cached_report
 
+@cached_report("Member Summary", ["SHG Contribution", "SHG Loan", "SHG Loan Repayment", "SHG Member", "SHG Payment Entry"])
 def execute(filters=None):
     if not filters:
         filters = {}
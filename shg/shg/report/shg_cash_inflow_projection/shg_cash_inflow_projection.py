@@ -0,0 +1,40 @@
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+from shg.shg.utils.cash_projection import AGING_BUCKETS, get_projection_chart, project_cash_inflows
+from shg.shg.utils.report_cache import cached_report
+
+@cached_report("SHG Cash Inflow Projection", ["SHG Loan", "SHG Loan Repayment"])
+def execute(filters=None):
+    filters = frappe._dict(filters or {})
+    period = filters.get("period") or "Monthly"
+
+    projection = project_cash_inflows(
+        period=period,
+        horizon_months=cint(filters.get("horizon_months")) or 12,
+        company=filters.get("company"),
+        apply_haircuts=cint(filters.get("apply_haircuts")),
+        lookback_months=cint(filters.get("lookback_months")) or 12,
+    )
+
+    message = None
+    if filters.get("apply_haircuts"):
+        message = _("Collection rates applied: {0}").format(", ".join(
+            f"{_(label)} {flt(rate * 100, 1)}%"
+            for (_key, label, _first_day), rate in zip(AGING_BUCKETS, projection["collection_rates"])
+        ))
+
+    chart = {"data": get_projection_chart(projection, period), "type": "bar"}
+    return get_columns(), projection["periods"], message, chart
+
+def get_columns():
+    return [
+        {"label": _("Period Start"), "fieldname": "period_start", "fieldtype": "Date", "width": 110},
+        {"label": _("Period End"), "fieldname": "period_end", "fieldtype": "Date", "width": 110},
+        {"label": _("Installments"), "fieldname": "installments", "fieldtype": "Int", "width": 100},
+        {"label": _("Scheduled"), "fieldname": "scheduled", "fieldtype": "Currency", "width": 140},
+        {"label": _("Of Which Overdue"), "fieldname": "overdue", "fieldtype": "Currency", "width": 140},
+        {"label": _("Principal"), "fieldname": "principal", "fieldtype": "Currency", "width": 140},
+        {"label": _("Interest"), "fieldname": "interest", "fieldtype": "Currency", "width": 140},
+        {"label": _("Expected"), "fieldname": "expected", "fieldtype": "Currency", "width": 140},
+    ]
@@ -0,0 +1,41 @@
+import frappe
+from frappe import _
+from datetime import datetime
+from frappe.utils import cint
+from shg.shg.utils.instrumentation import get_handler_stats, is_enabled
+
+def execute(filters=None):
+    filters = frappe._dict(filters or {})
+
+    columns = get_columns()
+    data = get_data(filters)
+
+    message = None
+    if not is_enabled():
+        message = _("Instrumentation is disabled. Enable it in SHG Settings to record new samples.")
+    return columns, data, message
+
+def get_columns():
+    return [
+        {"label": _("Handler"), "fieldname": "handler", "fieldtype": "Data", "width": 380},
+        {"label": _("Kind"), "fieldname": "kind", "fieldtype": "Data", "width": 70},
+        {"label": _("Calls"), "fieldname": "calls", "fieldtype": "Int", "width": 80},
+        {"label": _("p50 (ms)"), "fieldname": "p50_ms", "fieldtype": "Float", "precision": 1, "width": 100},
+        {"label": _("p95 (ms)"), "fieldname": "p95_ms", "fieldtype": "Float", "precision": 1, "width": 100},
+        {"label": _("Max (ms)"), "fieldname": "max_ms", "fieldtype": "Float", "precision": 1, "width": 100},
+        {"label": _("Avg Queries"), "fieldname": "avg_queries", "fieldtype": "Float", "precision": 1, "width": 100},
+        {"label": _("Avg Query Time (ms)"), "fieldname": "avg_query_ms", "fieldtype": "Float", "precision": 1, "width": 140},
+        {"label": _("Avg Rows"), "fieldname": "avg_rows", "fieldtype": "Float", "precision": 1, "width": 100},
+        {"label": _("Errors"), "fieldname": "errors", "fieldtype": "Int", "width": 70},
+        {"label": _("Last Seen"), "fieldname": "last_seen", "fieldtype": "Datetime", "width": 160},
+    ]
+
+def get_data(filters):
+    """Handler summaries over their most recent samples, slowest p95 first"""
+    data = []
+    for row in get_handler_stats(filters.get("kind") or None):
+        if row["calls"] < cint(filters.get("min_calls")):
+            continue
+        row["last_seen"] = datetime.fromtimestamp(row["last_seen"])
+        data.append(row)
+    return data
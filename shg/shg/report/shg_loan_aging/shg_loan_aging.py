@@ -4,7 +4,9 @@
 import frappe
 from frappe import _
 from frappe.utils import getdate, today
+from shg.shg.utils.report_cache import cached_report
 
+@cached_report("SHG Loan Aging", ["SHG Loan", "SHG Loan Repayment"])
 def execute(filters=None):
     columns = get_columns()
     data = get_data(filters)
@@ -3,7 +3,9 @@
 
 import frappe
 from frappe import _
+from shg.shg.utils.report_cache import cached_report
 
+@cached_report("SHG Loan Statement", ["SHG Loan", "SHG Loan Repayment"])
 def execute(filters=None):
     columns = get_columns()
     data = get_data(filters)
@@ -4,10 +4,13 @@
 import frappe
 from frappe import _
 
+from shg.shg.utils.report_pager import execute_paged, iter_rows
+from shg.shg.utils.report_cache import cached_report
+
+@cached_report("SHG Repayments Register", ["SHG Loan Repayment"])
 def execute(filters=None):
-    columns = get_columns()
-    data = get_data(filters)
-    return columns, data
+    filters = frappe._dict(filters or {})
+    return execute_paged(get_columns(), get_query(filters))
 
 def get_columns():
     return [
@@ -57,7 +60,8 @@ def get_columns():
         }
     ]
 
-def get_data(filters):
+def get_query(filters):
+    """Report query for :mod:`shg.shg.utils.report_pager`, newest first"""
     conditions = ""
     if filters.get("from_date"):
         conditions += " AND r.posting_date >= %(from_date)s"
@@ -70,7 +74,7 @@ def get_data(filters):
     if filters.get("payment_method"):
         conditions += " AND r.payment_method = %(payment_method)s"
         
-    data = frappe.db.sql("""
+    query = """
         SELECT 
             r.posting_date,
             r.name,
@@ -81,7 +85,9 @@ def get_data(filters):
             r.reference_number
         FROM `tabSHG Loan Repayment` r
         WHERE r.docstatus = 1 {conditions}
-        ORDER BY r.posting_date DESC
-    """.format(conditions=conditions), filters, as_dict=1)
+    """.format(conditions=conditions)
     
-    return data
\ No newline at end of file
+    return {"query": query, "values": filters, "keys": ["posting_date", "name"], "nullable_keys": ["posting_date"]}
+
+def get_data(filters):
+    return list(iter_rows(get_query(frappe._dict(filters or {}))))
\ No newline at end of file
@@ -4,7 +4,9 @@
 import frappe
 from frappe import _
 from frappe.utils import getdate, fmt_money
+from shg.shg.utils.report_cache import cached_report
 
+@cached_report("Yearly Attendance Report", ["SHG Member", "SHG Member Attendance"])
 def execute(filters=None):
     columns = get_columns()
     data = get_data(filters)
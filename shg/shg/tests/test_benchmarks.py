@@ -0,0 +1,57 @@
+import frappe
+import unittest
+from shg.shg.benchmarks.data_generator import generate_dataset, purge_dataset
+from shg.shg.benchmarks.suite import compare_results, count_queries, run_suite
+
+class TestBenchmarks(unittest.TestCase):
+    """Test cases for the synthetic data generator and benchmark suite."""
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        purge_dataset()
+
+    def test_generator_is_seeded(self):
+        """Equal seeds produce the same dataset with schedules for every loan."""
+        first = generate_dataset(members=20, seed=7)
+        second = generate_dataset(members=20, seed=7)
+        self.assertEqual(first, second)
+        self.assertEqual(first["SHG Member"], 20)
+
+        loans_without_schedule = frappe.db.sql("""
+            SELECT COUNT(*) FROM `tabSHG Loan` l
+            WHERE l.name LIKE 'BENCH-%%'
+            AND NOT EXISTS (SELECT 1 FROM `tabSHG Loan Repayment Schedule` s WHERE s.parent = l.name)
+        """)[0][0]
+        self.assertEqual(loans_without_schedule, 0)
+
+    def test_suite_records_timings_and_queries(self):
+        """Each case reports a median time and a query count."""
+        generate_dataset(members=20)
+        results = run_suite(repeat=1, cases=["reminder_planning", "report.loan_portfolio"])
+
+        for case in ("reminder_planning", "report.loan_portfolio"):
+            self.assertIn("median_seconds", results["cases"][case])
+            self.assertGreater(results["cases"][case]["queries"], 0)
+
+    def test_count_queries(self):
+        """The query counter sees every round trip and restores frappe.db.sql."""
+        original = frappe.db.sql
+        with count_queries() as counter:
+            frappe.db.sql("SELECT 1")
+            frappe.db.sql("SELECT 2")
+        self.assertEqual(counter["queries"], 2)
+        self.assertEqual(frappe.db.sql, original)
+
+    def test_compare_results(self):
+        """Slower or chattier cases are reported against the baseline."""
+        baseline = {"cases": {
+            "a": {"median_seconds": 1.0, "queries": 10},
+            "b": {"median_seconds": 1.0, "queries": 10},
+            "c": {"median_seconds": 1.0, "queries": 10},
+        }}
+        results = {"cases": {
+            "a": {"median_seconds": 1.1, "queries": 10},
+            "b": {"median_seconds": 1.5, "queries": 10},
+            "c": {"median_seconds": 0.9, "queries": 40},
+        }}
+        self.assertEqual([r["case"] for r in compare_results(results, baseline)], ["b", "c"])
@@ -0,0 +1,191 @@
+import frappe
+import unittest
+from shg.shg.doctype.shg_payment.shg_payment import (
+    apply_contribution_payments,
+    apply_invoice_payments,
+    get_bulk_payment_documents,
+    post_fine_payments,
+    shg_receive_bulk_payment,
+)
+from shg.shg.utils.bulk_utils import bulk_insert_rows
+from shg.shg.utils.company_utils import get_default_company
+from shg.shg.utils.payment import get_unpaid_invoices_for_member
+
+TEST_MEMBER = "_T-BP-Member"
+
+class TestBulkPayment(unittest.TestCase):
+    """Test cases for the batched bulk payment updates."""
+
+    def setUp(self):
+        """Create a member with two invoices, each billing one contribution."""
+        bulk_insert_rows("SHG Member", [{"name": TEST_MEMBER, "member_name": "Bulk Payment Member"}])
+        bulk_insert_rows("SHG Contribution", [{
+            "name": f"_T-BP-C{i}",
+            "member": TEST_MEMBER,
+            "contribution_date": f"2026-0{i}-01",
+            "amount": 500,
+            "expected_amount": 500,
+            "amount_paid": 0,
+            "unpaid_amount": 500,
+            "status": "Unpaid",
+            "invoice_reference": f"_T-BP-I{i}",
+            "docstatus": 1,
+        } for i in (1, 2)])
+        bulk_insert_rows("SHG Contribution Invoice", [{
+            "name": f"_T-BP-I{i}",
+            "member": TEST_MEMBER,
+            "invoice_date": f"2026-0{i}-01",
+            "amount": 500,
+            "status": "Unpaid",
+            "docstatus": 1,
+        } for i in (1, 2)])
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        frappe.db.sql("DELETE FROM `tabSHG Contribution Invoice` WHERE member = %s", TEST_MEMBER)
+        frappe.db.sql("DELETE FROM `tabSHG Contribution` WHERE member = %s", TEST_MEMBER)
+        frappe.db.sql("DELETE FROM `tabSHG Member` WHERE name = %s", TEST_MEMBER)
+        frappe.db.commit()
+
+    def test_documents_are_fetched_together(self):
+        """Referenced documents come back keyed by doctype and name; unknown ones are absent."""
+        found = get_bulk_payment_documents([
+            {"doctype": "SHG Contribution Invoice", "name": "_T-BP-I1"},
+            {"doctype": "SHG Contribution", "name": "_T-BP-C2"},
+            {"doctype": "SHG Contribution", "name": "_T-BP-Missing"},
+        ])
+        self.assertEqual(set(found), {("SHG Contribution Invoice", "_T-BP-I1"), ("SHG Contribution", "_T-BP-C2")})
+        self.assertEqual(found[("SHG Contribution Invoice", "_T-BP-I1")].amount, 500)
+
+    def test_invoice_payments_close_paid_invoices(self):
+        """A fully paid invoice marks its contribution paid; a partial payment does not."""
+        found = get_bulk_payment_documents([
+            {"doctype": "SHG Contribution Invoice", "name": "_T-BP-I1"},
+            {"doctype": "SHG Contribution Invoice", "name": "_T-BP-I2"},
+        ])
+        statuses = apply_invoice_payments([
+            (found[("SHG Contribution Invoice", "_T-BP-I1")], 500),
+            (found[("SHG Contribution Invoice", "_T-BP-I2")], 200),
+        ])
+        self.assertEqual(statuses, {"_T-BP-I1": "Paid", "_T-BP-I2": "Partially Paid"})
+        self.assertEqual(frappe.db.get_value("SHG Contribution", "_T-BP-C1", "status"), "Paid")
+        self.assertEqual(frappe.db.get_value("SHG Contribution", "_T-BP-C2", "status"), "Unpaid")
+
+    def test_contribution_payments_sync_invoice_status(self):
+        """Contribution amounts are updated and the billing invoice follows its status."""
+        found = get_bulk_payment_documents([{"doctype": "SHG Contribution", "name": "_T-BP-C1"}])
+        apply_contribution_payments([(found[("SHG Contribution", "_T-BP-C1")], 300)])
+        contribution = frappe.db.get_value("SHG Contribution", "_T-BP-C1", ["amount_paid", "unpaid_amount", "status"], as_dict=True)
+        self.assertEqual((contribution.amount_paid, contribution.unpaid_amount, contribution.status), (300, 200, "Partially Paid"))
+        self.assertEqual(frappe.db.get_value("SHG Contribution Invoice", "_T-BP-I1", "status"), "Partially Paid")
+
+    def test_unpaid_invoices_use_one_query(self):
+        """Standalone invoices are outstanding for their full amount."""
+        invoices = get_unpaid_invoices_for_member(TEST_MEMBER)
+        self.assertEqual(sorted((inv.name, inv.outstanding_amount) for inv in invoices),
+                         [("_T-BP-I1", 500), ("_T-BP-I2", 500)])
+
+
+class TestBulkPaymentPosting(unittest.TestCase):
+    """Test cases for the Payment Entry and Journal Entry of a bulk payment."""
+
+    def setUp(self):
+        """Create a member with a linked customer, two unposted fines and an invoice."""
+        member = frappe.get_doc({
+            "doctype": "SHG Member",
+            "member_name": "_Test Bulk Posting Member",
+            "id_number": "87650050",
+            "phone_number": "0712000050",
+            "membership_date": "2026-01-01",
+            "membership_status": "Active",
+            "company": get_default_company(),
+        })
+        member.insert(ignore_permissions=True)
+        self.member = member.name
+        self.customer = frappe.db.get_value("SHG Member", member.name, "customer")
+
+        bulk_insert_rows("SHG Meeting Fine", [{
+            "name": f"_T-BP-F{i}",
+            "member": self.member,
+            "fine_date": "2026-10-01",
+            "fine_reason": "Late Arrival",
+            "fine_amount": 50 * i,
+            "status": "Pending",
+            "posted_to_gl": 0,
+            "docstatus": 1,
+        } for i in (1, 2)])
+        bulk_insert_rows("SHG Contribution Invoice", [{
+            "name": "_T-BP-I3",
+            "member": self.member,
+            "invoice_date": "2026-10-01",
+            "amount": 500,
+            "status": "Unpaid",
+            "docstatus": 1,
+        }])
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        vouchers = {
+            ("Journal Entry", "Journal Entry Account"): frappe.db.sql_list(
+                "SELECT DISTINCT parent FROM `tabJournal Entry Account` WHERE custom_shg_meeting_fine IN ('_T-BP-F1', '_T-BP-F2')"),
+            ("Payment Entry", "Payment Entry Reference"): frappe.db.sql_list(
+                "SELECT name FROM `tabPayment Entry` WHERE party = %s", self.member),
+        }
+        for (doctype, child_doctype), names in vouchers.items():
+            if names:
+                frappe.db.sql("DELETE FROM `tabGL Entry` WHERE voucher_no IN %(names)s", {"names": tuple(names)})
+                frappe.db.sql(f"DELETE FROM `tab{child_doctype}` WHERE parent IN %(names)s", {"names": tuple(names)})
+                frappe.db.sql(f"DELETE FROM `tab{doctype}` WHERE name IN %(names)s", {"names": tuple(names)})
+        frappe.db.sql("DELETE FROM `tabSHG Meeting Fine` WHERE member = %s", self.member)
+        frappe.db.sql("DELETE FROM `tabSHG Contribution Invoice` WHERE member = %s", self.member)
+        frappe.db.sql("DELETE FROM `tabSHG Member` WHERE name = %s", self.member)
+        frappe.db.sql("DELETE FROM `tabCustomer` WHERE name = %s", self.customer)
+        frappe.db.commit()
+
+    def test_fines_share_one_journal_entry(self):
+        """Unposted fines get one entry with a debit line per fine linking back to it."""
+        found = get_bulk_payment_documents([{"doctype": "SHG Meeting Fine", "name": f"_T-BP-F{i}"} for i in (1, 2)])
+        post_fine_payments(list(found.values()), "2026-10-19")
+
+        fines = frappe.get_all("SHG Meeting Fine", filters={"member": self.member},
+                               fields=["name", "status", "journal_entry", "posted_to_gl"], order_by="name")
+        self.assertEqual([(fine.status, fine.posted_to_gl) for fine in fines], [("Paid", 1), ("Paid", 1)])
+        self.assertTrue(fines[0].journal_entry)
+        self.assertEqual(fines[0].journal_entry, fines[1].journal_entry)
+
+        lines = frappe.get_all("Journal Entry Account", filters={"parent": fines[0].journal_entry},
+                               fields=["custom_shg_meeting_fine", "party", "debit_in_account_currency", "credit_in_account_currency"])
+        self.assertEqual(sorted((line.custom_shg_meeting_fine, line.party, line.debit_in_account_currency)
+                                for line in lines if line.debit_in_account_currency),
+                         [("_T-BP-F1", self.customer, 50), ("_T-BP-F2", self.customer, 100)])
+        self.assertEqual([line.credit_in_account_currency for line in lines if line.credit_in_account_currency], [150])
+
+    def test_shared_journal_entry_cannot_be_cancelled(self):
+        """An entry posting several fines is only reversed through the fines themselves."""
+        found = get_bulk_payment_documents([{"doctype": "SHG Meeting Fine", "name": f"_T-BP-F{i}"} for i in (1, 2)])
+        post_fine_payments(list(found.values()), "2026-10-19")
+        je = frappe.get_doc("Journal Entry", frappe.db.get_value("SHG Meeting Fine", "_T-BP-F1", "journal_entry"))
+        self.assertRaises(frappe.ValidationError, je.cancel)
+
+    def test_bulk_payment_end_to_end(self):
+        """One Payment Entry carries every allocation and each document is updated once."""
+        result = shg_receive_bulk_payment(self.member, frappe.as_json([
+            {"doctype": "SHG Contribution Invoice", "name": "_T-BP-I3", "amount": 300},
+            {"doctype": "SHG Contribution Invoice", "name": "_T-BP-I3", "amount": 200},
+            {"doctype": "SHG Meeting Fine", "name": "_T-BP-F1", "amount": 50},
+        ]), 550, "Cash", posting_date="2026-10-19")
+
+        pe = frappe.get_doc("Payment Entry", result["payment_entry"])
+        self.assertEqual((pe.docstatus, pe.paid_amount), (1, 550))
+        self.assertEqual(sorted((ref.reference_name, ref.allocated_amount) for ref in pe.references),
+                         [("_T-BP-F1", 50), ("_T-BP-I3", 200), ("_T-BP-I3", 300)])
+
+        # The two invoice allocations add up to its full amount
+        self.assertEqual(result["updated_documents"], [
+            {"doctype": "SHG Contribution Invoice", "name": "_T-BP-I3", "new_status": "Paid"},
+            {"doctype": "SHG Meeting Fine", "name": "_T-BP-F1", "new_status": "Paid"},
+        ])
+        self.assertEqual(frappe.db.get_value("SHG Contribution Invoice", "_T-BP-I3", "status"), "Paid")
+        fine = frappe.db.get_value("SHG Meeting Fine", "_T-BP-F1", ["status", "posted_to_gl", "journal_entry"], as_dict=True)
+        self.assertEqual((fine.status, fine.posted_to_gl), ("Paid", 1))
+        self.assertTrue(fine.journal_entry)
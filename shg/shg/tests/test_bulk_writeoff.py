@@ -0,0 +1,145 @@
+import frappe
+import unittest
+from frappe.utils import add_days, today
+from shg.shg.loan_services.writeoff import preview_bulk_writeoff, run_bulk_writeoff
+from shg.shg.utils.bulk_utils import bulk_insert_rows
+from shg.shg.utils.company_utils import get_default_company
+
+TEST_MEMBER = "_T-WO-MEMBER"
+TEST_CUSTOMER = "_T-WO Customer"
+TEST_ACCOUNT_NAME = "_T-WO Loan Write Off"
+
+class TestBulkWriteoff(unittest.TestCase):
+    """Test cases for the bulk loan write-off dry run and run."""
+
+    def setUp(self):
+        """Create two long-overdue loans, one recent and one written off, and a write-off account."""
+        self.company = get_default_company()
+        abbr = frappe.db.get_value("Company", self.company, "abbr")
+
+        self.write_off_account = f"{TEST_ACCOUNT_NAME} - {abbr}"
+        if not frappe.db.exists("Account", self.write_off_account):
+            frappe.get_doc({
+                "doctype": "Account",
+                "account_name": TEST_ACCOUNT_NAME,
+                "parent_account": frappe.db.get_value("Account",
+                    {"company": self.company, "root_type": "Expense", "is_group": 1}, "name"),
+                "company": self.company,
+                "root_type": "Expense",
+                "report_type": "Profit and Loss",
+                "is_group": 0,
+            }).insert(ignore_permissions=True)
+        self.previous_account = frappe.db.get_single_value("SHG Settings", "default_write_off_account")
+        frappe.db.set_single_value("SHG Settings", "default_write_off_account", self.write_off_account)
+
+        if not frappe.db.exists("Customer", TEST_CUSTOMER):
+            frappe.get_doc({
+                "doctype": "Customer",
+                "customer_name": TEST_CUSTOMER,
+                "customer_type": "Individual",
+                "customer_group": "SHG Members",
+                "territory": "Kenya",
+            }).insert(ignore_permissions=True)
+        bulk_insert_rows("SHG Member", [{"name": TEST_MEMBER, "member_name": TEST_MEMBER, "customer": TEST_CUSTOMER}])
+
+        rows = []
+        for name, overdue_days, balance, status in [
+            ("_T-WO-1", 200, 1500, "Disbursed"),
+            ("_T-WO-2", 120, 2500.5, "Defaulted"),
+            ("_T-WO-3", 10, 900, "Disbursed"),
+            ("_T-WO-4", 300, 700, "Written Off"),
+        ]:
+            rows.append({
+                "name": name,
+                "member": TEST_MEMBER,
+                "member_name": TEST_MEMBER,
+                "company": self.company,
+                "loan_amount": 5000,
+                "loan_balance": balance,
+                "next_due_date": add_days(today(), -overdue_days),
+                "status": status,
+                "docstatus": 1,
+            })
+        bulk_insert_rows("SHG Loan", rows)
+
+        # _T-WO-1 owes 1,200 principal and 200 interest on its schedule; the other 100 is penalty
+        bulk_insert_rows("SHG Loan Repayment Schedule", [{
+            "name": f"_T-WO-1-{idx}",
+            "parent": "_T-WO-1",
+            "parenttype": "SHG Loan",
+            "parentfield": "repayment_schedule",
+            "idx": idx,
+            "installment_no": idx,
+            "principal_component": 600,
+            "interest_component": 100,
+            "total_payment": 700,
+            "amount_paid": 0,
+            "unpaid_balance": 700,
+            "status": "Pending",
+            "docstatus": 1,
+        } for idx in (1, 2)])
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        journal_entries = frappe.db.sql_list(
+            "SELECT DISTINCT journal_entry FROM `tabSHG Loan Transaction` WHERE loan LIKE '_T-WO-%%'")
+        if journal_entries:
+            frappe.db.sql("DELETE FROM `tabGL Entry` WHERE voucher_no IN %(names)s", {"names": tuple(journal_entries)})
+            frappe.db.sql("DELETE FROM `tabJournal Entry Account` WHERE parent IN %(names)s", {"names": tuple(journal_entries)})
+            frappe.db.sql("DELETE FROM `tabJournal Entry` WHERE name IN %(names)s", {"names": tuple(journal_entries)})
+        frappe.db.sql("DELETE FROM `tabSHG Loan Transaction` WHERE loan LIKE '_T-WO-%%'")
+        frappe.db.sql("DELETE FROM `tabSHG Loan Repayment Schedule` WHERE parent LIKE '_T-WO-%%'")
+        frappe.db.sql("DELETE FROM `tabSHG Loan` WHERE name LIKE '_T-WO-%%'")
+        frappe.db.sql("DELETE FROM `tabSHG Member` WHERE name = %s", TEST_MEMBER)
+        frappe.db.set_single_value("SHG Settings", "default_write_off_account", self.previous_account)
+        frappe.db.commit()
+
+    def test_preview_lists_candidates_with_totals(self):
+        """Only open loans past the overdue threshold are previewed, with totals from the same query."""
+        preview = preview_bulk_writeoff({"member": TEST_MEMBER})
+        self.assertEqual([row["loan"] for row in preview["loans"]], ["_T-WO-1", "_T-WO-2"])
+        self.assertEqual(preview["totals"], {"loans": 2, "outstanding": 4000.5})
+
+    def test_preview_does_not_write(self):
+        """The dry run leaves loan statuses unchanged."""
+        preview_bulk_writeoff({"member": TEST_MEMBER, "min_overdue_days": 5})
+        self.assertEqual(frappe.db.get_value("SHG Loan", "_T-WO-3", "status"), "Disbursed")
+
+    def test_run_aborts_when_total_changed(self):
+        """A run confirmed against a stale preview total is rejected."""
+        with self.assertRaises(frappe.ValidationError):
+            run_bulk_writeoff({"member": TEST_MEMBER}, expected_total=1)
+        self.assertEqual(frappe.db.get_value("SHG Loan", "_T-WO-1", "status"), "Disbursed")
+
+    def test_run_posts_voucher_and_updates_loans(self):
+        """A run posts one voucher, closes the loans and logs each write-off with its split."""
+        result = run_bulk_writeoff({"member": TEST_MEMBER}, expected_total=4000.5)
+        self.assertEqual((result["loans"], result["total"]), (2, 4000.5))
+        self.assertEqual(len(result["journal_entries"]), 1)
+        je_name = result["journal_entries"][0]
+
+        lines = frappe.get_all("Journal Entry Account", filters={"parent": je_name},
+                               fields=["account", "party", "debit_in_account_currency", "credit_in_account_currency"])
+        self.assertEqual([(line.account, line.debit_in_account_currency) for line in lines if line.debit_in_account_currency],
+                         [(self.write_off_account, 4000.5)])
+        self.assertEqual(sorted((line.party, line.credit_in_account_currency) for line in lines if line.credit_in_account_currency),
+                         [(TEST_CUSTOMER, 1500), (TEST_CUSTOMER, 2500.5)])
+
+        loans = frappe.get_all("SHG Loan", filters={"name": ["in", ["_T-WO-1", "_T-WO-2", "_T-WO-3"]]},
+                               fields=["name", "status", "loan_balance", "write_off_amount", "write_off_journal_entry"],
+                               order_by="name")
+        self.assertEqual([(loan.status, loan.loan_balance, loan.write_off_journal_entry) for loan in loans], [
+            ("Written Off", 0, je_name),
+            ("Written Off", 0, je_name),
+            ("Disbursed", 900, None),
+        ])
+        self.assertEqual([loan.write_off_amount for loan in loans[:2]], [1500, 2500.5])
+
+        logs = frappe.get_all("SHG Loan Transaction", filters={"loan": ["like", "_T-WO-%"]},
+                              fields=["loan", "transaction_type", "amount", "principal", "interest", "penalty", "journal_entry"],
+                              order_by="loan")
+        self.assertEqual([(log.loan, log.transaction_type, log.amount, log.principal, log.interest, log.penalty, log.journal_entry)
+                          for log in logs], [
+            ("_T-WO-1", "Write-off", 1500, 1200, 200, 100, je_name),
+            ("_T-WO-2", "Write-off", 2500.5, 2500.5, 0, 0, je_name),
+        ])
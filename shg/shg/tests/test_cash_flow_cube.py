@@ -0,0 +1,43 @@
+import frappe
+import unittest
+from frappe.utils import getdate
+from shg.shg.utils.cash_flow_cube import apply_flow_delta, get_flow_series, get_monthly_flows, month_start
+
+TEST_COMPANY = "_Test Cube Company"
+
+class TestCashFlowCube(unittest.TestCase):
+    """Test cases for the monthly cash-flow cube."""
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        frappe.db.sql("DELETE FROM `tabSHG Cash Flow Month` WHERE company = %s", TEST_COMPANY)
+        frappe.db.commit()
+
+    def test_month_start(self):
+        """Any day maps to the first of its month."""
+        self.assertEqual(month_start("2026-02-17"), getdate("2026-02-01"))
+
+    def test_deltas_upsert_one_cell(self):
+        """Submit and cancel deltas accumulate in the same company-month-flow cell."""
+        apply_flow_delta(TEST_COMPANY, "2026-02-03", "contribution", 500)
+        apply_flow_delta(TEST_COMPANY, "2026-02-20", "contribution", 300)
+        apply_flow_delta(TEST_COMPANY, "2026-02-21", "contribution", -300, -1)
+
+        amount, count = frappe.db.get_value(
+            "SHG Cash Flow Month", f"{TEST_COMPANY}|2026-02-01|contribution", ["amount", "count"]
+        )
+        self.assertEqual(amount, 500)
+        self.assertEqual(count, 1)
+
+    def test_reads(self):
+        """Monthly reads group by flow type and charts fill empty months."""
+        apply_flow_delta(TEST_COMPANY, "2026-01-10", "loan_disbursement", 1000)
+        apply_flow_delta(TEST_COMPANY, "2026-03-10", "loan_repayment", 250)
+
+        months = get_monthly_flows(["loan_disbursement", "loan_repayment"], "2026-01-01", "2026-03-31", TEST_COMPANY)
+        self.assertEqual(months[getdate("2026-01-01")], {"loan_disbursement": 1000})
+        self.assertEqual(months[getdate("2026-03-01")], {"loan_repayment": 250})
+
+        series = get_flow_series("loan_repayment", "2026-01-01", "2026-03-31", TEST_COMPANY)
+        self.assertEqual(series["labels"], ["2026-01", "2026-02", "2026-03"])
+        self.assertEqual(series["values"], [0, 0, 250])
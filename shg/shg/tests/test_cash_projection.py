@@ -0,0 +1,88 @@
+import frappe
+import unittest
+from frappe.utils import getdate
+from shg.shg.utils.bulk_utils import bulk_insert_rows
+from shg.shg.utils.cash_projection import get_collection_rates, get_period_starts, project_cash_inflows
+
+TEST_LOAN = "_T-CP-Loan"
+TEST_COMPANY = "_T-CP-Company"
+AS_OF = "2026-03-15"
+
+class TestCashProjection(unittest.TestCase):
+    """Test cases for the portfolio cash-inflow projection."""
+
+    def setUp(self):
+        """Create an open loan with paid history, overdue, upcoming and out-of-horizon installments."""
+        bulk_insert_rows("SHG Loan", [{
+            "name": TEST_LOAN,
+            "company": TEST_COMPANY,
+            "loan_amount": 5000,
+            "status": "Disbursed",
+            "docstatus": 1,
+        }])
+        rows = []
+        for idx, (due, paid, paid_on) in enumerate([
+            ("2025-06-01", 1000, "2025-06-01"),
+            ("2025-07-01", 500, "2025-07-20"),
+            ("2026-03-05", 600, "2026-03-05"),
+            ("2026-03-20", 0, None),
+            ("2026-04-20", 0, None),
+            ("2027-04-01", 0, None),
+        ], start=1):
+            rows.append({
+                "name": f"{TEST_LOAN}-{idx}",
+                "parent": TEST_LOAN,
+                "parenttype": "SHG Loan",
+                "parentfield": "repayment_schedule",
+                "idx": idx,
+                "installment_no": idx,
+                "due_date": due,
+                "principal_component": 800,
+                "interest_component": 200,
+                "total_payment": 1000,
+                "amount_paid": paid,
+                "unpaid_balance": 1000 - paid,
+                "actual_payment_date": paid_on,
+                "docstatus": 1,
+            })
+        bulk_insert_rows("SHG Loan Repayment Schedule", rows)
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        frappe.db.sql("DELETE FROM `tabSHG Loan Repayment Schedule` WHERE parent = %s", TEST_LOAN)
+        frappe.db.sql("DELETE FROM `tabSHG Loan` WHERE name = %s", TEST_LOAN)
+        frappe.db.commit()
+
+    def test_period_starts(self):
+        """Weekly periods start on Monday, monthly periods on the first."""
+        starts, end = get_period_starts("Monthly", AS_OF, 12)
+        self.assertEqual(len(starts), 13)
+        self.assertEqual(starts[0], getdate("2026-03-01"))
+        self.assertEqual(end, getdate("2027-03-15"))
+        weekly, _end = get_period_starts("Weekly", AS_OF, 1)
+        self.assertEqual(weekly[0], getdate("2026-03-09"))
+
+    def test_projection_bins_unpaid_rows(self):
+        """Overdue amounts land in the first period and rows past the horizon are left out."""
+        periods = project_cash_inflows(company=TEST_COMPANY, as_of=AS_OF)["periods"]
+        self.assertEqual(periods[0]["scheduled"], 1900)
+        self.assertEqual(periods[0]["overdue"], 900)
+        self.assertEqual(periods[0]["principal"], 1520)
+        self.assertEqual(periods[0]["installments"], 3)
+        self.assertEqual(periods[1]["scheduled"], 1000)
+        self.assertEqual(sum(row["scheduled"] for row in periods), 2900)
+        self.assertEqual(periods[0]["expected"], periods[0]["scheduled"])
+
+    def test_collection_rates(self):
+        """Rates are the share collected of what was still unpaid on entering each bucket."""
+        rates = get_collection_rates(12, TEST_COMPANY, AS_OF)
+        self.assertAlmostEqual(rates[0], 0.75)
+        self.assertAlmostEqual(rates[1], 0.5)
+        self.assertAlmostEqual(rates[4], 0.0)
+
+    def test_haircuts_apply_per_aging_bucket(self):
+        """Expected inflow discounts each amount by the rate of its aging bucket."""
+        periods = project_cash_inflows(company=TEST_COMPANY, apply_haircuts=True, as_of=AS_OF)["periods"]
+        # 400 at 1-30 days (50%) + 1000 current (75%) + 500 at 90+ days (0%)
+        self.assertEqual(periods[0]["expected"], 950)
+        self.assertEqual(periods[1]["expected"], 750)
@@ -0,0 +1,67 @@
+import frappe
+import unittest
+from shg.shg.utils.bulk_utils import bulk_insert_rows
+from shg.shg.utils.contribution_import import insert_contributions, validate_rows
+
+TEST_MEMBER = "_T-CI-Member"
+TEST_TYPE = "_T-CI-Type"
+
+def _row(row_no, **values):
+    row = {"row_no": row_no, "member": TEST_MEMBER, "contribution_date": "2026-02-07",
+           "amount": "100", "contribution_type": TEST_TYPE}
+    row.update(values)
+    return row
+
+class TestContributionImport(unittest.TestCase):
+    """Test cases for the bulk contribution CSV import."""
+
+    def setUp(self):
+        """Create a member, a contribution type and one existing contribution."""
+        bulk_insert_rows("SHG Member", [{"name": TEST_MEMBER, "member_name": "Import Member"}])
+        bulk_insert_rows("SHG Contribution Type", [{"name": TEST_TYPE, "contribution_type_name": TEST_TYPE}])
+        bulk_insert_rows("SHG Contribution", [{
+            "name": "_T-CI-EXISTING",
+            "member": TEST_MEMBER,
+            "contribution_date": "2026-01-31",
+            "amount": 100,
+            "docstatus": 1,
+        }])
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        frappe.db.sql("DELETE FROM `tabSHG Contribution` WHERE member = %s", TEST_MEMBER)
+        frappe.db.sql("DELETE FROM `tabSHG Contribution Type` WHERE name = %s", TEST_TYPE)
+        frappe.db.sql("DELETE FROM `tabSHG Member` WHERE name = %s", TEST_MEMBER)
+        frappe.db.commit()
+
+    def test_rejects_are_reported_per_row(self):
+        """Unknown members and types, bad amounts and duplicates are rejected up front."""
+        accepted, rejected = validate_rows([
+            _row(2),
+            _row(3, member="_T-CI-Nobody"),
+            _row(4, contribution_type="_T-CI-Unknown", contribution_date="2026-02-14"),
+            _row(5, amount="0", contribution_date="2026-02-21"),
+            _row(6, contribution_date="2026-01-31"),
+            _row(7),
+            _row(8, contribution_date=""),
+        ])
+        self.assertEqual([row["row_no"] for row in accepted], [2])
+        self.assertEqual([row["row_no"] for row in rejected], [3, 4, 5, 6, 7, 8])
+
+    def test_accepted_rows_follow_document_defaults(self):
+        """Expected amount, unpaid amount and status are derived as the document does."""
+        accepted, _rejected = validate_rows([_row(2, amount_paid="40")])
+        row = accepted[0]
+        self.assertEqual(row["member_name"], "Import Member")
+        self.assertEqual((row["expected_amount"], row["unpaid_amount"], row["status"]), (100, 60, "Partially Paid"))
+
+    def test_insert_writes_submitted_contributions(self):
+        """Accepted rows are inserted as submitted contributions in chunks."""
+        accepted, _rejected = validate_rows([
+            _row(2, contribution_date="2026-03-07"),
+            _row(3, contribution_date="2026-03-14"),
+            _row(4, contribution_date="2026-03-21"),
+        ])
+        result = insert_contributions(accepted, post_to_gl=False, chunk_size=2)
+        self.assertEqual(result, {"inserted": 3, "failed": []})
+        self.assertEqual(frappe.db.count("SHG Contribution", {"member": TEST_MEMBER, "docstatus": 1}), 4)
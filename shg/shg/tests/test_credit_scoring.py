@@ -0,0 +1,58 @@
+import frappe
+import unittest
+from shg.shg.utils.bulk_utils import bulk_insert_rows
+from shg.shg.utils.credit_scoring import BASE_SCORE, compute_scores, score_members
+
+TEST_MEMBER = "_T-CS-Member"
+SNAPSHOT_DATE = "2026-01-31"
+
+def _signals(**by_kind):
+    signals = {"repayments": {}, "contributions": {}, "attendance": {}, "fines": {}}
+    for kind, row in by_kind.items():
+        signals[kind][TEST_MEMBER] = frappe._dict(row)
+    return signals
+
+class TestCreditScoring(unittest.TestCase):
+    """Test cases for the nightly member credit scoring job."""
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        frappe.db.sql("DELETE FROM `tabSHG Credit Score Snapshot` WHERE snapshot_date = %s", SNAPSHOT_DATE)
+        frappe.db.sql("DELETE FROM `tabSHG Member` WHERE name = %s", TEST_MEMBER)
+        frappe.db.commit()
+
+    def test_member_without_history_gets_base_score(self):
+        """No loans, contributions or meetings earn no points."""
+        score = compute_scores([TEST_MEMBER], _signals())[0]
+        self.assertEqual(score["credit_score"], BASE_SCORE)
+
+    def test_perfect_member_scores_100(self):
+        """Full marks on every signal add up to 100."""
+        score = compute_scores([TEST_MEMBER], _signals(
+            repayments={"due": 12, "on_time": 12},
+            contributions={"contributions": 10, "paid": 10, "total": 20000},
+            attendance={"meetings": 8, "attended": 8},
+        ))[0]
+        self.assertEqual(score["credit_score"], 100)
+        self.assertEqual(score["repayment_rate"], 100)
+
+    def test_late_repayments_and_fines_lower_the_score(self):
+        """Half the installments late and three unpaid fines cost 15 and 6 points."""
+        score = compute_scores([TEST_MEMBER], _signals(
+            repayments={"due": 10, "on_time": 5},
+            contributions={"contributions": 10, "paid": 10, "total": 20000},
+            attendance={"meetings": 8, "attended": 8},
+            fines={"unpaid": 3},
+        ))[0]
+        self.assertEqual(score["credit_score"], 79)
+
+    def test_score_members_writes_score_and_snapshot(self):
+        """The job updates the member and re-running a date replaces its snapshot."""
+        bulk_insert_rows("SHG Member", [{"name": TEST_MEMBER, "member_name": TEST_MEMBER, "credit_score": 0}])
+        score_members(SNAPSHOT_DATE)
+        score_members(SNAPSHOT_DATE)
+
+        self.assertEqual(frappe.db.get_value("SHG Member", TEST_MEMBER, "credit_score"), BASE_SCORE)
+        snapshots = frappe.get_all("SHG Credit Score Snapshot",
+            filters={"member": TEST_MEMBER, "snapshot_date": SNAPSHOT_DATE}, pluck="credit_score")
+        self.assertEqual(snapshots, [BASE_SCORE])
@@ -0,0 +1,74 @@
+import frappe
+import unittest
+from frappe.utils import flt, today
+from shg.shg.loan_services.group_split import check_members_eligibility, split_group_loan
+
+class TestGroupLoanSplit(unittest.TestCase):
+    """Test cases for the bulk group loan split."""
+
+    def setUp(self):
+        """Create members and a group loan."""
+        self.members = []
+        for i in range(3):
+            member_name = f"_Test Split Member {i}"
+            if not frappe.db.exists("SHG Member", member_name):
+                frappe.get_doc({
+                    "doctype": "SHG Member",
+                    "member_name": member_name,
+                    "membership_status": "Active",
+                    "date_joined": today(),
+                }).insert(ignore_permissions=True)
+            self.members.append(member_name)
+
+        self.loan = frappe.get_doc({
+            "doctype": "SHG Loan",
+            "is_group_loan": 1,
+            "loan_amount": 9000,
+            "interest_rate": 12,
+            "interest_type": "Reducing Balance",
+            "loan_period_months": 6,
+            "repayment_frequency": "Monthly",
+            "repayment_start_date": today(),
+            "company": frappe.db.get_single_value("SHG Settings", "company") or "_Test Company"
+        })
+        for member in self.members:
+            self.loan.append("loan_members", {"member": member, "member_name": member, "allocated_amount": 3000})
+        self.loan.insert(ignore_permissions=True)
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        loans = frappe.get_all("SHG Loan", filters={"parent_loan": self.loan.name}, pluck="name") + [self.loan.name]
+        frappe.db.sql("DELETE FROM `tabSHG Loan Repayment Schedule` WHERE parent IN %(loans)s", {"loans": tuple(loans)})
+        frappe.db.sql("DELETE FROM `tabSHG Loan Member` WHERE parent IN %(loans)s", {"loans": tuple(loans)})
+        frappe.db.sql("DELETE FROM `tabSHG Loan` WHERE name IN %(loans)s", {"loans": tuple(loans)})
+        frappe.db.sql("DELETE FROM `tabSHG Member` WHERE member_name LIKE '_Test Split Member%%'")
+        frappe.db.commit()
+
+    def test_split_creates_child_loans_with_schedules(self):
+        """Every member gets one child loan carrying its schedule and balance."""
+        children = frappe.get_all(
+            "SHG Loan",
+            filters={"parent_loan": self.loan.name},
+            fields=["name", "member", "loan_amount", "balance_amount"]
+        )
+        self.assertEqual(sorted(c.member for c in children), sorted(self.members))
+
+        for child in children:
+            self.assertEqual(flt(child.loan_amount), 3000)
+            schedule = frappe.get_all(
+                "SHG Loan Repayment Schedule",
+                filters={"parent": child.name, "parenttype": "SHG Loan"},
+                fields=["unpaid_balance"]
+            )
+            self.assertEqual(len(schedule), 6)
+            self.assertAlmostEqual(flt(child.balance_amount), flt(sum(flt(r.unpaid_balance) for r in schedule), 2), places=2)
+
+    def test_split_is_idempotent(self):
+        """Re-running the split skips members that already have a loan."""
+        self.assertEqual(split_group_loan(self.loan.name), [])
+
+    def test_inactive_member_blocks_split(self):
+        """One inactive member fails the eligibility check for the whole group."""
+        frappe.db.set_value("SHG Member", self.members[0], "membership_status", "Inactive")
+        with self.assertRaises(frappe.ValidationError):
+            check_members_eligibility(self.members, min_savings=0)
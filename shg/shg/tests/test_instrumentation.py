@@ -0,0 +1,76 @@
+import frappe
+import unittest
+from shg.shg.utils.instrumentation import (
+    SAMPLES_KEY, clear_instrumentation, get_handler_stats, instrumented, percentile, summarize,
+)
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for the opt-in handler instrumentation."""
+
+    def setUp(self):
+        """Enable instrumentation for the current request and start with an empty store."""
+        frappe.local.shg_instrumentation_enabled = True
+        clear_instrumentation()
+
+    def tearDown(self):
+        """Clean up recorded samples after each test."""
+        clear_instrumentation()
+        frappe.local.shg_instrumentation_enabled = None
+
+    def test_records_queries_and_wall_time(self):
+        """A decorated handler records one sample with its query count."""
+        @instrumented()
+        def handler():
+            frappe.db.sql("SELECT 1")
+            frappe.db.sql("SELECT 2")
+
+        handler()
+        stats = {row["handler"]: row for row in get_handler_stats()}
+        name = f"{handler.__module__}.{handler.__qualname__}"
+        self.assertEqual(stats[name]["calls"], 1)
+        self.assertEqual(stats[name]["avg_queries"], 2)
+        self.assertEqual(stats[name]["kind"], "hook")
+        self.assertNotIn("sql", vars(frappe.db))
+
+    def test_disabled_is_pass_through(self):
+        """Nothing is recorded while instrumentation is disabled."""
+        frappe.local.shg_instrumentation_enabled = False
+
+        @instrumented()
+        def handler():
+            return 42
+
+        self.assertEqual(handler(), 42)
+        self.assertEqual(get_handler_stats(), [])
+
+    def test_errors_are_counted_and_raised(self):
+        """A failing handler still records its sample and re-raises."""
+        @instrumented(kind="job")
+        def handler():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            handler()
+        self.assertEqual(get_handler_stats(kind="job")[0]["errors"], 1)
+
+    def test_percentiles(self):
+        """Nearest-rank p50/p95 over the stored samples."""
+        self.assertEqual(percentile(list(range(1, 101)), 0.95), 95)
+        self.assertEqual(percentile([7], 0.5), 7)
+        stats = summarize([[ms, 1, 0.5, 3, 0, 0] for ms in range(1, 21)])
+        self.assertEqual(stats["p50_ms"], 10)
+        self.assertEqual(stats["p95_ms"], 19)
+        self.assertEqual(stats["max_ms"], 20)
+
+    def test_store_is_capped(self):
+        """Only the most recent samples are kept per handler."""
+        from shg.shg.utils import instrumentation
+
+        original = instrumentation.SAMPLE_LIMIT
+        instrumentation.SAMPLE_LIMIT = 3
+        try:
+            for _ in range(5):
+                instrumentation.record_sample("_test.capped", "hook", 0.001, 0, 0.0, 0)
+            self.assertEqual(len(frappe.cache().lrange(f"{SAMPLES_KEY}:_test.capped", 0, -1)), 3)
+        finally:
+            instrumentation.SAMPLE_LIMIT = original
@@ -0,0 +1,161 @@
+import email
+import socketserver
+import threading
+import frappe
+import unittest
+from unittest.mock import patch
+from shg.shg.utils.invoice_mailer import (
+    flush_invoice_mails,
+    get_delivery_metrics,
+    queue_invoice_mails,
+    render_invoice_mails,
+)
+
+TEST_EMAIL_ACCOUNT = "_Test SHG SMTP Sink"
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue that accepts every message and keeps it on the server."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 sink ready")
+        envelope = {"recipients": []}
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb == "MAIL":
+                envelope = {"recipients": []}
+            elif verb == "RCPT":
+                envelope["recipients"].append(command[8:].split(">")[0].lstrip("<"))
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for chunk in iter(self.rfile.readline, b""):
+                    if chunk.rstrip(b"\r\n") == b".":
+                        break
+                    data.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                envelope["message"] = email.message_from_bytes(b"".join(data))
+                self.server.messages.append(envelope)
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            self.reply("250 OK")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Local SMTP server on a free port collecting delivered messages."""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPSinkHandler)
+        self.messages = []
+
+class TestInvoiceMailer(unittest.TestCase):
+    """Test cases for the bulk invoice email stage."""
+
+    def test_render_substitutes_per_recipient(self):
+        """Each mail carries its own member and amount; rows without email or invoice are skipped."""
+        rows = [
+            frappe._dict(name="INV-1", member="M-1", member_name="Alice", email="alice@example.com",
+                         sales_invoice="SI-1", amount=1500, invoice_date="2026-03-01", due_date="2026-03-15"),
+            frappe._dict(name="INV-2", member="M-2", member_name="Bob", email="bob@example.com",
+                         sales_invoice="SI-2", amount=200, invoice_date="2026-03-01", due_date="2026-03-15"),
+            frappe._dict(name="INV-3", member="M-3", member_name="Carol", email=None,
+                         sales_invoice="SI-3", amount=200, invoice_date="2026-03-01", due_date="2026-03-15"),
+        ]
+        mails = render_invoice_mails(rows)
+
+        self.assertEqual([m["invoice"] for m in mails], ["INV-1", "INV-2"])
+        self.assertIn("Dear Alice", mails[0]["message"])
+        self.assertIn("KES 1,500.00", mails[0]["message"])
+        self.assertIn("Dear Bob", mails[1]["message"])
+        self.assertEqual(mails[0]["subject"], "Your March 2026 SHG Contribution Invoice")
+
+    def test_empty_batch_metrics(self):
+        """An empty batch reports zero counts."""
+        metrics = get_delivery_metrics([])
+        self.assertEqual((metrics["queued"], metrics["sent"], metrics["failed"]), (0, 0, 0))
+
+
+class TestInvoiceMailerDelivery(unittest.TestCase):
+    """Test cases for queueing and flushing invoice emails through a local SMTP sink."""
+
+    def setUp(self):
+        """Start the sink and make it the default outgoing Email Account."""
+        self.sink = SMTPSink()
+        threading.Thread(target=self.sink.serve_forever, daemon=True).start()
+
+        self.previous_defaults = frappe.get_all("Email Account", filters={"default_outgoing": 1}, pluck="name")
+        frappe.db.set_value("Email Account", {"default_outgoing": 1}, "default_outgoing", 0)
+        frappe.get_doc({
+            "doctype": "Email Account",
+            "email_account_name": TEST_EMAIL_ACCOUNT,
+            "email_id": "shg-sink@example.com",
+            "smtp_server": "127.0.0.1",
+            "smtp_port": self.sink.server_address[1],
+            "use_tls": 0,
+            "use_ssl_for_outgoing": 0,
+            "no_smtp_authentication": 1,
+            "enable_outgoing": 1,
+            "default_outgoing": 1,
+            "enable_incoming": 0,
+        }).insert(ignore_permissions=True)
+        # Outgoing accounts are memoised per request
+        frappe.local.outgoing_email_account = {}
+
+        self.mails = render_invoice_mails([
+            frappe._dict(name="_T-IM-INV-1", member="_T-IM-M1", member_name="Alice", email="alice@example.com",
+                         sales_invoice="_T-IM-SI-1", amount=1500, invoice_date="2026-03-01", due_date="2026-03-15"),
+            frappe._dict(name="_T-IM-INV-2", member="_T-IM-M2", member_name="Bob", email="bob@example.com",
+                         sales_invoice="_T-IM-SI-2", amount=200, invoice_date="2026-03-01", due_date="2026-03-15"),
+        ])
+        self.queue_names = []
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        self.sink.shutdown()
+        self.sink.server_close()
+        if self.queue_names:
+            names = {"names": tuple(self.queue_names)}
+            frappe.db.sql("DELETE FROM `tabSHG Email Log` WHERE email_queue IN %(names)s", names)
+            frappe.db.sql("DELETE FROM `tabEmail Queue Recipient` WHERE parent IN %(names)s", names)
+            frappe.db.sql("DELETE FROM `tabEmail Queue` WHERE name IN %(names)s", names)
+        frappe.db.sql("DELETE FROM `tabEmail Account` WHERE name = %s", TEST_EMAIL_ACCOUNT)
+        for name in self.previous_defaults:
+            frappe.db.set_value("Email Account", name, "default_outgoing", 1)
+        frappe.local.outgoing_email_account = {}
+        frappe.db.commit()
+
+    def _log_statuses(self):
+        return frappe.get_all("SHG Email Log", filters={"email_queue": ["in", self.queue_names]},
+                              fields=["reference_document", "status", "email_queue"], order_by="reference_document")
+
+    def test_queue_and_flush_deliver_over_smtp(self):
+        """Queued mails are Pending until the flush delivers them over SMTP and marks them Sent."""
+        # Print rendering of the attached Sales Invoice is outside this test
+        with patch.object(frappe, "attach_print", return_value={"fname": "invoice.pdf", "fcontent": b"%PDF-1.4"}):
+            self.queue_names = queue_invoice_mails(self.mails)
+            self.assertEqual([log.status for log in self._log_statuses()], ["Pending", "Pending"])
+
+            frappe.flags.testing_email = True
+            try:
+                metrics = flush_invoice_mails(self.queue_names)
+            finally:
+                frappe.flags.testing_email = False
+
+        self.assertEqual((metrics["queued"], metrics["sent"], metrics["failed"], metrics["pending"]), (2, 2, 0, 0))
+        self.assertEqual(sorted(recipient for message in self.sink.messages for recipient in message["recipients"]),
+                         ["alice@example.com", "bob@example.com"])
+        self.assertEqual({message["message"]["Subject"] for message in self.sink.messages},
+                         {"Your March 2026 SHG Contribution Invoice"})
+
+        logs = self._log_statuses()
+        self.assertEqual([(log.reference_document, log.status) for log in logs],
+                         [("_T-IM-INV-1", "Sent"), ("_T-IM-INV-2", "Sent")])
+        self.assertEqual({frappe.db.get_value("Email Queue", log.email_queue, "status") for log in logs}, {"Sent"})
@@ -0,0 +1,45 @@
+import frappe
+import unittest
+from frappe.utils import today
+from shg.shg.utils.invoice_submission import prevalidate_invoices
+
+class TestInvoiceSubmission(unittest.TestCase):
+    """Test cases for the chunked invoice submission pipeline."""
+
+    def setUp(self):
+        """Create an active and an inactive member with one draft invoice each."""
+        self.invoices = {}
+        for member_name, status in (("_Test Submit Active", "Active"), ("_Test Submit Inactive", "Inactive")):
+            if not frappe.db.exists("SHG Member", member_name):
+                frappe.get_doc({
+                    "doctype": "SHG Member",
+                    "member_name": member_name,
+                    "membership_status": "Active",
+                    "date_joined": today(),
+                }).insert(ignore_permissions=True)
+            invoice = frappe.get_doc({
+                "doctype": "SHG Contribution Invoice",
+                "member": member_name,
+                "member_name": member_name,
+                "invoice_date": today(),
+                "due_date": today(),
+                "contribution_type": "Regular Weekly",
+                "amount": 500,
+                "status": "Draft"
+            }).insert(ignore_permissions=True)
+            frappe.db.set_value("SHG Member", member_name, "membership_status", status)
+            self.invoices[status] = invoice.name
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        frappe.db.sql("DELETE FROM `tabSHG Contribution Invoice` WHERE member LIKE '_Test Submit%%'")
+        frappe.db.sql("DELETE FROM `tabSHG Member` WHERE member_name LIKE '_Test Submit%%'")
+        frappe.db.commit()
+
+    def test_prevalidation_splits_valid_and_failed(self):
+        """Drafts of inactive members land in the retry list before any submit."""
+        result = prevalidate_invoices(list(self.invoices.values()))
+
+        self.assertEqual(result["valid"], [self.invoices["Active"]])
+        self.assertIn(self.invoices["Inactive"], result["failed"])
+        self.assertIn("not active", result["failed"][self.invoices["Inactive"]])
@@ -0,0 +1,40 @@
+import frappe
+import unittest
+from frappe.utils import getdate
+from shg.shg.utils.kpi_snapshots import _bucket_label, apply_point_delta, apply_snapshot_delta, get_series
+
+class TestKPISnapshots(unittest.TestCase):
+    """Test cases for the dashboard KPI snapshot store."""
+
+    def tearDown(self):
+        frappe.db.sql("DELETE FROM `tabSHG KPI Daily Point` WHERE kpi = '_test_series'")
+        frappe.db.sql("DELETE FROM `tabSHG KPI Snapshot` WHERE kpi = '_test_kpi'")
+        frappe.db.commit()
+
+    def test_bucket_labels(self):
+        """Days map to the expected chart bucket per interval."""
+        day = getdate("2026-02-14")
+        self.assertEqual(_bucket_label(day, "Daily"), "2026-02-14")
+        self.assertEqual(_bucket_label(day, "Monthly"), "2026-02")
+        self.assertEqual(_bucket_label(day, "Quarterly"), "2026-Q1")
+        self.assertEqual(_bucket_label(day, "Yearly"), "2026")
+
+    def test_point_deltas_accumulate_and_reverse(self):
+        """Submit and cancel deltas upsert into one row per day."""
+        apply_point_delta("_test_series", "2026-01-05", 100)
+        apply_point_delta("_test_series", "2026-01-05", 50)
+        apply_point_delta("_test_series", "2026-02-01", 30)
+        apply_point_delta("_test_series", "2026-01-05", -50, -1)
+
+        series = get_series("_test_series", "2026-01-01", "2026-02-28", "Monthly")
+        self.assertEqual(series["labels"], ["2026-01", "2026-02"])
+        self.assertEqual(series["values"], [100.0, 30.0])
+
+        counts = get_series("_test_series", "2026-01-01", "2026-02-28", "Monthly", measure="count")
+        self.assertEqual(counts["values"], [1.0, 1.0])
+
+    def test_snapshot_delta(self):
+        """Snapshot deltas are applied atomically to the stored value."""
+        apply_snapshot_delta("_test_kpi", 10)
+        apply_snapshot_delta("_test_kpi", -4)
+        self.assertEqual(frappe.db.get_value("SHG KPI Snapshot", "_test_kpi", "value"), 6)
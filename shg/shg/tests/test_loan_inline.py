@@ -0,0 +1,72 @@
+import frappe
+import unittest
+from frappe.utils import add_days, today
+from shg.shg.api.loan import get_unpaid_installments
+from shg.shg.api.loan_inline import compute_inline_totals, get_inline_snapshot, pull_unpaid_installments
+from shg.shg.loan_utils import get_row_remaining
+from shg.shg.utils.bulk_utils import bulk_insert_rows
+
+TEST_LOAN = "_Test Inline Loan"
+
+class TestLoanInline(unittest.TestCase):
+    """Test cases for the read-only inline repayment API."""
+
+    def setUp(self):
+        """Create a loan with one paid, one overdue and one upcoming installment."""
+        bulk_insert_rows("SHG Loan", [{"name": TEST_LOAN, "loan_amount": 3000, "docstatus": 1}])
+        rows = []
+        for idx, (due, paid) in enumerate([(-60, 1000), (-30, 400), (30, 0)], start=1):
+            rows.append({
+                "name": f"{TEST_LOAN}-{idx}",
+                "parent": TEST_LOAN,
+                "parenttype": "SHG Loan",
+                "parentfield": "repayment_schedule",
+                "idx": idx,
+                "installment_no": idx,
+                "due_date": add_days(today(), due),
+                "total_payment": 1000,
+                "amount_paid": paid,
+                "unpaid_balance": 1000 - paid,
+                "status": "Paid" if paid == 1000 else "Pending",
+                "docstatus": 1,
+            })
+        bulk_insert_rows("SHG Loan Repayment Schedule", rows)
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        frappe.db.sql("DELETE FROM `tabSHG Loan Repayment Schedule` WHERE parent = %s", TEST_LOAN)
+        frappe.db.sql("DELETE FROM `tabSHG Loan` WHERE name = %s", TEST_LOAN)
+        frappe.db.commit()
+
+    def test_snapshot_reads_unpaid_rows_only(self):
+        """Paid rows are left out and totals follow the remaining balances."""
+        snapshot = get_inline_snapshot(TEST_LOAN)
+        self.assertEqual([row["installment_no"] for row in snapshot["rows"]], [2, 3])
+        self.assertEqual(snapshot["outstanding"], 1600)
+        self.assertEqual(snapshot["overdue"], 600)
+
+    def test_etag_reuse_until_change(self):
+        """An unchanged loan answers not_modified; a row update changes the ETag."""
+        etag = get_inline_snapshot(TEST_LOAN)["etag"]
+        self.assertTrue(get_inline_snapshot(TEST_LOAN, etag=etag).get("not_modified"))
+
+        frappe.db.set_value("SHG Loan Repayment Schedule", f"{TEST_LOAN}-2", "amount_paid", 1000)
+        self.assertNotEqual(get_inline_snapshot(TEST_LOAN)["etag"], etag)
+
+    def test_reads_do_not_write_the_loan(self):
+        """Pulling installments and computing totals leave the loan untouched."""
+        modified = frappe.db.get_value("SHG Loan", TEST_LOAN, "modified")
+        self.assertEqual(pull_unpaid_installments(TEST_LOAN)["count"], 2)
+        totals = compute_inline_totals(TEST_LOAN, [{"rowname": f"{TEST_LOAN}-2", "amount_to_pay": 900}])
+        self.assertEqual(totals["selected"], 600)
+        self.assertEqual(frappe.db.get_value("SHG Loan", TEST_LOAN, "modified"), modified)
+
+    def test_snapshot_matches_unpaid_installments(self):
+        """Rows marked Paid are left out and remaining follows the unpaid balance, as in get_unpaid_installments."""
+        frappe.db.set_value("SHG Loan Repayment Schedule", f"{TEST_LOAN}-2",
+                            {"status": "Paid", "unpaid_balance": 600})
+        frappe.db.set_value("SHG Loan Repayment Schedule", f"{TEST_LOAN}-3", "unpaid_balance", 700)
+        snapshot = get_inline_snapshot(TEST_LOAN)
+        self.assertEqual([(row["name"], row["remaining_amount"]) for row in snapshot["rows"]],
+                         [(row["name"], get_row_remaining(row)) for row in get_unpaid_installments(TEST_LOAN)])
+        self.assertEqual(snapshot["outstanding"], 700)
@@ -0,0 +1,71 @@
+import frappe
+import unittest
+from frappe.utils import today
+from shg.shg.utils.member_ledger import append_entry, get_ledger_entries, get_member_ledger, get_opening_balance
+
+class TestMemberLedger(unittest.TestCase):
+    """Test cases for the append-only member ledger."""
+
+    def setUp(self):
+        """Create a throwaway member."""
+        self.member = "_Test Ledger Member"
+        if not frappe.db.exists("SHG Member", self.member):
+            frappe.get_doc({
+                "doctype": "SHG Member",
+                "member_name": self.member,
+                "membership_status": "Active",
+                "date_joined": today(),
+            }).insert(ignore_permissions=True)
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        frappe.db.sql("DELETE FROM `tabSHG Member Ledger Entry` WHERE member = %s", self.member)
+        frappe.db.sql("DELETE FROM `tabSHG Member` WHERE member_name = %s", self.member)
+        frappe.db.commit()
+
+    def test_running_balances(self):
+        """Each entry stores the balance after it, including loan balance moves and reversals."""
+        append_entry(self.member, "SHG Contribution", "C-1", {"posting_date": "2026-01-05", "credit": 500})
+        append_entry(self.member, "SHG Loan", "L-1", {"posting_date": "2026-01-10", "debit": 1000,
+                                                      "principal_amount": 1000, "loan": "L-1"})
+        append_entry(self.member, "SHG Loan Repayment", "R-1", {"posting_date": "2026-02-10", "credit": 300,
+                                                                 "principal_amount": 250, "loan": "L-1"})
+        append_entry(self.member, "SHG Loan Repayment", "R-1", {"posting_date": "2026-02-11", "debit": 300,
+                                                                 "principal_amount": -250, "loan": "L-1"},
+                     is_reversal=1)
+
+        entries = get_ledger_entries(self.member)
+        self.assertEqual([e.entry_no for e in entries], [1, 2, 3, 4])
+        self.assertEqual([e.balance for e in entries], [500, -500, -200, -500])
+        self.assertEqual([e.loan_balance for e in entries], [0, 1000, 750, 1000])
+
+    def test_opening_balance_and_keyset_pages(self):
+        """Statements start from the opening balance and page by posting date and entry number."""
+        for i, day in enumerate(["2026-01-01", "2026-02-01", "2026-03-01"], start=1):
+            append_entry(self.member, "SHG Contribution", f"C-{i}", {"posting_date": day, "credit": 100})
+
+        self.assertEqual(get_opening_balance(self.member, "2026-02-01"), 100)
+
+        first = get_member_ledger(self.member, page_length=2)
+        self.assertEqual(len(first["entries"]), 2)
+        self.assertEqual(first["next_cursor"], "2026-02-01|2")
+
+        second = get_member_ledger(self.member, cursor=first["next_cursor"], page_length=2)
+        self.assertEqual([e.voucher_no for e in second["entries"]], ["C-3"])
+        self.assertIsNone(second["next_cursor"])
+
+    def test_backdated_entries(self):
+        """An entry posted out of date order takes its place in the running balances."""
+        append_entry(self.member, "SHG Contribution", "C-1", {"posting_date": "2026-01-01", "credit": 100})
+        append_entry(self.member, "SHG Contribution", "C-3", {"posting_date": "2026-03-01", "credit": 300})
+        append_entry(self.member, "SHG Loan", "L-1", {"posting_date": "2026-02-01", "debit": 1000,
+                                                      "principal_amount": 1000, "loan": "L-1"})
+
+        entries = get_ledger_entries(self.member)
+        self.assertEqual([e.voucher_no for e in entries], ["C-1", "L-1", "C-3"])
+        self.assertEqual([e.entry_no for e in entries], [1, 3, 2])
+        self.assertEqual([e.balance for e in entries], [100, -900, -600])
+        self.assertEqual([e.loan_balance for e in entries], [0, 1000, 1000])
+
+        self.assertEqual(get_opening_balance(self.member, "2026-03-01"), -900)
+        self.assertEqual(get_opening_balance(self.member, "2026-03-01", loan_only=True), 1000)
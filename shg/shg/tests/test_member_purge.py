@@ -0,0 +1,66 @@
+import frappe
+import unittest
+from shg.shg.utils.bulk_utils import chunked, parse_name_list
+from shg.shg.utils.company_utils import get_default_company
+from shg.shg.utils.member_purge import PURGE_PLAN, build_purge_plan, execute_purge, execute_anonymize
+
+class TestMemberPurge(unittest.TestCase):
+    """Test cases for the bulk member purge and anonymization job."""
+
+    def setUp(self):
+        """Create two throwaway members with their own ID and phone numbers."""
+        self.members, self.customers = [], []
+        for idx, member_name in enumerate(("_Test Purge Member A", "_Test Purge Member B"), start=1):
+            if not frappe.db.exists("SHG Member", member_name):
+                frappe.get_doc({
+                    "doctype": "SHG Member",
+                    "member_name": member_name,
+                    "id_number": f"1234567{idx}",
+                    "phone_number": f"071234567{idx}",
+                    "email": "purge@example.com",
+                    "membership_date": "2026-01-01",
+                    "membership_status": "Active",
+                    "company": get_default_company(),
+                }).insert(ignore_permissions=True)
+            self.members.append(member_name)
+            self.customers.append(frappe.db.get_value("SHG Member", member_name, "customer"))
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        frappe.db.sql("DELETE FROM `tabSHG Member` WHERE member_name LIKE '_Test Purge Member%%'")
+        frappe.db.sql("DELETE FROM `tabDeletion Log` WHERE entity_name LIKE '_Test Purge Member%%'")
+        customers = [customer for customer in self.customers if customer]
+        if customers:
+            frappe.db.sql("DELETE FROM `tabCustomer` WHERE name IN %(names)s", {"names": tuple(customers)})
+        frappe.db.commit()
+
+    def test_chunked_and_parse_name_list(self):
+        """Chunks are bounded and name lists are de-duplicated."""
+        self.assertEqual(list(chunked([1, 2, 3, 4, 5], 2)), [[1, 2], [3, 4], [5]])
+        self.assertEqual(parse_name_list('["A", "B", "A"]'), ["A", "B"])
+        self.assertEqual(parse_name_list("A, B\nC"), ["A", "B", "C"])
+
+    def test_plan_deletes_member_last(self):
+        """The member row must be deleted after everything pointing at it."""
+        self.assertEqual(PURGE_PLAN[-1][0], "SHG Member")
+        plan = build_purge_plan(self.members)
+        self.assertEqual(plan[-1]["doctype"], "SHG Member")
+        self.assertEqual(sorted(plan[-1]["names"]), sorted(self.members))
+
+    def test_execute_purge(self):
+        """Purging removes the members and writes one audit entry each."""
+        result = execute_purge(self.members, chunk_size=1)
+
+        self.assertEqual(result["totals"].get("SHG Member"), 2)
+        for member in self.members:
+            self.assertFalse(frappe.db.exists("SHG Member", member))
+            self.assertTrue(frappe.db.exists("Deletion Log", {"entity_name": member}))
+
+    def test_execute_anonymize(self):
+        """Anonymization masks personal data in place."""
+        result = execute_anonymize(self.members)
+
+        self.assertEqual(result["members"], 2)
+        phone, id_number = frappe.db.get_value("SHG Member", self.members[0], ["phone_number", "id_number"])
+        self.assertNotEqual(phone, "0712345671")
+        self.assertNotEqual(id_number, "12345671")
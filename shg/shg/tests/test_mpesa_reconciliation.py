@@ -0,0 +1,68 @@
+import frappe
+import unittest
+from shg.shg.utils.mpesa_reconciliation import build_indexes, match_receipts, parse_statement_lines
+from shg.shg.utils.notification_service import normalize_phone_number
+
+def _item(doctype, name, member, outstanding, due_date="2026-01-01"):
+    return frappe._dict(doctype=doctype, name=name, member=member, outstanding=outstanding, due_date=due_date)
+
+def _receipt(receipt_no, amount, phone="+254712000001", account_reference=""):
+    return {"receipt_no": receipt_no, "amount": amount, "phone": phone, "account_reference": account_reference}
+
+class TestMpesaReconciliation(unittest.TestCase):
+    """Test cases for M-Pesa statement parsing and matching."""
+
+    def setUp(self):
+        """Index open items of two members sharing a phone and one with its own."""
+        self.items = [
+            _item("SHG Contribution Invoice", "SINV-0001", "_T-MP-A", 500, "2026-01-01"),
+            _item("SHG Contribution Invoice", "SINV-0002", "_T-MP-A", 500, "2026-02-01"),
+            _item("SHG Meeting Fine", "FINE-0001", "_T-MP-B", 100),
+            _item("SHG Meeting Fine", "FINE-0002", "_T-MP-C", 100),
+        ]
+        phones = {"_T-MP-A": "+254712000001", "_T-MP-B": "+254712000002", "_T-MP-C": "+254712000002"}
+        self.by_ref, self.by_phone_amount = build_indexes(self.items, phones)
+
+    def test_phone_numbers_follow_notification_rules(self):
+        """Local, bare and international spellings normalize to the same number."""
+        for phone in ("0712 000 001", "712000001", "254712000001", "+254-712-000-001"):
+            self.assertEqual(normalize_phone_number(phone), "+254712000001")
+
+    def test_statement_header_is_found_below_preamble(self):
+        """Portal statements are read from their header row; withdrawals are left out."""
+        receipts, skipped = parse_statement_lines([
+            ["M-PESA STATEMENT"],
+            ["Receipt No.", "Completion Time", "Details", "Transaction Status", "Paid In", "Withdrawn", "Other Party Info", "A/C No."],
+            ["qjk1", "2026-10-01 10:00:00", "Pay Bill", "Completed", "1,500.00", "", "254712000001 - JANE DOE", "sinv-0001"],
+            ["QJK2", "2026-10-01 11:00:00", "Withdrawal", "Completed", "", "200.00", "", ""],
+            ["QJK3", "not a date", "Pay Bill", "Completed", "100.00", "", "0712000002", ""],
+        ])
+        self.assertEqual(len(receipts), 1)
+        self.assertEqual(receipts[0]["receipt_no"], "QJK1")
+        self.assertEqual(receipts[0]["amount"], 1500)
+        self.assertEqual(receipts[0]["phone"], "+254712000001")
+        self.assertEqual(receipts[0]["party_name"], "JANE DOE")
+        self.assertEqual(receipts[0]["account_reference"], "SINV-0001")
+        self.assertEqual([row["receipt_no"] for row in skipped], ["QJK3"])
+
+    def test_reference_match_wins_and_claims_the_item(self):
+        """An account reference matches directly and the item cannot be paid twice."""
+        receipts = match_receipts([
+            _receipt("R1", 500, account_reference="SINV-0002"),
+            _receipt("R2", 500),
+            _receipt("R3", 500),
+        ], self.by_ref, self.by_phone_amount)
+        self.assertEqual([r["match_name"] for r in receipts], ["SINV-0002", "SINV-0001", None])
+        self.assertEqual([r["status"] for r in receipts], ["Matched", "Matched", "Unmatched"])
+
+    def test_overpaid_reference_goes_to_review(self):
+        """A receipt larger than its referenced item's outstanding amount is reviewed."""
+        receipt = match_receipts([_receipt("R1", 900, account_reference="SINV-0001")], self.by_ref, self.by_phone_amount)[0]
+        self.assertEqual(receipt["status"], "Needs Review")
+        self.assertEqual(receipt["member"], "_T-MP-A")
+
+    def test_shared_phone_is_ambiguous(self):
+        """Candidates of several members are left for review with their list."""
+        receipt = match_receipts([_receipt("R1", 100, phone="+254712000002")], self.by_ref, self.by_phone_amount)[0]
+        self.assertEqual(receipt["status"], "Needs Review")
+        self.assertEqual(len(frappe.parse_json(receipt["candidates"])), 2)
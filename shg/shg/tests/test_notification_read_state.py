@@ -0,0 +1,63 @@
+import frappe
+import unittest
+from frappe.utils import add_months, now_datetime
+from shg.shg.doctype.shg_notification_log.shg_notification_log import mark_notifications_read
+from shg.shg.utils.notification_service import archive_notification_logs
+
+class TestNotificationReadState(unittest.TestCase):
+    """Test cases for the notification unread counter and archival."""
+
+    def setUp(self):
+        if not frappe.db.exists("SHG Member", "_Test Notify Member"):
+            frappe.get_doc({
+                "doctype": "SHG Member",
+                "member_name": "_Test Notify Member",
+                "membership_status": "Active"
+            }).insert(ignore_permissions=True)
+        frappe.db.set_value("SHG Member", "_Test Notify Member", "unread_notification_count", 0)
+
+    def tearDown(self):
+        frappe.db.sql("DELETE FROM `tabSHG Notification Log` WHERE member = '_Test Notify Member'")
+        frappe.db.sql("DELETE FROM `tabSHG Notification Log Archive` WHERE member = '_Test Notify Member'")
+        frappe.db.sql("DELETE FROM `tabSHG Member` WHERE name = '_Test Notify Member'")
+        frappe.db.commit()
+
+    def _create_log(self):
+        return frappe.get_doc({
+            "doctype": "SHG Notification Log",
+            "member": "_Test Notify Member",
+            "notification_type": "General Announcement",
+            "channel": "SMS",
+            "message": "Test message"
+        }).insert(ignore_permissions=True)
+
+    def _unread(self):
+        return frappe.db.get_value("SHG Member", "_Test Notify Member", "unread_notification_count")
+
+    def test_counter_follows_insert_and_read(self):
+        """Inserts increment the counter and read receipts decrement it."""
+        first = self._create_log()
+        self._create_log()
+        self.assertEqual(self._unread(), 2)
+
+        self.assertEqual(mark_notifications_read("_Test Notify Member", [first.name]), 1)
+        self.assertEqual(self._unread(), 1)
+
+        # Marking again is a no-op
+        self.assertEqual(mark_notifications_read("_Test Notify Member", [first.name]), 0)
+        self.assertEqual(self._unread(), 1)
+
+        mark_notifications_read("_Test Notify Member")
+        self.assertEqual(self._unread(), 0)
+
+    def test_archive_moves_old_logs(self):
+        """Old logs move to the archive and release their unread slot."""
+        log = self._create_log()
+        frappe.db.set_value("SHG Notification Log", log.name, "creation",
+                            add_months(now_datetime(), -13), update_modified=False)
+
+        archive_notification_logs(months=12)
+
+        self.assertFalse(frappe.db.exists("SHG Notification Log", log.name))
+        self.assertTrue(frappe.db.exists("SHG Notification Log Archive", log.name))
+        self.assertEqual(self._unread(), 0)
@@ -0,0 +1,36 @@
+import frappe
+import unittest
+from frappe.utils import getdate, today
+from shg.shg.utils.overdue_sweep import compute_late_fees, sweep_overdue_invoices
+
+class TestOverdueSweep(unittest.TestCase):
+    """Test cases for the set-based overdue sweep."""
+
+    def test_compute_late_fees(self):
+        """Fees follow amount * rate% * days and skip invoices not yet late."""
+        as_of = getdate("2026-01-11")
+        rows = [
+            {"name": "INV-1", "amount": 1000, "due_date": "2026-01-01"},
+            {"name": "INV-2", "amount": 500, "due_date": "2026-01-11"},
+            {"name": "INV-3", "amount": 0, "due_date": "2025-12-01"},
+        ]
+        fees = compute_late_fees(rows, 1, as_of)
+        self.assertEqual(fees, {"INV-1": 100.0})
+        self.assertEqual(compute_late_fees(rows, 0, as_of), {})
+
+    def test_sweep_flips_unpaid_invoices(self):
+        """Submitted Unpaid invoices past due become Overdue and are reported per member."""
+        invoices = frappe.get_all(
+            "SHG Contribution Invoice",
+            filters={"status": "Unpaid", "docstatus": 1, "due_date": ["<", today()]},
+            fields=["name", "member"],
+            limit=5
+        )
+        if not invoices:
+            self.skipTest("No overdue unpaid invoices available")
+
+        result = sweep_overdue_invoices(today())
+        frappe.db.rollback()
+
+        self.assertTrue(set(i.name for i in invoices) <= set(result["invoices"]))
+        self.assertTrue(set(i.member for i in invoices) <= set(result["members"]))
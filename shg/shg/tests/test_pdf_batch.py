@@ -0,0 +1,76 @@
+import os
+import frappe
+import unittest
+from unittest.mock import patch
+from shg.shg.utils import pdf_batch
+from shg.shg.utils.pdf_batch import get_cache_path, get_pdf_attachment, get_versions, render_pdfs, render_uncached, write_cached
+
+class TestPdfBatch(unittest.TestCase):
+    """Test cases for the batch PDF renderer and its disk cache."""
+
+    def setUp(self):
+        """Use a document that exists on every site."""
+        self.key = ("User", "Administrator", None)
+        self.path = get_cache_path(self.key, get_versions([self.key])[self.key])
+        self.bio = frappe.db.get_value("User", "Administrator", "bio")
+
+    def tearDown(self):
+        """Clean up cached files and restore the document after each test."""
+        frappe.db.set_value("User", "Administrator", "bio", self.bio, update_modified=False)
+        frappe.db.commit()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_cache_key_follows_version(self):
+        """A changed version yields a different cache file."""
+        self.assertNotEqual(get_cache_path(self.key, "a"), get_cache_path(self.key, "b"))
+        self.assertEqual(get_cache_path(self.key, "x"), get_cache_path(self.key, "x"))
+
+    def test_version_follows_writes_without_modified(self):
+        """A write that keeps modified still changes the version."""
+        before = get_versions([self.key])[self.key]
+        frappe.db.set_value("User", "Administrator", "bio", "_T-PDF changed bio", update_modified=False)
+        self.assertNotEqual(get_versions([self.key])[self.key], before)
+
+    def test_version_follows_print_settings(self):
+        """Print Settings are part of every version."""
+        before = get_versions([self.key])[self.key]
+        previous = frappe.db.get_single_value("Print Settings", "with_letterhead")
+        try:
+            frappe.db.set_single_value("Print Settings", "with_letterhead", 0 if previous else 1)
+            self.assertNotEqual(get_versions([self.key])[self.key], before)
+        finally:
+            frappe.db.set_single_value("Print Settings", "with_letterhead", previous)
+            frappe.db.commit()
+
+    def test_missing_document_has_no_version(self):
+        """Unknown documents are rendered but never cached."""
+        key = ("User", "_T-PDF missing user", None)
+        self.assertIsNone(get_versions([key])[key])
+
+    def test_cached_pdf_is_served_without_rendering(self):
+        """A cache hit returns the stored bytes."""
+        write_cached(self.path, b"%PDF-cached")
+        self.assertEqual(render_pdfs([self.key, self.key]), {self.key: b"%PDF-cached"})
+
+    def test_cache_miss_renders_and_stores(self):
+        """A miss goes through render_uncached and the result is cached for the next call."""
+        with patch.object(pdf_batch, "render_uncached", wraps=render_uncached) as render:
+            content = render_pdfs([self.key])[self.key]
+            self.assertEqual(render.call_args[0][0], [self.key])
+        self.assertTrue(content.startswith(b"%PDF"))
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_failed_conversion_falls_back_to_get_print(self):
+        """A document whose conversion fails is rendered by frappe.get_print."""
+        with patch.object(pdf_batch, "_convert", side_effect=OSError("renderer crashed")), \
+                patch("frappe.get_print", wraps=frappe.get_print) as get_print:
+            content = render_uncached([self.key])[self.key]
+        self.assertTrue(content.startswith(b"%PDF"))
+        get_print.assert_called_with("User", "Administrator", None, as_pdf=True)
+
+    def test_attachment_shape(self):
+        """Attachments match the frappe.attach_print shape."""
+        attachment = get_pdf_attachment("User", "Administrator", content=b"%PDF")
+        self.assertEqual(attachment, {"fname": "Administrator.pdf", "fcontent": b"%PDF"})
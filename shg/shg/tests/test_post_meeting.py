@@ -0,0 +1,150 @@
+import frappe
+import unittest
+from shg.shg.utils.bulk_utils import bulk_insert_rows
+from shg.shg.utils.company_utils import get_default_company
+from shg.shg.utils.post_meeting import (
+    build_attendance_fines,
+    create_absentee_invoices,
+    create_attendance_fines,
+    queue_absentee_emails,
+)
+
+TEST_MEETING = "_Test Post Meeting"
+
+class TestPostMeetingPipeline(unittest.TestCase):
+    """Test cases for the deferred post-meeting fine creation."""
+
+    def setUp(self):
+        """Build an in-memory meeting with mixed attendance."""
+        self.settings = frappe._dict(absentee_fine=50, lateness_fine=20)
+        self.meeting = frappe._dict(
+            name=TEST_MEETING,
+            meeting_date="2026-10-01",
+            attendance=[
+                frappe._dict(member="_T-MEM-1", member_name="Absent One", attendance_status="Absent"),
+                frappe._dict(member="_T-MEM-2", member_name="Late Two", attendance_status="Late"),
+                frappe._dict(member="_T-MEM-3", member_name="Present Three", attendance_status="Present"),
+                frappe._dict(member="_T-MEM-1", member_name="Absent One", attendance_status="Absent"),
+            ],
+        )
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        frappe.db.sql("DELETE FROM `tabSHG Meeting Fine` WHERE meeting = %s", TEST_MEETING)
+        frappe.db.commit()
+
+    def test_builds_one_fine_per_member_and_reason(self):
+        """Absent and late members are fined once; present members are not."""
+        rows = build_attendance_fines(self.meeting, self.settings)
+        self.assertEqual(
+            sorted((row["member"], row["fine_reason"], row["fine_amount"]) for row in rows),
+            [("_T-MEM-1", "Absentee", 50), ("_T-MEM-2", "Late Arrival", 20)],
+        )
+        self.assertEqual({(row["company"], row["created_by"]) for row in rows},
+                         {(get_default_company(), frappe.session.user)})
+
+    def test_rerun_skips_existing_fines(self):
+        """A second run of the pipeline inserts no duplicate fines."""
+        self.assertEqual(create_attendance_fines(self.meeting, self.settings), 2)
+        self.assertEqual(create_attendance_fines(self.meeting, self.settings), 0)
+        names = frappe.get_all("SHG Meeting Fine", filters={"meeting": TEST_MEETING}, pluck="name")
+        self.assertEqual(len(names), 2)
+        self.assertTrue(all(name.startswith("FINE-") for name in names))
+
+    def test_zero_fine_amount_creates_nothing(self):
+        """No fines are created when the fine amounts are not configured."""
+        self.assertEqual(build_attendance_fines(self.meeting, frappe._dict()), [])
+
+
+TEST_CUSTOMER = "_T-PM Customer"
+TEST_ITEM = "_T-PM Absence Fee"
+
+class TestPostMeetingInvoices(unittest.TestCase):
+    """Test cases for the absentee invoice and email stages."""
+
+    def setUp(self):
+        """Create a meeting with one invoiceable absentee, one without a customer and an absence fee item."""
+        bulk_insert_rows("SHG Meeting", [{"name": TEST_MEETING, "meeting_date": "2026-10-01", "docstatus": 1}])
+        if not frappe.db.exists("Customer", TEST_CUSTOMER):
+            frappe.get_doc({
+                "doctype": "Customer",
+                "customer_name": TEST_CUSTOMER,
+                "customer_type": "Individual",
+                "customer_group": "SHG Members",
+                "territory": "Kenya",
+            }).insert(ignore_permissions=True)
+        if not frappe.db.exists("Item", TEST_ITEM):
+            frappe.get_doc({
+                "doctype": "Item",
+                "item_code": TEST_ITEM,
+                "item_name": TEST_ITEM,
+                "item_group": "Services",
+                "stock_uom": "Nos",
+                "is_stock_item": 0,
+            }).insert(ignore_permissions=True)
+        bulk_insert_rows("SHG Member", [
+            {"name": "_T-PM-1", "member_name": "Absent One", "customer": TEST_CUSTOMER, "email": "absent.one@example.com"},
+            {"name": "_T-PM-2", "member_name": "Absent Two", "customer": None, "email": "absent.two@example.com"},
+        ])
+
+        self.meeting = frappe._dict(
+            name=TEST_MEETING,
+            meeting_date="2026-10-01",
+            attendance=[
+                frappe._dict(member="_T-PM-1", attendance_status="Absent"),
+                frappe._dict(member="_T-PM-2", attendance_status="Absent"),
+            ],
+        )
+        self.settings = frappe._dict(auto_invoice_absentees=1, absent_fee=100, invoice_item=TEST_ITEM)
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        invoices = frappe.get_all("Sales Invoice", filters={"customer": TEST_CUSTOMER}, pluck="name")
+        if invoices:
+            names = {"names": tuple(invoices)}
+            queued = frappe.get_all("Email Queue", filters={
+                "reference_doctype": "Sales Invoice", "reference_name": ["in", invoices]}, pluck="name")
+            if queued:
+                frappe.db.sql("DELETE FROM `tabEmail Queue Recipient` WHERE parent IN %(queued)s", {"queued": tuple(queued)})
+                frappe.db.sql("DELETE FROM `tabEmail Queue` WHERE name IN %(queued)s", {"queued": tuple(queued)})
+            frappe.db.sql("DELETE FROM `tabGL Entry` WHERE voucher_no IN %(names)s", names)
+            frappe.db.sql("DELETE FROM `tabPayment Ledger Entry` WHERE voucher_no IN %(names)s", names)
+            frappe.db.sql("DELETE FROM `tabSales Invoice Item` WHERE parent IN %(names)s", names)
+            frappe.db.sql("DELETE FROM `tabSales Invoice` WHERE name IN %(names)s", names)
+        frappe.db.sql("DELETE FROM `tabSHG Member` WHERE name LIKE '_T-PM-%%'")
+        frappe.db.sql("DELETE FROM `tabSHG Meeting` WHERE name = %s", TEST_MEETING)
+        frappe.db.commit()
+
+    def test_invoice_stage_skips_when_not_configured(self):
+        """Without an absent fee nothing is invoiced and the reason is logged."""
+        log = []
+        self.assertEqual(create_absentee_invoices(self.meeting, frappe._dict(self.settings, absent_fee=0), log), [])
+        self.assertEqual(log, ["Auto-invoicing skipped: absent fee or invoice item not configured"])
+        self.assertEqual(create_absentee_invoices(self.meeting, frappe._dict(self.settings, auto_invoice_absentees=0)), [])
+
+    def test_invoice_stage_bills_absentees_with_a_customer(self):
+        """One submitted invoice per absentee with a customer; a re-run does not bill them again."""
+        created = create_absentee_invoices(self.meeting, self.settings, [])
+        self.assertEqual([(row["member"], row["email"]) for row in created], [("_T-PM-1", "absent.one@example.com")])
+
+        invoice = frappe.db.get_value("Sales Invoice", created[0]["invoice"],
+                                      ["customer", "docstatus", "grand_total", "posting_date"], as_dict=True)
+        self.assertEqual((invoice.customer, invoice.docstatus, invoice.grand_total), (TEST_CUSTOMER, 1, 100))
+        self.assertEqual(str(invoice.posting_date), "2026-10-01")
+        self.assertEqual(create_absentee_invoices(self.meeting, self.settings, []), [])
+
+    def test_email_stage_queues_invoice_mails(self):
+        """Every invoiced absentee with an email gets one queued mail referencing the invoice, once."""
+        created = create_absentee_invoices(self.meeting, self.settings, [])
+        # A re-run invoices nobody but still mails the invoices of the earlier run
+        self.assertEqual(create_absentee_invoices(self.meeting, self.settings, []), [])
+        self.assertEqual(queue_absentee_emails(self.meeting, self.settings), 1)
+        self.assertEqual(queue_absentee_emails(self.meeting, self.settings), 0)
+
+        queued = frappe.get_all("Email Queue", filters={
+            "reference_doctype": "Sales Invoice",
+            "reference_name": created[0]["invoice"],
+        }, pluck="name")
+        self.assertEqual(len(queued), 1)
+        recipients = frappe.get_all("Email Queue Recipient", filters={"parent": queued[0]}, pluck="recipient")
+        self.assertEqual(recipients, ["absent.one@example.com"])
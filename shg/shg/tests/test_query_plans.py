@@ -0,0 +1,86 @@
+import frappe
+import unittest
+from frappe.utils import add_days, today
+from shg.shg.report.contribution_summary.contribution_summary import get_query as contribution_summary_query
+from shg.shg.report.loan_portfolio.loan_portfolio import get_query as loan_portfolio_query
+from shg.shg.report.loan_transaction_ledger.loan_transaction_ledger import get_query as loan_transaction_ledger_query
+from shg.shg.report.shg_repayments_register.shg_repayments_register import get_query as repayments_register_query
+from shg.shg.utils.db_indexes import find_full_scans, get_missing_indexes
+from shg.shg.utils.report_pager import build_page_query
+
+DATE_RANGE = {"from_date": add_days(today(), -90), "to_date": today()}
+
+# (label, query, values) for the hot report and utility access paths
+HOT_QUERIES = [
+    ("overdue invoice sweep", """
+        SELECT name, member, amount, due_date FROM `tabSHG Contribution Invoice`
+        WHERE docstatus = 1 AND status = 'Unpaid' AND due_date < %(as_of)s
+    """, {"as_of": today()}),
+    ("invoice mail rows", """
+        SELECT name FROM `tabSHG Contribution Invoice`
+        WHERE invoice_date = %(as_of)s AND status = 'Unpaid' AND docstatus = 1
+    """, {"as_of": today()}),
+    ("overdue contributions", """
+        SELECT c.name, m.email FROM `tabSHG Contribution` c
+        INNER JOIN `tabSHG Member` m ON m.name = c.member
+        WHERE c.docstatus = 1 AND c.status = 'Unpaid' AND c.contribution_date < %(as_of)s
+    """, {"as_of": today()}),
+    ("member contributions", """
+        SELECT name, amount FROM `tabSHG Contribution`
+        WHERE member = %(member)s AND docstatus = 1 AND contribution_date BETWEEN %(from_date)s AND %(to_date)s
+    """, dict(DATE_RANGE, member="_Test Member")),
+    ("member fines", """
+        SELECT name, fine_amount FROM `tabSHG Meeting Fine`
+        WHERE member = %(member)s AND docstatus = 1 AND fine_date BETWEEN %(from_date)s AND %(to_date)s
+    """, dict(DATE_RANGE, member="_Test Member")),
+    ("member repayments", """
+        SELECT name, total_paid FROM `tabSHG Loan Repayment`
+        WHERE member = %(member)s AND docstatus = 1 AND repayment_date BETWEEN %(from_date)s AND %(to_date)s
+    """, dict(DATE_RANGE, member="_Test Member")),
+    ("loan repayments", """
+        SELECT name FROM `tabSHG Loan Repayment`
+        WHERE loan = %(loan)s AND docstatus = 1 ORDER BY posting_date
+    """, {"loan": "_Test Loan"}),
+    ("member payments", """
+        SELECT name FROM `tabSHG Payment Entry`
+        WHERE member = %(member)s AND docstatus = 1 AND payment_date >= %(from_date)s
+    """, dict(DATE_RANGE, member="_Test Member")),
+    ("open installments", """
+        SELECT name, unpaid_balance FROM `tabSHG Loan Repayment Schedule`
+        WHERE parent = %(loan)s AND due_date <= %(as_of)s AND unpaid_balance > 0
+    """, {"loan": "_Test Loan", "as_of": today()}),
+    ("overdue installments", """
+        SELECT name, parent FROM `tabSHG Loan Repayment Schedule`
+        WHERE status = 'Pending' AND due_date < %(as_of)s AND unpaid_balance > 0
+    """, {"as_of": today()}),
+]
+
+class TestQueryPlans(unittest.TestCase):
+    """Query-plan regression checks for the composite index pack."""
+
+    def setUp(self):
+        if frappe.db.db_type != "mariadb":
+            self.skipTest("Query plans are checked on MariaDB only")
+
+    def test_index_pack_installed(self):
+        """Every composite index of the pack exists."""
+        self.assertEqual(get_missing_indexes(), [])
+
+    def test_hot_queries_avoid_full_scans(self):
+        """Hot utility queries are served by an index."""
+        for label, query, values in HOT_QUERIES:
+            with self.subTest(query=label):
+                self.assertEqual(find_full_scans(query, values), [])
+
+    def test_report_pages_avoid_full_scans(self):
+        """First pages of the paginated reports are served by an index."""
+        specs = {
+            "Contribution Summary": contribution_summary_query(frappe._dict(DATE_RANGE)),
+            "SHG Repayments Register": repayments_register_query(frappe._dict(DATE_RANGE)),
+            "Loan Portfolio": loan_portfolio_query(frappe._dict(member="_Test Member")),
+            "Loan Transaction Ledger": loan_transaction_ledger_query(frappe._dict(DATE_RANGE)),
+        }
+        for label, spec in specs.items():
+            with self.subTest(report=label):
+                query, values = build_page_query(spec)
+                self.assertEqual(find_full_scans(query, values), [])
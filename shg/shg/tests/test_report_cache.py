@@ -0,0 +1,64 @@
+import unittest
+from shg.shg.utils import report_cache
+from shg.shg.utils.report_cache import bump_data_version, cache_get, cache_set, cached_report, clear_local_cache
+
+class TestReportCache(unittest.TestCase):
+    """Test cases for the data-version keyed report cache."""
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        clear_local_cache()
+        self.calls = []
+
+        @cached_report("_Test Cached Report", ["SHG Meeting Fine"])
+        def execute(filters=None):
+            self.calls.append(filters)
+            return [{"fieldname": "amount"}], [{"amount": len(self.calls)}]
+
+        self.execute = execute
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        clear_local_cache()
+
+    def test_hits_until_version_changes(self):
+        """Equal filters are served from cache until a source doctype changes."""
+        first = self.execute({"member": "M-1", "status": ""})
+        second = self.execute({"member": "M-1"})
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.calls), 1)
+
+        bump_data_version("SHG Meeting Fine")
+        self.execute({"member": "M-1"})
+        self.assertEqual(len(self.calls), 2)
+
+    def test_cached_results_are_copies(self):
+        """Callers mutating a result do not corrupt the cached entry."""
+        self.execute({})[1].append({"amount": 99})
+        self.assertEqual(len(self.execute({})[1]), 1)
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted once the entry bound is hit."""
+        original = report_cache.REPORT_CACHE_MAX_ENTRIES
+        report_cache.REPORT_CACHE_MAX_ENTRIES = 2
+        try:
+            cache_set("a", 1)
+            cache_set("b", 2)
+            cache_get("a")
+            self.assertEqual(cache_set("c", 3), 1)
+            self.assertIsNone(cache_get("b"))
+            self.assertEqual(cache_get("a"), 1)
+        finally:
+            report_cache.REPORT_CACHE_MAX_ENTRIES = original
+
+    def test_entries_expire_after_ttl(self):
+        """A result is recomputed once its TTL has passed even without a version bump."""
+        original = report_cache.REPORT_CACHE_TTL_SECONDS
+        report_cache.REPORT_CACHE_TTL_SECONDS = 0
+        try:
+            self.execute({})
+            self.execute({})
+            self.assertEqual(len(self.calls), 2)
+            self.assertEqual(report_cache.get_report_cache_stats()["entries"], 1)
+        finally:
+            report_cache.REPORT_CACHE_TTL_SECONDS = original
@@ -0,0 +1,73 @@
+import csv
+import os
+import tempfile
+import frappe
+import unittest
+from shg.shg.report.loan_transaction_ledger.loan_transaction_ledger import get_query
+from shg.shg.utils.bulk_utils import bulk_insert_rows
+from shg.shg.utils.cash_flow_cube import apply_flow_delta
+from shg.shg.utils.report_pager import fetch_page, iter_rows, write_csv
+
+TEST_COMPANY = "_Test Pager Company"
+
+class TestReportPager(unittest.TestCase):
+    """Test cases for keyset pagination and streaming report export."""
+
+    def setUp(self):
+        """Create one cube cell per month to page over."""
+        for month in range(1, 8):
+            apply_flow_delta(TEST_COMPANY, f"2026-{month:02d}-05", "contribution", month * 100)
+        self.spec = {
+            "query": """
+                SELECT name, period, amount FROM `tabSHG Cash Flow Month`
+                WHERE company = %(company)s
+            """,
+            "values": {"company": TEST_COMPANY},
+            "keys": ["period", "name"],
+        }
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        frappe.db.sql("DELETE FROM `tabSHG Cash Flow Month` WHERE company = %s", TEST_COMPANY)
+        frappe.db.sql("DELETE FROM `tabSHG Loan Transaction` WHERE loan = '_T-RP-Loan'")
+        frappe.db.commit()
+
+    def test_pages_follow_cursor(self):
+        """Pages are disjoint, newest first, and the last page has no cursor."""
+        first, cursor = fetch_page(self.spec, page_length=3)
+        second, cursor = fetch_page(self.spec, cursor, page_length=3)
+        third, last_cursor = fetch_page(self.spec, cursor, page_length=3)
+
+        periods = [str(row.period) for row in first + second + third]
+        self.assertEqual(periods, [f"2026-{month:02d}-01" for month in range(7, 0, -1)])
+        self.assertEqual(len(third), 1)
+        self.assertIsNone(last_cursor)
+
+    def test_export_streams_all_rows(self):
+        """The CSV writer receives every row through the chunked iterator."""
+        columns = [{"label": "Period", "fieldname": "period"}, {"label": "Amount", "fieldname": "amount"}]
+        path = os.path.join(tempfile.mkdtemp(), "pager.csv")
+
+        count = write_csv(path, columns, iter_rows(self.spec, chunk_size=2))
+        with open(path, newline="") as f:
+            lines = list(csv.reader(f))
+
+        self.assertEqual(count, 7)
+        self.assertEqual(lines[0], ["Period", "Amount"])
+        self.assertEqual(lines[1][0], "2026-07-01")
+
+    def test_null_keys_are_paged_last(self):
+        """Rows without a posting date come after dated ones and are not dropped between pages."""
+        bulk_insert_rows("SHG Loan Transaction", [{
+            "name": name,
+            "loan": "_T-RP-Loan",
+            "transaction_type": "Repayment",
+            "posting_date": posting_date,
+            "amount": 100,
+            "docstatus": 1,
+        } for name, posting_date in [
+            ("_T-RP-1", "2026-01-05"), ("_T-RP-2", None), ("_T-RP-3", "2026-02-05"), ("_T-RP-4", None),
+        ]])
+
+        rows = list(iter_rows(get_query(frappe._dict(loan="_T-RP-Loan")), chunk_size=1))
+        self.assertEqual([row.name for row in rows], ["_T-RP-3", "_T-RP-1", "_T-RP-4", "_T-RP-2"])
@@ -0,0 +1,89 @@
+import frappe
+import unittest
+from shg.shg.loan_services.reschedule import evaluate_reschedule_scenarios, get_scenario_factors
+from shg.shg.loan_services.schedule import build_flat_rate_schedule, build_reducing_balance_emi_schedule
+from shg.shg.utils.bulk_utils import bulk_insert_rows
+
+class TestRescheduleScenarios(unittest.TestCase):
+    """Test cases for the vectorized reschedule scenario grid."""
+
+    def setUp(self):
+        """Create one disbursed loan whose schedule owes 7,800 of principal."""
+        bulk_insert_rows("SHG Loan", [{
+            "name": "_T-RS-1",
+            "member": "_T-RS-MEMBER",
+            "member_name": "_T-RS-MEMBER",
+            "loan_amount": 20000,
+            "loan_balance": 12000,
+            "interest_rate": 12,
+            "interest_type": "Reducing Balance",
+            "loan_period_months": 12,
+            "status": "Disbursed",
+            "docstatus": 1,
+        }])
+        # Paid, partly paid (interest settled first) and unpaid installments
+        bulk_insert_rows("SHG Loan Repayment Schedule", [{
+            "name": f"_T-RS-1-{idx}",
+            "parent": "_T-RS-1",
+            "parenttype": "SHG Loan",
+            "parentfield": "repayment_schedule",
+            "idx": idx,
+            "installment_no": idx,
+            "principal_component": 4000,
+            "interest_component": interest,
+            "total_payment": 4000 + interest,
+            "amount_paid": paid,
+            "unpaid_balance": 4000 + interest - paid,
+            "status": status,
+            "docstatus": 1,
+        } for idx, interest, paid, status in [(1, 400, 4400, "Paid"), (2, 300, 500, "Partially Paid"), (3, 200, 0, "Pending")]])
+
+    def tearDown(self):
+        """Clean up test data after each test."""
+        frappe.db.sql("DELETE FROM `tabSHG Loan Repayment Schedule` WHERE parent LIKE '_T-RS-%%'")
+        frappe.db.sql("DELETE FROM `tabSHG Loan` WHERE name LIKE '_T-RS-%%'")
+        frappe.db.commit()
+
+    def test_emi_factors_match_schedule_builder(self):
+        """Closed-form EMI and total repayment match the generated EMI schedule."""
+        factors = get_scenario_factors("Reducing Balance", [12, 18], [6, 24], [0])
+        for i, rate in enumerate([12, 18]):
+            for j, tenor in enumerate([6, 24]):
+                schedule = build_reducing_balance_emi_schedule(10000, rate, tenor)
+                self.assertAlmostEqual(factors["emi"][0][i][j] * 10000, schedule[0]["total_due"], places=1)
+                self.assertAlmostEqual(factors["total"][0][i][j] * 10000,
+                                       sum(row["total_due"] for row in schedule), delta=0.5)
+
+    def test_flat_factors_match_schedule_builder(self):
+        """Closed-form flat rate totals match the generated flat rate schedule."""
+        factors = get_scenario_factors("Flat Rate", [10], [12], [0])
+        schedule = build_flat_rate_schedule(10000, 10, 12)
+        self.assertAlmostEqual(factors["total"][0][0][0] * 10000,
+                               sum(row["total_due"] for row in schedule), delta=0.5)
+
+    def test_grace_adds_interest_only_installments(self):
+        """Each grace installment adds one period of interest on the principal."""
+        factors = get_scenario_factors("Reducing Balance", [12], [12], [0, 3])
+        self.assertAlmostEqual(factors["total"][1][0][0] - factors["total"][0][0][0], 0.03, places=9)
+        self.assertEqual(factors["emi"][1][0][0], factors["emi"][0][0][0])
+
+    def test_grid_for_loan(self):
+        """A 20x20 grid is scored from the unpaid principal, not the balance with interest."""
+        rates = [6 + i for i in range(20)]
+        tenors = [6 + 3 * i for i in range(20)]
+        result = evaluate_reschedule_scenarios(["_T-RS-1"], rates, tenors)
+
+        loan = result["loans"]["_T-RS-1"]
+        self.assertEqual(loan["outstanding"], 7800)
+        self.assertEqual(len(loan["emi"][0]), 20)
+        self.assertEqual(len(loan["emi"][0][0]), 20)
+        self.assertAlmostEqual(loan["difference"][0][0][0], loan["total_repayment"][0][0][0] - 7800, places=2)
+
+    def test_results_are_cached_per_loan_state(self):
+        """A repeated grid is served from the cache until the loan's schedule changes."""
+        first = evaluate_reschedule_scenarios("_T-RS-1", "12,18", "12,24")
+        frappe.db.set_value("SHG Loan Repayment Schedule", "_T-RS-1-3",
+                            {"amount_paid": 4200, "unpaid_balance": 0, "status": "Paid"}, update_modified=False)
+        second = evaluate_reschedule_scenarios("_T-RS-1", "12,18", "12,24")
+        self.assertEqual(first["loans"]["_T-RS-1"]["outstanding"], 7800)
+        self.assertEqual(second["loans"]["_T-RS-1"]["outstanding"], 3800)
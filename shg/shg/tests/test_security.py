@@ -0,0 +1,64 @@
+import frappe
+import unittest
+from cryptography.fernet import Fernet
+from shg.utils.security import SHGSecurity, decrypt_member_rows, encrypted_member_fields, is_encrypted_value
+
+class TestSHGSecurity(unittest.TestCase):
+    """Test cases for the cached, versioned cipher in SHGSecurity."""
+
+    def setUp(self):
+        self.security = SHGSecurity()
+
+    def test_encrypt_many_round_trip(self):
+        """Batch encryption round-trips and passes empty values through."""
+        values = ["12345678", "", None, "0712345678"]
+        encrypted = self.security.encrypt_many(values)
+
+        self.assertEqual(encrypted[1], "")
+        self.assertIsNone(encrypted[2])
+        self.assertTrue(is_encrypted_value(encrypted[0]))
+        self.assertTrue(encrypted[0].startswith(f"v{self.security.get_current_key_version()}$"))
+        self.assertEqual(self.security.decrypt_many(encrypted), values)
+
+    def test_legacy_token_uses_version_one(self):
+        """Tokens written before key versioning are decrypted with key version 1."""
+        legacy = Fernet(self.security._get_encryption_key(1).encode()).encrypt(b"12345678").decode()
+
+        self.assertTrue(is_encrypted_value(legacy))
+        self.assertEqual(self.security.decrypt_data(legacy), "12345678")
+
+    def test_plaintext_is_not_encrypted_value(self):
+        """Plain phone and ID numbers are never mistaken for ciphertext."""
+        self.assertFalse(is_encrypted_value("0712345678"))
+        self.assertFalse(is_encrypted_value("12345678"))
+        self.assertFalse(is_encrypted_value(None))
+
+    def test_blind_index_is_deterministic(self):
+        """The same plaintext always hashes alike, unlike its ciphertexts."""
+        self.assertEqual(self.security.blind_index("12345678"), self.security.blind_index("12345678"))
+        self.assertNotEqual(self.security.blind_index("12345678"), self.security.blind_index("12345679"))
+        self.assertIsNone(self.security.blind_index(""))
+
+    def test_member_rows_are_decrypted_on_read(self):
+        """SQL-fetched member rows get plaintext back; plaintext rows are untouched."""
+        rows = [
+            frappe._dict(name="A", phone_number=self.security.encrypt_data("0712345678")),
+            frappe._dict(name="B", phone_number="0722000000"),
+        ]
+        decrypt_member_rows(rows, ["phone_number"])
+        self.assertEqual([row.phone_number for row in rows], ["0712345678", "0722000000"])
+
+    def test_member_fields_encrypted_only_while_written(self):
+        """Fields are ciphertext inside the write block and plaintext again after it."""
+        original = frappe.db.get_single_value("SHG Settings", "enable_data_encryption")
+        frappe.db.set_single_value("SHG Settings", "enable_data_encryption", 1)
+        try:
+            doc = frappe.new_doc("SHG Member")
+            doc.update({"id_number": "12345678", "phone_number": "0712345678"})
+            with encrypted_member_fields(doc):
+                self.assertTrue(is_encrypted_value(doc.id_number))
+                self.assertTrue(is_encrypted_value(doc.phone_number))
+            self.assertEqual((doc.id_number, doc.phone_number), ("12345678", "0712345678"))
+            self.assertEqual(doc.id_number_hash, self.security.blind_index("12345678"))
+        finally:
+            frappe.db.set_single_value("SHG Settings", "enable_data_encryption", original)
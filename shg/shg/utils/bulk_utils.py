@@ -0,0 +1,204 @@
+"""
+Set-based helpers shared by the SHG bulk jobs.
+Keeps chunking, IN-list queries and checkpoints in one place so the
+bulk jobs do not each reinvent them.
+"""
+import json
+import frappe
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def chunked(items: Iterable[Any], size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Any]]:
+    """
+    Yield successive lists of at most ``size`` items.
+
+    Args:
+        items: Any iterable
+        size: Maximum chunk length
+
+    Returns:
+        Iterator over lists
+    """
+    size = max(int(size or DEFAULT_CHUNK_SIZE), 1)
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_name_list(names: Any) -> List[str]:
+    """
+    Normalize a list argument coming from a whitelisted call.
+
+    Accepts a JSON string, a comma/newline separated string or a list and
+    returns a de-duplicated list preserving the original order.
+    """
+    if not names:
+        return []
+
+    if isinstance(names, str):
+        names = names.strip()
+        if names.startswith("["):
+            names = json.loads(names)
+        else:
+            names = names.replace("\n", ",").split(",")
+
+    seen = set()
+    result = []
+    for name in names:
+        name = (name or "").strip() if isinstance(name, str) else name
+        if name and name not in seen:
+            seen.add(name)
+            result.append(name)
+    return result
+
+
+def table_has_column(doctype: str, fieldname: str) -> bool:
+    """Return True when the doctype table exists and carries ``fieldname``."""
+    return bool(frappe.db.table_exists(doctype) and frappe.db.has_column(doctype, fieldname))
+
+
+def get_child_doctypes(doctype: str) -> List[str]:
+    """Return the child table doctypes of ``doctype``."""
+    return [df.options for df in frappe.get_meta(doctype).get_table_fields()]
+
+
+def delete_names(doctype: str, names: List[str]) -> int:
+    """
+    Delete ``names`` of ``doctype`` and their child rows with set-based DELETEs.
+
+    Bypasses controller hooks on purpose; callers are expected to have
+    already decided these rows must go.
+
+    Returns:
+        Number of parent rows deleted
+    """
+    if not names:
+        return 0
+
+    names = tuple(names)
+    for child_doctype in get_child_doctypes(doctype):
+        frappe.db.sql(
+            f"DELETE FROM `tab{child_doctype}` WHERE parenttype = %(parenttype)s AND parent IN %(names)s",
+            {"parenttype": doctype, "names": names},
+        )
+
+    frappe.db.sql(f"DELETE FROM `tab{doctype}` WHERE name IN %(names)s", {"names": names})
+    return len(names)
+
+
+def load_checkpoint(key: str) -> Optional[Dict[str, Any]]:
+    """Load a JSON checkpoint stored with :func:`save_checkpoint`."""
+    value = frappe.db.get_global(key)
+    return json.loads(value) if value else None
+
+
+def save_checkpoint(key: str, state: Dict[str, Any]):
+    """Persist a JSON checkpoint so an interrupted job can resume."""
+    frappe.db.set_global(key, json.dumps(state, default=str))
+
+
+def clear_checkpoint(key: str):
+    """Remove a checkpoint once its job has completed."""
+    frappe.db.set_global(key, None)
+
+
+def bulk_insert_docs(docs: List[Any], chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Insert already named documents and their child rows with multi-row INSERTs.
+
+    Controller hooks do not run; callers must have validated the documents
+    and set everything ``insert()`` would normally derive. Rows are grouped
+    per doctype, so a batch of N loans with M schedule rows each costs two
+    statements per chunk instead of N * (M + 1).
+
+    Returns:
+        Number of parent documents inserted
+    """
+    from frappe.utils import now
+
+    timestamp = now()
+    rows_by_doctype: Dict[str, List[Dict[str, Any]]] = {}
+
+    for doc in docs:
+        for row in [doc] + list(doc.get_all_children()):
+            row.creation = row.creation or timestamp
+            row.modified = row.modified or timestamp
+            row.owner = row.owner or frappe.session.user
+            row.modified_by = row.modified_by or frappe.session.user
+            row.docstatus = row.docstatus or 0
+            if not row.name:
+                row.name = frappe.generate_hash(length=10)
+            rows_by_doctype.setdefault(row.doctype, []).append(row.get_valid_dict(convert_dates_to_str=True))
+
+    for doctype, rows in rows_by_doctype.items():
+        fields = list(rows[0].keys())
+        frappe.db.bulk_insert(
+            doctype,
+            fields,
+            [tuple(row.get(field) for field in fields) for row in rows],
+            chunk_size=chunk_size,
+        )
+
+    return len(docs)
+
+
+def bulk_insert_rows(doctype: str, rows: List[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Insert plain row dicts of one doctype with multi-row INSERTs.
+
+    Lighter than :func:`bulk_insert_docs` for generated data: no document
+    objects are built. Standard columns missing from the rows are filled in
+    and every row must carry the same keys as the first one.
+
+    Returns:
+        Number of rows inserted
+    """
+    from frappe.utils import now
+
+    if not rows:
+        return 0
+
+    defaults = {
+        "creation": now(),
+        "modified": now(),
+        "owner": frappe.session.user,
+        "modified_by": frappe.session.user,
+        "docstatus": 0,
+        "idx": 0,
+    }
+    fields = list(rows[0].keys()) + [field for field in defaults if field not in rows[0]]
+    frappe.db.bulk_insert(
+        doctype,
+        fields,
+        [tuple(row.get(field, defaults.get(field)) for field in fields) for row in rows],
+        chunk_size=chunk_size,
+    )
+    return len(rows)
+
+
+def reserve_series_names(prefix: str, digits: int, count: int) -> List[str]:
+    """
+    Reserve ``count`` consecutive names of a naming series with one UPDATE.
+
+    Equivalent to calling ``make_autoname(prefix + "." + "#" * digits)``
+    ``count`` times, for documents written through :func:`bulk_insert_docs`.
+    """
+    if count <= 0:
+        return []
+
+    current = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name` = %s FOR UPDATE", (prefix,))
+    if current and current[0][0] is not None:
+        start = int(current[0][0]) + 1
+        frappe.db.sql("UPDATE `tabSeries` SET `current` = `current` + %s WHERE `name` = %s", (count, prefix))
+    else:
+        start = 1
+        frappe.db.sql("INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)", (prefix, count))
+
+    return [f"{prefix}{str(i).zfill(digits)}" for i in range(start, start + count)]
@@ -0,0 +1,204 @@
+"""
+Monthly cash-flow cube for the SHG financial reports and charts.
+
+``SHG Cash Flow Month`` holds one row per company, month and flow type with
+the summed amount and document count. Submit/cancel events move the cells
+incrementally and :func:`rebuild_cube` re-derives them from the transaction
+tables for backfills, so reports read a few hundred rows regardless of how
+much history the group has.
+"""
+import frappe
+from frappe import _
+from frappe.utils import add_months, cint, flt, getdate, now, today
+from typing import Any, Dict, List, Optional
+
+from shg.shg.utils.bulk_utils import table_has_column
+from shg.shg.utils.company_utils import get_default_company
+from shg.shg.utils.instrumentation import instrumented
+
+# flow type -> (source doctype, date field, amount field)
+FLOW_SOURCES = {
+    "contribution": ("SHG Contribution", "contribution_date", "amount"),
+    "loan_disbursement": ("SHG Loan", "disbursement_date", "loan_amount"),
+    "loan_repayment": ("SHG Loan Repayment", "repayment_date", "total_paid"),
+    "loan_interest": ("SHG Loan Repayment", "repayment_date", "interest_amount"),
+    "payment": ("SHG Payment Entry", "payment_date", "amount"),
+}
+
+
+def month_start(day) -> Any:
+    """First day of the month containing ``day``"""
+    return getdate(day).replace(day=1)
+
+
+# ---------------------------------------------------
+# Incremental updates (doc_events)
+# ---------------------------------------------------
+@instrumented()
+def on_submit(doc, method=None):
+    """Add a submitted document's cash flows to the cube"""
+    _apply_document(doc, 1)
+
+
+@instrumented()
+def on_cancel(doc, method=None):
+    """Remove a cancelled document's cash flows from the cube"""
+    _apply_document(doc, -1)
+
+
+def _apply_document(doc, sign):
+    try:
+        company = doc.get("company") or get_default_company()
+        if not company:
+            return
+        for flow_type, (doctype, date_field, amount_field) in FLOW_SOURCES.items():
+            if doctype != doc.doctype:
+                continue
+            flow_date = doc.get(date_field) or doc.get("posting_date") or today()
+            apply_flow_delta(company, flow_date, flow_type, sign * flt(doc.get(amount_field)), sign)
+    except Exception:
+        # rebuild_cube repairs any missed delta; never block a submit on reporting
+        frappe.log_error(frappe.get_traceback(), f"Cash flow cube update failed for {doc.doctype} {doc.name}")
+
+
+def apply_flow_delta(company: str, flow_date, flow_type: str, delta: float, count: int = 1):
+    """Atomically add ``delta`` (and ``count``) to one cube cell"""
+    period = month_start(flow_date)
+    timestamp = now()
+    frappe.db.sql("""
+        INSERT INTO `tabSHG Cash Flow Month`
+            (name, company, period, flow_type, amount, count, creation, modified, owner, modified_by, docstatus, idx)
+        VALUES
+            (%(name)s, %(company)s, %(period)s, %(flow_type)s, %(delta)s, %(count)s,
+             %(now)s, %(now)s, %(user)s, %(user)s, 0, 0)
+        ON DUPLICATE KEY UPDATE
+            amount = amount + VALUES(amount),
+            count = count + VALUES(count),
+            modified = VALUES(modified)
+    """, {
+        "name": f"{company}|{period}|{flow_type}",
+        "company": company,
+        "period": period,
+        "flow_type": flow_type,
+        "delta": flt(delta),
+        "count": cint(count),
+        "now": timestamp,
+        "user": frappe.session.user,
+    })
+
+
+# ---------------------------------------------------
+# Rebuild
+# ---------------------------------------------------
+def rebuild_cube(from_date=None, flow_types: Optional[List[str]] = None):
+    """
+    Re-derive cube cells from the source tables
+
+    Args:
+        from_date: First month to rebuild; the whole history when omitted
+        flow_types: Flow types to rebuild, all of them by default
+    """
+    timestamp = now()
+    default_company = get_default_company() or ""
+    from_month = month_start(from_date) if from_date else None
+
+    for flow_type in flow_types or FLOW_SOURCES:
+        doctype, date_field, amount_field = FLOW_SOURCES[flow_type]
+        date_expr = f"`{date_field}`"
+        if table_has_column(doctype, "posting_date"):
+            date_expr = f"COALESCE(`{date_field}`, `posting_date`)"
+        company_expr = "COALESCE(`company`, %(default_company)s)" if table_has_column(doctype, "company") else "%(default_company)s"
+        period_expr = f"DATE_FORMAT({date_expr}, '%%Y-%%m-01')"
+
+        values = {"flow_type": flow_type, "from_month": from_month, "default_company": default_company,
+                  "now": timestamp, "user": frappe.session.user}
+
+        frappe.db.sql(f"""
+            DELETE FROM `tabSHG Cash Flow Month`
+            WHERE flow_type = %(flow_type)s {"AND period >= %(from_month)s" if from_month else ""}
+        """, values)
+        frappe.db.sql(f"""
+            INSERT INTO `tabSHG Cash Flow Month`
+                (name, company, period, flow_type, amount, count, creation, modified, owner, modified_by, docstatus, idx)
+            SELECT
+                CONCAT(company, '|', period, '|', %(flow_type)s), company, period, %(flow_type)s,
+                amount, count, %(now)s, %(now)s, %(user)s, %(user)s, 0, 0
+            FROM (
+                SELECT {company_expr} AS company, {period_expr} AS period,
+                    COALESCE(SUM(`{amount_field}`), 0) AS amount, COUNT(*) AS count
+                FROM `tab{doctype}`
+                WHERE docstatus = 1 AND {date_expr} IS NOT NULL
+                {f"AND {date_expr} >= %(from_month)s" if from_month else ""}
+                GROUP BY {company_expr}, {period_expr}
+            ) cells
+            WHERE company != ''
+        """, values)
+
+
+@frappe.whitelist()
+def rebuild_cash_flow_cube(from_date=None):
+    """Queue a rebuild of the cash-flow cube (backfill)"""
+    frappe.only_for(["System Manager", "SHG Admin"])
+    frappe.enqueue("shg.shg.utils.cash_flow_cube.run_rebuild", queue="long", timeout=3600, from_date=from_date)
+    return {"status": "queued"}
+
+
+def run_rebuild(from_date=None):
+    """Background job behind :func:`rebuild_cash_flow_cube`"""
+    rebuild_cube(from_date=from_date)
+    frappe.db.commit()
+
+
+# ---------------------------------------------------
+# Reads
+# ---------------------------------------------------
+def get_monthly_flows(flow_types: Optional[List[str]] = None, from_date=None, to_date=None,
+                      company: Optional[str] = None) -> Dict[Any, Dict[str, float]]:
+    """
+    Read cube cells summed over companies unless ``company`` is given
+
+    Returns:
+        Ordered dictionary of month start date to ``{flow_type: amount}``
+    """
+    conditions = []
+    values = {}
+    if flow_types:
+        conditions.append("flow_type IN %(flow_types)s")
+        values["flow_types"] = tuple(flow_types)
+    if from_date:
+        conditions.append("period >= %(from_month)s")
+        values["from_month"] = month_start(from_date)
+    if to_date:
+        conditions.append("period <= %(to_month)s")
+        values["to_month"] = month_start(to_date)
+    if company:
+        conditions.append("company = %(company)s")
+        values["company"] = company
+
+    rows = frappe.db.sql(f"""
+        SELECT period, flow_type, SUM(amount) AS amount
+        FROM `tabSHG Cash Flow Month`
+        {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        GROUP BY period, flow_type
+        ORDER BY period
+    """, values, as_dict=True)
+
+    months = {}
+    for row in rows:
+        months.setdefault(getdate(row.period), {})[row.flow_type] = flt(row.amount)
+    return months
+
+
+def get_flow_series(flow_type: str, from_date, to_date, company: Optional[str] = None) -> Dict[str, Any]:
+    """Chart labels/values for one flow type with a point for every month in range"""
+    if flow_type not in FLOW_SOURCES:
+        frappe.throw(_("Unknown cash flow type {0}").format(flow_type))
+
+    months = get_monthly_flows([flow_type], from_date, to_date, company)
+    labels, values = [], []
+    current, end = month_start(from_date), month_start(to_date)
+    while current <= end:
+        labels.append(current.strftime("%Y-%m"))
+        values.append(flt(months.get(current, {}).get(flow_type), 2))
+        current = add_months(current, 1)
+    return {"labels": labels, "values": values}
@@ -0,0 +1,232 @@
+"""
+Projected repayment cash inflows of the loan portfolio.
+
+:func:`project_cash_inflows` answers "how much repayment cash do we expect
+per week or month over the next N months". Unpaid schedule rows of all open
+loans are summed per due date in one query, so the portfolio's schedule rows
+never leave the database; the day totals are then binned into periods with a
+sorted boundary search. Overdue amounts are expected in the first period.
+
+With ``apply_haircuts`` each amount is multiplied by the historical
+collection rate of its aging bucket (see :func:`get_collection_rates`),
+giving an expected inflow next to the scheduled one.
+"""
+from bisect import bisect_right
+import frappe
+from frappe import _
+from frappe.utils import add_days, add_months, cint, flt, getdate, today
+from typing import Any, Dict, List, Optional, Tuple
+
+PROJECTION_LOAN_STATUSES = ("Disbursed", "Defaulted")
+DEFAULT_HORIZON_MONTHS = 12
+DEFAULT_LOOKBACK_MONTHS = 12
+# Schedule rows count towards the collection rates only once they are this
+# many days past due, so late payments had time to arrive
+HAIRCUT_SEASONING_DAYS = 90
+
+# (key, label, first day overdue); "current" covers rows not yet due
+AGING_BUCKETS = [
+    ("current", "Current", None),
+    ("days_1_30", "1-30 Days", 1),
+    ("days_31_60", "31-60 Days", 31),
+    ("days_61_90", "61-90 Days", 61),
+    ("days_90_plus", "90+ Days", 91),
+]
+
+
+def get_aging_bucket(days_overdue: int) -> int:
+    """Index into :data:`AGING_BUCKETS` of an amount ``days_overdue`` days past due"""
+    bucket = 0
+    for index, (_key, _label, first_day) in enumerate(AGING_BUCKETS):
+        if first_day is not None and days_overdue >= first_day:
+            bucket = index
+    return bucket
+
+
+# ---------------------------------------------------
+# Periods
+# ---------------------------------------------------
+def get_period_starts(period: str, start, horizon_months: int) -> Tuple[List[Any], Any]:
+    """
+    Start dates of the projection periods and the end of the horizon
+
+    Weekly periods start on Monday and monthly periods on the first of the
+    month; the first period starts at the beginning of the current one.
+    """
+    start = getdate(start)
+    end = add_months(start, cint(horizon_months))
+    if period == "Weekly":
+        current = add_days(start, -start.weekday())
+        step = lambda day: add_days(day, 7)
+    else:
+        current = start.replace(day=1)
+        step = lambda day: add_months(day, 1)
+
+    starts = []
+    while current < end:
+        starts.append(current)
+        current = step(current)
+    return starts, end
+
+
+# ---------------------------------------------------
+# Collection rates
+# ---------------------------------------------------
+def get_collection_rates(lookback_months: int = DEFAULT_LOOKBACK_MONTHS,
+                         company: Optional[str] = None, as_of=None) -> List[float]:
+    """
+    Historical collection rate of each aging bucket
+
+    Schedule rows that fell due in the lookback window are grouped by how
+    late their payment arrived. The rate of a bucket is the share of the
+    amount still unpaid on entering the bucket that was collected afterwards,
+    so an amount 45 days overdue is discounted by what happened to amounts
+    that were 31-60 days overdue before.
+
+    Returns:
+        One rate per :data:`AGING_BUCKETS` entry; 1.0 where there is no history
+    """
+    window_end = add_days(getdate(as_of or today()), -HAIRCUT_SEASONING_DAYS)
+    window_start = add_months(window_end, -cint(lookback_months or DEFAULT_LOOKBACK_MONTHS))
+
+    lateness = "GREATEST(DATEDIFF(IFNULL(s.actual_payment_date, s.due_date), s.due_date), 0)"
+    paid_columns = []
+    for index, (key, _label, first_day) in enumerate(AGING_BUCKETS):
+        last_day = AGING_BUCKETS[index + 1][2] - 1 if index + 1 < len(AGING_BUCKETS) else None
+        condition = f"{lateness} >= {first_day or 0}"
+        if last_day is not None:
+            condition += f" AND {lateness} <= {last_day}"
+        paid_columns.append(f"SUM(CASE WHEN {condition} THEN s.amount_paid ELSE 0 END) AS paid_{key}")
+
+    conditions, values = _get_loan_conditions(company)
+    values.update({"window_start": window_start, "window_end": window_end})
+    totals = frappe.db.sql(f"""
+        SELECT
+            SUM(IFNULL(s.amount_paid, 0) + IFNULL(s.unpaid_balance, 0)) AS due,
+            {", ".join(paid_columns)}
+        FROM `tabSHG Loan Repayment Schedule` s
+        INNER JOIN `tabSHG Loan` l ON l.name = s.parent AND s.parenttype = 'SHG Loan'
+        WHERE s.due_date >= %(window_start)s AND s.due_date < %(window_end)s
+            {conditions}
+    """, values, as_dict=True)[0]
+
+    due = flt(totals.due)
+    paid = [flt(totals[f"paid_{key}"]) for key, _label, _first_day in AGING_BUCKETS]
+    rates = []
+    for index in range(len(AGING_BUCKETS)):
+        remaining = due - sum(paid[:index])
+        rates.append(min(sum(paid[index:]) / remaining, 1.0) if remaining > 0 else 1.0)
+    return rates
+
+
+# ---------------------------------------------------
+# Projection
+# ---------------------------------------------------
+def _get_loan_conditions(company: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+    conditions = " AND l.docstatus = 1 AND l.status IN %(statuses)s"
+    values = {"statuses": PROJECTION_LOAN_STATUSES}
+    if company:
+        conditions += " AND l.company = %(company)s"
+        values["company"] = company
+    return conditions, values
+
+
+def get_unpaid_by_due_date(end, company: Optional[str] = None) -> List[Tuple]:
+    """
+    Unpaid schedule amounts of open loans per due date up to ``end``
+
+    Returns:
+        ``(due_date, unpaid, principal, interest, installments)`` tuples; the
+        principal and interest shares are pro-rated on the unpaid balance
+    """
+    conditions, values = _get_loan_conditions(company)
+    values["end"] = end
+    return frappe.db.sql(f"""
+        SELECT
+            s.due_date,
+            SUM(s.unpaid_balance),
+            SUM(s.unpaid_balance * IFNULL(s.principal_component, 0)
+                / NULLIF(IFNULL(s.principal_component, 0) + IFNULL(s.interest_component, 0), 0)),
+            SUM(s.unpaid_balance * IFNULL(s.interest_component, 0)
+                / NULLIF(IFNULL(s.principal_component, 0) + IFNULL(s.interest_component, 0), 0)),
+            COUNT(*)
+        FROM `tabSHG Loan Repayment Schedule` s
+        INNER JOIN `tabSHG Loan` l ON l.name = s.parent AND s.parenttype = 'SHG Loan'
+        WHERE s.unpaid_balance > 0 AND s.due_date < %(end)s
+            {conditions}
+        GROUP BY s.due_date
+    """, values)
+
+
+def project_cash_inflows(
+    period: str = "Monthly",
+    horizon_months: int = DEFAULT_HORIZON_MONTHS,
+    company: Optional[str] = None,
+    apply_haircuts: bool = False,
+    lookback_months: int = DEFAULT_LOOKBACK_MONTHS,
+    as_of=None
+) -> Dict[str, Any]:
+    """
+    Scheduled and expected repayment inflows per period
+
+    Args:
+        period: "Weekly" or "Monthly"
+        horizon_months: Number of months to project
+        company: Optional company filter
+        apply_haircuts: Discount amounts by their historical collection rate
+        lookback_months: History used for the collection rates
+        as_of: Projection date, defaults to today
+
+    Returns:
+        ``periods`` (one dict per period with scheduled, overdue, principal,
+        interest, expected and installments) and the ``collection_rates`` used
+    """
+    as_of = getdate(as_of or today())
+    starts, end = get_period_starts(period, as_of, horizon_months or DEFAULT_HORIZON_MONTHS)
+    rates = get_collection_rates(lookback_months, company, as_of) if apply_haircuts else [1.0] * len(AGING_BUCKETS)
+
+    periods = [{
+        "period_start": start,
+        "period_end": add_days(starts[index + 1], -1) if index + 1 < len(starts) else add_days(end, -1),
+        "scheduled": 0.0,
+        "overdue": 0.0,
+        "principal": 0.0,
+        "interest": 0.0,
+        "expected": 0.0,
+        "installments": 0,
+    } for index, start in enumerate(starts)]
+    if not periods:
+        return {"periods": [], "collection_rates": rates}
+
+    for due_date, unpaid, principal, interest, installments in get_unpaid_by_due_date(end, company):
+        due_date = getdate(due_date)
+        if due_date < as_of:
+            bucket = periods[0]
+            bucket["overdue"] += flt(unpaid)
+            rate = rates[get_aging_bucket((as_of - due_date).days)]
+        else:
+            bucket = periods[max(bisect_right(starts, due_date) - 1, 0)]
+            rate = rates[0]
+        bucket["scheduled"] += flt(unpaid)
+        bucket["principal"] += flt(principal)
+        bucket["interest"] += flt(interest)
+        bucket["expected"] += flt(unpaid) * rate
+        bucket["installments"] += cint(installments)
+
+    for row in periods:
+        for key in ("scheduled", "overdue", "principal", "interest", "expected"):
+            row[key] = flt(row[key], 2)
+    return {"periods": periods, "collection_rates": rates}
+
+
+def get_projection_chart(projection: Dict[str, Any], period: str = "Monthly") -> Dict[str, Any]:
+    """Bar chart data of a projection: scheduled against expected inflows"""
+    date_format = "%d %b" if period == "Weekly" else "%b %Y"
+    periods = projection["periods"]
+    return {
+        "labels": [row["period_start"].strftime(date_format) for row in periods],
+        "datasets": [
+            {"name": _("Scheduled"), "values": [row["scheduled"] for row in periods]},
+            {"name": _("Expected"), "values": [row["expected"] for row in periods]},
+        ],
+    }
@@ -1,4 +1,5 @@
 import frappe
+from shg.shg.utils.instrumentation import instrumented
 
 def get_default_company():
     """Fetch the default company from SHG Settings (safe fallback)."""
@@ -10,6 +11,7 @@ def get_default_company():
         frappe.log_error(f"Error fetching default company: {e}", "get_default_company")
     return None
 
+@instrumented()
 def ensure_company_field(doc, method=None):
     """Global hook to attach company from SHG Settings if missing."""
     if not getattr(doc, "company", None):
@@ -0,0 +1,446 @@
+"""
+Bulk contribution import from CSV.
+
+Historical or offline-collected contributions are loaded without going
+through ``SHGContribution.validate`` row by row:
+
+1. :func:`validate_rows` checks every row with a handful of set queries:
+   unknown members and contribution types, duplicate member + date,
+   reused invoices and locked posting periods, both against the database
+   and within the file itself. Rejects are reported before anything is
+   written.
+2. :func:`insert_contributions` writes the accepted rows as submitted
+   contributions with multi-row INSERTs, one chunk per transaction. Each
+   chunk is posted to the ledger with one Journal Entry per company and
+   contribution date instead of one per contribution.
+3. The member ledger, cash-flow cube, KPI series and member summaries of
+   the imported members are then rebuilt set-based.
+
+:func:`preview_contribution_import` runs step 1 only;
+:func:`import_contributions` reports the rejects and queues steps 2 and 3.
+"""
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, getdate, now
+from typing import Any, Dict, List, Tuple
+
+from shg.shg.utils.bulk_utils import bulk_insert_rows, chunked, reserve_series_names
+
+CONTRIBUTION_SERIES_PREFIX = "CONT-"
+CONTRIBUTION_SERIES_DIGITS = 4
+IMPORT_CHUNK_SIZE = 500
+
+# Further columns read when present: contribution_type, expected_amount,
+# amount_paid, posting_date, payment_method, reference_number,
+# invoice_reference, company and notes
+REQUIRED_COLUMNS = ("member", "contribution_date", "amount")
+
+# Keys of an accepted row that are not SHG Contribution columns; company
+# only groups the Journal Entries
+NON_FIELD_KEYS = ("row_no", "company")
+
+
+# ---------------------------------------------------
+# Parsing
+# ---------------------------------------------------
+def read_import_file(file_url: str) -> List[Dict[str, Any]]:
+    """
+    Rows of an uploaded CSV as dicts keyed by the lower-cased header
+
+    Each row carries its 1-based line number in the file as ``row_no``.
+    """
+    from frappe.utils.csvutils import read_csv_content
+
+    content = frappe.get_doc("File", {"file_url": file_url}).get_content()
+    lines = read_csv_content(content)
+    if not lines:
+        frappe.throw(_("The import file is empty."))
+
+    header = [frappe.scrub(str(column or "").strip()) for column in lines[0]]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        frappe.throw(_("The import file is missing the columns: {0}").format(", ".join(missing)))
+
+    rows = []
+    for row_no, line in enumerate(lines[1:], start=2):
+        if not any(str(value or "").strip() for value in line):
+            continue
+        row = {column: (str(value).strip() if value is not None else "") for column, value in zip(header, line)}
+        row["row_no"] = row_no
+        rows.append(row)
+    return rows
+
+
+# ---------------------------------------------------
+# Validation
+# ---------------------------------------------------
+def _existing(query: str, values: Dict[str, Any]) -> set:
+    return {tuple(row) if len(row) > 1 else row[0] for row in frappe.db.sql(query, values)}
+
+
+def _get_lock_checker(settings):
+    """Posting lock test of ``posting_locks.validate_posting_date`` with the settings read once"""
+    if not settings.enable_posting_lock:
+        return lambda day: None
+
+    locked_until = getdate(settings.posting_locked_until) if settings.posting_locked_until else None
+    locked_months = {
+        (row.month, cint(row.year)) for row in settings.locked_months or [] if row.status == "Locked"
+    }
+
+    def check(day):
+        if locked_until and day <= locked_until:
+            return _("Posting date {0} is before the locked date {1}").format(day, locked_until)
+        if (day.strftime("%B"), day.year) in locked_months:
+            return _("The month of {0} {1} is locked for posting").format(day.strftime("%B"), day.year)
+        return None
+
+    return check
+
+
+def _get_expected_amount(row: Dict[str, Any], contribution_type: str, type_defaults: Dict[str, float], settings) -> float:
+    """Expected amount as ``SHGContribution.set_contribution_details`` derives it"""
+    if flt(row.get("expected_amount")) > 0:
+        return flt(row["expected_amount"])
+    if flt(type_defaults.get(contribution_type)) > 0:
+        return flt(type_defaults[contribution_type])
+    multiplier = {"Regular Weekly": 1, "Regular Monthly": 4, "Bi-Monthly": 8}.get(contribution_type)
+    if multiplier and flt(settings.default_contribution_amount) > 0:
+        return flt(settings.default_contribution_amount) * multiplier
+    return flt(row.get("amount"))
+
+
+def validate_rows(rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Check every import row with set queries and build the contribution rows
+
+    Applies the checks of ``SHGContribution.validate``: positive amount,
+    known member and contribution type, one contribution per member and
+    date, one contribution per invoice and open posting period.
+
+    Returns:
+        Tuple of the accepted contribution rows and the rejects
+        (``{"row_no", "member", "errors"}``)
+    """
+    from shg.shg.utils.company_utils import get_default_company
+
+    settings = frappe.get_cached_doc("SHG Settings")
+    default_company = get_default_company()
+    check_lock = _get_lock_checker(settings)
+
+    members = {row["member"] for row in rows if row.get("member")}
+    invoices = {row["invoice_reference"] for row in rows if row.get("invoice_reference")}
+
+    member_names = dict(frappe.db.sql("""
+        SELECT name, member_name FROM `tabSHG Member` WHERE name IN %(members)s AND docstatus < 2
+    """, {"members": tuple(members) or ("",)}))
+    type_defaults = dict(frappe.db.sql("SELECT name, default_amount FROM `tabSHG Contribution Type`"))
+    default_type = settings.get("default_contribution_type")
+    if default_type not in type_defaults:
+        default_type = "Special Assessment" if "Special Assessment" in type_defaults else "Regular Weekly"
+
+    contributed = _existing("""
+        SELECT member, contribution_date FROM `tabSHG Contribution`
+        WHERE member IN %(members)s AND docstatus = 1
+    """, {"members": tuple(member_names) or ("",)})
+    known_invoices, used_invoices = set(), set()
+    if invoices:
+        known_invoices = _existing("""
+            SELECT name FROM `tabSHG Contribution Invoice` WHERE name IN %(invoices)s
+        """, {"invoices": tuple(invoices)})
+        used_invoices = _existing("""
+            SELECT invoice_reference FROM `tabSHG Contribution`
+            WHERE invoice_reference IN %(invoices)s AND docstatus != 2
+        """, {"invoices": tuple(invoices)})
+
+    accepted, rejected = [], []
+    for row in rows:
+        errors = []
+        member = row.get("member")
+        amount = flt(row.get("amount"))
+        contribution_type = row.get("contribution_type") or "Regular Weekly"
+        if contribution_type == "Invoice Payment":
+            contribution_type = default_type
+
+        try:
+            # getdate() of an empty value is today, so a missing date must fail here
+            if not row.get("contribution_date"):
+                raise ValueError
+            contribution_date = getdate(row.get("contribution_date"))
+            posting_date = getdate(row.get("posting_date") or contribution_date)
+        except Exception:
+            contribution_date = posting_date = None
+            errors.append(_("Invalid date"))
+
+        if amount <= 0:
+            errors.append(_("Contribution amount must be greater than zero"))
+        if member not in member_names:
+            errors.append(_("Unknown member {0}").format(member or ""))
+        if contribution_type not in type_defaults:
+            errors.append(_("Invalid contribution type: {0}").format(contribution_type))
+        if contribution_date:
+            if (member, contribution_date) in contributed:
+                errors.append(_("A contribution already exists for this member on this date"))
+            lock_error = check_lock(posting_date)
+            if lock_error:
+                errors.append(lock_error)
+
+        invoice = row.get("invoice_reference")
+        if invoice:
+            if invoice not in known_invoices:
+                errors.append(_("Unknown contribution invoice {0}").format(invoice))
+            elif invoice in used_invoices:
+                errors.append(_("A contribution already exists for invoice {0}").format(invoice))
+
+        if errors:
+            rejected.append({"row_no": row.get("row_no"), "member": member, "errors": errors})
+            continue
+
+        # Later rows of the file must not repeat an accepted member/date or invoice
+        contributed.add((member, contribution_date))
+        if invoice:
+            used_invoices.add(invoice)
+
+        expected = round(_get_expected_amount(row, contribution_type, type_defaults, settings), 2)
+        paid = round(max(flt(row.get("amount_paid")), 0), 2)
+        unpaid = round(max(0, expected - paid), 2)
+        accepted.append({
+            "row_no": row.get("row_no"),
+            "member": member,
+            "member_name": member_names[member],
+            "contribution_date": contribution_date,
+            "posting_date": posting_date,
+            "contribution_type": contribution_type,
+            "contribution_type_link": contribution_type,
+            "amount": round(amount, 2),
+            "expected_amount": expected,
+            "amount_paid": paid,
+            "unpaid_amount": unpaid,
+            "status": "Paid" if unpaid <= 0 else "Partially Paid" if paid > 0 else "Unpaid",
+            "payment_method": row.get("payment_method") or None,
+            "reference_number": row.get("reference_number") or None,
+            "invoice_reference": invoice or None,
+            "company": row.get("company") or default_company,
+            "notes": row.get("notes") or None,
+        })
+    return accepted, rejected
+
+
+# ---------------------------------------------------
+# Insert and GL posting
+# ---------------------------------------------------
+def _get_income_account(company: str) -> str:
+    """Contributions income account, resolved as ``SHGContribution.post_to_ledger`` does"""
+    from shg.shg.utils.account_utils import get_or_create_account
+
+    abbr = frappe.db.get_value("Company", company, "abbr")
+    income_parent = (
+        frappe.db.get_value("Account", {"account_name": "Income", "company": company}, "name")
+        or frappe.db.get_value("Account", {"account_name": f"Income - {abbr}", "company": company}, "name")
+    )
+    return get_or_create_account(company, f"SHG Contributions - {abbr}", income_parent, "Income Account", "Income")
+
+
+def _get_member_accounts(members: List[str], company: str) -> Dict[str, str]:
+    """Member ledger accounts resolved with one query; missing ones are created"""
+    from shg.shg.utils.account_utils import get_account
+
+    abbr = frappe.db.get_value("Company", company, "abbr")
+    existing = dict(frappe.db.sql("""
+        SELECT account_name, name FROM `tabAccount`
+        WHERE company = %(company)s AND account_name IN %(names)s
+    """, {"company": company, "names": tuple(f"{member} - {abbr}" for member in members)}))
+    return {
+        member: existing.get(f"{member} - {abbr}") or get_account(company, "members", member)
+        for member in members
+    }
+
+
+def post_contribution_vouchers(rows: List[Dict[str, Any]], context: Dict[str, Any]) -> Dict[Tuple, str]:
+    """
+    Post ``rows`` with one Journal Entry per company and contribution date
+
+    Each entry debits the member accounts, one line per contribution, and
+    credits the contributions income account with the total.
+
+    Returns:
+        Journal Entry name keyed by ``(company, contribution_date)``
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["company"], row["contribution_date"]), []).append(row)
+
+    vouchers = {}
+    for (company, contribution_date), group in groups.items():
+        if company not in context["income_accounts"]:
+            context["income_accounts"][company] = _get_income_account(company)
+            context["member_accounts"][company] = {}
+        member_accounts = context["member_accounts"][company]
+        missing = list({row["member"] for row in group if row["member"] not in member_accounts})
+        if missing:
+            member_accounts.update(_get_member_accounts(missing, company))
+
+        je = frappe.new_doc("Journal Entry")
+        je.voucher_type = "Journal Entry"
+        je.company = company
+        je.posting_date = contribution_date
+        je.remark = _("Imported contributions of {0}").format(contribution_date)
+        for row in group:
+            customer = context["customers"].get(row["member"])
+            je.append("accounts", {
+                "account": member_accounts[row["member"]],
+                "party_type": "Customer" if customer else None,
+                "party": customer,
+                "debit_in_account_currency": row["amount"],
+                "credit_in_account_currency": 0,
+                "company": company,
+            })
+        je.append("accounts", {
+            "account": context["income_accounts"][company],
+            "debit_in_account_currency": 0,
+            "credit_in_account_currency": flt(sum(row["amount"] for row in group), 2),
+            "company": company,
+        })
+        je.insert(ignore_permissions=True)
+        je.submit()
+        vouchers[(company, contribution_date)] = je.name
+    return vouchers
+
+
+def insert_contributions(rows: List[Dict[str, Any]], post_to_gl: bool = True,
+                         chunk_size: int = IMPORT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Insert validated rows as submitted contributions, one transaction per chunk
+
+    A failing chunk is rolled back and reported; the chunks before it stay
+    committed.
+
+    Returns:
+        Number of contributions inserted and the failed chunks
+    """
+    rows = sorted(rows, key=lambda row: (row["company"] or "", row["contribution_date"], row["member"]))
+    context = {
+        "income_accounts": {},
+        "member_accounts": {},
+        "customers": dict(frappe.db.sql("""
+            SELECT name, customer FROM `tabSHG Member` WHERE name IN %(members)s
+        """, {"members": tuple({row["member"] for row in rows}) or ("",)})),
+    }
+
+    inserted, failed, imported = 0, [], []
+    for chunk in chunked(rows, chunk_size):
+        try:
+            vouchers = post_contribution_vouchers(chunk, context) if post_to_gl else {}
+            names = reserve_series_names(CONTRIBUTION_SERIES_PREFIX, CONTRIBUTION_SERIES_DIGITS, len(chunk))
+            posted_on = now()
+            bulk_insert_rows("SHG Contribution", [{
+                **{key: value for key, value in row.items() if key not in NON_FIELD_KEYS},
+                "name": name,
+                "naming_series": f"{CONTRIBUTION_SERIES_PREFIX}.{'#' * CONTRIBUTION_SERIES_DIGITS}",
+                "voucher_type": "Contribution Entry",
+                "journal_entry": vouchers.get((row["company"], row["contribution_date"])),
+                "posted_to_gl": 1 if post_to_gl else 0,
+                "posted_on": posted_on if post_to_gl else None,
+                "docstatus": 1,
+            } for name, row in zip(names, chunk)])
+            frappe.db.commit()
+            inserted += len(chunk)
+            imported.extend(chunk)
+        except Exception as e:
+            frappe.db.rollback()
+            frappe.log_error(frappe.get_traceback(), "Contribution import chunk failed")
+            failed.append({"rows": [row["row_no"] for row in chunk], "error": str(e)})
+
+        frappe.publish_progress(
+            100 * (inserted + sum(len(chunk["rows"]) for chunk in failed)) / len(rows),
+            title=_("Contribution Import"),
+            description=_("Imported {0} of {1} contributions").format(inserted, len(rows)),
+        )
+
+    if imported:
+        refresh_derived_data(imported)
+    return {"inserted": inserted, "failed": failed}
+
+
+def refresh_derived_data(rows: List[Dict[str, Any]]):
+    """Rebuild what the skipped submit hooks maintain, for the imported members and dates"""
+    from shg.shg.utils.cash_flow_cube import rebuild_cube
+    from shg.shg.utils.kpi_snapshots import rebuild_series, reconcile_snapshots
+    from shg.shg.utils.member_ledger import rebuild_ledger
+    from shg.shg.utils.report_cache import bump_data_version
+
+    members = sorted({row["member"] for row in rows})
+    from_date = min(row["contribution_date"] for row in rows)
+
+    rebuild_ledger(members)
+    rebuild_cube(from_date=from_date, flow_types=["contribution"])
+    reconcile_snapshots()
+    rebuild_series(from_date=from_date, kpis=["contributions"])
+    for member in members:
+        frappe.get_doc("SHG Member", member).update_financial_summary()
+    frappe.db.commit()
+    bump_data_version("SHG Contribution")
+
+
+# ---------------------------------------------------
+# API
+# ---------------------------------------------------
+@frappe.whitelist()
+def preview_contribution_import(file_url: str) -> Dict[str, Any]:
+    """
+    Dry run: validate an uploaded CSV and report its rejects
+
+    Returns:
+        Row counts, the total amount to import and the rejected rows
+    """
+    frappe.only_for(["System Manager", "SHG Admin"])
+    rows = read_import_file(file_url)
+    accepted, rejected = validate_rows(rows)
+    return {
+        "rows": len(rows),
+        "accepted": len(accepted),
+        "total_amount": flt(sum(row["amount"] for row in accepted), 2),
+        "rejected": rejected,
+    }
+
+
+def run_contribution_import(rows: List[Dict[str, Any]], post_to_gl: bool = True):
+    """Background job behind :func:`import_contributions`"""
+    for row in rows:
+        row["contribution_date"] = getdate(row["contribution_date"])
+        row["posting_date"] = getdate(row["posting_date"])
+    return insert_contributions(rows, post_to_gl=post_to_gl)
+
+
+@frappe.whitelist()
+def import_contributions(file_url: str, post_to_gl: int = 1, allow_rejects: int = 0) -> Dict[str, Any]:
+    """
+    Validate an uploaded CSV and queue the import of its accepted rows
+
+    Args:
+        file_url: URL of the uploaded CSV file
+        post_to_gl: Post the contributions to the ledger
+        allow_rejects: Import the accepted rows even when some rows are rejected
+
+    Returns:
+        The queued job name, the number of rows queued and the rejects
+    """
+    frappe.only_for(["System Manager", "SHG Admin"])
+    rows = read_import_file(file_url)
+    accepted, rejected = validate_rows(rows)
+    if rejected and not cint(allow_rejects):
+        return {"status": "rejected", "queued": 0, "rejected": rejected}
+    if not accepted:
+        frappe.throw(_("No rows to import."))
+
+    job_name = f"contribution-import-{frappe.generate_hash(length=10)}"
+    frappe.enqueue(
+        "shg.shg.utils.contribution_import.run_contribution_import",
+        queue="long",
+        timeout=7200,
+        job_name=job_name,
+        enqueue_after_commit=True,
+        rows=accepted,
+        post_to_gl=cint(post_to_gl),
+    )
+    return {"status": "queued", "job_name": job_name, "queued": len(accepted), "rejected": rejected}
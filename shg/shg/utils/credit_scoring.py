@@ -0,0 +1,191 @@
+"""
+Nightly member credit scoring.
+
+:func:`score_members` reads the four scoring signals of every member with
+one grouped query each:
+
+- repayment punctuality: share of due schedule installments paid on time
+- contribution regularity: share of submitted contributions fully paid
+- attendance: share of submitted meetings attended (late counts half)
+- unpaid fines
+
+The scores are then computed in one pass, written to ``SHG Member.credit_score``
+with a bulk update and stored as dated ``SHG Credit Score Snapshot`` rows so
+score trends can be queried. Payments no longer compute scores.
+"""
+import frappe
+from frappe.utils import cint, flt, getdate, today
+from typing import Any, Dict, List, Optional
+
+from shg.shg.utils.bulk_utils import bulk_insert_rows
+
+BASE_SCORE = 40
+# Maximum points of each signal; together with BASE_SCORE they add up to 100
+CONTRIBUTION_VOLUME_POINTS = 10
+CONTRIBUTION_REGULARITY_POINTS = 10
+REPAYMENT_POINTS = 30
+ATTENDANCE_POINTS = 10
+# Points deducted per unpaid fine, up to MAX_FINE_PENALTY
+FINE_PENALTY_POINTS = 2
+MAX_FINE_PENALTY = 10
+# Total contributions that earn the full contribution volume points
+FULL_CONTRIBUTION_AMOUNT = 10000
+
+
+# ---------------------------------------------------
+# Signals
+# ---------------------------------------------------
+def _by_member(query: str, values: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+    return {row.member: row for row in frappe.db.sql(query, values or {}, as_dict=True)}
+
+
+def get_scoring_signals(as_of=None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Grouped scoring inputs of all members
+
+    Returns:
+        ``repayments``, ``contributions``, ``attendance`` and ``fines``, each
+        keyed by member
+    """
+    as_of = getdate(as_of or today())
+    return {
+        "repayments": _by_member("""
+            SELECT
+                l.member,
+                COUNT(*) AS due,
+                SUM(CASE WHEN IFNULL(s.unpaid_balance, 0) <= 0
+                    AND IFNULL(s.actual_payment_date, s.due_date) <= s.due_date THEN 1 ELSE 0 END) AS on_time
+            FROM `tabSHG Loan Repayment Schedule` s
+            INNER JOIN `tabSHG Loan` l ON l.name = s.parent AND s.parenttype = 'SHG Loan'
+            WHERE l.docstatus = 1 AND s.due_date <= %(as_of)s
+            GROUP BY l.member
+        """, {"as_of": as_of}),
+        "contributions": _by_member("""
+            SELECT
+                member,
+                COUNT(*) AS contributions,
+                SUM(CASE WHEN status = 'Paid' THEN 1 ELSE 0 END) AS paid,
+                SUM(amount) AS total
+            FROM `tabSHG Contribution`
+            WHERE docstatus = 1
+            GROUP BY member
+        """),
+        "attendance": _by_member("""
+            SELECT
+                a.member,
+                COUNT(*) AS meetings,
+                SUM(CASE a.attendance_status WHEN 'Present' THEN 1 WHEN 'Late' THEN 0.5 ELSE 0 END) AS attended
+            FROM `tabSHG Meeting Attendance` a
+            INNER JOIN `tabSHG Meeting` m ON m.name = a.parent AND a.parenttype = 'SHG Meeting'
+            WHERE m.docstatus = 1
+            GROUP BY a.member
+        """),
+        "fines": _by_member("""
+            SELECT member, COUNT(*) AS unpaid
+            FROM `tabSHG Meeting Fine`
+            WHERE docstatus < 2 AND status = 'Pending'
+            GROUP BY member
+        """),
+    }
+
+
+# ---------------------------------------------------
+# Scoring
+# ---------------------------------------------------
+def _rate(numerator, denominator) -> Optional[float]:
+    return flt(numerator) / flt(denominator) if flt(denominator) > 0 else None
+
+
+def compute_scores(members: List[str], signals: Dict[str, Dict[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Credit score and its components for every member
+
+    A signal without history (no loans, contributions or meetings yet) earns
+    no points, so new members start from :data:`BASE_SCORE`.
+    """
+    empty = frappe._dict()
+    scores = []
+    for member in members:
+        repayments = signals["repayments"].get(member, empty)
+        contributions = signals["contributions"].get(member, empty)
+        attendance = signals["attendance"].get(member, empty)
+        unpaid_fines = cint(signals["fines"].get(member, empty).get("unpaid"))
+
+        repayment_rate = _rate(repayments.get("on_time"), repayments.get("due"))
+        contribution_rate = _rate(contributions.get("paid"), contributions.get("contributions"))
+        attendance_rate = _rate(attendance.get("attended"), attendance.get("meetings"))
+        total_contributions = flt(contributions.get("total"))
+
+        score = (
+            BASE_SCORE
+            + CONTRIBUTION_VOLUME_POINTS * min(total_contributions / FULL_CONTRIBUTION_AMOUNT, 1)
+            + CONTRIBUTION_REGULARITY_POINTS * (contribution_rate or 0)
+            + REPAYMENT_POINTS * (repayment_rate or 0)
+            + ATTENDANCE_POINTS * (attendance_rate or 0)
+            - min(unpaid_fines * FINE_PENALTY_POINTS, MAX_FINE_PENALTY)
+        )
+        scores.append({
+            "member": member,
+            "credit_score": int(max(0, min(100, round(score)))),
+            "repayment_rate": flt((repayment_rate or 0) * 100, 2),
+            "contribution_rate": flt((contribution_rate or 0) * 100, 2),
+            "attendance_rate": flt((attendance_rate or 0) * 100, 2),
+            "unpaid_fines": unpaid_fines,
+            "total_contributions": flt(total_contributions, 2),
+        })
+    return scores
+
+
+def score_members(snapshot_date=None) -> Dict[str, int]:
+    """
+    Score all members, update changed scores and store the day's snapshot
+
+    Re-running for the same date replaces that date's snapshot rows.
+
+    Returns:
+        Number of members scored and of member scores that changed
+    """
+    snapshot_date = getdate(snapshot_date or today())
+    current = dict(frappe.db.sql("""
+        SELECT name, credit_score FROM `tabSHG Member` WHERE docstatus < 2
+    """))
+    if not current:
+        return {"scored": 0, "updated": 0}
+
+    scores = compute_scores(sorted(current), get_scoring_signals(snapshot_date))
+
+    updates = {
+        row["member"]: {"credit_score": row["credit_score"]}
+        for row in scores
+        if cint(current[row["member"]]) != row["credit_score"]
+    }
+    if updates:
+        frappe.db.bulk_update("SHG Member", updates, update_modified=False)
+
+    frappe.db.sql("DELETE FROM `tabSHG Credit Score Snapshot` WHERE snapshot_date = %s", snapshot_date)
+    bulk_insert_rows("SHG Credit Score Snapshot", [
+        {"name": f"{row['member']}|{snapshot_date}", "snapshot_date": snapshot_date, **row}
+        for row in scores
+    ])
+    frappe.db.commit()
+    return {"scored": len(scores), "updated": len(updates)}
+
+
+def run_nightly_credit_scoring():
+    """Scheduled job: score all members for today"""
+    result = score_members()
+    frappe.logger("shg").info(f"Credit scoring: {result['scored']} members scored, {result['updated']} changed")
+
+
+@frappe.whitelist()
+def get_credit_score_history(member: str, limit: int = 90) -> List[Dict[str, Any]]:
+    """Dated credit score snapshots of ``member``, newest first"""
+    frappe.has_permission("SHG Member", "read", member, throw=True)
+    return frappe.get_all(
+        "SHG Credit Score Snapshot",
+        filters={"member": member},
+        fields=["snapshot_date", "credit_score", "repayment_rate", "contribution_rate",
+                "attendance_rate", "unpaid_fines", "total_contributions"],
+        order_by="snapshot_date desc",
+        limit_page_length=cint(limit),
+    )
@@ -0,0 +1,104 @@
+"""
+Composite index pack for the SHG transaction doctypes and a query-plan check.
+
+Hot queries filter on ``member`` + ``docstatus`` + a date column, on
+``docstatus`` + ``status`` + a due date for the overdue sweeps, or on
+``parent`` + ``due_date`` + ``unpaid_balance`` for repayment schedules.
+:data:`COMPOSITE_INDEXES` lists one index per access path; doctype
+controllers add theirs in ``on_doctype_update`` and a patch adds all of them
+to existing sites. :func:`find_full_scans` runs EXPLAIN on a query and
+reports table accesses that degrade to a full scan.
+"""
+import frappe
+from typing import Any, Dict, List, Optional
+
+COMPOSITE_INDEXES = {
+    "SHG Contribution": [
+        ["member", "docstatus", "contribution_date"],
+        ["docstatus", "contribution_date"],
+        ["docstatus", "status", "contribution_date"],
+    ],
+    "SHG Contribution Invoice": [
+        ["member", "docstatus", "invoice_date"],
+        ["docstatus", "status", "due_date"],
+        ["invoice_date", "status"],
+    ],
+    "SHG Loan": [
+        ["member", "docstatus", "disbursement_date"],
+        ["docstatus", "status", "disbursement_date"],
+    ],
+    "SHG Loan Repayment": [
+        ["member", "docstatus", "repayment_date"],
+        ["loan", "docstatus", "posting_date"],
+        ["docstatus", "posting_date"],
+    ],
+    "SHG Loan Transaction": [
+        ["docstatus", "posting_date"],
+        ["loan", "docstatus", "posting_date"],
+    ],
+    "SHG Loan Repayment Schedule": [
+        ["parent", "due_date", "unpaid_balance"],
+        ["status", "due_date"],
+    ],
+    "SHG Meeting Fine": [
+        ["member", "docstatus", "fine_date"],
+    ],
+    "SHG Payment Entry": [
+        ["member", "docstatus", "payment_date"],
+    ],
+}
+
+# EXPLAIN estimates at or above this count a full scan as a regression
+LARGE_TABLE_ROWS = 1000
+
+
+def get_index_name(columns: List[str]) -> str:
+    """Index name used by ``frappe.db.add_index`` for ``columns``"""
+    return "_".join(columns) + "_index"
+
+
+def add_composite_indexes(doctypes: Optional[List[str]] = None):
+    """Create the composite indexes of ``doctypes`` (all of them by default); existing ones are skipped"""
+    for doctype in doctypes or COMPOSITE_INDEXES:
+        for columns in COMPOSITE_INDEXES[doctype]:
+            frappe.db.add_index(doctype, columns)
+
+
+def get_missing_indexes() -> List[str]:
+    """Return ``"<doctype>: <index>"`` for every pack index not present in the database"""
+    missing = []
+    for doctype, indexes in COMPOSITE_INDEXES.items():
+        for columns in indexes:
+            if not frappe.db.has_index(f"tab{doctype}", get_index_name(columns)):
+                missing.append(f"{doctype}: {get_index_name(columns)}")
+    return missing
+
+
+# ---------------------------------------------------
+# Query plans
+# ---------------------------------------------------
+def explain(query: str, values: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """EXPLAIN rows for ``query``"""
+    return frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True)
+
+
+def find_full_scans(query: str, values: Optional[Dict[str, Any]] = None,
+                    min_rows: int = LARGE_TABLE_ROWS) -> List[Dict[str, Any]]:
+    """
+    Table accesses in the plan of ``query`` that scan the whole table
+
+    A full scan (``type = ALL``) is reported when no index could serve the
+    access at all, or when the optimizer expects to read ``min_rows`` rows
+    or more. Derived tables and subquery materialisations are ignored.
+
+    Returns:
+        The offending EXPLAIN rows
+    """
+    offending = []
+    for row in explain(query, values):
+        table = row.get("table") or ""
+        if row.get("type") != "ALL" or table.startswith("<"):
+            continue
+        if not row.get("possible_keys") or int(row.get("rows") or 0) >= min_rows:
+            offending.append(row)
+    return offending
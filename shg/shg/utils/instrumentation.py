@@ -0,0 +1,243 @@
+"""
+Opt-in performance instrumentation for SHG hooks, scheduled jobs and APIs.
+
+When *Enable Performance Instrumentation* is ticked in SHG Settings every
+tracked invocation records its wall time, the number and duration of
+``frappe.db.sql`` calls it made and the rows those calls returned or
+touched. Samples go to a capped Redis list per handler, so the store keeps
+the most recent :data:`SAMPLE_LIMIT` invocations and costs three Redis
+commands per invocation. Nested invocations are measured inclusively.
+
+Doc event handlers and selected services are tracked with the
+:func:`instrumented` decorator; whitelisted ``shg.*`` API calls and
+background jobs through the ``before_request``/``after_request`` and
+``before_job``/``after_job`` hooks. The *SHG Handler Performance* report
+ranks handlers by p50/p95.
+"""
+import functools
+import json
+import time
+from contextlib import contextmanager
+import frappe
+from typing import Any, Callable, Dict, List
+
+SAMPLE_LIMIT = 500
+
+SAMPLES_KEY = "shg_instrumentation_samples"
+HANDLERS_KEY = "shg_instrumentation_handlers"
+
+SCHEDULED_JOB_METHOD = "frappe.core.doctype.scheduled_job_type.scheduled_job_type.run_scheduled_job"
+
+
+def is_enabled() -> bool:
+    """Whether instrumentation is on, read once per request or job"""
+    enabled = getattr(frappe.local, "shg_instrumentation_enabled", None)
+    if enabled is None:
+        try:
+            enabled = bool(frappe.db.get_single_value("SHG Settings", "enable_instrumentation"))
+        except Exception:
+            enabled = False
+        frappe.local.shg_instrumentation_enabled = enabled
+    return enabled
+
+
+# ---------------------------------------------------
+# Measurement
+# ---------------------------------------------------
+def _get_stack() -> List[Dict[str, Any]]:
+    if not hasattr(frappe.local, "shg_instrumentation_stack"):
+        frappe.local.shg_instrumentation_stack = []
+    return frappe.local.shg_instrumentation_stack
+
+
+def _install_sql_probe():
+    db = frappe.db
+    frappe.local.shg_sql_probe = (db, vars(db).get("sql"))
+    original = db.sql
+
+    def probed_sql(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            rows = max(getattr(getattr(db, "_cursor", None), "rowcount", 0) or 0, 0)
+            for frame in _get_stack():
+                frame["queries"] += 1
+                frame["query_seconds"] += elapsed
+                frame["rows"] += rows
+
+    db.sql = probed_sql
+
+
+def _remove_sql_probe():
+    db, previous = frappe.local.shg_sql_probe
+    if previous is None:
+        vars(db).pop("sql", None)
+    else:
+        db.sql = previous
+    frappe.local.shg_sql_probe = None
+
+
+def start_frame(name: str, kind: str) -> Dict[str, Any]:
+    """Begin measuring an invocation; pair with :func:`finish_frame`"""
+    stack = _get_stack()
+    if not stack and frappe.db:
+        _install_sql_probe()
+    frame = {"name": name, "kind": kind, "started": time.perf_counter(),
+             "queries": 0, "query_seconds": 0.0, "rows": 0}
+    stack.append(frame)
+    return frame
+
+
+def finish_frame(frame: Dict[str, Any], error: bool = False):
+    """Stop measuring ``frame`` and record its sample"""
+    wall = time.perf_counter() - frame["started"]
+    stack = _get_stack()
+    if frame in stack:
+        stack.remove(frame)
+    if not stack and getattr(frappe.local, "shg_sql_probe", None):
+        _remove_sql_probe()
+    record_sample(frame["name"], frame["kind"], wall, frame["queries"], frame["query_seconds"],
+                  frame["rows"], error)
+
+
+def record_sample(name: str, kind: str, wall_seconds: float, queries: int, query_seconds: float,
+                  rows: int, error: bool = False):
+    """Append one invocation to the handler's capped sample list"""
+    sample = json.dumps([round(wall_seconds * 1000, 2), queries, round(query_seconds * 1000, 2),
+                         rows, int(error), int(time.time())])
+    try:
+        cache = frappe.cache()
+        key = f"{SAMPLES_KEY}:{name}"
+        cache.lpush(key, sample)
+        cache.ltrim(key, 0, SAMPLE_LIMIT - 1)
+        cache.sadd(HANDLERS_KEY, f"{kind}|{name}")
+    except Exception:
+        # Instrumentation never fails the instrumented call
+        pass
+
+
+@contextmanager
+def track(name: str, kind: str = "hook"):
+    """Measure the enclosed block as one invocation of ``name`` when enabled"""
+    if not is_enabled():
+        yield
+        return
+
+    frame = start_frame(name, kind)
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        finish_frame(frame, error)
+
+
+def instrumented(kind: str = "hook") -> Callable:
+    """Decorate a handler so each call is measured while instrumentation is enabled"""
+    def decorator(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return fn(*args, **kwargs)
+            with track(name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---------------------------------------------------
+# Request and job hooks
+# ---------------------------------------------------
+def before_request():
+    """Start measuring whitelisted ``shg.*`` API calls"""
+    method = (frappe.form_dict or {}).get("cmd") or ""
+    if not method and frappe.request and frappe.request.path.startswith("/api/method/"):
+        method = frappe.request.path[len("/api/method/"):]
+    if method.startswith("shg.") and is_enabled():
+        frappe.local.shg_request_frame = start_frame(method, "api")
+
+
+def after_request(response=None, request=None):
+    """Record the API call started in :func:`before_request`"""
+    frame = getattr(frappe.local, "shg_request_frame", None)
+    if frame:
+        frappe.local.shg_request_frame = None
+        finish_frame(frame, error=bool(response is not None and getattr(response, "status_code", 200) >= 500))
+
+
+def before_job(method=None, kwargs=None, **_):
+    """Start measuring ``shg.*`` background and scheduled jobs"""
+    if method == SCHEDULED_JOB_METHOD:
+        method = (kwargs or {}).get("job_type")
+    if isinstance(method, str) and method.startswith("shg.") and is_enabled():
+        frappe.local.shg_job_frame = start_frame(method, "job")
+
+
+def after_job(method=None, kwargs=None, result=None, **_):
+    """Record the job started in :func:`before_job`"""
+    frame = getattr(frappe.local, "shg_job_frame", None)
+    if frame:
+        frappe.local.shg_job_frame = None
+        finish_frame(frame)
+
+
+# ---------------------------------------------------
+# Reads
+# ---------------------------------------------------
+def percentile(values: List[float], share: float) -> float:
+    """Nearest-rank percentile of ``values`` (``share`` between 0 and 1)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(-(-share * len(ordered) // 1)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples: List[List[float]]) -> Dict[str, Any]:
+    """p50/p95/max wall time and mean query figures of a handler's samples"""
+    wall = [sample[0] for sample in samples]
+    count = len(samples) or 1
+    return {
+        "calls": len(samples),
+        "p50_ms": percentile(wall, 0.5),
+        "p95_ms": percentile(wall, 0.95),
+        "max_ms": max(wall) if wall else 0.0,
+        "avg_queries": round(sum(sample[1] for sample in samples) / count, 1),
+        "avg_query_ms": round(sum(sample[2] for sample in samples) / count, 2),
+        "avg_rows": round(sum(sample[3] for sample in samples) / count, 1),
+        "errors": sum(sample[4] for sample in samples),
+        "last_seen": max((sample[5] for sample in samples), default=0),
+    }
+
+
+def get_handler_stats(kind: str = None) -> List[Dict[str, Any]]:
+    """Per-handler summaries, slowest p95 first"""
+    cache = frappe.cache()
+    stats = []
+    for member in cache.smembers(HANDLERS_KEY) or []:
+        member = member.decode() if isinstance(member, bytes) else member
+        handler_kind, name = member.split("|", 1)
+        if kind and handler_kind != kind:
+            continue
+        samples = [json.loads(raw) for raw in cache.lrange(f"{SAMPLES_KEY}:{name}", 0, SAMPLE_LIMIT - 1) or []]
+        if samples:
+            stats.append(dict(summarize(samples), handler=name, kind=handler_kind))
+    return sorted(stats, key=lambda row: row["p95_ms"], reverse=True)
+
+
+@frappe.whitelist()
+def clear_instrumentation():
+    """Drop all recorded samples"""
+    frappe.only_for(["System Manager", "SHG Admin"])
+    cache = frappe.cache()
+    for member in cache.smembers(HANDLERS_KEY) or []:
+        member = member.decode() if isinstance(member, bytes) else member
+        cache.delete_value(f"{SAMPLES_KEY}:{member.split('|', 1)[1]}")
+    cache.delete_value(HANDLERS_KEY)
+    return {"status": "cleared"}
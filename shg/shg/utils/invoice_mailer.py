@@ -0,0 +1,240 @@
+"""
+Bulk contribution invoice emails.
+
+Reads invoice and member data with one join, renders the subject and body
+templates once with per-recipient values, writes every mail to the Email
+Queue with multi-row INSERTs and flushes the queue through a single SMTP
+connection. Each mail gets an SHG Email Log row whose status follows the
+Email Queue after the flush.
+"""
+import json
+import time
+import frappe
+from frappe import _
+from frappe.utils import flt, formatdate, getdate, now
+from typing import Any, Dict, List
+
+from shg.shg.utils.bulk_utils import DEFAULT_CHUNK_SIZE, bulk_insert_docs, chunked, reserve_series_names
+
+SUBJECT_TEMPLATE = "Your {{ month_year }} SHG Contribution Invoice"
+
+BODY_TEMPLATE = """Dear {{ member_name }},
+
+Your contribution invoice for {{ month_year }} amounting to KES {{ amount }} has been generated.
+Please make payment by {{ due_date }}.
+
+Thank you for your continued support.
+
+SHG Management"""
+
+EMAIL_LOG_SERIES = ("SHG-EMAIL-LOG-", 5)
+
+
+def get_invoice_mail_rows(invoice_date) -> List[Dict[str, Any]]:
+    """Return submitted Unpaid invoices of ``invoice_date`` with their member's email."""
+    return frappe.db.sql(
+        """
+        SELECT i.name, i.member, i.member_name, i.amount, i.invoice_date, i.due_date,
+            i.sales_invoice, m.email
+        FROM `tabSHG Contribution Invoice` i
+        INNER JOIN `tabSHG Member` m ON m.name = i.member
+        WHERE i.invoice_date = %(invoice_date)s
+        AND i.status = 'Unpaid'
+        AND i.docstatus = 1
+        ORDER BY i.name
+        """,
+        {"invoice_date": getdate(invoice_date)},
+        as_dict=True,
+    )
+
+
+def render_invoice_mails(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Render subject and body for every row from templates compiled once.
+
+    Rows without an email or a linked Sales Invoice are skipped, matching
+    ``SHGContributionInvoice.send_invoice_email``.
+    """
+    jenv = frappe.get_jenv()
+    subject_template = jenv.from_string(SUBJECT_TEMPLATE)
+    body_template = jenv.from_string(BODY_TEMPLATE)
+
+    mails = []
+    for row in rows:
+        if not row.get("email") or not row.get("sales_invoice"):
+            continue
+        context = {
+            "member_name": row["member_name"],
+            "month_year": formatdate(row["invoice_date"], "MMMM yyyy"),
+            "amount": f"{flt(row['amount']):,.2f}",
+            "due_date": formatdate(row["due_date"]),
+        }
+        mails.append({
+            "invoice": row["name"],
+            "member": row["member"],
+            "member_name": row["member_name"],
+            "email": row["email"],
+            "sales_invoice": row["sales_invoice"],
+            "subject": subject_template.render(context),
+            "message": body_template.render(context),
+        })
+    return mails
+
+
+def _get_outgoing_account():
+    from frappe.email.doctype.email_account.email_account import EmailAccount
+
+    account = EmailAccount.find_outgoing(match_by_doctype="SHG Contribution Invoice")
+    if not account:
+        frappe.throw(_("Please set up a default outgoing Email Account."))
+    return account
+
+
+def build_queue_doc(mail: Dict[str, Any], email_account):
+    """Build an unsaved Email Queue document carrying ``mail`` and a lazy print attachment."""
+    from frappe.email.email_body import get_email
+
+    sender = email_account.default_sender
+    message = get_email(
+        recipients=[mail["email"]],
+        sender=sender,
+        msg=mail["message"].replace("\n", "<br>"),
+        subject=mail["subject"],
+        text_content=mail["message"],
+        email_account=email_account,
+    ).as_string()
+
+    queue = frappe.new_doc("Email Queue")
+    queue.update({
+        "name": frappe.generate_hash(length=10),
+        "sender": sender,
+        "message": message,
+        "status": "Not Sent",
+        "priority": 1,
+        "reference_doctype": "SHG Contribution Invoice",
+        "reference_name": mail["invoice"],
+        "email_account": email_account.name,
+        "attachments": json.dumps([{
+            "print_format_attachment": 1,
+            "doctype": "Sales Invoice",
+            "name": mail["sales_invoice"],
+            "print_format": None,
+            "file_name": mail["sales_invoice"],
+        }]),
+    })
+    queue.append("recipients", {"recipient": mail["email"], "status": "Not Sent"})
+    return queue
+
+
+def queue_invoice_mails(mails: List[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[str]:
+    """
+    Write all mails to the Email Queue and SHG Email Log with bulk INSERTs.
+
+    Returns:
+        Names of the created Email Queue entries
+    """
+    if not mails:
+        return []
+
+    account = _get_outgoing_account()
+    queue_docs = [build_queue_doc(mail, account) for mail in mails]
+
+    prefix, digits = EMAIL_LOG_SERIES
+    log_names = reserve_series_names(prefix, digits, len(mails))
+    timestamp = now()
+    log_docs = []
+    for mail, queue, log_name in zip(mails, queue_docs, log_names):
+        log = frappe.new_doc("SHG Email Log")
+        log.update({
+            "name": log_name,
+            "member": mail["member"],
+            "member_name": mail["member_name"],
+            "email_address": mail["email"],
+            "subject": mail["subject"],
+            "status": "Pending",
+            "document_type": "SHG Contribution Invoice",
+            "reference_document": mail["invoice"],
+            "email_queue": queue.name,
+            "sent_by": frappe.session.user,
+            "sent_on": timestamp,
+        })
+        log_docs.append(log)
+
+    bulk_insert_docs(queue_docs, chunk_size=chunk_size)
+    bulk_insert_docs(log_docs, chunk_size=chunk_size)
+    return [queue.name for queue in queue_docs]
+
+
+def flush_invoice_mails(queue_names: List[str]) -> Dict[str, Any]:
+    """
+    Send the queued mails over one SMTP connection and update SHG Email Log.
+
+    Returns:
+        Delivery metrics for the flush
+    """
+    if not queue_names:
+        return get_delivery_metrics([])
+
+    started = time.monotonic()
+    smtp_server = _get_outgoing_account().get_smtp_server()
+    try:
+        for name in queue_names:
+            try:
+                frappe.get_doc("Email Queue", name).send(smtp_server_instance=smtp_server)
+            except Exception:
+                frappe.log_error(frappe.get_traceback(), f"Invoice email flush failed for {name}")
+    finally:
+        smtp_server.quit()
+
+    for chunk in chunked(queue_names):
+        frappe.db.sql(
+            """
+            UPDATE `tabSHG Email Log` l
+            INNER JOIN `tabEmail Queue` q ON q.name = l.email_queue
+            SET l.status = CASE q.status WHEN 'Sent' THEN 'Sent' WHEN 'Error' THEN 'Failed' ELSE 'Pending' END,
+                l.error_log = q.error,
+                l.sent_on = IF(q.status = 'Sent', q.modified, l.sent_on)
+            WHERE l.email_queue IN %(names)s
+            """,
+            {"names": tuple(chunk)},
+        )
+    frappe.db.commit()
+
+    return get_delivery_metrics(queue_names, flush_seconds=time.monotonic() - started)
+
+
+def get_delivery_metrics(queue_names: List[str], flush_seconds: float = 0) -> Dict[str, Any]:
+    """Count SHG Email Log statuses for a batch of queued mails."""
+    counts = {"Sent": 0, "Failed": 0, "Pending": 0}
+    for chunk in chunked(queue_names):
+        for status, count in frappe.db.sql(
+            """
+            SELECT status, COUNT(*) FROM `tabSHG Email Log`
+            WHERE email_queue IN %(names)s
+            GROUP BY status
+            """,
+            {"names": tuple(chunk)},
+        ):
+            counts[status] = counts.get(status, 0) + count
+
+    return {
+        "queued": len(queue_names),
+        "sent": counts["Sent"],
+        "failed": counts["Failed"],
+        "pending": counts["Pending"],
+        "flush_seconds": flt(flush_seconds, 3),
+        "per_second": flt(counts["Sent"] / flush_seconds, 2) if flush_seconds else 0,
+    }
+
+
+def send_invoice_mails(invoice_date) -> Dict[str, Any]:
+    """Render, queue and flush all invoice emails for ``invoice_date``."""
+    started = time.monotonic()
+    mails = render_invoice_mails(get_invoice_mail_rows(invoice_date))
+    queue_names = queue_invoice_mails(mails)
+    frappe.db.commit()
+    render_seconds = time.monotonic() - started
+
+    metrics = flush_invoice_mails(queue_names)
+    metrics["render_seconds"] = flt(render_seconds, 3)
+    return metrics
@@ -0,0 +1,195 @@
+"""
+Chunked background submission of draft SHG Contribution Invoices.
+
+Drafts are pre-validated with one joined query, split into chunks and
+enqueued so several workers can submit in parallel. Each chunk commits on
+its own and isolates failing invoices behind a savepoint, recording them in
+a retry list together with per-stage timings.
+"""
+import time
+import frappe
+from frappe import _
+from frappe.utils import flt, now
+from typing import Any, Dict, List, Optional
+
+from shg.shg.utils.bulk_utils import chunked, load_checkpoint, parse_name_list, save_checkpoint
+
+SUBMIT_CHUNK_SIZE = 50
+RUN_PREFIX = "shg_invoice_submit:"
+
+REQUIRED_FIELDS = ("member", "amount", "contribution_type", "invoice_date")
+
+
+def prevalidate_invoices(names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Check draft invoices with the rules of ``validate_contribution_invoice`` in one query.
+
+    Args:
+        names: Restrict to these invoices; all drafts when omitted
+
+    Returns:
+        Dictionary with ``valid`` names and ``failed`` as name to reason
+    """
+    conditions = "i.docstatus = 0 AND i.status = 'Draft'"
+    values = {}
+    if names:
+        conditions += " AND i.name IN %(names)s"
+        values["names"] = tuple(names)
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT i.name, i.member, i.amount, i.contribution_type, i.invoice_date,
+            m.membership_status
+        FROM `tabSHG Contribution Invoice` i
+        LEFT JOIN `tabSHG Member` m ON m.name = i.member
+        WHERE {conditions}
+        ORDER BY i.name
+        """,
+        values,
+        as_dict=True,
+    )
+
+    valid, failed = [], {}
+    for row in rows:
+        missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+        if missing:
+            failed[row.name] = f"Missing required field: {missing[0]}"
+        elif flt(row.amount) <= 0:
+            failed[row.name] = "Amount must be greater than zero."
+        elif row.membership_status != "Active":
+            failed[row.name] = f"Member {row.member} is not active. Current status: {row.membership_status}"
+        else:
+            valid.append(row.name)
+
+    return {"valid": valid, "failed": failed}
+
+
+def submit_invoice_chunk(names: List[str], run_id: str, chunk_no: int) -> Dict[str, Any]:
+    """
+    Submit one chunk of invoices and commit.
+
+    Each invoice is submitted behind a savepoint so a failure rolls back
+    only that invoice's Sales Invoice and GL postings.
+    """
+    result = {"started_on": now(), "submitted": [], "failed": {}, "timings": {"load": 0.0, "submit": 0.0, "commit": 0.0}}
+    started = time.monotonic()
+
+    for name in names:
+        savepoint = f"inv_{frappe.generate_hash(length=8)}"
+        frappe.db.savepoint(savepoint)
+        try:
+            tick = time.monotonic()
+            invoice = frappe.get_doc("SHG Contribution Invoice", name)
+            result["timings"]["load"] += time.monotonic() - tick
+
+            if invoice.docstatus != 0:
+                continue
+
+            tick = time.monotonic()
+            invoice.submit()
+            result["timings"]["submit"] += time.monotonic() - tick
+            result["submitted"].append(name)
+        except Exception as e:
+            frappe.db.rollback(save_point=savepoint)
+            frappe.log_error(frappe.get_traceback(), f"Auto-submit failed for invoice {name}")
+            result["failed"][name] = str(e)
+
+    tick = time.monotonic()
+    frappe.db.commit()
+    result["timings"]["commit"] = time.monotonic() - tick
+    result["elapsed"] = time.monotonic() - started
+    result["completed_on"] = now()
+
+    save_checkpoint(f"{RUN_PREFIX}{run_id}:{chunk_no}", result)
+    frappe.db.commit()
+    return result
+
+
+def start_submission_run(names: Optional[List[str]] = None, chunk_size: int = SUBMIT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Pre-validate drafts and enqueue one background job per chunk.
+
+    Returns:
+        Dictionary with the run id, chunk count and pre-validation failures
+    """
+    checked = prevalidate_invoices(names)
+    run_id = frappe.generate_hash(length=10)
+    chunks = list(chunked(checked["valid"], chunk_size))
+
+    save_checkpoint(f"{RUN_PREFIX}{run_id}", {
+        "started_on": now(),
+        "chunks": len(chunks),
+        "queued": len(checked["valid"]),
+        "prevalidation_failed": checked["failed"],
+    })
+
+    for chunk_no, chunk in enumerate(chunks):
+        frappe.enqueue(
+            "shg.shg.utils.invoice_submission.submit_invoice_chunk",
+            queue="long",
+            timeout=1800,
+            job_name=f"invoice-submit-{run_id}-{chunk_no}",
+            enqueue_after_commit=True,
+            names=chunk,
+            run_id=run_id,
+            chunk_no=chunk_no,
+        )
+
+    return {
+        "run_id": run_id,
+        "chunks": len(chunks),
+        "queued": len(checked["valid"]),
+        "prevalidation_failed": len(checked["failed"]),
+    }
+
+
+@frappe.whitelist()
+def get_submission_report(run_id: str) -> Dict[str, Any]:
+    """
+    Aggregate chunk results of a submission run.
+
+    Returns:
+        Progress, the retry list, throughput (invoices per second of
+        worker time) and summed per-stage timings
+    """
+    run = load_checkpoint(f"{RUN_PREFIX}{run_id}")
+    if not run:
+        frappe.throw(_("Submission run {0} not found").format(run_id))
+
+    submitted, failed = [], dict(run.get("prevalidation_failed") or {})
+    timings = {"load": 0.0, "submit": 0.0, "commit": 0.0}
+    elapsed, finished = 0.0, 0
+
+    for chunk_no in range(run["chunks"]):
+        result = load_checkpoint(f"{RUN_PREFIX}{run_id}:{chunk_no}")
+        if not result:
+            continue
+        finished += 1
+        submitted.extend(result["submitted"])
+        failed.update(result["failed"])
+        elapsed += result["elapsed"]
+        for stage, seconds in result["timings"].items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+
+    return {
+        "run_id": run_id,
+        "started_on": run["started_on"],
+        "chunks": run["chunks"],
+        "chunks_finished": finished,
+        "complete": finished == run["chunks"],
+        "submitted": len(submitted),
+        "failed": len(failed),
+        "retry_list": failed,
+        "throughput_per_second": flt(len(submitted) / elapsed, 2) if elapsed else 0,
+        "timings": {stage: flt(seconds, 3) for stage, seconds in timings.items()},
+    }
+
+
+@frappe.whitelist()
+def retry_failed_invoices(run_id: str, chunk_size: int = SUBMIT_CHUNK_SIZE) -> Dict[str, Any]:
+    """Start a new run for the invoices that failed in ``run_id``."""
+    report = get_submission_report(run_id)
+    names = parse_name_list(list(report["retry_list"]))
+    if not names:
+        return {"run_id": None, "chunks": 0, "queued": 0, "prevalidation_failed": 0}
+    return start_submission_run(names, chunk_size=int(chunk_size))
@@ -0,0 +1,364 @@
+"""
+KPI snapshot store for the SHG dashboard.
+
+Dashboard numbers and chart series are read from two small tables instead
+of aggregating the transaction tables on every page load:
+
+- ``SHG KPI Snapshot``: one row per KPI with its current value
+- ``SHG KPI Daily Point``: one row per KPI per day for the time-series charts
+
+Both are moved incrementally by submit/cancel events and corrected by a
+periodic reconciler that recomputes them from the source tables.
+"""
+import frappe
+from frappe.utils import (
+    add_days,
+    add_months,
+    cint,
+    flt,
+    get_datetime,
+    getdate,
+    now,
+    now_datetime,
+    today,
+)
+from typing import Any, Dict, List, Optional
+
+from shg.shg.utils.instrumentation import instrumented
+
+# KPIs whose current value is kept in SHG KPI Snapshot, with the query the
+# reconciler uses to recompute them from scratch.
+SNAPSHOT_QUERIES = {
+    "active_members": """
+        SELECT COUNT(*) FROM `tabSHG Member` WHERE membership_status = 'Active'
+    """,
+    "total_contributions": """
+        SELECT COALESCE(SUM(amount), 0) FROM `tabSHG Contribution` WHERE docstatus = 1
+    """,
+    "active_loans": """
+        SELECT COUNT(*) FROM `tabSHG Loan` WHERE status = 'Disbursed'
+    """,
+    "outstanding_balance": """
+        SELECT COALESCE(SUM(balance_amount), 0) FROM `tabSHG Loan` WHERE status = 'Disbursed'
+    """,
+    "total_payments": """
+        SELECT COALESCE(SUM(amount), 0) FROM `tabSHG Payment Entry` WHERE docstatus = 1
+    """,
+}
+
+# Daily time series: kpi -> (source doctype, date field, amount field)
+SERIES_SOURCES = {
+    "contributions": ("SHG Contribution", "contribution_date", "amount"),
+    "loan_disbursements": ("SHG Loan", "disbursement_date", "loan_amount"),
+    "loan_repayments": ("SHG Loan Repayment", "repayment_date", "total_paid"),
+    "meeting_fines": ("SHG Meeting Fine", "fine_date", "fine_amount"),
+    "payments": ("SHG Payment Entry", "payment_date", "amount"),
+    "multi_member_payments": ("SHG Multi Member Payment", "payment_date", "total_payment_amount"),
+}
+
+# Days of series history re-derived by each periodic reconcile
+RECONCILE_WINDOW_DAYS = 40
+
+DEFAULT_MAX_STALENESS_MINUTES = 120
+
+
+# ---------------------------------------------------
+# Incremental updates (doc_events)
+# ---------------------------------------------------
+@instrumented()
+def on_submit(doc, method=None):
+    """Apply a submitted document's contribution to the KPI store"""
+    _apply_document(doc, 1)
+
+
+@instrumented()
+def on_cancel(doc, method=None):
+    """Reverse a cancelled document's contribution to the KPI store"""
+    _apply_document(doc, -1)
+
+
+def _apply_document(doc, sign):
+    try:
+        for kpi, delta in _get_snapshot_deltas(doc):
+            apply_snapshot_delta(kpi, sign * delta)
+
+        for kpi, (doctype, date_field, amount_field) in SERIES_SOURCES.items():
+            if doctype == doc.doctype:
+                point_date = doc.get(date_field) or doc.get("posting_date") or today()
+                apply_point_delta(kpi, point_date, sign * flt(doc.get(amount_field)), sign)
+    except Exception:
+        # The reconciler repairs any missed delta; never block a submit on the dashboard
+        frappe.log_error(frappe.get_traceback(), f"KPI snapshot update failed for {doc.doctype} {doc.name}")
+
+
+def _get_snapshot_deltas(doc) -> List[tuple]:
+    """Snapshot KPI deltas caused by submitting ``doc``"""
+    if doc.doctype == "SHG Contribution":
+        return [("total_contributions", flt(doc.amount))]
+
+    if doc.doctype == "SHG Loan":
+        # on_submit handlers set status and the summary with db_set; read them back
+        balance = frappe.db.get_value("SHG Loan", doc.name, "balance_amount")
+        return [("active_loans", 1), ("outstanding_balance", flt(balance or doc.loan_amount))]
+
+    if doc.doctype == "SHG Loan Repayment":
+        return [("outstanding_balance", -(flt(doc.total_paid) - flt(doc.penalty_amount)))]
+
+    if doc.doctype == "SHG Payment Entry":
+        return [("total_payments", flt(doc.amount))]
+
+    return []
+
+
+def apply_snapshot_delta(kpi: str, delta: float):
+    """Atomically add ``delta`` to a snapshot KPI"""
+    timestamp = now()
+    frappe.db.sql("""
+        INSERT INTO `tabSHG KPI Snapshot`
+            (name, kpi, value, refreshed_on, creation, modified, owner, modified_by, docstatus, idx)
+        VALUES
+            (%(kpi)s, %(kpi)s, %(delta)s, %(now)s, %(now)s, %(now)s, %(user)s, %(user)s, 0, 0)
+        ON DUPLICATE KEY UPDATE
+            value = value + VALUES(value),
+            refreshed_on = VALUES(refreshed_on),
+            modified = VALUES(modified)
+    """, {"kpi": kpi, "delta": flt(delta), "now": timestamp, "user": frappe.session.user})
+
+
+def apply_point_delta(kpi: str, point_date, delta: float, count: int = 1):
+    """Atomically add ``delta`` (and ``count``) to one day of a KPI series"""
+    point_date = getdate(point_date)
+    timestamp = now()
+    frappe.db.sql("""
+        INSERT INTO `tabSHG KPI Daily Point`
+            (name, kpi, point_date, value, count, creation, modified, owner, modified_by, docstatus, idx)
+        VALUES
+            (%(name)s, %(kpi)s, %(point_date)s, %(delta)s, %(count)s, %(now)s, %(now)s, %(user)s, %(user)s, 0, 0)
+        ON DUPLICATE KEY UPDATE
+            value = value + VALUES(value),
+            count = count + VALUES(count),
+            modified = VALUES(modified)
+    """, {
+        "name": f"{kpi}|{point_date}",
+        "kpi": kpi,
+        "point_date": point_date,
+        "delta": flt(delta),
+        "count": cint(count),
+        "now": timestamp,
+        "user": frappe.session.user,
+    })
+
+
+# ---------------------------------------------------
+# Reconciliation
+# ---------------------------------------------------
+def reconcile_snapshots() -> Dict[str, float]:
+    """Recompute every snapshot KPI from the source tables"""
+    timestamp = now()
+    values = {}
+    for kpi, query in SNAPSHOT_QUERIES.items():
+        values[kpi] = flt(frappe.db.sql(query)[0][0])
+        frappe.db.sql("""
+            INSERT INTO `tabSHG KPI Snapshot`
+                (name, kpi, value, refreshed_on, reconciled_on, creation, modified, owner, modified_by, docstatus, idx)
+            VALUES
+                (%(kpi)s, %(kpi)s, %(value)s, %(now)s, %(now)s, %(now)s, %(now)s, %(user)s, %(user)s, 0, 0)
+            ON DUPLICATE KEY UPDATE
+                value = VALUES(value),
+                refreshed_on = VALUES(refreshed_on),
+                reconciled_on = VALUES(reconciled_on),
+                modified = VALUES(modified)
+        """, {"kpi": kpi, "value": values[kpi], "now": timestamp, "user": frappe.session.user})
+    return values
+
+
+def rebuild_series(from_date=None, kpis: Optional[List[str]] = None):
+    """
+    Re-derive daily points from the source tables
+
+    Args:
+        from_date: First day to rebuild; the whole history when omitted
+        kpis: Series to rebuild, all of them by default
+    """
+    timestamp = now()
+    for kpi in kpis or SERIES_SOURCES:
+        doctype, date_field, amount_field = SERIES_SOURCES[kpi]
+        values = {"kpi": kpi, "from_date": getdate(from_date) if from_date else None,
+                  "now": timestamp, "user": frappe.session.user}
+        date_condition = f"AND `{date_field}` >= %(from_date)s" if from_date else ""
+
+        frappe.db.sql(f"""
+            DELETE FROM `tabSHG KPI Daily Point`
+            WHERE kpi = %(kpi)s {"AND point_date >= %(from_date)s" if from_date else ""}
+        """, values)
+        frappe.db.sql(f"""
+            INSERT INTO `tabSHG KPI Daily Point`
+                (name, kpi, point_date, value, count, creation, modified, owner, modified_by, docstatus, idx)
+            SELECT
+                CONCAT(%(kpi)s, '|', DATE(`{date_field}`)), %(kpi)s, DATE(`{date_field}`),
+                COALESCE(SUM(`{amount_field}`), 0), COUNT(*),
+                %(now)s, %(now)s, %(user)s, %(user)s, 0, 0
+            FROM `tab{doctype}`
+            WHERE docstatus = 1 AND `{date_field}` IS NOT NULL {date_condition}
+            GROUP BY DATE(`{date_field}`)
+        """, values)
+
+
+def reconcile_kpi_snapshots():
+    """
+    Periodic reconciler: refresh snapshot KPIs and the recent series window.
+    This function is designed to be called by the scheduler
+    """
+    reconcile_snapshots()
+    rebuild_series(from_date=add_days(today(), -RECONCILE_WINDOW_DAYS))
+    frappe.db.commit()
+
+
+@frappe.whitelist()
+def rebuild_kpi_snapshots():
+    """Queue a full rebuild of snapshots and series history (backfill)"""
+    frappe.only_for(["System Manager", "SHG Admin"])
+    frappe.enqueue("shg.shg.utils.kpi_snapshots.run_full_rebuild", queue="long", timeout=3600)
+    return {"status": "queued"}
+
+
+def run_full_rebuild():
+    """Background job behind :func:`rebuild_kpi_snapshots`"""
+    reconcile_snapshots()
+    rebuild_series()
+    frappe.db.commit()
+
+
+# ---------------------------------------------------
+# Reads
+# ---------------------------------------------------
+def get_snapshot(max_staleness_minutes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Read all snapshot KPIs, reconciling first if they are older than the bound
+
+    Args:
+        max_staleness_minutes: Oldest acceptable reconcile; defaults to
+            ``kpi_max_staleness_minutes`` from SHG Settings
+
+    Returns:
+        Dictionary of KPI values plus ``as_of`` (last reconcile time)
+    """
+    if max_staleness_minutes is None:
+        max_staleness_minutes = cint(
+            frappe.db.get_single_value("SHG Settings", "kpi_max_staleness_minutes")
+        ) or DEFAULT_MAX_STALENESS_MINUTES
+
+    rows = frappe.db.sql("""
+        SELECT kpi, value, reconciled_on FROM `tabSHG KPI Snapshot`
+    """, as_dict=True)
+    values = {row.kpi: flt(row.value) for row in rows}
+    reconciled = [get_datetime(row.reconciled_on) for row in rows if row.reconciled_on]
+    as_of = min(reconciled) if reconciled else None
+
+    stale = (
+        set(SNAPSHOT_QUERIES) - set(values)
+        or not as_of
+        or (now_datetime() - as_of).total_seconds() > cint(max_staleness_minutes) * 60
+    )
+    if stale:
+        values = reconcile_snapshots()
+        as_of = now_datetime()
+
+    values["as_of"] = as_of
+    return values
+
+
+def get_series_total(kpi: str, from_date, to_date, measure: str = "value") -> float:
+    """Sum of a series between two dates (inclusive)"""
+    column = "count" if measure == "count" else "value"
+    return flt(frappe.db.sql(f"""
+        SELECT COALESCE(SUM(`{column}`), 0)
+        FROM `tabSHG KPI Daily Point`
+        WHERE kpi = %s AND point_date BETWEEN %s AND %s
+    """, (kpi, getdate(from_date), getdate(to_date)))[0][0])
+
+
+def get_series(kpi: str, from_date, to_date, time_interval: str = "Monthly",
+               measure: str = "value") -> Dict[str, Any]:
+    """
+    Bucket a KPI series into chart labels/values
+
+    Args:
+        kpi: Series name from :data:`SERIES_SOURCES`
+        from_date: First day (inclusive)
+        to_date: Last day (inclusive)
+        time_interval: Daily, Weekly, Monthly, Quarterly or Yearly
+        measure: "value" for amounts, "count" for number of documents
+
+    Returns:
+        Dictionary with ``labels`` and ``values`` lists
+    """
+    column = "count" if measure == "count" else "value"
+    points = frappe.db.sql(f"""
+        SELECT point_date, `{column}` AS amount
+        FROM `tabSHG KPI Daily Point`
+        WHERE kpi = %s AND point_date BETWEEN %s AND %s
+        ORDER BY point_date
+    """, (kpi, getdate(from_date), getdate(to_date)), as_dict=True)
+
+    buckets = {}
+    current = getdate(from_date)
+    end = getdate(to_date)
+    while current <= end:
+        buckets.setdefault(_bucket_label(current, time_interval), 0.0)
+        current = add_days(current, 1)
+
+    for point in points:
+        label = _bucket_label(getdate(point.point_date), time_interval)
+        buckets[label] = buckets.get(label, 0.0) + flt(point.amount)
+
+    return {"labels": list(buckets), "values": [flt(value, 2) for value in buckets.values()]}
+
+
+def _bucket_label(day, time_interval: str) -> str:
+    if time_interval == "Daily":
+        return day.strftime("%Y-%m-%d")
+    if time_interval == "Weekly":
+        year, week, _weekday = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if time_interval == "Quarterly":
+        return f"{day.year}-Q{(day.month - 1) // 3 + 1}"
+    if time_interval == "Yearly":
+        return str(day.year)
+    return day.strftime("%Y-%m")
+
+
+def get_default_range(time_interval: str = "Monthly"):
+    """Default chart window ending today for an interval"""
+    to_date = getdate(today())
+    if time_interval == "Daily":
+        return add_days(to_date, -29), to_date
+    if time_interval == "Weekly":
+        return add_days(to_date, -7 * 12 + 1), to_date
+    if time_interval == "Yearly":
+        return add_months(to_date.replace(day=1, month=1), -48), to_date
+    if time_interval == "Quarterly":
+        return add_months(to_date.replace(day=1), -21), to_date
+    return add_months(to_date.replace(day=1), -11), to_date
+
+
+@frappe.whitelist()
+def get_kpi_number_card(filters=None):
+    """
+    Number Card method reading from the KPI store
+
+    Filters:
+        kpi: Snapshot KPI name, or series name combined with ``period``
+        period: "this_month" to sum a series over the current month
+    """
+    filters = frappe.parse_json(filters) or {}
+    kpi = filters.get("kpi")
+    fieldtype = "Int" if kpi in ("active_members", "active_loans") else "Currency"
+
+    if filters.get("period") == "this_month":
+        start = getdate(today()).replace(day=1)
+        value = get_series_total(kpi, start, today())
+    else:
+        value = get_snapshot().get(kpi, 0)
+
+    return {"value": value, "fieldtype": fieldtype}
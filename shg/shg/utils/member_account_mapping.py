@@ -1,6 +1,8 @@
 import frappe
 from frappe import _
+from shg.shg.utils.instrumentation import instrumented
 
+@instrumented()
 def set_member_credit_account(doc, method):
     """
     Automatically map the Credit Account (or "Paid To" account) from the member's personal account
@@ -0,0 +1,370 @@
+"""
+Append-only member ledger.
+
+Every submitted financial document writes one ``SHG Member Ledger Entry``
+per member it touches; cancelling writes an opposite entry instead of
+deleting. Each entry carries the member's running balance (and running loan
+balance) in statement order, ``(posting_date, entry_no)``, so statements are
+an indexed range scan with an opening-balance sum rather than a
+re-derivation of history. A backdated entry shifts the stored balances of
+the entries dated after it.
+
+Balance convention follows the Detailed Member Statement: credits
+(contributions, fines, repayments, payments) increase the balance and loan
+disbursements decrease it.
+"""
+import frappe
+from frappe.utils import cint, flt, getdate, now, today
+from typing import Any, Dict, List, Optional, Tuple
+
+from shg.shg.utils.bulk_utils import parse_name_list
+from shg.shg.utils.instrumentation import instrumented
+
+
+def _contribution(doc):
+    return [{
+        "posting_date": doc.contribution_date,
+        "description": f"Contribution - {doc.get('contribution_type') or 'Regular'}",
+        "credit": doc.amount,
+    }]
+
+
+def _contribution_invoice(doc):
+    return [{"posting_date": doc.invoice_date, "description": "Contribution Invoice", "credit": doc.amount}]
+
+
+def _meeting_fine(doc):
+    return [{"posting_date": doc.fine_date, "description": f"Fine - {doc.get('fine_reason') or ''}".strip(" -"),
+             "credit": doc.fine_amount}]
+
+
+def _loan(doc):
+    return [{
+        "posting_date": doc.get("disbursement_date") or doc.get("posting_date"),
+        "description": f"Loan Disbursement - {doc.name}",
+        "loan": doc.name,
+        "debit": doc.loan_amount,
+        "principal_amount": doc.loan_amount,
+    }]
+
+
+def _loan_repayment(doc):
+    return [{
+        "posting_date": doc.get("repayment_date") or doc.get("posting_date"),
+        "description": f"Loan Repayment - {doc.loan}",
+        "loan": doc.loan,
+        "credit": doc.total_paid,
+        "principal_amount": doc.get("principal_amount"),
+        "interest_amount": doc.get("interest_amount"),
+        "penalty_amount": doc.get("penalty_amount"),
+    }]
+
+
+def _payment_entry(doc):
+    return [{"posting_date": doc.payment_date, "description": "Payment Received", "credit": doc.amount}]
+
+
+# doctype -> builder returning the ledger rows of a submitted document
+LEDGER_SOURCES = {
+    "SHG Contribution": _contribution,
+    "SHG Contribution Invoice": _contribution_invoice,
+    "SHG Meeting Fine": _meeting_fine,
+    "SHG Loan": _loan,
+    "SHG Loan Repayment": _loan_repayment,
+    "SHG Payment Entry": _payment_entry,
+}
+
+
+# ---------------------------------------------------
+# Writes (doc_events)
+# ---------------------------------------------------
+@instrumented()
+def on_submit(doc, method=None):
+    """Append the ledger entries of a submitted document"""
+    if not doc.get("member") or doc.doctype not in LEDGER_SOURCES:
+        return
+    for row in LEDGER_SOURCES[doc.doctype](doc):
+        append_entry(doc.member, doc.doctype, doc.name, row)
+
+
+@instrumented()
+def on_cancel(doc, method=None):
+    """Append reversing entries for a cancelled document"""
+    if not doc.get("member"):
+        return
+
+    originals = frappe.get_all(
+        "SHG Member Ledger Entry",
+        filters={"voucher_type": doc.doctype, "voucher_no": doc.name, "is_reversal": 0},
+        fields=["member", "loan", "description", "debit", "credit",
+                "principal_amount", "interest_amount", "penalty_amount"],
+        order_by="entry_no asc",
+    )
+    for entry in originals:
+        append_entry(entry.member, doc.doctype, doc.name, {
+            "posting_date": today(),
+            "description": f"Reversal - {entry.description}",
+            "loan": entry.loan,
+            "debit": entry.credit,
+            "credit": entry.debit,
+            "principal_amount": -flt(entry.principal_amount),
+            "interest_amount": -flt(entry.interest_amount),
+            "penalty_amount": -flt(entry.penalty_amount),
+        }, is_reversal=1)
+
+
+def _loan_delta(voucher_type: str, row: Dict[str, Any]) -> float:
+    """Running loan balance move: disbursed principal up, repaid principal down"""
+    if voucher_type == "SHG Loan":
+        return flt(row.get("principal_amount"))
+    if voucher_type == "SHG Loan Repayment":
+        return -flt(row.get("principal_amount"))
+    return 0.0
+
+
+def append_entry(member: str, voucher_type: str, voucher_no: str, row: Dict[str, Any], is_reversal: int = 0):
+    """
+    Insert one ledger entry with its running balances.
+
+    The member's last entry is read ``FOR UPDATE`` so concurrent submits for
+    the same member serialize and each gets the next ``entry_no``. The
+    running balances continue from the member's last entry in statement
+    order on or before the posting date; when the entry is backdated, the
+    balances of the entries dated after it are shifted by its amounts.
+    """
+    last = frappe.db.sql("""
+        SELECT entry_no
+        FROM `tabSHG Member Ledger Entry`
+        WHERE member = %s
+        ORDER BY entry_no DESC
+        LIMIT 1
+        FOR UPDATE
+    """, member)
+    last_entry_no = cint(last[0][0]) if last else 0
+
+    posting_date = getdate(row.get("posting_date") or today())
+    previous = frappe.db.sql("""
+        SELECT balance, loan_balance
+        FROM `tabSHG Member Ledger Entry`
+        WHERE member = %s AND posting_date <= %s
+        ORDER BY posting_date DESC, entry_no DESC
+        LIMIT 1
+    """, (member, posting_date), as_dict=True)
+    previous = previous[0] if previous else frappe._dict(balance=0, loan_balance=0)
+
+    debit, credit = flt(row.get("debit")), flt(row.get("credit"))
+    # Reversals carry a negated principal, so the same rule undoes the original move
+    loan_delta = _loan_delta(voucher_type, row)
+
+    entry = frappe.get_doc({
+        "doctype": "SHG Member Ledger Entry",
+        "member": member,
+        "posting_date": posting_date,
+        "entry_no": last_entry_no + 1,
+        "voucher_type": voucher_type,
+        "voucher_no": voucher_no,
+        "loan": row.get("loan"),
+        "is_reversal": is_reversal,
+        "description": row.get("description"),
+        "debit": debit,
+        "credit": credit,
+        "balance": flt(flt(previous.balance) + credit - debit, 2),
+        "principal_amount": flt(row.get("principal_amount")),
+        "interest_amount": flt(row.get("interest_amount")),
+        "penalty_amount": flt(row.get("penalty_amount")),
+        "loan_balance": flt(flt(previous.loan_balance) + loan_delta, 2),
+    })
+    entry.insert(ignore_permissions=True)
+
+    frappe.db.sql("""
+        UPDATE `tabSHG Member Ledger Entry`
+        SET balance = ROUND(balance + %(delta)s, 2), loan_balance = ROUND(loan_balance + %(loan_delta)s, 2)
+        WHERE member = %(member)s AND posting_date > %(posting_date)s
+    """, {"member": member, "posting_date": posting_date, "delta": credit - debit, "loan_delta": loan_delta})
+    return entry
+
+
+# ---------------------------------------------------
+# Rebuild (backfill)
+# ---------------------------------------------------
+_REBUILD_SOURCES = """
+    SELECT member, contribution_date AS posting_date, 'SHG Contribution' AS voucher_type, name AS voucher_no,
+        NULL AS loan, CONCAT('Contribution - ', COALESCE(contribution_type, 'Regular')) AS description,
+        0 AS debit, amount AS credit, 0 AS principal_amount, 0 AS interest_amount, 0 AS penalty_amount,
+        creation
+    FROM `tabSHG Contribution` WHERE docstatus = 1 {member_condition}
+    UNION ALL
+    SELECT member, invoice_date, 'SHG Contribution Invoice', name, NULL, 'Contribution Invoice',
+        0, amount, 0, 0, 0, creation
+    FROM `tabSHG Contribution Invoice` WHERE docstatus = 1 {member_condition}
+    UNION ALL
+    SELECT member, fine_date, 'SHG Meeting Fine', name, NULL, CONCAT('Fine - ', COALESCE(fine_reason, '')),
+        0, fine_amount, 0, 0, 0, creation
+    FROM `tabSHG Meeting Fine` WHERE docstatus = 1 {member_condition}
+    UNION ALL
+    SELECT member, COALESCE(disbursement_date, posting_date), 'SHG Loan', name, name,
+        CONCAT('Loan Disbursement - ', name), loan_amount, 0, loan_amount, 0, 0, creation
+    FROM `tabSHG Loan` WHERE docstatus = 1 AND IFNULL(member, '') != '' {member_condition}
+    UNION ALL
+    SELECT member, COALESCE(repayment_date, posting_date), 'SHG Loan Repayment', name, loan,
+        CONCAT('Loan Repayment - ', loan), 0, total_paid, principal_amount, interest_amount, penalty_amount,
+        creation
+    FROM `tabSHG Loan Repayment` WHERE docstatus = 1 {member_condition}
+    UNION ALL
+    SELECT member, payment_date, 'SHG Payment Entry', name, NULL, 'Payment Received',
+        0, amount, 0, 0, 0, creation
+    FROM `tabSHG Payment Entry` WHERE docstatus = 1 {member_condition}
+"""
+
+
+def rebuild_ledger(members: Optional[List[str]] = None):
+    """
+    Re-derive ledger entries for ``members`` (all members when omitted).
+
+    History is replayed in posting-date order and running balances are
+    computed with window functions in a single INSERT ... SELECT.
+    Cancelled documents simply drop out, so no reversal rows are written.
+    """
+    members = parse_name_list(members)
+    values = {"now": now(), "user": frappe.session.user}
+    member_condition = ""
+    if members:
+        member_condition = "AND member IN %(members)s"
+        values["members"] = tuple(members)
+        frappe.db.sql("DELETE FROM `tabSHG Member Ledger Entry` WHERE member IN %(members)s", values)
+    else:
+        frappe.db.sql("DELETE FROM `tabSHG Member Ledger Entry`")
+
+    sources = _REBUILD_SOURCES.format(member_condition=member_condition)
+    frappe.db.sql(f"""
+        INSERT INTO `tabSHG Member Ledger Entry`
+            (name, member, posting_date, entry_no, voucher_type, voucher_no, loan, is_reversal, description,
+             debit, credit, balance, principal_amount, interest_amount, penalty_amount, loan_balance,
+             creation, modified, owner, modified_by, docstatus, idx)
+        SELECT
+            SUBSTRING(SHA1(CONCAT(voucher_type, '|', voucher_no)), 1, 10), member, posting_date,
+            ROW_NUMBER() OVER (PARTITION BY member ORDER BY posting_date, creation, voucher_type, voucher_no), voucher_type, voucher_no, loan, 0, description,
+            debit, credit, ROUND(SUM(credit - debit) OVER (PARTITION BY member ORDER BY posting_date, creation, voucher_type, voucher_no), 2),
+            principal_amount, interest_amount, penalty_amount,
+            ROUND(SUM(CASE voucher_type
+                WHEN 'SHG Loan' THEN principal_amount
+                WHEN 'SHG Loan Repayment' THEN -principal_amount
+                ELSE 0 END) OVER (PARTITION BY member ORDER BY posting_date, creation, voucher_type, voucher_no), 2),
+            %(now)s, %(now)s, %(user)s, %(user)s, 0, 0
+        FROM ({sources}) history
+        WHERE IFNULL(member, '') != '' AND posting_date IS NOT NULL
+    """, values)
+
+
+@frappe.whitelist()
+def rebuild_member_ledger(members=None):
+    """Queue a rebuild of the member ledger (backfill)"""
+    frappe.only_for(["System Manager", "SHG Admin"])
+    frappe.enqueue("shg.shg.utils.member_ledger.run_rebuild", queue="long", timeout=3600,
+                   members=parse_name_list(members))
+    return {"status": "queued"}
+
+
+def run_rebuild(members=None):
+    """Background job behind :func:`rebuild_member_ledger`"""
+    rebuild_ledger(members)
+    frappe.db.commit()
+
+
+# ---------------------------------------------------
+# Reads
+# ---------------------------------------------------
+def get_opening_balance(member: str, from_date=None, loan_only: bool = False,
+                        voucher_types: Optional[List[str]] = None) -> float:
+    """
+    Sum of the member's entries dated before ``from_date``
+
+    Args:
+        member: SHG Member name
+        from_date: First posting date of the statement
+        loan_only: Sum the loan balance moves instead of credit - debit
+        voucher_types: Restrict to these source doctypes
+    """
+    if not from_date:
+        return 0.0
+    amount = """CASE voucher_type
+        WHEN 'SHG Loan' THEN principal_amount
+        WHEN 'SHG Loan Repayment' THEN -principal_amount
+        ELSE 0 END""" if loan_only else "credit - debit"
+    values = {"member": member, "from_date": getdate(from_date)}
+    voucher_condition = ""
+    if voucher_types:
+        voucher_condition = "AND voucher_type IN %(voucher_types)s"
+        values["voucher_types"] = tuple(voucher_types)
+    value = frappe.db.sql(f"""
+        SELECT SUM({amount})
+        FROM `tabSHG Member Ledger Entry`
+        WHERE member = %(member)s AND posting_date < %(from_date)s {voucher_condition}
+    """, values)
+    return flt(value[0][0], 2) if value else 0.0
+
+
+def parse_cursor(cursor: Any) -> Optional[Tuple[Any, int]]:
+    """``(posting_date, entry_no)`` of a ``"<posting_date>|<entry_no>"`` page cursor"""
+    if not cursor:
+        return None
+    posting_date, _sep, entry_no = str(cursor).partition("|")
+    return getdate(posting_date), cint(entry_no)
+
+
+def get_ledger_entries(member: str, from_date=None, to_date=None, after: Optional[Tuple[Any, int]] = None,
+                       page_length: int = 0, voucher_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Range scan of a member's ledger in statement order, ``(posting_date, entry_no)``.
+
+    Args:
+        member: SHG Member name
+        from_date: First posting date (inclusive)
+        to_date: Last posting date (inclusive)
+        after: Keyset cursor; only entries after this ``(posting_date, entry_no)``
+        page_length: Maximum rows, unlimited when 0
+        voucher_types: Restrict to these source doctypes
+    """
+    conditions = ["member = %(member)s"]
+    values = {"member": member}
+    if after:
+        conditions.append("(posting_date > %(after_date)s OR (posting_date = %(after_date)s AND entry_no > %(after_no)s))")
+        values.update({"after_date": getdate(after[0]), "after_no": cint(after[1])})
+    if from_date:
+        conditions.append("posting_date >= %(from_date)s")
+        values["from_date"] = getdate(from_date)
+    if to_date:
+        conditions.append("posting_date <= %(to_date)s")
+        values["to_date"] = getdate(to_date)
+    if voucher_types:
+        conditions.append("voucher_type IN %(voucher_types)s")
+        values["voucher_types"] = tuple(voucher_types)
+
+    return frappe.db.sql(f"""
+        SELECT entry_no, posting_date, voucher_type, voucher_no, loan, is_reversal, description,
+            debit, credit, balance, principal_amount, interest_amount, penalty_amount, loan_balance
+        FROM `tabSHG Member Ledger Entry`
+        WHERE {" AND ".join(conditions)}
+        ORDER BY posting_date, entry_no
+        {"LIMIT %(limit)s" if page_length else ""}
+    """, dict(values, limit=cint(page_length)), as_dict=True)
+
+
+@frappe.whitelist()
+def get_member_ledger(member, from_date=None, to_date=None, cursor=None, page_length=100):
+    """
+    One page of a member statement.
+
+    Returns:
+        Dictionary with ``opening_balance`` (first page only), ``entries``
+        and ``next_cursor`` to pass back for the following page
+    """
+    frappe.has_permission("SHG Member", "read", member, throw=True)
+    page_length = min(max(cint(page_length) or 100, 1), 500)
+    entries = get_ledger_entries(member, from_date, to_date, parse_cursor(cursor), page_length)
+
+    return {
+        "opening_balance": None if cursor else get_opening_balance(member, from_date),
+        "entries": entries,
+        "next_cursor": f"{entries[-1].posting_date}|{entries[-1].entry_no}" if len(entries) == page_length else None,
+    }
@@ -0,0 +1,300 @@
+"""
+Bulk member purge and anonymization.
+
+Builds a dependency-ordered delete plan for a list of members and executes
+it with set-based DELETE/UPDATE statements per doctype, committing between
+chunks and keeping a resumable checkpoint so retention sweeps over
+thousands of exited members can run as a background job.
+"""
+import frappe
+from frappe import _
+from frappe.utils import now
+from typing import Any, Dict, List, Optional
+
+from shg.shg.utils.bulk_utils import (
+    DEFAULT_CHUNK_SIZE,
+    chunked,
+    clear_checkpoint,
+    delete_names,
+    load_checkpoint,
+    parse_name_list,
+    save_checkpoint,
+    table_has_column,
+)
+
+# Order matters: dependants first, the records they point at last.
+# Each entry is (doctype, field holding the member id).
+PURGE_PLAN = [
+    ("SHG Loan Repayment", "member"),
+    ("SHG Meeting Fine", "member"),
+    ("SHG Payment Entry", "member"),
+    ("SHG Loan", "member"),
+    ("SHG Contribution", "member"),
+    ("SHG Contribution Invoice", "member"),
+    ("SHG Scheduled Notification", "member"),
+    ("SHG Notification Log", "member"),
+    ("SHG Email Log", "member"),
+    ("Payment Entry", "party"),
+    ("Journal Entry", "reference_member"),
+    ("GL Entry", "party"),
+    ("SHG Member Ledger Entry", "member"),
+    ("SHG Member", "name"),
+]
+
+# Doctypes carrying a denormalized member_name that must follow anonymization
+MEMBER_NAME_DOCTYPES = [
+    "SHG Contribution",
+    "SHG Contribution Invoice",
+    "SHG Loan",
+    "SHG Loan Repayment",
+    "SHG Meeting Fine",
+    "SHG Payment Entry",
+    "SHG Notification Log",
+]
+
+CHECKPOINT_PREFIX = "shg_member_purge:"
+
+
+def build_purge_plan(members: List[str]) -> List[Dict[str, Any]]:
+    """
+    Resolve every record to delete for ``members`` with one query per doctype.
+
+    Args:
+        members: SHG Member names
+
+    Returns:
+        List of plan steps in execution order, each with the doctype,
+        the record names and a per-member record count
+    """
+    plan = []
+    if not members:
+        return plan
+
+    for doctype, member_field in PURGE_PLAN:
+        if not table_has_column(doctype, member_field):
+            continue
+
+        rows = frappe.db.sql(
+            f"""
+            SELECT name, `{member_field}` AS member
+            FROM `tab{doctype}`
+            WHERE `{member_field}` IN %(members)s
+            """,
+            {"members": tuple(members)},
+            as_dict=True,
+        )
+
+        counts = {}
+        for row in rows:
+            counts[row.member] = counts.get(row.member, 0) + 1
+
+        plan.append({
+            "doctype": doctype,
+            "names": [row.name for row in rows],
+            "counts": counts,
+        })
+
+    return plan
+
+
+def execute_purge(
+    members: List[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    job_id: Optional[str] = None,
+    reason: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Delete all data for ``members`` following :data:`PURGE_PLAN`.
+
+    Commits after every chunk. When ``job_id`` is given, progress is
+    checkpointed so that re-running the same job resumes at the first
+    unfinished step; already deleted rows simply no longer match the plan
+    queries, so a resumed step is idempotent.
+
+    Returns:
+        Dictionary with per-doctype totals and a per-member audit summary
+    """
+    members = parse_name_list(members)
+    checkpoint_key = f"{CHECKPOINT_PREFIX}{job_id}" if job_id else None
+    state = (load_checkpoint(checkpoint_key) if checkpoint_key else None) or {
+        "completed_steps": [],
+        "totals": {},
+        "audit": {member: {} for member in members},
+        "started_on": now(),
+    }
+
+    pending = [step for step in PURGE_PLAN if step[0] not in state["completed_steps"]]
+    plan = {step["doctype"]: step for step in build_purge_plan(members)}
+
+    for doctype, _member_field in pending:
+        step = plan.get(doctype)
+        if step:
+            for names in chunked(step["names"], chunk_size):
+                deleted = delete_names(doctype, names)
+                state["totals"][doctype] = state["totals"].get(doctype, 0) + deleted
+                frappe.db.commit()
+
+            for member, count in step["counts"].items():
+                state["audit"].setdefault(member, {})[doctype] = count
+
+        state["completed_steps"].append(doctype)
+        if checkpoint_key:
+            save_checkpoint(checkpoint_key, state)
+            frappe.db.commit()
+
+    _write_audit_log(state["audit"], "purged", reason)
+
+    if checkpoint_key:
+        clear_checkpoint(checkpoint_key)
+    frappe.db.commit()
+
+    return {
+        "status": "success",
+        "members": len(members),
+        "totals": state["totals"],
+        "audit": state["audit"],
+        "started_on": state["started_on"],
+        "completed_on": now(),
+    }
+
+
+def execute_anonymize(members: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      reason: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Anonymize personal data for ``members`` with bulk UPDATEs.
+
+    Member rows are read in one query per chunk, masked in Python with the
+    same rules as :class:`shg.utils.security.SHGSecurity` and written back
+    with a single CASE-based update; denormalized ``member_name`` columns
+    on transactional doctypes are refreshed with one joined UPDATE each.
+    """
+    from shg.utils.security import MEMBER_HASH_FIELDS, DataPrivacyManager, decrypt_member_rows
+
+    members = parse_name_list(members)
+    privacy = DataPrivacyManager()
+    security = privacy.security
+    has_anonymized_flag = table_has_column("SHG Member", "anonymized")
+    audit = {}
+
+    for chunk in chunked(members, chunk_size):
+        rows = frappe.db.sql(
+            """
+            SELECT name, phone_number, id_number, email
+            FROM `tabSHG Member`
+            WHERE name IN %(members)s
+            """,
+            {"members": tuple(chunk)},
+            as_dict=True,
+        )
+        decrypt_member_rows(rows, ["phone_number", "id_number"])
+
+        updates = {}
+        for row in rows:
+            values = {
+                "member_name": f"Anonymized Member {row.name[-4:]}",
+                "phone_number": security.mask_sensitive_data(row.phone_number or ""),
+                "id_number": security.mask_sensitive_data(row.id_number or ""),
+                "email": privacy._mask_email(row.email or ""),
+            }
+            # Free the hashes so the real ID and phone number can be registered again
+            values.update({hash_field: None for hash_field in MEMBER_HASH_FIELDS.values()
+                           if table_has_column("SHG Member", hash_field)})
+            if has_anonymized_flag:
+                values["anonymized"] = 1
+            updates[row.name] = values
+            audit[row.name] = {"SHG Member": 1}
+
+        if updates:
+            frappe.db.bulk_update("SHG Member", updates, chunk_size=chunk_size)
+
+        for doctype in MEMBER_NAME_DOCTYPES:
+            if not table_has_column(doctype, "member_name"):
+                continue
+            frappe.db.sql(
+                f"""
+                UPDATE `tab{doctype}` t
+                INNER JOIN `tabSHG Member` m ON m.name = t.member
+                SET t.member_name = m.member_name
+                WHERE t.member IN %(members)s
+                """,
+                {"members": tuple(chunk)},
+            )
+            for member in updates:
+                audit[member][doctype] = 1
+
+        frappe.db.commit()
+
+    _write_audit_log(audit, "anonymized", reason)
+    frappe.db.commit()
+
+    return {
+        "status": "success",
+        "members": len(audit),
+        "missing": [member for member in members if member not in audit],
+        "audit": audit,
+        "timestamp": now(),
+    }
+
+
+def _write_audit_log(audit: Dict[str, Dict[str, int]], action: str, reason: Optional[str] = None):
+    """Record one Deletion Log entry per member summarizing what was done."""
+    for member, counts in audit.items():
+        summary = ", ".join(f"{doctype}: {count}" for doctype, count in counts.items()) or "no linked records"
+        frappe.get_doc({
+            "doctype": "Deletion Log",
+            "entity_type": "SHG Member",
+            "entity_name": member,
+            "reason": f"{reason or 'Bulk member ' + action} ({action} - {summary})",
+            "deleted_by": frappe.session.user,
+            "timestamp": now(),
+        }).insert(ignore_permissions=True)
+
+
+def run_member_purge_job(members, action: str = "purge", checkpoint_id: Optional[str] = None,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE, reason: Optional[str] = None):
+    """Background job entry point for :func:`bulk_purge_members`."""
+    if action == "anonymize":
+        return execute_anonymize(members, chunk_size=chunk_size, reason=reason)
+    return execute_purge(members, chunk_size=chunk_size, job_id=checkpoint_id, reason=reason)
+
+
+@frappe.whitelist()
+def bulk_purge_members(members, action: str = "purge", reason: Optional[str] = None,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE, job_id: Optional[str] = None):
+    """
+    Queue a bulk purge or anonymization of many members.
+
+    Args:
+        members: List (or JSON list) of SHG Member names
+        action: "purge" to delete all data, "anonymize" to mask personal data
+        reason: Reason recorded in the Deletion Log
+        chunk_size: Rows per DELETE/UPDATE statement
+        job_id: Pass the id of an interrupted job to resume it
+
+    Returns:
+        Dictionary with the queued job id
+    """
+    if "System Manager" not in frappe.get_roles():
+        frappe.throw(_("Only System Manager can perform this action."))
+
+    members = parse_name_list(members)
+    if not members:
+        frappe.throw(_("At least one member is required."))
+
+    if action not in ("purge", "anonymize"):
+        frappe.throw(_("Action must be either purge or anonymize."))
+
+    job_id = job_id or f"{action}-{frappe.generate_hash(length=10)}"
+    frappe.enqueue(
+        "shg.shg.utils.member_purge.run_member_purge_job",
+        queue="long",
+        timeout=3600,
+        job_name=job_id,
+        checkpoint_id=job_id,
+        members=members,
+        action=action,
+        chunk_size=int(chunk_size),
+        reason=reason,
+    )
+
+    return {"job_id": job_id, "members": len(members), "action": action}
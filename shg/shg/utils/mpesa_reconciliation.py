@@ -0,0 +1,444 @@
+"""
+M-Pesa statement reconciliation.
+
+:func:`reconcile_mpesa_statement` takes an M-Pesa statement export (CSV or
+XLSX, either the M-Pesa portal statement or a C2B transaction export) and
+matches its receipts against the open items of all members in one pass:
+
+1. Open contribution invoices, contributions and meeting fines are loaded
+   with one query each and indexed in memory by document name (the
+   account reference a member types in) and by (phone, amount). Phone
+   numbers on both sides go through :func:`normalize_phone_number`, the
+   rules the notification service uses.
+2. Each receipt is looked up by account reference first, then by phone and
+   amount. A match claims its open item so the same item is never paid by
+   two receipts of the file. Several same-amount items of one member are
+   paid oldest first; candidates of several members (a shared phone) go to
+   the review queue.
+3. Every receipt is stored as an ``SHG Mpesa Statement Line``; receipts
+   already on file are skipped, so re-importing a statement is harmless.
+4. Matched lines are posted in a background job through
+   ``shg_receive_bulk_payment``, one savepoint per line and one commit per
+   chunk. Lines that fail to post join the review queue.
+
+Review lines are settled with :func:`resolve_statement_line`.
+"""
+import json
+import re
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, get_datetime, getdate, now_datetime
+from typing import Any, Dict, List, Tuple
+
+from shg.shg.utils.bulk_utils import bulk_insert_rows, chunked
+from shg.shg.utils.notification_service import normalize_phone_number
+
+STATEMENT_LINE_DOCTYPE = "SHG Mpesa Statement Line"
+MPESA_MODE_OF_PAYMENT = "Mpesa"
+POSTING_CHUNK_SIZE = 200
+# Rows searched for the header line; portal statements start with a preamble
+HEADER_SEARCH_ROWS = 30
+
+# Statement column -> accepted header spellings, lower-cased with every run
+# of non-alphanumerics replaced by "_"
+COLUMN_ALIASES = {
+    "receipt_no": ("receipt_no", "receipt", "transid", "trans_id", "transaction_id", "mpesa_receipt_number"),
+    "transaction_date": ("completion_time", "transtime", "trans_time", "transaction_date", "date"),
+    "amount": ("paid_in", "transamount", "trans_amount", "amount"),
+    "phone": ("msisdn", "phone", "phone_number", "other_party_info", "opposite_party"),
+    "party_name": ("firstname", "first_name", "name", "party_name"),
+    "account_reference": ("a_c_no", "billrefnumber", "bill_ref_number", "account_reference", "account_no", "account"),
+    "details": ("details", "description"),
+    "transaction_status": ("transaction_status", "status"),
+}
+REQUIRED_COLUMNS = ("receipt_no", "transaction_date", "amount")
+
+PHONE_PATTERN = re.compile(r"\+?\d[\d ]{7,}\d")
+
+
+# ---------------------------------------------------
+# Parsing
+# ---------------------------------------------------
+def _normalize_header(value: Any) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(value or "").strip().lower()).strip("_")
+
+
+def _find_header(lines: List[List[Any]]) -> Tuple[int, Dict[str, int]]:
+    """Index of the header row and the position of each known column in it"""
+    for index, line in enumerate(lines[:HEADER_SEARCH_ROWS]):
+        header = [_normalize_header(value) for value in line]
+        positions = {}
+        for column, aliases in COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in header:
+                    positions[column] = header.index(alias)
+                    break
+        if all(column in positions for column in REQUIRED_COLUMNS):
+            return index, positions
+    frappe.throw(_("No statement header found. The file needs receipt, date and amount columns."))
+
+
+def _read_lines(file_url: str) -> List[List[Any]]:
+    file_doc = frappe.get_doc("File", {"file_url": file_url})
+    if (file_doc.file_name or file_url).lower().endswith(".xlsx"):
+        from frappe.utils.xlsxutils import read_xlsx_file_from_attached_file
+
+        return read_xlsx_file_from_attached_file(file_url=file_url)
+
+    from frappe.utils.csvutils import read_csv_content
+
+    return read_csv_content(file_doc.get_content())
+
+
+def extract_phone(value: Any) -> str:
+    """Normalized phone number found in a statement cell such as ``2547... - JANE DOE``"""
+    found = PHONE_PATTERN.search(str(value or ""))
+    return normalize_phone_number(found.group(0)) if found else ""
+
+
+def parse_statement_lines(lines: List[List[Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Incoming receipts of a statement
+
+    Withdrawals, incomplete transactions and rows without a receipt number
+    are left out; rows whose date cannot be read are skipped.
+
+    Returns:
+        The receipts and the skipped rows, each skipped row with a ``reason``
+    """
+    if not lines:
+        frappe.throw(_("The statement file is empty."))
+
+    header_index, positions = _find_header(lines)
+    receipts, skipped = [], []
+    for row_no, line in enumerate(lines[header_index + 1:], start=header_index + 2):
+        values = {
+            column: (str(line[position]).strip() if position < len(line) and line[position] is not None else "")
+            for column, position in positions.items()
+        }
+        if not values["receipt_no"]:
+            continue
+        if values.get("transaction_status") and values["transaction_status"].lower() != "completed":
+            continue
+
+        amount = flt(values["amount"].replace(",", ""))
+        if amount <= 0:
+            continue
+        try:
+            transaction_date = get_datetime(values["transaction_date"]) if values["transaction_date"] else None
+        except Exception:
+            transaction_date = None
+        if not transaction_date:
+            skipped.append({"row_no": row_no, "receipt_no": values["receipt_no"], "reason": _("Invalid transaction date")})
+            continue
+
+        party = values.get("phone", "")
+        receipts.append({
+            "row_no": row_no,
+            "receipt_no": values["receipt_no"].upper(),
+            "transaction_date": transaction_date,
+            "amount": flt(amount, 2),
+            "phone": extract_phone(party),
+            "party_name": values.get("party_name") or PHONE_PATTERN.sub("", party).strip(" -"),
+            "account_reference": values.get("account_reference", "").strip().upper(),
+            "details": values.get("details", ""),
+        })
+    return receipts, skipped
+
+
+# ---------------------------------------------------
+# Open items
+# ---------------------------------------------------
+def get_open_items() -> List[Dict[str, Any]]:
+    """
+    Unpaid invoices, contributions and fines of all members, oldest first
+
+    Contributions billed through an open invoice are left out so an
+    obligation is only offered once.
+    """
+    invoices = frappe.db.sql("""
+        SELECT
+            'SHG Contribution Invoice' AS doctype, i.name, i.member,
+            IFNULL(si.outstanding_amount, i.amount) AS outstanding,
+            IFNULL(i.due_date, i.invoice_date) AS due_date,
+            i.linked_shg_contribution
+        FROM `tabSHG Contribution Invoice` i
+        LEFT JOIN `tabSales Invoice` si ON si.name = i.sales_invoice
+        WHERE i.docstatus = 1 AND i.status NOT IN ('Paid', 'Cancelled')
+    """, as_dict=True)
+    invoiced = {row.linked_shg_contribution for row in invoices if row.linked_shg_contribution}
+
+    contributions = frappe.db.sql("""
+        SELECT
+            'SHG Contribution' AS doctype, name, member,
+            unpaid_amount AS outstanding, contribution_date AS due_date
+        FROM `tabSHG Contribution`
+        WHERE docstatus = 1 AND status IN ('Unpaid', 'Partially Paid')
+    """, as_dict=True)
+
+    fines = frappe.db.sql("""
+        SELECT
+            'SHG Meeting Fine' AS doctype, name, member,
+            fine_amount AS outstanding, fine_date AS due_date
+        FROM `tabSHG Meeting Fine`
+        WHERE docstatus < 2 AND status = 'Pending'
+    """, as_dict=True)
+
+    items = [
+        row for row in invoices + contributions + fines
+        if flt(row.outstanding) > 0 and not (row.doctype == "SHG Contribution" and row.name in invoiced)
+    ]
+    items.sort(key=lambda row: (getdate(row.due_date) if row.due_date else getdate("1900-01-01"), row.name))
+    return items
+
+
+def _amount_key(amount: float) -> int:
+    return int(round(flt(amount) * 100))
+
+
+def build_indexes(items: List[Dict[str, Any]], member_phones: Dict[str, str]) -> Tuple[Dict, Dict]:
+    """
+    Hash indexes of the open items
+
+    Returns:
+        ``by_ref`` keyed by upper-cased document name and ``by_phone_amount``
+        keyed by (normalized phone, amount in cents), each list oldest first
+    """
+    by_ref, by_phone_amount = {}, {}
+    for item in items:
+        by_ref[item.name.upper()] = item
+        phone = member_phones.get(item.member)
+        if phone:
+            by_phone_amount.setdefault((phone, _amount_key(item.outstanding)), []).append(item)
+    return by_ref, by_phone_amount
+
+
+def get_member_phones() -> Dict[str, str]:
+    """Normalized phone number of every member that has one"""
+    from shg.utils.security import get_member_phone_numbers
+
+    return {member: normalize_phone_number(phone) for member, phone in get_member_phone_numbers().items()}
+
+
+# ---------------------------------------------------
+# Matching
+# ---------------------------------------------------
+def _candidate(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {"doctype": item.doctype, "name": item.name, "member": item.member, "outstanding": flt(item.outstanding, 2)}
+
+
+def match_receipts(receipts: List[Dict[str, Any]], by_ref: Dict, by_phone_amount: Dict) -> List[Dict[str, Any]]:
+    """
+    Match every receipt to at most one open item
+
+    Sets ``status``, ``match_doctype``, ``match_name``, ``member``,
+    ``review_reason`` and ``candidates`` on each receipt and returns them.
+    """
+    claimed = set()
+    for receipt in receipts:
+        receipt.update({"status": "Unmatched", "match_doctype": None, "match_name": None,
+                        "member": None, "review_reason": None, "candidates": None})
+
+        item = by_ref.get(receipt["account_reference"]) if receipt["account_reference"] else None
+        if item and (item.doctype, item.name) not in claimed:
+            if receipt["amount"] <= flt(item.outstanding) + 0.01:
+                _claim(receipt, item, claimed)
+            else:
+                receipt.update({
+                    "status": "Needs Review",
+                    "member": item.member,
+                    "review_reason": _("Amount exceeds the outstanding {0} of {1}").format(flt(item.outstanding, 2), item.name),
+                    "candidates": json.dumps([_candidate(item)]),
+                })
+            continue
+
+        candidates = [
+            item for item in by_phone_amount.get((receipt["phone"], _amount_key(receipt["amount"])), [])
+            if (item.doctype, item.name) not in claimed
+        ]
+        if not candidates:
+            receipt["review_reason"] = _("No open item for this phone number and amount")
+        elif len({item.member for item in candidates}) == 1:
+            _claim(receipt, candidates[0], claimed)
+        else:
+            receipt.update({
+                "status": "Needs Review",
+                "review_reason": _("The phone number belongs to several members with a matching open item"),
+                "candidates": json.dumps([_candidate(item) for item in candidates]),
+            })
+    return receipts
+
+
+def _claim(receipt: Dict[str, Any], item: Dict[str, Any], claimed: set):
+    claimed.add((item.doctype, item.name))
+    receipt.update({"status": "Matched", "match_doctype": item.doctype, "match_name": item.name, "member": item.member})
+
+
+# ---------------------------------------------------
+# Posting
+# ---------------------------------------------------
+def _post_line(line: Dict[str, Any]) -> str:
+    from shg.shg.doctype.shg_payment.shg_payment import shg_receive_bulk_payment
+
+    result = shg_receive_bulk_payment(
+        member=line["member"],
+        documents=[{"doctype": line["match_doctype"], "name": line["match_name"], "amount": flt(line["amount"])}],
+        amount=flt(line["amount"]),
+        mode_of_payment=MPESA_MODE_OF_PAYMENT,
+        posting_date=getdate(line["transaction_date"]),
+        reference_no=line["name"],
+    )
+    return result["payment_entry"]
+
+
+def post_matched_lines(names: List[str], chunk_size: int = POSTING_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Post matched statement lines as Payment Entries
+
+    Each line is posted behind a savepoint; a failing line is rolled back
+    and moved to the review queue with its error. Line statuses are written
+    with one bulk update and one commit per chunk.
+
+    Returns:
+        Number of lines posted and failed
+    """
+    result = {"posted": 0, "failed": 0}
+    done = 0
+    for chunk in chunked(names, chunk_size):
+        lines = frappe.get_all(
+            STATEMENT_LINE_DOCTYPE,
+            filters={"name": ["in", chunk], "status": "Matched"},
+            fields=["name", "amount", "transaction_date", "member", "match_doctype", "match_name"],
+        )
+        updates = {}
+        for line in lines:
+            savepoint = f"mpesa_{frappe.generate_hash(length=8)}"
+            frappe.db.savepoint(savepoint)
+            try:
+                updates[line.name] = {"status": "Posted", "payment_entry": _post_line(line)}
+                result["posted"] += 1
+            except Exception as e:
+                frappe.db.rollback(save_point=savepoint)
+                frappe.log_error(frappe.get_traceback(), f"M-Pesa reconciliation: posting {line.name} failed")
+                updates[line.name] = {"status": "Needs Review", "review_reason": str(e)[:500]}
+                result["failed"] += 1
+
+        if updates:
+            frappe.db.bulk_update(STATEMENT_LINE_DOCTYPE, updates, update_modified=False)
+        frappe.db.commit()
+
+        done += len(chunk)
+        frappe.publish_progress(done * 100 / len(names), title=_("Posting M-Pesa receipts"))
+    return result
+
+
+# ---------------------------------------------------
+# API
+# ---------------------------------------------------
+def _drop_known_receipts(receipts: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """Receipts not yet on file nor repeated in the statement, and the number dropped"""
+    existing = set()
+    for chunk in chunked([receipt["receipt_no"] for receipt in receipts]):
+        existing.update(frappe.get_all(STATEMENT_LINE_DOCTYPE, filters={"name": ["in", chunk]}, pluck="name"))
+
+    new_receipts = []
+    for receipt in receipts:
+        if receipt["receipt_no"] in existing:
+            continue
+        existing.add(receipt["receipt_no"])
+        new_receipts.append(receipt)
+    return new_receipts, len(receipts) - len(new_receipts)
+
+
+@frappe.whitelist()
+def reconcile_mpesa_statement(file_url: str, post: int = 1) -> Dict[str, Any]:
+    """
+    Match an uploaded M-Pesa statement and queue the posting of its matches
+
+    Args:
+        file_url: URL of the uploaded CSV or XLSX statement
+        post: Queue the posting of the matched receipts
+
+    Returns:
+        The import batch, counts per status, the skipped rows and the
+        queued job name
+    """
+    frappe.only_for(["System Manager", "SHG Admin"])
+    receipts, skipped = parse_statement_lines(_read_lines(file_url))
+    import_batch = f"MPESA-{now_datetime().strftime('%Y%m%d%H%M%S')}-{frappe.generate_hash(length=4)}"
+    receipts, duplicates = _drop_known_receipts(receipts)
+
+    by_ref, by_phone_amount = build_indexes(get_open_items(), get_member_phones())
+    match_receipts(receipts, by_ref, by_phone_amount)
+
+    bulk_insert_rows(STATEMENT_LINE_DOCTYPE, [{
+        "name": receipt["receipt_no"],
+        "receipt_no": receipt["receipt_no"],
+        "transaction_date": receipt["transaction_date"],
+        "amount": receipt["amount"],
+        "phone": receipt["phone"],
+        "party_name": receipt["party_name"],
+        "account_reference": receipt["account_reference"],
+        "details": receipt["details"],
+        "status": receipt["status"],
+        "match_doctype": receipt["match_doctype"],
+        "match_name": receipt["match_name"],
+        "member": receipt["member"],
+        "import_batch": import_batch,
+        "review_reason": receipt["review_reason"],
+        "candidates": receipt["candidates"],
+    } for receipt in receipts])
+
+    counts = {status: 0 for status in ("Matched", "Needs Review", "Unmatched")}
+    for receipt in receipts:
+        counts[receipt["status"]] += 1
+
+    matched = [receipt["receipt_no"] for receipt in receipts if receipt["status"] == "Matched"]
+    job_name = None
+    if matched and cint(post):
+        job_name = f"mpesa-reconciliation-{import_batch}"
+        frappe.enqueue(
+            "shg.shg.utils.mpesa_reconciliation.post_matched_lines",
+            queue="long",
+            timeout=7200,
+            job_name=job_name,
+            enqueue_after_commit=True,
+            names=matched,
+        )
+
+    return {
+        "import_batch": import_batch,
+        "lines": len(receipts),
+        "duplicates": duplicates,
+        "matched": counts["Matched"],
+        "needs_review": counts["Needs Review"],
+        "unmatched": counts["Unmatched"],
+        "skipped": skipped,
+        "job_name": job_name,
+    }
+
+
+@frappe.whitelist()
+def resolve_statement_line(line: str, match_doctype: str, match_name: str) -> Dict[str, Any]:
+    """
+    Settle a review-queue line against the chosen open item and post it
+
+    Returns:
+        The line's new status and Payment Entry
+    """
+    frappe.only_for(["System Manager", "SHG Admin"])
+    doc = frappe.get_doc(STATEMENT_LINE_DOCTYPE, line)
+    if doc.status not in ("Needs Review", "Unmatched"):
+        frappe.throw(_("Statement line {0} is already {1}").format(line, doc.status))
+    if match_doctype not in ("SHG Contribution Invoice", "SHG Contribution", "SHG Meeting Fine"):
+        frappe.throw(_("Invalid document type: {0}").format(match_doctype))
+
+    member = frappe.db.get_value(match_doctype, match_name, "member")
+    if not member:
+        frappe.throw(_("Document {0} {1} not found").format(match_doctype, match_name))
+
+    doc.update({"match_doctype": match_doctype, "match_name": match_name, "member": member})
+    payment_entry = _post_line(doc.as_dict())
+    doc.update({"status": "Posted", "payment_entry": payment_entry, "review_reason": None})
+    doc.save()
+    return {"status": doc.status, "payment_entry": payment_entry}
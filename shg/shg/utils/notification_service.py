@@ -1,9 +1,49 @@
 import frappe
-from frappe.utils import now, getdate, add_days
+from frappe.utils import now, getdate, add_days, add_months, cint, now_datetime
 import json
 import requests
 from typing import Dict, List, Optional, Union
 
+from shg.shg.utils.bulk_utils import DEFAULT_CHUNK_SIZE
+
+
+def normalize_phone_number(phone: str, whatsapp_format: bool = False) -> str:
+    """
+    Normalize phone number to international format
+
+    Shared by the notification channels and the M-Pesa statement
+    reconciliation so both compare numbers in the same form.
+    """
+    if not phone:
+        return phone
+        
+    # Remove any non-digit characters
+    phone = ''.join(filter(str.isdigit, phone))
+    
+    # Handle different formats
+    if phone.startswith('0'):
+        # Convert Kenyan 07xxx to +2547xxx
+        phone = '+254' + phone[1:]
+    elif phone.startswith('7') and len(phone) == 9:
+        # Add country code to 7xxxxxxx
+        phone = '+254' + phone
+    elif phone.startswith('254') and len(phone) == 12:
+        # Add + to 254xxxxxxxx
+        phone = '+' + phone
+    elif phone.startswith('+') and phone[1:].startswith('254'):
+        # Already in correct format
+        pass
+    else:
+        # Assume it's already in international format or leave as is
+        pass
+    
+    # For WhatsApp, sometimes need to remove the +
+    if whatsapp_format and phone.startswith('+'):
+        phone = phone[1:]
+        
+    return phone
+
+
 class NotificationService:
     """
     Comprehensive notification service supporting SMS, Email, and WhatsApp
@@ -323,34 +363,7 @@ class NotificationService:
         """
         Normalize phone number to international format
         """
-        if not phone:
-            return phone
-            
-        # Remove any non-digit characters
-        phone = ''.join(filter(str.isdigit, phone))
-        
-        # Handle different formats
-        if phone.startswith('0'):
-            # Convert Kenyan 07xxx to +2547xxx
-            phone = '+254' + phone[1:]
-        elif phone.startswith('7') and len(phone) == 9:
-            # Add country code to 7xxxxxxx
-            phone = '+254' + phone
-        elif phone.startswith('254') and len(phone) == 12:
-            # Add + to 254xxxxxxxx
-            phone = '+' + phone
-        elif phone.startswith('+') and phone[1:].startswith('254'):
-            # Already in correct format
-            pass
-        else:
-            # Assume it's already in international format or leave as is
-            pass
-        
-        # For WhatsApp, sometimes need to remove the +
-        if whatsapp_format and phone.startswith('+'):
-            phone = phone[1:]
-            
-        return phone
+        return normalize_phone_number(phone, whatsapp_format)
     
     def _update_notification_log(self, notification_log_id: str, result: Dict):
         """
@@ -625,3 +638,59 @@ def process_scheduled_notifications():
     """
     service = NotificationService()
     return service.process_scheduled_notifications()
+
+
+def archive_notification_logs(months: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """
+    Move notification logs older than ``months`` into SHG Notification Log Archive
+    
+    Rows are copied and deleted in chunks with INSERT ... SELECT, so the hot
+    table only holds recent history. Unread rows being archived are
+    released from their member's unread counter first.
+    This function is designed to be called by the scheduler
+    """
+    months = cint(months or frappe.db.get_single_value("SHG Settings", "notification_archive_months"))
+    if months <= 0:
+        return {"archived": 0}
+    
+    cutoff = add_months(now_datetime(), -months)
+    archive_columns = set(frappe.db.get_table_columns("SHG Notification Log Archive"))
+    columns = [
+        column for column in frappe.db.get_table_columns("SHG Notification Log")
+        if column in archive_columns and column != "archived_on"
+    ]
+    column_list = ", ".join(f"`{column}`" for column in columns)
+    archived = 0
+    
+    while True:
+        names = frappe.db.sql_list("""
+            SELECT name FROM `tabSHG Notification Log`
+            WHERE creation < %(cutoff)s
+            ORDER BY creation
+            LIMIT %(limit)s
+        """, {"cutoff": cutoff, "limit": cint(chunk_size)})
+        if not names:
+            break
+        
+        values = {"names": tuple(names), "archived_on": now()}
+        frappe.db.sql("""
+            UPDATE `tabSHG Member` m
+            INNER JOIN (
+                SELECT member, COUNT(*) AS unread
+                FROM `tabSHG Notification Log`
+                WHERE name IN %(names)s AND is_read = 0
+                GROUP BY member
+            ) n ON n.member = m.name
+            SET m.unread_notification_count = GREATEST(IFNULL(m.unread_notification_count, 0) - n.unread, 0)
+        """, values)
+        frappe.db.sql(f"""
+            INSERT INTO `tabSHG Notification Log Archive` ({column_list}, `archived_on`)
+            SELECT {column_list}, %(archived_on)s
+            FROM `tabSHG Notification Log`
+            WHERE name IN %(names)s
+        """, values)
+        frappe.db.sql("DELETE FROM `tabSHG Notification Log` WHERE name IN %(names)s", values)
+        frappe.db.commit()
+        archived += len(names)
+    
+    return {"archived": archived, "cutoff": cutoff}
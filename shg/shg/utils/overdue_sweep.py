@@ -0,0 +1,131 @@
+"""
+Daily overdue sweep for contribution invoices and contributions.
+
+Flips newly overdue invoices with set-based UPDATEs, prices their late fees
+in one pass and writes them back in bulk, then returns the affected members
+so reminders can be sent from a single joined query instead of one document
+load per record.
+"""
+import frappe
+from frappe.utils import flt, getdate, today
+from typing import Any, Dict, List, Optional
+
+from shg.shg.utils.bulk_utils import DEFAULT_CHUNK_SIZE, chunked
+
+
+def compute_late_fees(rows: List[Dict[str, Any]], rate: float, as_of) -> Dict[str, float]:
+    """
+    Price late fees for many invoices at once.
+
+    Uses the same formula as ``SHGContributionInvoice.calculate_late_fee``:
+    ``amount * rate% * days overdue``.
+
+    Args:
+        rows: Dicts with ``name``, ``amount`` and ``due_date``
+        rate: Late fee rate (percent per day)
+        as_of: Date the fee is computed at
+
+    Returns:
+        Dictionary of invoice name to positive late fee
+    """
+    as_of = getdate(as_of)
+    factor = flt(rate) / 100
+    if not factor:
+        return {}
+
+    fees = {}
+    for row in rows:
+        days = (as_of - getdate(row["due_date"])).days
+        fee = flt(flt(row["amount"]) * factor * days, 2) if days > 0 else 0
+        if fee > 0:
+            fees[row["name"]] = fee
+    return fees
+
+
+def sweep_overdue_invoices(as_of=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Mark submitted Unpaid invoices past their due date as Overdue and apply late fees.
+
+    Returns:
+        Dictionary with the flipped invoice names and their members
+    """
+    as_of = getdate(as_of or today())
+    rows = frappe.db.sql(
+        """
+        SELECT name, member, amount, due_date
+        FROM `tabSHG Contribution Invoice`
+        WHERE docstatus = 1
+        AND status = 'Unpaid'
+        AND due_date < %(as_of)s
+        """,
+        {"as_of": as_of},
+        as_dict=True,
+    )
+    if not rows:
+        return {"invoices": [], "members": []}
+
+    for chunk in chunked([row.name for row in rows], chunk_size):
+        frappe.db.sql(
+            """
+            UPDATE `tabSHG Contribution Invoice`
+            SET status = 'Overdue', modified = NOW()
+            WHERE name IN %(names)s AND status = 'Unpaid'
+            """,
+            {"names": tuple(chunk)},
+        )
+
+    if frappe.db.get_single_value("SHG Settings", "apply_late_fee_policy"):
+        rate = frappe.db.get_single_value("SHG Settings", "late_fee_rate") or 0
+        fees = compute_late_fees(rows, rate, as_of)
+        if fees:
+            frappe.db.bulk_update(
+                "SHG Contribution Invoice",
+                {name: {"late_fee_amount": fee} for name, fee in fees.items()},
+                chunk_size=chunk_size,
+            )
+
+    return {
+        "invoices": [row.name for row in rows],
+        "members": sorted({row.member for row in rows if row.member}),
+    }
+
+
+def get_overdue_contributions(as_of=None) -> List[Dict[str, Any]]:
+    """Return submitted Unpaid contributions past their date, joined with member contact details."""
+    return frappe.db.sql(
+        """
+        SELECT c.name, c.member, c.unpaid_amount, c.contribution_date,
+            m.member_name, m.email
+        FROM `tabSHG Contribution` c
+        INNER JOIN `tabSHG Member` m ON m.name = c.member
+        WHERE c.docstatus = 1
+        AND c.status = 'Unpaid'
+        AND c.contribution_date < %(as_of)s
+        """,
+        {"as_of": getdate(as_of or today())},
+        as_dict=True,
+    )
+
+
+def run_overdue_sweep(as_of: Optional[str] = None, send_reminders: bool = True) -> Dict[str, Any]:
+    """
+    Scheduled entry point: sweep invoices, then remind members with overdue contributions.
+
+    Returns:
+        Summary with counts and the sorted list of affected members
+    """
+    from shg.shg.doctype.shg_contribution.shg_contribution import send_contribution_reminders
+
+    invoices = sweep_overdue_invoices(as_of)
+    frappe.db.commit()
+
+    contributions = get_overdue_contributions(as_of)
+    if send_reminders and contributions:
+        send_contribution_reminders(contributions)
+
+    members = sorted(set(invoices["members"]) | {row.member for row in contributions})
+    return {
+        "invoices": len(invoices["invoices"]),
+        "contributions": len(contributions),
+        "members": members,
+    }
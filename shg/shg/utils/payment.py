@@ -1,5 +1,6 @@
 import frappe
 from frappe import _
+from frappe.utils import flt
 
 def get_unpaid_invoices_for_member(member):
     """
@@ -12,28 +13,18 @@ def get_unpaid_invoices_for_member(member):
         list: List of unpaid contribution invoices
     """
     try:
-        # Get unpaid contribution invoices
-        invoices = frappe.get_all(
-            "SHG Contribution Invoice",
-            filters={
-                "member": member,
-                "docstatus": 1,
-                "status": ["!=", "Paid"]
-            },
-            fields=["name", "invoice_date", "amount", "description"]
-        )
+        # Get unpaid contribution invoices with the outstanding amount of their Sales Invoice
+        invoices = frappe.db.sql("""
+            SELECT
+                i.name, i.invoice_date, i.amount, i.description,
+                IFNULL(si.outstanding_amount, i.amount) AS outstanding_amount
+            FROM `tabSHG Contribution Invoice` i
+            LEFT JOIN `tabSales Invoice` si ON si.name = i.sales_invoice
+            WHERE i.member = %s AND i.docstatus = 1 AND i.status != 'Paid'
+        """, member, as_dict=True)
         
-        # Add outstanding amount from linked Sales Invoice
-        for invoice in invoices:
-            shg_invoice = frappe.get_doc("SHG Contribution Invoice", invoice.name)
-            if shg_invoice.sales_invoice:
-                sales_invoice = frappe.get_doc("Sales Invoice", shg_invoice.sales_invoice)
-                invoice.outstanding_amount = sales_invoice.outstanding_amount
-            else:
-                invoice.outstanding_amount = invoice.amount
-                
         # Filter out fully paid invoices
-        unpaid_invoices = [inv for inv in invoices if inv.outstanding_amount > 0]
+        unpaid_invoices = [inv for inv in invoices if flt(inv.outstanding_amount) > 0]
         
         return unpaid_invoices
         
@@ -0,0 +1,224 @@
+"""
+Batch PDF rendering for invoice and statement attachments.
+
+:func:`render_pdfs` takes many ``(doctype, name, print_format)`` requests
+and returns their PDFs. Each PDF is cached on disk under the site's private
+directory, keyed by a digest of the document's row and child rows, its print
+format, the Print Settings and the default letter head. Re-sends and
+retries after a failed send cost one file read, while a change to any of
+those gives a new file, even one written with
+``db_set(update_modified=False)``. For cache misses the print
+HTML is rendered in the calling job (it needs the database) and the
+wkhtmltopdf conversions, where the renderer startup cost lies, run in
+parallel with at most :data:`PDF_MAX_WORKERS` processes at a time.
+
+:func:`get_pdf_attachment` returns the same ``{"fname", "fcontent"}``
+attachment as ``frappe.attach_print`` and can replace it one for one.
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+import frappe
+from frappe.utils import cint
+from typing import Any, Dict, List, Optional, Tuple
+
+PDF_CACHE_FOLDER = "shg_pdf_cache"
+PDF_MAX_WORKERS = 4
+PDF_CACHE_MAX_AGE_DAYS = 30
+
+# (doctype, name, print_format)
+PdfKey = Tuple[str, str, Optional[str]]
+
+
+# ---------------------------------------------------
+# Disk cache
+# ---------------------------------------------------
+def get_cache_dir() -> str:
+    path = frappe.get_site_path("private", PDF_CACHE_FOLDER)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_cache_path(key: PdfKey, version: Any) -> str:
+    """Cache file of one PDF; a new ``version`` gives a new file"""
+    doctype, name, print_format = key
+    digest = hashlib.sha1(f"{doctype}|{name}|{print_format or ''}|{version}".encode()).hexdigest()
+    return os.path.join(get_cache_dir(), f"{digest}.pdf")
+
+
+def read_cached(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def write_cached(path: str, content: bytes):
+    """Write atomically so concurrent jobs never read a half-written PDF"""
+    tmp_path = f"{path}.{frappe.generate_hash(length=6)}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha1(frappe.as_json(value).encode()).hexdigest()
+
+
+def get_document_versions(keys: List[PdfKey]) -> Dict[PdfKey, Optional[str]]:
+    """
+    Digest of every requested document's row and child rows, None if missing
+
+    One query per doctype and per child table.
+    """
+    names_by_doctype = {}
+    for doctype, name, _print_format in keys:
+        names_by_doctype.setdefault(doctype, set()).add(name)
+
+    versions = {}
+    for doctype, names in names_by_doctype.items():
+        params = {"doctype": doctype, "names": tuple(names)}
+        rows = {row.name: [row] for row in frappe.db.sql(
+            f"SELECT * FROM `tab{doctype}` WHERE name IN %(names)s", params, as_dict=True)}
+        for df in frappe.get_meta(doctype).get_table_fields():
+            for child in frappe.db.sql(f"""
+                SELECT * FROM `tab{df.options}`
+                WHERE parenttype = %(doctype)s AND parent IN %(names)s
+                ORDER BY parent, parentfield, idx
+            """, params, as_dict=True):
+                if child.parent in rows:
+                    rows[child.parent].append(child)
+        versions.update({(doctype, name): _digest(content) for name, content in rows.items()})
+    return {key: versions.get(key[:2]) for key in keys}
+
+
+def get_render_versions(keys: List[PdfKey]) -> Dict[PdfKey, str]:
+    """Digest of the print format, Print Settings and default letter head behind each PDF"""
+    shared = _digest([
+        frappe.db.sql("SELECT field, value FROM `tabSingles` WHERE doctype = 'Print Settings' ORDER BY field"),
+        frappe.db.sql("SELECT * FROM `tabLetter Head` WHERE is_default = 1 ORDER BY name", as_dict=True),
+    ])
+
+    formats = {key: key[2] or frappe.get_meta(key[0]).default_print_format for key in keys}
+    format_rows = {}
+    names = {name for name in formats.values() if name}
+    if names:
+        format_rows = {row.name: row for row in frappe.db.sql(
+            "SELECT * FROM `tabPrint Format` WHERE name IN %(names)s", {"names": tuple(names)}, as_dict=True)}
+    return {key: _digest([shared, format_rows.get(formats[key])]) for key in keys}
+
+
+def get_versions(keys: List[PdfKey]) -> Dict[PdfKey, Optional[str]]:
+    """Cache version of each PDF, None when the document does not exist"""
+    documents = get_document_versions(keys)
+    render = get_render_versions(keys)
+    return {key: f"{documents[key]}|{render[key]}" if documents[key] else None for key in keys}
+
+
+def purge_pdf_cache(max_age_days: int = PDF_CACHE_MAX_AGE_DAYS) -> int:
+    """Scheduled job: delete cached PDFs not read or written for ``max_age_days``"""
+    import time
+
+    cutoff = time.time() - cint(max_age_days) * 86400
+    removed = 0
+    folder = get_cache_dir()
+    for file_name in os.listdir(folder):
+        path = os.path.join(folder, file_name)
+        try:
+            if max(os.path.getmtime(path), os.path.getatime(path)) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+# ---------------------------------------------------
+# Rendering
+# ---------------------------------------------------
+def _prepare(key: PdfKey) -> Tuple[str, Dict[str, Any]]:
+    """Print HTML and wkhtmltopdf options of one document (needs the database)"""
+    from frappe.utils.pdf import prepare_options, scrub_urls
+
+    doctype, name, print_format = key
+    html = frappe.get_print(doctype, name, print_format)
+    html, options = prepare_options(scrub_urls(html), {})
+    options.update({"disable-javascript": "", "disable-local-file-access": ""})
+    return html, options
+
+
+def _convert(html: str, options: Dict[str, Any]) -> bytes:
+    """HTML to PDF in a wkhtmltopdf process; safe to run off the main thread"""
+    import pdfkit
+
+    return pdfkit.from_string(html, False, options=options)
+
+
+def render_uncached(keys: List[PdfKey], max_workers: int = PDF_MAX_WORKERS) -> Dict[PdfKey, bytes]:
+    """
+    Render ``keys`` with at most ``max_workers`` concurrent renderer processes
+
+    A document whose conversion fails falls back to ``frappe.get_print`` so
+    it gets the renderer's own error handling.
+    """
+    from frappe.utils.pdf import cleanup
+
+    prepared = {key: _prepare(key) for key in keys}
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(cint(max_workers), 1)) as pool:
+        futures = {key: pool.submit(_convert, html, options) for key, (html, options) in prepared.items()}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception:
+                doctype, name, print_format = key
+                results[key] = frappe.get_print(doctype, name, print_format, as_pdf=True)
+            finally:
+                cleanup(prepared[key][1])
+    return results
+
+
+def render_pdfs(requests: List[PdfKey], max_workers: int = PDF_MAX_WORKERS) -> Dict[PdfKey, bytes]:
+    """
+    PDFs of many documents, served from the disk cache where possible
+
+    Args:
+        requests: ``(doctype, name, print_format)`` tuples; print_format may be None
+        max_workers: Maximum concurrent renderer processes for cache misses
+
+    Returns:
+        PDF bytes keyed by the request tuple
+    """
+    keys = list(dict.fromkeys((doctype, name, print_format or None) for doctype, name, print_format in requests))
+    if not keys:
+        return {}
+
+    versions = get_versions(keys)
+    results, paths, misses = {}, {}, []
+    for key in keys:
+        paths[key] = get_cache_path(key, versions[key])
+        content = read_cached(paths[key])
+        if content:
+            results[key] = content
+        else:
+            misses.append(key)
+
+    for key, content in render_uncached(misses, max_workers).items():
+        results[key] = content
+        if versions[key] is not None:
+            write_cached(paths[key], content)
+    return results
+
+
+def get_pdf_attachment(doctype: str, name: str, print_format: Optional[str] = None,
+                       file_name: Optional[str] = None, content: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Cached drop-in for ``frappe.attach_print``
+
+    Pass ``content`` from an earlier :func:`render_pdfs` call to skip the
+    cache lookup.
+    """
+    if content is None:
+        content = render_pdfs([(doctype, name, print_format)])[(doctype, name, print_format or None)]
+    return {"fname": f"{file_name or name}.pdf", "fcontent": content}
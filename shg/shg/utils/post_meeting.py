@@ -0,0 +1,344 @@
+"""
+Post-meeting processing pipeline for submitted SHG Meetings.
+
+Submitting a meeting only enqueues :func:`run_post_meeting_pipeline`; the
+background job then
+
+1. creates the attendance fines of the meeting in one multi-row INSERT,
+   skipping members already fined for the same reason,
+2. invoices absentees with the settings, item and member data resolved once
+   up front, committing every :data:`INVOICE_CHUNK_SIZE` invoices, and
+3. renders the PDFs of the meeting's invoices that have no queued email yet
+   in one batch and hands the emails to the email queue.
+
+Progress is stored on the meeting (``post_meeting_status``,
+``post_meeting_progress`` and ``post_meeting_log``) and published to the open
+form. Every stage skips work that is already done, so the pipeline can be
+re-run after a failure.
+"""
+import frappe
+from frappe import _
+from frappe.utils import add_days, flt, getdate
+from typing import Any, Dict, List, Optional
+
+from shg.shg.utils.bulk_utils import bulk_insert_rows, chunked, reserve_series_names, table_has_column
+from shg.shg.utils.company_utils import get_default_company
+from shg.shg.utils.meeting_utils import get_fine_reason_from_attendance, sanitize_fine_reason
+from shg.shg.utils.pdf_batch import get_pdf_attachment, render_pdfs
+
+FINE_SERIES_PREFIX = "FINE-"
+FINE_SERIES_DIGITS = 4
+INVOICE_CHUNK_SIZE = 50
+
+# Share of the progress bar reached at the end of each stage
+FINES_PROGRESS = 20
+INVOICES_PROGRESS = 90
+
+
+def enqueue_post_meeting_processing(meeting) -> None:
+    """Mark the meeting as queued and enqueue its pipeline once the submit commits"""
+    meeting.db_set({
+        "post_meeting_status": "Queued",
+        "post_meeting_progress": 0,
+        "post_meeting_log": None,
+    }, update_modified=False)
+    frappe.enqueue(
+        "shg.shg.utils.post_meeting.run_post_meeting_pipeline",
+        queue="long",
+        timeout=3600,
+        job_name=f"post-meeting-{meeting.name}",
+        enqueue_after_commit=True,
+        meeting_name=meeting.name,
+    )
+
+
+def run_post_meeting_pipeline(meeting_name: str) -> Dict[str, Any]:
+    """
+    Background job: fines, absentee invoices and invoice emails of a meeting
+
+    Returns:
+        Number of fines, invoices and queued emails created by this run
+    """
+    meeting = frappe.get_doc("SHG Meeting", meeting_name)
+    settings = frappe.get_cached_doc("SHG Settings")
+    log = []
+    _update_progress(meeting_name, "Running", 0, log)
+
+    try:
+        fines = create_attendance_fines(meeting, settings)
+        log.append(_("{0} fines created").format(fines))
+        _update_progress(meeting_name, "Running", FINES_PROGRESS, log)
+
+        invoices = create_absentee_invoices(meeting, settings, log)
+        log.append(_("{0} absentee invoices created").format(len(invoices)))
+        _update_progress(meeting_name, "Running", INVOICES_PROGRESS, log)
+
+        emails = queue_absentee_emails(meeting, settings)
+        log.append(_("{0} invoice emails queued").format(emails))
+        _update_progress(meeting_name, "Completed", 100, log)
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), f"Post-meeting processing failed for {meeting_name}")
+        log.append(_("Failed: {0}").format(str(e)))
+        _update_progress(meeting_name, "Failed", None, log)
+        return {"status": "Failed"}
+
+    return {"status": "Completed", "fines": fines, "invoices": len(invoices), "emails": emails}
+
+
+def _update_progress(meeting_name: str, status: str, progress: Optional[float], log: List[str]):
+    """Persist the pipeline state on the meeting, commit and notify the open form"""
+    values = {"post_meeting_status": status, "post_meeting_log": "\n".join(log)}
+    if progress is not None:
+        values["post_meeting_progress"] = progress
+    frappe.db.set_value("SHG Meeting", meeting_name, values, update_modified=False)
+    frappe.db.commit()
+
+    if progress is not None:
+        frappe.publish_progress(
+            progress,
+            title=_("Post-Meeting Processing"),
+            doctype="SHG Meeting",
+            docname=meeting_name,
+            description=log[-1] if log else status,
+        )
+
+
+# ---------------------------------------------------
+# Fines
+# ---------------------------------------------------
+def build_attendance_fines(meeting, settings) -> List[Dict[str, Any]]:
+    """
+    Fine rows for absent and late members that were not fined yet
+
+    Existing fines of the meeting are read with one query and members are
+    de-duplicated on ``(member, fine_reason)``, the key
+    ``SHGMeetingFine.validate_duplicate`` enforces per document.
+    """
+    amounts = {
+        "Absent": flt(settings.absentee_fine),
+        "Late": flt(settings.lateness_fine),
+    }
+    attendance = [row for row in meeting.attendance or [] if amounts.get(row.attendance_status, 0) > 0]
+    if not attendance:
+        return []
+
+    existing = set(frappe.db.sql("""
+        SELECT member, fine_reason
+        FROM `tabSHG Meeting Fine`
+        WHERE meeting = %s AND docstatus < 2
+    """, (meeting.name,)))
+    member_names = dict(frappe.get_all(
+        "SHG Member",
+        filters={"name": ["in", list({row.member for row in attendance})]},
+        fields=["name", "member_name"],
+        as_list=True,
+    ))
+
+    # Set here as the bulk insert skips the before_validate company hook
+    company = get_default_company()
+
+    rows = []
+    for row in attendance:
+        fine_reason = sanitize_fine_reason(get_fine_reason_from_attendance(row.attendance_status))
+        if (row.member, fine_reason) in existing:
+            continue
+        existing.add((row.member, fine_reason))
+        rows.append({
+            "naming_series": f"{FINE_SERIES_PREFIX}.{'#' * FINE_SERIES_DIGITS}",
+            "meeting": meeting.name,
+            "member": row.member,
+            "member_name": member_names.get(row.member) or row.get("member_name"),
+            "fine_date": meeting.meeting_date,
+            "fine_amount": round(amounts[row.attendance_status], 2),
+            "fine_reason": fine_reason,
+            "fine_description": f"{fine_reason} fine for meeting on {meeting.meeting_date}",
+            "status": "Pending",
+            "voucher_type": "Fine Entry",
+            "company": company,
+            "created_by": frappe.session.user,
+        })
+    return rows
+
+
+def create_attendance_fines(meeting, settings=None) -> int:
+    """Insert the missing attendance fines of ``meeting`` as drafts and return their count"""
+    rows = build_attendance_fines(meeting, settings or frappe.get_cached_doc("SHG Settings"))
+    if not rows:
+        return 0
+
+    names = reserve_series_names(FINE_SERIES_PREFIX, FINE_SERIES_DIGITS, len(rows))
+    return bulk_insert_rows("SHG Meeting Fine", [{"name": name, **row} for name, row in zip(names, rows)])
+
+
+# ---------------------------------------------------
+# Absentee invoices
+# ---------------------------------------------------
+def get_absentees_to_invoice(meeting) -> List[Dict[str, Any]]:
+    """Absent members with a customer record that have no invoice for the meeting yet"""
+    absentees = list({row.member for row in meeting.attendance or [] if row.attendance_status == "Absent"})
+    if not absentees:
+        return []
+
+    members = frappe.get_all(
+        "SHG Member",
+        filters={"name": ["in", absentees]},
+        fields=["name", "member_name", "customer", "email"],
+        order_by="name",
+    )
+    invoiced = set()
+    if table_has_column("Sales Invoice", "shg_meeting"):
+        invoiced = set(frappe.get_all(
+            "Sales Invoice",
+            filters={"shg_meeting": meeting.name, "docstatus": ["<", 2]},
+            pluck="customer",
+        ))
+
+    pending = []
+    for member in members:
+        if not member.customer:
+            frappe.logger("shg").info(f"Skipped invoicing for member {member.name} - no customer record")
+        elif member.customer not in invoiced:
+            pending.append(member)
+    return pending
+
+
+def create_absentee_invoices(meeting, settings, log: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Create and submit one Sales Invoice per absentee
+
+    Invoices still go through the Sales Invoice controller for taxes and GL
+    entries, but the item name and member data are read once for the whole
+    meeting and work is committed per chunk. A failing invoice is rolled
+    back to its savepoint and logged without stopping the others.
+
+    Returns:
+        ``{"invoice", "member", "member_name", "email"}`` for every created invoice
+    """
+    if not settings.auto_invoice_absentees:
+        return []
+    if flt(settings.absent_fee) <= 0 or not settings.invoice_item:
+        if log is not None:
+            log.append(_("Auto-invoicing skipped: absent fee or invoice item not configured"))
+        return []
+
+    pending = get_absentees_to_invoice(meeting)
+    if not pending:
+        return []
+
+    item_name = frappe.db.get_value("Item", settings.invoice_item, "item_name")
+    description = f"Absence fine for meeting on {meeting.meeting_date}"
+    due_date = add_days(getdate(meeting.meeting_date), 1)
+
+    created, done = [], 0
+    for chunk in chunked(pending, INVOICE_CHUNK_SIZE):
+        for member in chunk:
+            savepoint = f"absentee_invoice_{frappe.generate_hash(length=6)}"
+            frappe.db.savepoint(savepoint)
+            try:
+                invoice = frappe.get_doc({
+                    "doctype": "Sales Invoice",
+                    "customer": member.customer,
+                    "posting_date": meeting.meeting_date,
+                    "due_date": due_date,
+                    "items": [{
+                        "item_code": settings.invoice_item,
+                        "item_name": item_name,
+                        "description": description,
+                        "qty": 1,
+                        "rate": settings.absent_fee,
+                        "amount": settings.absent_fee,
+                        "cost_center": settings.cost_center,
+                        "income_account": settings.income_account,
+                    }],
+                    "remarks": description,
+                    "shg_meeting": meeting.name,
+                })
+                invoice.insert()
+                invoice.submit()
+                created.append({
+                    "invoice": invoice.name,
+                    "member": member.name,
+                    "member_name": member.member_name,
+                    "email": member.email,
+                })
+            except Exception as e:
+                frappe.db.rollback(save_point=savepoint)
+                frappe.log_error(frappe.get_traceback(), f"Failed to create invoice for absent member {member.name}")
+                if log is not None:
+                    log.append(_("Invoice for {0} failed: {1}").format(member.name, str(e)))
+
+        done += len(chunk)
+        frappe.db.commit()
+        frappe.publish_progress(
+            FINES_PROGRESS + (INVOICES_PROGRESS - FINES_PROGRESS) * done / len(pending),
+            title=_("Post-Meeting Processing"),
+            doctype="SHG Meeting",
+            docname=meeting.name,
+            description=_("Invoiced {0} of {1} absentees").format(done, len(pending)),
+        )
+
+    return created
+
+
+# ---------------------------------------------------
+# Emails
+# ---------------------------------------------------
+def get_invoices_to_email(meeting) -> List[Dict[str, Any]]:
+    """
+    Submitted invoices of the meeting with no queued email yet
+
+    Read from all of the meeting's invoices rather than those of the current
+    run, so a re-run also mails invoices committed by an earlier, failed run.
+    """
+    if not table_has_column("Sales Invoice", "shg_meeting"):
+        return []
+    return frappe.db.sql("""
+        SELECT si.name AS invoice, m.name AS member, m.member_name, m.email
+        FROM `tabSales Invoice` si
+        INNER JOIN `tabSHG Member` m ON m.customer = si.customer
+        WHERE si.shg_meeting = %s AND si.docstatus = 1
+        AND IFNULL(m.email, '') != ''
+        AND NOT EXISTS (
+            SELECT 1 FROM `tabEmail Queue` q
+            WHERE q.reference_doctype = 'Sales Invoice' AND q.reference_name = si.name
+        )
+        ORDER BY si.name
+    """, (meeting.name,), as_dict=True)
+
+
+def queue_absentee_emails(meeting, settings) -> int:
+    """
+    Queue the absence invoice emails not queued yet
+
+    The invoice PDFs are rendered together through the batch renderer and
+    its disk cache, so a re-run after a failure does not render them again.
+
+    Returns:
+        Number of emails queued
+    """
+    invoices = get_invoices_to_email(meeting)
+    pdfs = render_pdfs([("Sales Invoice", invoice["invoice"], None) for invoice in invoices])
+
+    queued = 0
+    for invoice in invoices:
+        frappe.sendmail(
+            recipients=[invoice["email"]],
+            subject=f"Absence Fine for Meeting on {meeting.meeting_date}",
+            message=f"""Dear {invoice["member_name"]},
+
+You were marked absent for the SHG meeting held on {meeting.meeting_date}.
+A fine of KES {flt(settings.absent_fee):,.2f} has been invoiced to your account.
+
+Please find your invoice attached.
+
+Regards,
+SHG Management""",
+            attachments=[get_pdf_attachment(
+                "Sales Invoice", invoice["invoice"], content=pdfs[("Sales Invoice", invoice["invoice"], None)]
+            )],
+            reference_doctype="Sales Invoice",
+            reference_name=invoice["invoice"],
+        )
+        queued += 1
+    return queued
@@ -0,0 +1,218 @@
+"""
+Result cache for SHG script reports keyed by data versions.
+
+Every source doctype has a data-version token in Redis that changes on
+submit, cancel and update-after-submit, and wherever code writes those
+doctypes outside document events (db_set, bulk_update, raw SQL) through
+``bump_data_version_after_commit``. A cached report result is keyed by the
+report name, its normalised filters, today's date and the tokens of the
+doctypes it reads, so it is served until one of those doctypes changes or
+its TTL runs out; the TTL bounds staleness from writers that miss a bump.
+Results live in a per-process LRU bounded by entry count and pickled size;
+hit, miss and eviction counters are kept in Redis for all workers.
+"""
+import functools
+import hashlib
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+import frappe
+from frappe.utils import cint, today
+from typing import Any, Callable, Dict, List
+
+from shg.shg.utils.instrumentation import instrumented
+
+REPORT_CACHE_MAX_ENTRIES = 128
+REPORT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+REPORT_CACHE_TTL_SECONDS = 300
+
+DATA_VERSION_KEY = "shg_report_data_version"
+STATS_KEY = "shg_report_cache_stats"
+
+TRACKED_DOCTYPES = {
+    "SHG Contribution",
+    "SHG Contribution Invoice",
+    "SHG Loan",
+    "SHG Loan Repayment",
+    "SHG Meeting Fine",
+    "SHG Member",
+    "SHG Member Attendance",
+    "SHG Payment Entry",
+}
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_size = {"bytes": 0}
+
+
+# ---------------------------------------------------
+# Data versions
+# ---------------------------------------------------
+@instrumented()
+def on_doc_change(doc, method=None):
+    """
+    doc_events handler: invalidate cached reports that read ``doc.doctype``
+
+    The bump runs after commit so a report executed meanwhile cannot cache
+    pre-commit data under the new version.
+    """
+    if doc.doctype in TRACKED_DOCTYPES:
+        bump_data_version_after_commit(doc.doctype)
+
+
+def bump_data_version_after_commit(*doctypes: str):
+    """
+    Bump data versions once the current transaction commits
+
+    For writers that bypass document events, such as ``db_set`` and
+    ``bulk_update`` status updates.
+    """
+    tracked = sorted(set(doctypes) & TRACKED_DOCTYPES)
+    if tracked:
+        frappe.db.after_commit.add(functools.partial(bump_data_version, *tracked))
+
+
+def bump_data_version(*doctypes: str):
+    """Give each doctype a new data-version token"""
+    for doctype in doctypes:
+        frappe.cache().hset(DATA_VERSION_KEY, doctype, frappe.generate_hash(length=12))
+
+
+def get_data_versions(doctypes: List[str]) -> Dict[str, str]:
+    """Current data-version tokens, creating a token for doctypes that have none"""
+    versions = {}
+    for doctype in sorted(doctypes):
+        version = frappe.cache().hget(DATA_VERSION_KEY, doctype)
+        if not version:
+            version = frappe.generate_hash(length=12)
+            frappe.cache().hset(DATA_VERSION_KEY, doctype, version)
+        versions[doctype] = version
+    return versions
+
+
+# ---------------------------------------------------
+# Cache
+# ---------------------------------------------------
+def normalize_filters(filters) -> Dict[str, Any]:
+    """Drop empty filter values and stringify the rest so equal filters hash equally"""
+    if isinstance(filters, str):
+        filters = frappe.parse_json(filters)
+    normalized = {}
+    for key, value in (filters or {}).items():
+        if value in (None, "", [], {}):
+            continue
+        normalized[key] = [str(v) for v in value] if isinstance(value, (list, tuple)) else str(value)
+    return normalized
+
+
+def make_cache_key(report_name: str, filters, doctypes: List[str]) -> str:
+    """Key of a report result for the current site, day and data versions"""
+    payload = json.dumps({
+        "site": frappe.local.site,
+        "report": report_name,
+        "filters": normalize_filters(filters),
+        "versions": get_data_versions(doctypes),
+        "today": today(),
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def cache_get(key: str):
+    """Return a fresh copy of a cached result or None, moving it to the LRU head"""
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        expires_at, blob = entry
+        if expires_at <= time.monotonic():
+            del _entries[key]
+            _size["bytes"] -= len(blob)
+            return None
+        _entries.move_to_end(key)
+    return pickle.loads(blob)
+
+
+def cache_set(key: str, result) -> int:
+    """
+    Store a result for ``REPORT_CACHE_TTL_SECONDS``, evicting least recently
+    used entries to stay in bounds
+
+    Returns:
+        Number of evicted entries
+    """
+    blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(blob) > REPORT_CACHE_MAX_BYTES // 4:
+        return 0
+
+    evicted = 0
+    with _lock:
+        previous = _entries.pop(key, None)
+        if previous is not None:
+            _size["bytes"] -= len(previous[1])
+        _entries[key] = (time.monotonic() + REPORT_CACHE_TTL_SECONDS, blob)
+        _size["bytes"] += len(blob)
+        while len(_entries) > REPORT_CACHE_MAX_ENTRIES or _size["bytes"] > REPORT_CACHE_MAX_BYTES:
+            _, (_, dropped) = _entries.popitem(last=False)
+            _size["bytes"] -= len(dropped)
+            evicted += 1
+    return evicted
+
+
+def clear_local_cache():
+    """Drop every cached result of this process"""
+    with _lock:
+        _entries.clear()
+        _size["bytes"] = 0
+
+
+def _stats_key(stat: str) -> str:
+    return frappe.cache().make_key(f"{STATS_KEY}:{stat}")
+
+
+def _count(stat: str, amount: int = 1):
+    if amount:
+        frappe.cache().incrby(_stats_key(stat), amount)
+
+
+def cached_report(report_name: str, doctypes: List[str]) -> Callable:
+    """
+    Decorate a script report's ``execute`` to serve results from the cache
+
+    Args:
+        report_name: Report name, part of the cache key
+        doctypes: Source doctypes whose data versions invalidate the result
+    """
+    unknown = set(doctypes) - TRACKED_DOCTYPES
+    if unknown:
+        raise ValueError(f"Data versions are not tracked for {', '.join(sorted(unknown))}")
+
+    def decorator(execute):
+        @functools.wraps(execute)
+        def wrapper(filters=None):
+            key = make_cache_key(report_name, filters, doctypes)
+            result = cache_get(key)
+            if result is not None:
+                _count("hits")
+                return result
+
+            _count("misses")
+            result = execute(filters)
+            _count("evictions", cache_set(key, result))
+            return result
+        return wrapper
+    return decorator
+
+
+@frappe.whitelist()
+def get_report_cache_stats() -> Dict[str, Any]:
+    """Hit rate across workers and this process's cache footprint"""
+    frappe.only_for(["System Manager", "SHG Admin"])
+    stats = {stat: cint(frappe.cache().get(_stats_key(stat))) for stat in ("hits", "misses", "evictions")}
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0
+    with _lock:
+        stats["entries"] = len(_entries)
+        stats["bytes"] = _size["bytes"]
+    return stats
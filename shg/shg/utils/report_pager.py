@@ -0,0 +1,278 @@
+"""
+Paginated execution and background export for large SHG script reports.
+
+A paginated report exposes ``get_columns()`` and ``get_query(filters)``. The
+query returns its rows together with the sort key columns named in
+``keys``, which should be raw indexed columns rather than computed ones.
+Rows are read in descending key order with keyset pagination
+(``WHERE keys < cursor ORDER BY keys DESC LIMIT n``), so every page costs
+one index range scan however deep the reader goes. Keys listed in
+``nullable_keys`` may be NULL; those rows sort after every value, as
+``DESC`` orders them, and the cursor condition has an explicit ``IS NULL``
+branch so they stay reachable. The desk view shows the
+first page, :func:`get_report_page` serves the following ones and
+:func:`start_report_export` streams the full result to a CSV or XLSX file
+chunk by chunk in a background job.
+"""
+import csv
+import json
+import frappe
+from frappe import _
+from frappe.utils import cint
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+REPORT_PAGE_LENGTH = 1000
+MAX_PAGE_LENGTH = 5000
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ("csv", "xlsx")
+
+PAGINATED_REPORTS = {
+    "Loan Transaction Ledger": "shg.shg.report.loan_transaction_ledger.loan_transaction_ledger",
+    "SHG Repayments Register": "shg.shg.report.shg_repayments_register.shg_repayments_register",
+    "Contribution Summary": "shg.shg.report.contribution_summary.contribution_summary",
+    "Loan Portfolio": "shg.shg.report.loan_portfolio.loan_portfolio",
+}
+
+
+# ---------------------------------------------------
+# Keyset pagination
+# ---------------------------------------------------
+def encode_cursor(row: Dict[str, Any], keys: List[str]) -> str:
+    """Serialise the sort key values of ``row`` into an opaque cursor"""
+    return json.dumps([row.get(key) for key in keys], default=str)
+
+
+def decode_cursor(cursor: Optional[str], keys: List[str]) -> Optional[List[Any]]:
+    """Parse a cursor produced by :func:`encode_cursor`"""
+    if not cursor:
+        return None
+    values = json.loads(cursor) if isinstance(cursor, str) else list(cursor)
+    if len(values) != len(keys):
+        frappe.throw(_("Invalid report cursor"))
+    return values
+
+
+def _keyset_condition(keys: List[str], cursor_values: List[Any],
+                      nullable_keys=()) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build ``(k0 < c0) OR (k0 = c0 AND k1 < c1) ...`` for a descending sort
+
+    NULL sorts last: past a non-NULL cursor value a nullable key also
+    matches NULL, and past a NULL one only later keys can advance.
+    """
+    clauses, values = [], {}
+    equal = []
+    for position, key in enumerate(keys):
+        param = f"%(_cursor_{position})s"
+        if cursor_values[position] is None:
+            # Nothing sorts after NULL on this key
+            equal.append(f"page.`{key}` IS NULL")
+            continue
+        after = f"page.`{key}` < {param}"
+        if key in nullable_keys:
+            after = f"({after} OR page.`{key}` IS NULL)"
+        clauses.append("(" + " AND ".join(equal + [after]) + ")")
+        equal.append(f"page.`{key}` = {param}")
+        values[f"_cursor_{position}"] = cursor_values[position]
+    return "(" + (" OR ".join(clauses) or "1=0") + ")", values
+
+
+def build_page_query(spec: Dict[str, Any], cursor: Optional[str] = None,
+                     page_length: int = REPORT_PAGE_LENGTH) -> Tuple[str, Dict[str, Any]]:
+    """
+    SQL and values reading one page of a report query
+
+    The report query is wrapped as a derived table; with no grouping or
+    LIMIT inside it the optimizer merges it into the outer SELECT so the
+    cursor condition and ORDER BY still use the table's indexes. One row
+    more than ``page_length`` is read to detect the last page.
+    """
+    keys = spec["keys"]
+    values = dict(spec.get("values") or {})
+    condition = "1=1"
+    cursor_values = decode_cursor(cursor, keys)
+    if cursor_values is not None:
+        condition, cursor_params = _keyset_condition(keys, cursor_values, spec.get("nullable_keys") or ())
+        values.update(cursor_params)
+
+    order_by = ", ".join(f"page.`{key}` DESC" for key in keys)
+    query = f"""
+        SELECT * FROM ({spec["query"]}) page
+        WHERE {condition}
+        ORDER BY {order_by}
+        LIMIT {cint(page_length) + 1}
+    """
+    return query, values
+
+
+def fetch_page(spec: Dict[str, Any], cursor: Optional[str] = None,
+               page_length: int = REPORT_PAGE_LENGTH) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Read one page of a report query
+
+    Args:
+        spec: ``{"query", "values", "keys", "nullable_keys"}`` from the report's ``get_query``
+        cursor: Cursor returned with the previous page
+        page_length: Maximum number of rows to return
+
+    Returns:
+        Tuple of the rows and the cursor of the next page (None on the last page)
+    """
+    query, values = build_page_query(spec, cursor, page_length)
+    rows = frappe.db.sql(query, values, as_dict=True)
+
+    next_cursor = None
+    if len(rows) > page_length:
+        rows = rows[:page_length]
+        next_cursor = encode_cursor(rows[-1], spec["keys"])
+    return rows, next_cursor
+
+
+def iter_rows(spec: Dict[str, Any], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield every row of a report query, holding one chunk in memory at a time"""
+    cursor = None
+    while True:
+        rows, cursor = fetch_page(spec, cursor, chunk_size)
+        yield from rows
+        if not cursor:
+            break
+
+
+def execute_paged(columns: List[Dict[str, Any]], spec: Dict[str, Any], page_length: int = REPORT_PAGE_LENGTH):
+    """
+    ``execute`` result for the desk view: the first page plus a notice when truncated
+
+    Returns:
+        ``(columns, data)`` or ``(columns, data, message)``
+    """
+    rows, next_cursor = fetch_page(spec, page_length=page_length)
+    if not next_cursor:
+        return columns, rows
+    message = _("Showing the first {0} rows. Use the background export for the full result.").format(page_length)
+    return columns, rows, message
+
+
+# ---------------------------------------------------
+# API
+# ---------------------------------------------------
+def get_report_module(report_name: str):
+    """Return the module of a paginated report after checking the user may run it"""
+    if report_name not in PAGINATED_REPORTS:
+        frappe.throw(_("Report {0} does not support paginated export").format(report_name))
+    if not frappe.get_doc("Report", report_name).is_permitted():
+        frappe.throw(_("You don't have access to Report: {0}").format(report_name), frappe.PermissionError)
+    return frappe.get_module(PAGINATED_REPORTS[report_name])
+
+
+@frappe.whitelist()
+def get_report_page(report_name: str, filters=None, cursor: Optional[str] = None,
+                    page_length: int = REPORT_PAGE_LENGTH) -> Dict[str, Any]:
+    """
+    Return one page of a paginated report
+
+    Returns:
+        Dictionary with ``columns``, ``data`` and ``next_cursor``
+    """
+    module = get_report_module(report_name)
+    page_length = min(max(cint(page_length), 1), MAX_PAGE_LENGTH)
+    filters = frappe._dict(frappe.parse_json(filters) or {})
+    rows, next_cursor = fetch_page(module.get_query(filters), cursor, page_length)
+    return {"columns": module.get_columns(), "data": rows, "next_cursor": next_cursor}
+
+
+@frappe.whitelist()
+def start_report_export(report_name: str, filters=None, file_format: str = "csv") -> Dict[str, Any]:
+    """Queue a background export of the full report result"""
+    get_report_module(report_name)
+    if file_format not in EXPORT_FORMATS:
+        frappe.throw(_("Unsupported export format {0}").format(file_format))
+
+    frappe.enqueue(
+        "shg.shg.utils.report_pager.run_report_export",
+        queue="long",
+        timeout=3600,
+        job_name=f"report-export-{frappe.scrub(report_name)}",
+        report_name=report_name,
+        filters=frappe.parse_json(filters) or {},
+        file_format=file_format,
+    )
+    return {"status": "queued"}
+
+
+# ---------------------------------------------------
+# Export
+# ---------------------------------------------------
+def write_csv(path: str, columns: List[Dict[str, Any]], rows: Iterator[Dict[str, Any]]) -> int:
+    """Stream rows to a CSV file and return the row count"""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([column["label"] for column in columns])
+        for row in rows:
+            writer.writerow([row.get(column["fieldname"]) for column in columns])
+            count += 1
+    return count
+
+
+def write_xlsx(path: str, columns: List[Dict[str, Any]], rows: Iterator[Dict[str, Any]]) -> int:
+    """Stream rows to an XLSX file with a write-only workbook and return the row count"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([column["label"] for column in columns])
+    count = 0
+    for row in rows:
+        sheet.append([row.get(column["fieldname"]) for column in columns])
+        count += 1
+    workbook.save(path)
+    return count
+
+
+EXPORT_WRITERS = {"csv": write_csv, "xlsx": write_xlsx}
+
+
+def run_report_export(report_name: str, filters: Dict[str, Any], file_format: str = "csv") -> Dict[str, Any]:
+    """
+    Background job behind :func:`start_report_export`
+
+    Writes the file to the site's private files, attaches a File record
+    owned by the requesting user and notifies them with the download link.
+    """
+    module = get_report_module(report_name)
+    spec = module.get_query(frappe._dict(filters or {}))
+
+    file_name = f"{frappe.scrub(report_name)}-{frappe.generate_hash(length=8)}.{file_format}"
+    path = frappe.get_site_path("private", "files", file_name)
+    count = EXPORT_WRITERS[file_format](path, module.get_columns(), iter_rows(spec))
+
+    file_doc = frappe.get_doc({
+        "doctype": "File",
+        "file_name": file_name,
+        "file_url": f"/private/files/{file_name}",
+        "is_private": 1,
+    }).insert(ignore_permissions=True)
+    frappe.db.commit()
+
+    notify_export_ready(report_name, file_doc, count)
+    return {"file_url": file_doc.file_url, "rows": count}
+
+
+def notify_export_ready(report_name: str, file_doc, count: int):
+    """Tell the requesting user the export is ready (realtime and Notification Log)"""
+    from frappe.desk.doctype.notification_log.notification_log import enqueue_create_notification
+
+    user = frappe.session.user
+    subject = _("{0} export is ready ({1} rows)").format(report_name, count)
+    enqueue_create_notification(user, {
+        "type": "Alert",
+        "document_type": "File",
+        "document_name": file_doc.name,
+        "subject": subject,
+        "email_content": f'<a href="{file_doc.file_url}">{file_doc.file_name}</a>',
+    })
+    frappe.publish_realtime(
+        "shg_report_export_ready",
+        {"report_name": report_name, "file_url": file_doc.file_url, "rows": count},
+        user=user,
+    )
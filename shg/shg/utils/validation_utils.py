@@ -113,6 +113,10 @@ def _validate_custom_field_in_journal_entry(journal_entry_name, custom_field, ex
     try:
         je = frappe.get_doc("Journal Entry", journal_entry_name)
         
+        # Entries shared by several meeting fines link each fine on its own line
+        if not je.get(custom_field) and any(row.get(custom_field) == expected_value for row in je.accounts):
+            return
+        
         # Check if the custom field exists and has the correct value
         if not hasattr(je, custom_field) or not getattr(je, custom_field):
             frappe.throw(
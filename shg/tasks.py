@@ -2,6 +2,7 @@ import frappe
 from frappe.utils import today, add_days, getdate, get_last_day, get_first_day
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
+from shg.shg.utils.pdf_batch import get_pdf_attachment
 
 def all():
     """Task that runs every few minutes"""
@@ -130,7 +131,9 @@ def generate_monthly_reports():
 
 def get_overdue_loans():
     """Get list of overdue loans"""
-    return frappe.db.sql("""
+    from shg.utils.security import decrypt_member_rows
+
+    rows = frappe.db.sql("""
         SELECT 
             l.name,
             l.member,
@@ -148,6 +151,7 @@ def get_overdue_loans():
         AND l.balance_amount > 0
         ORDER BY overdue_days DESC
     """, (today(), today()), as_dict=True)
+    return decrypt_member_rows(rows, ["phone_number"])
 
 def send_loan_reminder(loan_name):
     """Send loan repayment reminder"""
@@ -544,7 +548,7 @@ SHG Management"""
             recipients=[member.email],
             subject=subject,
             message=message,
-            attachments=[frappe.attach_print("Sales Invoice", invoice.name, file_name=invoice.name)]
+            attachments=[get_pdf_attachment("Sales Invoice", invoice.name)]
         )
         
         # Log the notification
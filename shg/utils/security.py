@@ -1,10 +1,44 @@
 import frappe
 import hashlib
+import hmac
+import re
 import secrets
+from contextlib import contextmanager
 from cryptography.fernet import Fernet
-from typing import Optional, Dict, Any
+from frappe.utils import cint
+from frappe.utils.password import get_decrypted_password, set_encrypted_password
+from typing import Optional, Dict, Any, List
 import json
 
+from shg.shg.utils.bulk_utils import (
+    DEFAULT_CHUNK_SIZE,
+    clear_checkpoint,
+    load_checkpoint,
+    save_checkpoint,
+    table_has_column,
+)
+
+# Fernet objects per (site, key version). Keys never change for a given
+# version, so entries only need dropping when a site is reconfigured.
+_cipher_cache: Dict[tuple, Fernet] = {}
+
+KEY_VERSION_CACHE_KEY = "shg_encryption_key_version"
+TOKEN_PATTERN = re.compile(r"^(?:v(\d+)\$)?(gAAAAA[A-Za-z0-9_\-=]+)$")
+
+# Sensitive SHG Member columns encrypted by the bulk migration
+DEFAULT_MEMBER_ENCRYPTED_FIELDS = ("id_number", "phone_number", "next_of_kin_id_number", "next_of_kin_phone")
+# Encrypted SHG Member column -> column holding its deterministic hash, used
+# for uniqueness checks and lookups once the plaintext is no longer stored
+MEMBER_HASH_FIELDS = {"id_number": "id_number_hash", "phone_number": "phone_number_hash"}
+
+
+def is_encrypted_value(value: Optional[str]) -> bool:
+    """
+    Check whether a stored value is an SHG ciphertext (versioned or legacy)
+    """
+    return bool(value) and isinstance(value, str) and bool(TOKEN_PATTERN.match(value))
+
+
 class SHGSecurity:
     """
     Security module for SHG ERPNext application
@@ -12,7 +46,14 @@ class SHGSecurity:
     """
     
     def __init__(self):
-        self.settings = frappe.get_single("SHG Settings")
+        self._settings = None
+    
+    @property
+    def settings(self):
+        """SHG Settings, loaded only when a caller actually needs the document"""
+        if self._settings is None:
+            self._settings = frappe.get_single("SHG Settings")
+        return self._settings
     
     def encrypt_data(self, data: str) -> str:
         """
@@ -22,15 +63,10 @@ class SHGSecurity:
             data: String data to encrypt
             
         Returns:
-            Encrypted data as string
+            Encrypted data as string, prefixed with the key version
         """
         try:
-            # Get or generate encryption key
-            encryption_key = self._get_encryption_key()
-            cipher_suite = Fernet(encryption_key.encode())
-            
-            encrypted_data = cipher_suite.encrypt(data.encode())
-            return encrypted_data.decode()
+            return self.encrypt_many([data])[0]
         except Exception as e:
             frappe.log_error(f"Encryption failed: {str(e)}", "SHG Security Error")
             raise
@@ -46,33 +82,115 @@ class SHGSecurity:
             Decrypted data as string
         """
         try:
-            # Get encryption key
-            encryption_key = self._get_encryption_key()
-            cipher_suite = Fernet(encryption_key.encode())
-            
-            decrypted_data = cipher_suite.decrypt(encrypted_data.encode())
-            return decrypted_data.decode()
+            return self.decrypt_many([encrypted_data])[0]
         except Exception as e:
             frappe.log_error(f"Decryption failed: {str(e)}", "SHG Security Error")
             raise
     
-    def _get_encryption_key(self) -> str:
-        """
-        Get or generate encryption key from settings
+    def encrypt_many(self, values: List[Optional[str]], key_version: Optional[int] = None) -> List[Optional[str]]:
         """
-        # Check if encryption key exists in settings
-        if not hasattr(self.settings, 'encryption_key') or not self.settings.encryption_key:
-            # Generate a new key
-            key = Fernet.generate_key().decode()
+        Encrypt a list of values with a single cipher lookup
+        
+        Args:
+            values: Plaintext values; empty values are passed through unchanged
+            key_version: Key version to encrypt with (defaults to the current one)
             
-            # Store in settings (this would typically be in a secure field)
-            # For now, we'll use a custom field approach
-            self.settings.encryption_key = key
-            self.settings.save(ignore_permissions=True)
+        Returns:
+            List of ciphertexts in the same order
+        """
+        version = key_version or self.get_current_key_version()
+        cipher_suite = self._get_cipher(version)
+        prefix = f"v{version}$"
+        
+        return [
+            prefix + cipher_suite.encrypt(str(value).encode()).decode() if value else value
+            for value in values
+        ]
+    
+    def decrypt_many(self, values: List[Optional[str]]) -> List[Optional[str]]:
+        """
+        Decrypt a list of values, each with the key version it was written with
+        
+        Args:
+            values: Ciphertexts; empty values are passed through unchanged
             
+        Returns:
+            List of plaintext values in the same order
+        """
+        result = []
+        for value in values:
+            if not value:
+                result.append(value)
+                continue
+            
+            match = TOKEN_PATTERN.match(value)
+            if not match:
+                raise ValueError("Value is not an SHG encrypted token")
+            
+            # Tokens written before key versioning carry no prefix and use version 1
+            version = int(match.group(1) or 1)
+            result.append(self._get_cipher(version).decrypt(match.group(2).encode()).decode())
+        
+        return result
+    
+    def get_current_key_version(self) -> int:
+        """
+        Current encryption key version, cached across requests
+        """
+        version = frappe.cache().get_value(
+            KEY_VERSION_CACHE_KEY,
+            generator=lambda: cint(frappe.db.get_single_value("SHG Settings", "encryption_key_version")) or 1
+        )
+        return cint(version) or 1
+    
+    def _get_cipher(self, version: int) -> Fernet:
+        """
+        Get the cached Fernet object for a key version
+        """
+        cache_key = (getattr(frappe.local, "site", None), version)
+        cipher_suite = _cipher_cache.get(cache_key)
+        if cipher_suite is None:
+            cipher_suite = Fernet(self._get_encryption_key(version).encode())
+            _cipher_cache[cache_key] = cipher_suite
+        return cipher_suite
+    
+    def _get_encryption_key(self, version: int = 1) -> str:
+        """
+        Get the encryption key for a version, generating version 1 on first use
+        
+        Keys live in the encrypted password store; version 1 is the
+        ``encryption_key`` field of SHG Settings, later versions are stored
+        under ``encryption_key_v<n>`` by :meth:`rotate_key`.
+        """
+        fieldname = _key_fieldname(version)
+        key = get_decrypted_password("SHG Settings", "SHG Settings", fieldname, raise_exception=False)
+        if key:
             return key
-        else:
-            return self.settings.encryption_key
+        
+        if version != 1:
+            frappe.throw(f"Encryption key version {version} is not available")
+        
+        # Generate the first key without saving the whole settings document
+        key = Fernet.generate_key().decode()
+        set_encrypted_password("SHG Settings", "SHG Settings", key, fieldname)
+        return key
+    
+    def rotate_key(self) -> int:
+        """
+        Create a new key version and make it current
+        
+        Older keys are kept so existing ciphertexts stay readable until
+        :func:`reencrypt_member_fields` has rewritten them.
+        
+        Returns:
+            The new key version
+        """
+        new_version = self.get_current_key_version() + 1
+        set_encrypted_password("SHG Settings", "SHG Settings", Fernet.generate_key().decode(),
+                               _key_fieldname(new_version))
+        frappe.db.set_single_value("SHG Settings", "encryption_key_version", new_version)
+        frappe.cache().delete_value(KEY_VERSION_CACHE_KEY)
+        return new_version
     
     def hash_data(self, data: str, algorithm: str = 'sha256') -> str:
         """
@@ -94,6 +212,25 @@ class SHGSecurity:
         else:
             raise ValueError(f"Unsupported hash algorithm: {algorithm}")
     
+    def blind_index(self, data: str) -> str:
+        """
+        Deterministic keyed hash of a sensitive value
+        
+        Like :meth:`hash_data` with sha256, but keyed with encryption key
+        version 1 (kept across rotations), so a short value such as an ID
+        number cannot be recovered by hashing every candidate.
+        
+        Args:
+            data: Plaintext value
+            
+        Returns:
+            Hex digest, or None for an empty value
+        """
+        if not data:
+            return None
+        key = self._get_encryption_key(1).encode()
+        return hmac.new(key, str(data).encode(), hashlib.sha256).hexdigest()
+    
     def generate_secure_token(self, length: int = 32) -> str:
         """
         Generate a cryptographically secure token
@@ -284,6 +421,33 @@ class DataPrivacyManager:
                 "error": str(e)
             }
     
+    def anonymize_members(self, member_ids: List[str]) -> Dict[str, Any]:
+        """
+        Anonymize many members at once with set-based updates
+        
+        Args:
+            member_ids: IDs of the members to anonymize
+            
+        Returns:
+            Dictionary with per-member anonymization summary
+        """
+        from shg.shg.utils.member_purge import execute_anonymize
+        return execute_anonymize(member_ids)
+    
+    def purge_members(self, member_ids: List[str], job_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Permanently delete many members and their linked records
+        
+        Args:
+            member_ids: IDs of the members to purge
+            job_id: Checkpoint id, pass the same id to resume an interrupted run
+            
+        Returns:
+            Dictionary with per-member deletion summary
+        """
+        from shg.shg.utils.member_purge import execute_purge
+        return execute_purge(member_ids, job_id=job_id)
+    
     def export_member_data(self, member_id: str) -> Dict[str, Any]:
         """
         Export member data for GDPR compliance
@@ -372,6 +536,249 @@ class DataPrivacyManager:
                 "error": str(e)
             }
 
+def _key_fieldname(version: int) -> str:
+    """Password-store fieldname holding the key for a version"""
+    return "encryption_key" if cint(version) <= 1 else f"encryption_key_v{cint(version)}"
+
+def _rewrite_member_fields(fields: List[str], transform, checkpoint_key: str,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Walk SHG Member in primary-key order and rewrite sensitive columns in batches
+    
+    ``transform(fieldname, values)`` receives every value of one column in
+    the current batch and returns the new values (or None to leave a value
+    untouched). Rows are read and written with plain SQL so no member
+    documents are loaded; progress is checkpointed after every batch.
+    """
+    fields = [field for field in fields if table_has_column("SHG Member", field)]
+    state = load_checkpoint(checkpoint_key) or {"last_name": "", "updated": 0, "skipped": []}
+    column_list = ", ".join(f"`{field}`" for field in fields)
+    
+    while fields:
+        rows = frappe.db.sql(
+            f"""
+            SELECT name, {column_list}
+            FROM `tabSHG Member`
+            WHERE name > %(last_name)s
+            ORDER BY name
+            LIMIT %(limit)s
+            """,
+            {"last_name": state["last_name"], "limit": cint(chunk_size)},
+            as_dict=True,
+        )
+        if not rows:
+            break
+        
+        updates = {}
+        for field in fields:
+            new_values = transform(field, [row[field] for row in rows])
+            for row, new_value in zip(rows, new_values):
+                if new_value is None or new_value == row[field]:
+                    continue
+                # Data columns are varchar(140); never truncate a ciphertext
+                if len(new_value) > 140:
+                    state["skipped"].append(f"{row.name}:{field}")
+                    continue
+                updates.setdefault(row.name, {})[field] = new_value
+        
+        if updates:
+            frappe.db.bulk_update("SHG Member", updates, chunk_size=cint(chunk_size), update_modified=False)
+        
+        state["last_name"] = rows[-1].name
+        state["updated"] += len(updates)
+        save_checkpoint(checkpoint_key, state)
+        frappe.db.commit()
+    
+    clear_checkpoint(checkpoint_key)
+    frappe.db.commit()
+    return {"status": "success", "updated": state["updated"], "skipped": state["skipped"]}
+
+def encryption_enabled() -> bool:
+    """Whether sensitive member columns are stored encrypted"""
+    return bool(cint(frappe.db.get_single_value("SHG Settings", "enable_data_encryption")))
+
+def decrypt_value(value: Optional[str], security: Optional[SHGSecurity] = None) -> Optional[str]:
+    """Plaintext of a stored member value; plaintext values are returned as they are"""
+    if not is_encrypted_value(value):
+        return value
+    return (security or SHGSecurity()).decrypt_data(value)
+
+def decrypt_member_rows(rows: List[Dict[str, Any]], fields=DEFAULT_MEMBER_ENCRYPTED_FIELDS) -> List[Dict[str, Any]]:
+    """
+    Decrypt the sensitive columns of SHG Member rows in place
+    
+    The read path for code that fetches member rows with SQL or
+    ``frappe.get_all``; documents are decrypted on load by the controller.
+    """
+    security = SHGSecurity()
+    for field in fields:
+        present = [row for row in rows if is_encrypted_value(row.get(field))]
+        if not present:
+            continue
+        for row, value in zip(present, security.decrypt_many([row.get(field) for row in present])):
+            # update() works for row dicts and documents alike
+            row.update({field: value})
+    return rows
+
+def get_member_phone_numbers(members: Optional[List[str]] = None) -> Dict[str, str]:
+    """Plaintext phone number of every member that has one, keyed by member"""
+    conditions, values = "", {}
+    if members:
+        conditions, values = "AND name IN %(members)s", {"members": tuple(members)}
+    rows = frappe.db.sql(f"""
+        SELECT name, phone_number FROM `tabSHG Member`
+        WHERE docstatus < 2 AND IFNULL(phone_number, '') != '' {conditions}
+    """, values, as_dict=True)
+    return {row.name: row.phone_number for row in decrypt_member_rows(rows, ["phone_number"])}
+
+def set_member_hashes(doc) -> None:
+    """Set the hash columns of a member document from its plaintext values"""
+    security = SHGSecurity()
+    for field, hash_field in MEMBER_HASH_FIELDS.items():
+        if doc.meta.has_field(hash_field):
+            doc.set(hash_field, security.blind_index(decrypt_value(doc.get(field), security)))
+
+@contextmanager
+def encrypted_member_fields(doc):
+    """
+    Hold a member document's sensitive fields encrypted while it is written
+    
+    Hashes are always set; the fields themselves are encrypted only when
+    data encryption is enabled, and restored to plaintext afterwards so the
+    in-memory document stays readable.
+    """
+    set_member_hashes(doc)
+    if not encryption_enabled():
+        yield
+        return
+    
+    plaintext = {
+        field: doc.get(field) for field in DEFAULT_MEMBER_ENCRYPTED_FIELDS
+        if doc.meta.has_field(field) and doc.get(field) and not is_encrypted_value(doc.get(field))
+    }
+    for field, value in zip(plaintext, SHGSecurity().encrypt_many(list(plaintext.values()))):
+        doc.set(field, value)
+    try:
+        yield
+    finally:
+        for field, value in plaintext.items():
+            doc.set(field, value)
+
+def backfill_member_hashes(chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Fill the hash columns of every SHG Member from its (decrypted) values
+    
+    Returns:
+        Number of members updated
+    """
+    hash_fields = {field: hash_field for field, hash_field in MEMBER_HASH_FIELDS.items()
+                   if table_has_column("SHG Member", field) and table_has_column("SHG Member", hash_field)}
+    if not hash_fields:
+        return 0
+    
+    security = SHGSecurity()
+    columns = ", ".join(f"`{column}`" for pair in hash_fields.items() for column in pair)
+    last_name, updated = "", 0
+    while True:
+        rows = frappe.db.sql(f"""
+            SELECT name, {columns} FROM `tabSHG Member`
+            WHERE name > %(last_name)s ORDER BY name LIMIT %(limit)s
+        """, {"last_name": last_name, "limit": cint(chunk_size)}, as_dict=True)
+        if not rows:
+            break
+        
+        stored = {row.name: {hash_field: row[hash_field] for hash_field in hash_fields.values()} for row in rows}
+        decrypt_member_rows(rows, list(hash_fields))
+        updates = {}
+        for row in rows:
+            values = {hash_field: security.blind_index(row[field]) for field, hash_field in hash_fields.items()}
+            if values != stored[row.name]:
+                updates[row.name] = values
+        if updates:
+            frappe.db.bulk_update("SHG Member", updates, chunk_size=cint(chunk_size), update_modified=False)
+        
+        updated += len(updates)
+        last_name = rows[-1].name
+        frappe.db.commit()
+    return updated
+
+def encrypt_member_fields(fields: Optional[List[str]] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Encrypt existing plaintext sensitive columns across all SHG Members
+    
+    Already encrypted values are left alone, so the job can be re-run safely.
+    The hash columns are filled first, so uniqueness checks and lookups keep
+    working on the encrypted rows.
+    """
+    backfill_member_hashes(chunk_size)
+    security = SHGSecurity()
+    version = security.get_current_key_version()
+    
+    def transform(field, values):
+        plaintext = [None if not value or is_encrypted_value(value) else value for value in values]
+        return security.encrypt_many(plaintext, key_version=version)
+    
+    return _rewrite_member_fields(list(fields or DEFAULT_MEMBER_ENCRYPTED_FIELDS), transform,
+                                  "shg_encrypt_member_fields", chunk_size)
+
+def reencrypt_member_fields(fields: Optional[List[str]] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Re-encrypt values written with an older key under the current key version
+    """
+    security = SHGSecurity()
+    version = security.get_current_key_version()
+    current_prefix = f"v{version}$"
+    
+    def transform(field, values):
+        stale = [value if is_encrypted_value(value) and not value.startswith(current_prefix) else None
+                 for value in values]
+        return security.encrypt_many(security.decrypt_many(stale), key_version=version)
+    
+    return _rewrite_member_fields(list(fields or DEFAULT_MEMBER_ENCRYPTED_FIELDS), transform,
+                                  "shg_reencrypt_member_fields", chunk_size)
+
+@frappe.whitelist()
+def start_member_field_encryption(fields=None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Queue the bulk encryption of sensitive SHG Member columns
+    """
+    if "System Manager" not in frappe.get_roles():
+        frappe.throw("Only System Manager can perform this action.")
+    
+    if not frappe.db.get_single_value("SHG Settings", "enable_data_encryption"):
+        frappe.throw("Enable Data Encryption in SHG Settings first.")
+    
+    if isinstance(fields, str):
+        fields = json.loads(fields)
+    
+    frappe.enqueue(
+        "shg.utils.security.encrypt_member_fields",
+        queue="long",
+        timeout=7200,
+        fields=fields,
+        chunk_size=cint(chunk_size),
+    )
+    return {"status": "queued"}
+
+@frappe.whitelist()
+def rotate_encryption_key(chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Create a new key version and queue re-encryption of existing values
+    """
+    if "System Manager" not in frappe.get_roles():
+        frappe.throw("Only System Manager can perform this action.")
+    
+    new_version = SHGSecurity().rotate_key()
+    frappe.db.commit()
+    
+    frappe.enqueue(
+        "shg.utils.security.reencrypt_member_fields",
+        queue="long",
+        timeout=7200,
+        chunk_size=cint(chunk_size),
+    )
+    return {"status": "queued", "key_version": new_version}
+
 # Global functions for easy access
 def encrypt_data(data: str) -> str:
     """
@@ -401,6 +808,20 @@ def anonymize_member_data(member_id: str) -> Dict[str, Any]:
     manager = DataPrivacyManager()
     return manager.anonymize_member_data(member_id)
 
+def anonymize_members(member_ids: List[str]) -> Dict[str, Any]:
+    """
+    Convenience function to anonymize many members
+    """
+    manager = DataPrivacyManager()
+    return manager.anonymize_members(member_ids)
+
+def purge_members(member_ids: List[str], job_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Convenience function to purge many members
+    """
+    manager = DataPrivacyManager()
+    return manager.purge_members(member_ids, job_id)
+
 def delete_member_data(member_id: str, retention_period_days: int = 30) -> Dict[str, Any]:
     """
     Convenience function to delete member data